@@ -4,28 +4,51 @@ from sqlalchemy.future import select
 from sqlalchemy import func, and_, case
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
+from functools import partial
 import random
 from collections import defaultdict
 
 from backend.schemas.user import User
-from backend.core.database import get_db
+from backend.core.database import get_db, run_in_session
 from backend.core.rbac import require_viewer, require_executive
 from backend.models.pipeline import Pipeline
 from backend.models.pipeline_run import PipelineRun
 from backend.models.connector import Connector
 from backend.models.transformation import Transformation
+from backend.services.cache_service import cache_service
 
 router = APIRouter()
 
+# Analytics are shared by all executives. Each query runs at most once per
+# TTL across replicas; expired results are served for ANALYTICS_STALE_TTL
+# more seconds while one request recomputes them in the background
+ANALYTICS_CACHE_TTL = 60
+ANALYTICS_STALE_TTL = 300
+# Dropped together by cache_service.invalidate_api_cache("analytics")
+ANALYTICS_CACHE_TAGS = ("api", "api:analytics")
+
+
+async def _cached(key: str, query, *args) -> Any:
+    return await cache_service.get_or_compute(
+        key,
+        partial(run_in_session, query, *args),
+        ttl=ANALYTICS_CACHE_TTL,
+        stale_ttl=ANALYTICS_STALE_TTL,
+        tags=ANALYTICS_CACHE_TAGS
+    )
+
 
 @router.get("/data")
 async def get_analytics_data(
-    current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(require_executive())
 ) -> Dict[str, Any]:
     """
     Get overall analytics data
     """
+    return await _cached("api:analytics:data", _analytics_data)
+
+
+async def _analytics_data(db: AsyncSession) -> Dict[str, Any]:
     # Get pipeline counts
     total_pipelines_result = await db.execute(select(func.count(Pipeline.id)))
     total_count = total_pipelines_result.scalar_one_or_none() or 0
@@ -86,13 +109,15 @@ async def get_analytics_data(
 @router.get("/timeseries")
 async def get_time_series_data(
     current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db),
     days: int = 7
 ) -> List[Dict[str, Any]]:
     """
     Get time series data for charts
     """
-    
+    return await _cached(f"api:analytics:timeseries:{days}", _time_series_data, days)
+
+
+async def _time_series_data(db: AsyncSession, days: int) -> List[Dict[str, Any]]:
     start_date = datetime.now() - timedelta(days=days)
     
     # Group by date
@@ -125,13 +150,15 @@ async def get_time_series_data(
 @router.get("/top-pipelines")
 async def get_top_pipelines(
     current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db),
     limit: int = 5
 ) -> List[Dict[str, Any]]:
     """
     Get top performing pipelines
     """
-    
+    return await _cached(f"api:analytics:top-pipelines:{limit}", _top_pipelines, limit)
+
+
+async def _top_pipelines(db: AsyncSession, limit: int) -> List[Dict[str, Any]]:
     # Join Pipeline and PipelineRun to get aggregated stats
     query = (
         select(
@@ -163,12 +190,15 @@ async def get_top_pipelines(
 
 @router.get("/pipeline-trends")
 async def get_pipeline_trends(
-    current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(require_executive())
 ) -> Dict[str, Any]:
     """
     Get pipeline performance trends
     """
+    return await _cached("api:analytics:pipeline-trends", _pipeline_trends)
+
+
+async def _pipeline_trends(db: AsyncSession) -> Dict[str, Any]:
     # Get current counts
     total_result = await db.execute(select(func.count(Pipeline.id)))
     current_total = total_result.scalar_one_or_none() or 0
@@ -203,13 +233,16 @@ async def get_pipeline_trends(
 @router.get("/aggregated")
 async def get_aggregated_analytics(
     current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db),
     time_range: str = Query("7d", regex="^(24h|7d|30d|90d)$")
 ) -> Dict[str, Any]:
     """
     Get aggregated analytics data with time-based filtering
     Enhanced analytics with more granular metrics
     """
+    return await _cached(f"api:analytics:aggregated:{time_range}", _aggregated_analytics, time_range)
+
+
+async def _aggregated_analytics(db: AsyncSession, time_range: str) -> Dict[str, Any]:
     # Parse time range
     time_mapping = {
         "24h": timedelta(hours=24),
@@ -347,7 +380,6 @@ async def get_performance_metrics(
 @router.get("/export-data")
 async def export_analytics_data(
     current_user: User = Depends(require_executive()),
-    db: AsyncSession = Depends(get_db),
     format: str = Query("json", regex="^(json|csv)$"),
     time_range: str = Query("7d", regex="^(24h|7d|30d|90d)$")
 ) -> Dict[str, Any]:
@@ -356,7 +388,7 @@ async def export_analytics_data(
     Supports JSON and CSV formats
     """
     # Get aggregated data
-    aggregated_data = await get_aggregated_analytics(current_user, db, time_range)
+    aggregated_data = await get_aggregated_analytics(current_user, time_range)
 
     if format == "csv":
         # Convert time series to CSV-friendly format
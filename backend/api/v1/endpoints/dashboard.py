@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
@@ -6,24 +7,41 @@ from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from backend.core.database import get_db
+from backend.core.database import get_db, run_in_session
 from backend.core.rbac import require_viewer
 from backend.models.connector import Connector
 from backend.models.pipeline import Pipeline
 from backend.models.transformation import Transformation
 from backend.schemas.user import User
+from backend.services.cache_service import cache_service
 
 router = APIRouter()
 
+# Dashboard figures are the same for every viewer: computed once per TTL, and
+# served stale for a while longer while one request refreshes them
+DASHBOARD_CACHE_TTL = 30
+DASHBOARD_STALE_TTL = 120
+# Dropped together by cache_service.invalidate_api_cache("dashboard")
+DASHBOARD_CACHE_TAGS = ("api", "api:dashboard")
+
 
 @router.get("/stats")
 async def get_dashboard_stats(
-    current_user: User = Depends(require_viewer()),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(require_viewer())
 ) -> Dict[str, Any]:
     """
     Get dashboard overview statistics
     """
+    return await cache_service.get_or_compute(
+        "api:dashboard:stats",
+        partial(run_in_session, _dashboard_stats),
+        ttl=DASHBOARD_CACHE_TTL,
+        stale_ttl=DASHBOARD_STALE_TTL,
+        tags=DASHBOARD_CACHE_TAGS
+    )
+
+
+async def _dashboard_stats(db: AsyncSession) -> Dict[str, Any]:
     # Get real counts from database
     pipelines_result = await db.execute(select(func.count(Pipeline.id)))
     total_pipelines = pipelines_result.scalar() or 0
@@ -194,12 +212,21 @@ async def get_system_status(
 
 @router.get("/performance-metrics")
 async def get_performance_metrics(
-    current_user: User = Depends(require_viewer()),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(require_viewer())
 ) -> Dict[str, Any]:
     """
     Get system performance metrics
     """
+    return await cache_service.get_or_compute(
+        "api:dashboard:performance-metrics",
+        partial(run_in_session, _performance_metrics),
+        ttl=DASHBOARD_CACHE_TTL,
+        stale_ttl=DASHBOARD_STALE_TTL,
+        tags=DASHBOARD_CACHE_TAGS
+    )
+
+
+async def _performance_metrics(db: AsyncSession) -> Dict[str, Any]:
     # Get actual pipeline counts for more realistic metrics
     active_pipelines_result = await db.execute(
         select(func.count(Pipeline.id)).filter(Pipeline.is_active == True)
@@ -1,15 +1,26 @@
 import os
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.database import get_db
+from backend.core.error_handler import safe_error_response
+from backend.core.file_response import StoredFileResponse
 from backend.core.rbac import require_any_authenticated
+from backend.models.file_upload import FileStatus, FileType, FileUpload
 from backend.schemas.user import User
+from backend.services.file_preview_service import MAX_PREVIEW_ROWS, FilePreviewError, file_preview_service
+from backend.services.file_upload_service import ChunkUploadError, UploadTooLargeError, file_upload_service
 
 router = APIRouter()
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/data_aggregator/uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+PREVIEW_FORMATS = {FileType.CSV: "csv", FileType.JSON: "jsonl", FileType.EXCEL: "excel"}
+
 @router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -26,3 +37,200 @@ async def upload_file(
         return {"file_path": file_location, "filename": file.filename}
     except Exception as e:
         raise safe_error_response(500, "Unable to upload file", internal_error=e)
+
+
+class ChunkedUploadRequest(BaseModel):
+    """Request to start a chunked upload"""
+    filename: str
+    file_size: int = Field(..., gt=0)
+    mime_type: Optional[str] = None
+    chunk_size: Optional[int] = Field(None, gt=0)
+    file_hash: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$", description="SHA-256 of the content, if known")
+    columnar: bool = Field(False, description="Convert CSV, JSON or Excel content to a columnar sidecar once validated")
+
+
+async def _get_own_upload(db: AsyncSession, file_id: int, current_user: User) -> FileUpload:
+    """Load an upload owned by the current user, or raise 404"""
+    upload = await file_upload_service.get_file_upload(db, file_id)
+    if upload is None or (upload.user_id != current_user.id and not current_user.can_admin):
+        raise HTTPException(status_code=404, detail="File not found")
+    return upload
+
+
+def _chunk_status(upload: FileUpload) -> Dict[str, Any]:
+    return {
+        "file_id": upload.id,
+        "status": upload.status.value,
+        "chunk_size": upload.chunk_size,
+        "total_chunks": upload.chunk_count,
+        "upload_required": upload.status == FileStatus.UPLOADING
+    }
+
+
+@router.post("/uploads")
+async def start_chunked_upload(
+    request: ChunkedUploadRequest,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Start a chunked upload. Chunks can then be sent in any order, in parallel.
+    When file_hash matches content already stored, the upload completes
+    immediately and upload_required is false. Files above MAX_FILE_SIZE are
+    rejected with 413, chunk layouts outside the configured bounds with 400.
+    """
+    try:
+        upload = await file_upload_service.create_upload(
+            db=db,
+            filename=request.filename,
+            file_size=request.file_size,
+            mime_type=request.mime_type,
+            user_id=current_user.id,
+            chunk_size=request.chunk_size,
+            file_hash=request.file_hash,
+            columnar=request.columnar
+        )
+        return _chunk_status(upload)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ChunkUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise safe_error_response(500, "Unable to start upload", internal_error=e)
+
+
+@router.put("/uploads/{file_id}/chunks/{chunk_number}")
+async def upload_file_chunk(
+    file_id: int,
+    chunk_number: int,
+    request: Request,
+    total_chunks: int = Query(..., gt=0),
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Upload one chunk (raw request body) at its position in the file.
+    The Content-Length must be the chunk's length, checked before the body is read.
+    """
+    try:
+        upload = await _get_own_upload(db, file_id, current_user)
+        expected_length = file_upload_service.expected_chunk_length(upload, chunk_number, total_chunks)
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            raise HTTPException(status_code=411, detail="Content-Length is required")
+        if not content_length.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if int(content_length) != expected_length:
+            raise HTTPException(
+                status_code=413 if int(content_length) > expected_length else 400,
+                detail=f"Chunk {chunk_number} must be {expected_length} bytes, got {content_length}"
+            )
+        return await file_upload_service.upload_chunk(
+            db=db,
+            file_id=file_id,
+            chunk_data=await request.body(),
+            chunk_number=chunk_number,
+            total_chunks=total_chunks
+        )
+    except HTTPException:
+        raise
+    except ChunkUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise safe_error_response(500, "Unable to upload chunk", internal_error=e)
+
+
+@router.get("/uploads/{file_id}/chunks")
+async def get_chunk_status(
+    file_id: int,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Received and missing chunks, for resuming an interrupted upload
+    """
+    try:
+        await _get_own_upload(db, file_id, current_user)
+        return await file_upload_service.get_chunk_status(db, file_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(500, "Unable to read upload status", internal_error=e)
+
+
+@router.get("/uploads/{file_id}/content")
+async def download_file(
+    file_id: int,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream an uploaded file. Supports Range requests (single and multiple
+    ranges) and If-None-Match against the content hash.
+    """
+    try:
+        upload = await _get_own_upload(db, file_id, current_user)
+        if upload.status in (FileStatus.UPLOADING, FileStatus.DELETED):
+            raise HTTPException(status_code=409, detail="File upload is not complete")
+        try:
+            stat_result = os.stat(upload.file_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        return StoredFileResponse(
+            upload.file_path,
+            file_hash=upload.file_hash,
+            filename=upload.original_filename,
+            media_type=upload.mime_type,
+            stat_result=stat_result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(500, "Unable to download file", internal_error=e)
+
+
+@router.get("/uploads/{file_id}/preview")
+async def preview_file(
+    file_id: int,
+    start: int = Query(0, ge=0, description="First data row of the window"),
+    limit: int = Query(50, ge=1, le=MAX_PREVIEW_ROWS),
+    has_header: bool = Query(True, description="Treat the first CSV row as column names"),
+    delimiter: str = Query(",", min_length=1, max_length=1),
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    A window of rows from a CSV or JSON Lines upload. The file's sparse
+    record index locates the window, so only the rows near it are parsed.
+    Uploads converted to a columnar sidecar (Excel too) are read from it.
+    """
+    try:
+        upload = await _get_own_upload(db, file_id, current_user)
+        if upload.status in (FileStatus.UPLOADING, FileStatus.DELETED):
+            raise HTTPException(status_code=409, detail="File upload is not complete")
+        file_format = PREVIEW_FORMATS.get(upload.file_type)
+        if file_format is None:
+            raise HTTPException(status_code=400, detail="Only CSV, JSON Lines and Excel files can be previewed")
+        if not os.path.exists(upload.file_path):
+            raise HTTPException(status_code=404, detail="File not found")
+
+        encoding = (upload.file_metadata or {}).get("encoding") or "utf-8"
+        return await file_preview_service.preview(
+            upload.file_path,
+            file_format,
+            start=start,
+            limit=limit,
+            has_header=has_header,
+            delimiter=delimiter,
+            encoding=encoding,
+            file_hash=upload.file_hash
+        )
+    except FilePreviewError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(500, "Unable to preview file", internal_error=e)
@@ -11,6 +11,8 @@ from backend.core.rbac import require_viewer
 from backend.models.pipeline import Pipeline
 from backend.models.connector import Connector
 from backend.models.transformation import Transformation
+from backend.services.memory_budget_service import memory_budget_service
+from backend.services.sandbox_worker_pool import sandbox_worker_pool
 
 router = APIRouter()
 
@@ -168,4 +170,24 @@ async def get_system_health(
         },
         "overall_status": "operational",
         "last_check": datetime.now()
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/memory-budget")
+async def get_memory_budget(
+    current_user: User = Depends(require_viewer())
+) -> Dict[str, Any]:
+    """
+    Get pipeline memory pool usage per run and per operator
+    """
+    return memory_budget_service.get_usage()
+
+
+@router.get("/sandbox-pool")
+async def get_sandbox_pool(
+    current_user: User = Depends(require_viewer())
+) -> Dict[str, Any]:
+    """
+    Get sandbox worker pool status for user transformation functions
+    """
+    return sandbox_worker_pool.get_stats()
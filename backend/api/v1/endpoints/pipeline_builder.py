@@ -37,11 +37,13 @@ async def validate_pipeline(
 async def dry_run_pipeline(
     pipeline_id: int,
     definition: VisualPipelineDefinition,
+    use_cache: bool = False,
     current_user: User = Depends(require_any_authenticated()),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
-    Perform a dry-run of the pipeline without actually processing data
+    Perform a dry-run of the pipeline without actually processing data.
+    With use_cache, cached upstream outputs are reused for the preview.
     """
     # Validate first
     validation = pipeline_validation_service.validate_pipeline(definition)
@@ -59,7 +61,9 @@ async def dry_run_pipeline(
     state = await pipeline_execution_engine.execute_pipeline(
         pipeline_id=pipeline_id,
         definition=definition,
-        dry_run=True
+        dry_run=True,
+        use_cache=use_cache,
+        user=current_user
     )
 
     return {
@@ -72,11 +76,13 @@ async def dry_run_pipeline(
                 "node_id": step.node_id,
                 "node_type": step.node_type,
                 "status": step.status,
-                "records_processed": step.records_processed
+                "records_processed": step.records_processed,
+                "metrics": step.metrics
             }
             for step in state.steps
         ],
         "execution_log": state.execution_log,
+        "cached_nodes": state.cached_nodes,
         "validation": validation.dict()
     }
 
@@ -85,11 +91,13 @@ async def dry_run_pipeline(
 async def execute_visual_pipeline(
     pipeline_id: int,
     definition: VisualPipelineDefinition,
+    use_cache: bool = False,
     current_user: User = Depends(require_any_authenticated()),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
-    Execute a visual pipeline
+    Execute a visual pipeline.
+    With use_cache, unchanged upstream nodes are served from the node output cache.
     """
     # Validate first
     validation = pipeline_validation_service.validate_pipeline(definition)
@@ -107,7 +115,9 @@ async def execute_visual_pipeline(
     state = await pipeline_execution_engine.execute_pipeline(
         pipeline_id=pipeline_id,
         definition=definition,
-        dry_run=False
+        dry_run=False,
+        use_cache=use_cache,
+        user=current_user
     )
 
     return {
@@ -119,7 +129,9 @@ async def execute_visual_pipeline(
             if state.end_time and state.start_time
             else 0
         ),
-        "total_steps": len(state.steps)
+        "total_steps": len(state.steps),
+        "cached_nodes": state.cached_nodes,
+        "operator_metrics": state.node_metrics
     }
 
 
@@ -150,7 +162,8 @@ async def get_execution_state(
                 "step_number": step.step_number,
                 "node_id": step.node_id,
                 "node_type": step.node_type,
-                "status": step.status
+                "status": step.status,
+                "metrics": step.metrics
             }
             for step in state.steps
         ]
@@ -165,7 +178,11 @@ async def cancel_pipeline_execution(
     """
     Cancel a running pipeline execution
     """
-    pipeline_execution_engine.cancel_execution(pipeline_id)
+    if not pipeline_execution_engine.cancel_execution(pipeline_id):
+        raise HTTPException(
+            status_code=404,
+            detail="No active execution found for this pipeline"
+        )
 
     return {"message": f"Pipeline {pipeline_id} execution cancelled"}
 
@@ -4,22 +4,35 @@ Updated: Phase 11A - SEC-002 (Fixed error message leakage)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
+from functools import partial
+import json
+import logging
 
 from backend.schemas.user import User
-from backend.core.database import get_db
+from backend.core.database import AsyncSessionLocal, get_db
 from backend.core.rbac import require_any_authenticated
 from backend.core.error_handler import safe_error_response
 from backend.services.schema_introspector import (
+    DEFAULT_INTROSPECTION_PAGE_SIZE,
     DatabaseSchemaIntrospector,
     APISchemaIntrospector,
     FileSchemaIntrospector,
     SchemaComparator
 )
+from backend.services.schema_introspection_cache import schema_introspection_cache
+from backend.services.schema_inference_service import schema_inference_service
+from backend.services.column_profile_service import (
+    column_profile_service,
+    profile_file,
+    profile_table,
+    table_source_ref
+)
 from backend.services.schema_mapper import (
     SchemaMapping,
     FieldMapping,
@@ -29,14 +42,26 @@ from backend.services.schema_mapper import (
     TransformationRuleGenerator,
     MappingType
 )
+from backend.services.schema_mapping_compiler import (
+    MappingApplicationError,
+    MappingCompilationError,
+    schema_mapping_compiler
+)
+from backend.models.file_upload import FileUpload, FileType
 from backend.models.schema_mapping import (
+    DataProfile,
     SchemaDefinition,
     SchemaMappingDefinition,
     MappingTemplate
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Upper bound on records accepted by the mapping apply endpoint
+MAX_APPLY_RECORDS = 10000
+
 # Initialize template manager (in production, use database-backed storage)
 template_manager = MappingTemplateManager()
 
@@ -45,6 +70,9 @@ template_manager = MappingTemplateManager()
 class DatabaseIntrospectionRequest(BaseModel):
     connection_string: str = Field(..., description="Database connection string")
     schema_name: Optional[str] = Field(None, description="Schema name (optional)")
+    offset: int = Field(default=0, ge=0, description="First table to return, in name order")
+    limit: Optional[int] = Field(None, ge=1, le=5000, description="Maximum tables to return (optional)")
+    refresh: bool = Field(default=False, description="Re-introspect even if the catalog fingerprint is unchanged")
 
 
 class APIIntrospectionRequest(BaseModel):
@@ -53,7 +81,7 @@ class APIIntrospectionRequest(BaseModel):
 
 
 class JSONSampleRequest(BaseModel):
-    json_data: Dict[str, Any] = Field(..., description="Sample JSON data")
+    json_data: Union[Dict[str, Any], List[Dict[str, Any]]] = Field(..., description="Sample JSON object or array of objects")
     schema_name: str = Field(default="sample", description="Name for the schema")
 
 
@@ -63,6 +91,24 @@ class CSVIntrospectionRequest(BaseModel):
     has_header: bool = Field(default=True, description="Whether first row is header")
 
 
+class FileInferenceRequest(BaseModel):
+    file_id: int = Field(..., description="Uploaded file to infer the schema of")
+    file_format: Optional[str] = Field(None, pattern="^(csv|json|ndjson)$", description="File format (defaults to the upload's type)")
+    delimiter: str = Field(default=",", description="CSV delimiter")
+    has_header: bool = Field(default=True, description="Whether first row is header")
+    sample_size: Optional[int] = Field(None, ge=100, description="Infer from a uniform sample of this many records (optional)")
+
+
+class ProfileRequest(BaseModel):
+    file_id: Optional[int] = Field(None, description="Uploaded file to profile")
+    connection_string: Optional[str] = Field(None, description="Database connection string of the source table")
+    table_name: Optional[str] = Field(None, description="Source table to profile")
+    schema_name: Optional[str] = Field(None, description="Schema of the source table (optional)")
+    file_format: Optional[str] = Field(None, pattern="^(csv|json|ndjson)$", description="File format (defaults to the upload's type)")
+    delimiter: str = Field(default=",", description="CSV delimiter")
+    has_header: bool = Field(default=True, description="Whether first row is header")
+
+
 class SchemaComparisonRequest(BaseModel):
     schema1: Dict[str, Any] = Field(..., description="First schema")
     schema2: Dict[str, Any] = Field(..., description="Second schema")
@@ -103,12 +149,18 @@ async def introspect_database_schema(
     """
     Introspect a database schema
 
-    Returns table structures, columns, types, and constraints
+    Returns table structures, columns, types, and constraints. Results are
+    cached and only re-introspected when the catalog fingerprint changes;
+    a detected change is returned as `drift`.
     """
     try:
-        schema = DatabaseSchemaIntrospector.introspect_database(
+        schema = await schema_introspection_cache.introspect_async(
             connection_string=request.connection_string,
-            schema_name=request.schema_name
+            schema_name=request.schema_name,
+            offset=request.offset,
+            limit=request.limit,
+            refresh=request.refresh,
+            user_id=current_user.id
         )
 
         if "error" in schema:
@@ -124,6 +176,51 @@ async def introspect_database_schema(
         )
 
 
+@router.get("/drift-events")
+async def list_schema_drift_events(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_any_authenticated())
+) -> Dict[str, Any]:
+    """
+    List recent schema drift events detected during database introspection.
+    Users see the events their own introspections detected; admins see all.
+    """
+    events = schema_introspection_cache.get_drift_events(
+        limit, user_id=None if current_user.can_admin else current_user.id
+    )
+    return {
+        "events": events,
+        "total_count": len(events)
+    }
+
+
+@router.post("/introspect/database/stream")
+async def stream_database_schema(
+    request: DatabaseIntrospectionRequest,
+    page_size: int = Query(DEFAULT_INTROSPECTION_PAGE_SIZE, ge=1, le=5000),
+    current_user: User = Depends(require_any_authenticated())
+) -> StreamingResponse:
+    """
+    Stream a database schema as NDJSON
+
+    The first line describes the schema, each following line is one table.
+    Tables are reflected page by page, so large schemas start arriving
+    before the whole catalog has been read.
+    """
+    def lines():
+        try:
+            for item in DatabaseSchemaIntrospector.iter_tables(
+                request.connection_string, request.schema_name, page_size
+            ):
+                yield json.dumps(item, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming database introspection failed: {e}")
+            yield json.dumps({"error": "Unable to introspect database schema"}) + "\n"
+
+    # The sync generator is iterated in a worker thread
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/introspect/api")
 async def introspect_api_schema(
     request: APIIntrospectionRequest,
@@ -206,6 +303,184 @@ async def introspect_csv_schema(
         )
 
 
+async def _get_upload(db: AsyncSession, file_id: int, current_user: User) -> FileUpload:
+    """Load an upload the current user may read, or raise 404"""
+    result = await db.execute(select(FileUpload).where(FileUpload.id == file_id))
+    upload = result.scalar_one_or_none()
+    if upload is None or (upload.user_id not in (None, current_user.id) and not current_user.can_admin):
+        raise HTTPException(status_code=404, detail="File not found")
+    return upload
+
+
+def _upload_format(upload: FileUpload, requested: Optional[str]) -> str:
+    file_format = requested or {FileType.CSV: "csv", FileType.JSON: "json"}.get(upload.file_type)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Only CSV and JSON files can be scanned")
+    return file_format
+
+
+@router.post("/introspect/file")
+async def infer_file_schema(
+    request: FileInferenceRequest,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Start schema inference over an uploaded CSV or JSON file
+
+    The whole file (or a reservoir sample) is scanned in one streaming pass
+    in a worker thread. Poll `/introspect/jobs/{job_id}` for progress and
+    the inferred schema.
+    """
+    try:
+        upload = await _get_upload(db, request.file_id, current_user)
+
+        return schema_inference_service.start_job(
+            upload.file_path,
+            _upload_format(upload, request.file_format),
+            delimiter=request.delimiter,
+            has_header=request.has_header,
+            sample_size=request.sample_size
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(
+            500,
+            "Unable to start schema inference",
+            internal_error=e
+        )
+
+
+@router.get("/introspect/jobs/{job_id}")
+async def get_schema_inference_job(
+    job_id: str,
+    current_user: User = Depends(require_any_authenticated())
+) -> Dict[str, Any]:
+    """Get the progress or result of a file schema inference job"""
+    job = schema_inference_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Inference job not found")
+    return job
+
+
+@router.post("/profiles")
+async def start_profile(
+    request: ProfileRequest,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Start profiling an uploaded file or a source table
+
+    Every record is streamed through per-column sketches (null counts,
+    min/max, HyperLogLog distinct estimates, t-digest quantiles, frequent
+    values and length histograms) in a worker thread. The stored profile
+    is the job result; poll `/introspect/jobs/{job_id}`.
+    """
+    try:
+        if request.file_id is not None:
+            upload = await _get_upload(db, request.file_id, current_user)
+            source_type, source_ref = "file", str(upload.id)
+            work = partial(
+                profile_file, upload.file_path, _upload_format(upload, request.file_format),
+                request.delimiter, request.has_header, file_hash=upload.file_hash
+            )
+        elif request.connection_string and request.table_name:
+            source_type = "table"
+            source_ref = table_source_ref(request.connection_string, request.table_name, request.schema_name)
+            work = partial(profile_table, request.connection_string, request.table_name, request.schema_name)
+        else:
+            raise HTTPException(status_code=400, detail="Provide file_id, or connection_string and table_name")
+
+        async def store(profiler):
+            async with AsyncSessionLocal() as session:
+                return await column_profile_service.save(session, source_type, source_ref, profiler, current_user.id)
+
+        return schema_inference_service.submit(
+            "profile",
+            lambda progress: work(progress=progress),
+            on_complete=store,
+            source_type=source_type,
+            source_ref=source_ref
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(
+            500,
+            "Unable to start profiling",
+            internal_error=e
+        )
+
+
+@router.get("/profiles")
+async def list_profiles(
+    source_type: Optional[str] = Query(None, regex="^(file|table)$"),
+    source_ref: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """
+    List stored column profiles, newest first, without column statistics.
+    Users see the profiles they requested; admins see all.
+    """
+    try:
+        query = select(DataProfile).order_by(DataProfile.created_at.desc(), DataProfile.id.desc()).limit(limit)
+        if not current_user.can_admin:
+            query = query.where(DataProfile.created_by == current_user.id)
+        if source_type:
+            query = query.where(DataProfile.source_type == source_type)
+        if source_ref:
+            query = query.where(DataProfile.source_ref == source_ref)
+        result = await db.execute(query)
+
+        return [
+            {
+                "profile_id": profile.id,
+                "source_type": profile.source_type,
+                "source_ref": profile.source_ref,
+                "row_count": profile.row_count,
+                "column_count": len(profile.columns),
+                "created_at": profile.created_at.isoformat() if profile.created_at else None
+            }
+            for profile in result.scalars().all()
+        ]
+
+    except Exception as e:
+        raise safe_error_response(
+            500,
+            "Unable to list profiles",
+            internal_error=e
+        )
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: int,
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """Get a stored profile with its per-column statistics"""
+    try:
+        profile = await column_profile_service.get(db, profile_id)
+        if profile is None or (profile.created_by != current_user.id and not current_user.can_admin):
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return column_profile_service.to_response(profile)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(
+            500,
+            "Unable to get profile",
+            internal_error=e
+        )
+
+
 @router.post("/compare")
 async def compare_schemas(
     request: SchemaComparisonRequest,
@@ -502,6 +777,7 @@ async def update_field_mappings(
         # Convert to dict
         mapping.field_mappings = [fm.dict() for fm in field_mappings]
         await db.commit()
+        schema_mapping_compiler.invalidate(mapping_id)
 
         return {
             "message": "Field mappings updated successfully",
@@ -583,6 +859,43 @@ async def validate_schema_mapping(
         )
 
 
+@router.post("/mappings/{mapping_id}/apply")
+async def apply_schema_mapping(
+    mapping_id: int,
+    records: List[Dict[str, Any]] = Body(...),
+    current_user: User = Depends(require_any_authenticated()),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """Apply a schema mapping to sample records using the compiled transformer"""
+    try:
+        if len(records) > MAX_APPLY_RECORDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_APPLY_RECORDS} records can be applied per request"
+            )
+
+        compiled = await schema_mapping_compiler.resolve(db, mapping_id)
+        if compiled is None:
+            raise HTTPException(status_code=404, detail="Mapping not found")
+
+        return {
+            "records": compiled.apply_records(records),
+            "record_count": len(records),
+            "version": compiled.version
+        }
+
+    except (MappingCompilationError, MappingApplicationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise safe_error_response(
+            500,
+            "Unable to apply schema mapping",
+            internal_error=e
+        )
+
+
 @router.post("/mappings/{mapping_id}/generate-code")
 async def generate_transformation_code(
     mapping_id: int,
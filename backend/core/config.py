@@ -55,6 +55,21 @@ class Settings(BaseSettings):
     MAX_LOGIN_ATTEMPTS: int = 5
     LOCKOUT_DURATION: int = 15  # In minutes
 
+    # Pipeline execution memory budget
+    PIPELINE_MEMORY_POOL_BYTES: Optional[int] = None  # Overrides the detected pool size
+    PIPELINE_MEMORY_POOL_FRACTION: float = 0.6  # Share of the cgroup/physical limit given to pipelines
+
+    # Node output cache for incremental re-runs (stored under TEMP_FILES_PATH)
+    NODE_OUTPUT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+
+    # Sandbox worker pool for user-defined transformation functions
+    SANDBOX_WORKERS: int = 2
+    SANDBOX_MAX_CALLS_PER_WORKER: int = 500  # Recycle a worker after this many batches
+    SANDBOX_CPU_SECONDS_PER_CALL: int = 10
+    SANDBOX_MEMORY_BYTES: int = 512 * 1024 * 1024  # Address-space limit per worker
+    SANDBOX_BATCH_TIMEOUT_SECONDS: float = 30.0
+    SANDBOX_SHM_THRESHOLD_BYTES: int = 1024 * 1024  # Larger batches go through shared memory
+
     class Config:
         case_sensitive = True
         env_file = ".env"
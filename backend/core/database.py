@@ -30,4 +30,9 @@ Base = declarative_base()
 # Dependency to get the database session
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def run_in_session(query, *args):
+    """Await query(session, *args) in a session of its own, for work that can outlive the request"""
+    async with AsyncSessionLocal() as session:
+        return await query(session, *args)
@@ -0,0 +1,126 @@
+"""
+File Download Responses
+Streams stored files with HTTP Range, ETag and zero-copy support
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from backend.services.compressed_storage import FrameIndex, FramedReader
+
+
+class _AsyncFramedReader:
+    """Async file interface over a FramedReader, reading in a worker thread"""
+
+    def __init__(self, reader: FramedReader):
+        self.reader = reader
+
+    async def seek(self, offset: int) -> int:
+        return self.reader.seek(offset)
+
+    async def read(self, size: int) -> bytes:
+        def read_full() -> bytes:
+            chunks = []
+            remaining = size
+            while remaining > 0 and (chunk := self.reader.read(remaining)):
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            return b"".join(chunks)
+
+        return await anyio.to_thread.run_sync(read_full)
+
+
+def parse_etags(header_value: str) -> Set[str]:
+    """Entity tags of an If-None-Match header, compared weakly (W/ prefixes dropped)"""
+    tags = set()
+    for tag in header_value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class StoredFileResponse(FileResponse):
+    """
+    FileResponse for files whose SHA-256 is known
+
+    - The ETag is the content hash, so it is stable across restarts and
+      storage moves; a matching If-None-Match is answered with 304
+    - Single and multi-range requests (206, multipart/byteranges) and
+      If-Range are served by Starlette's FileResponse
+    - Whole-file responses are handed to the server through the ASGI
+      pathsend extension when it is offered, letting the server sendfile()
+      without the file passing through Python; otherwise, and for ranges,
+      the file is streamed in chunk_size reads
+    - Files in compressed frame storage are served by their uncompressed
+      content: ranges decompress only the frames they cover, and pathsend
+      is not used since the bytes on disk are not the response body
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        file_hash: Optional[str] = None,
+        filename: Optional[str] = None,
+        media_type: Optional[str] = None,
+        stat_result: Optional[os.stat_result] = None
+    ):
+        headers = {"cache-control": "private, no-cache"}
+        if file_hash:
+            headers["etag"] = f'"{file_hash}"'
+        self.frame_index = FrameIndex.load(path)
+        if self.frame_index is not None:
+            stat_result = stat_result or os.stat(path)
+            # Length and ranges refer to the content, not the compressed bytes
+            stat_result = os.stat_result(
+                tuple(stat_result[:6]) + (self.frame_index.uncompressed_size,) + tuple(stat_result[7:10]),
+                {"st_mtime": stat_result.st_mtime}
+            )
+        super().__init__(
+            path,
+            headers=headers,
+            media_type=media_type,
+            filename=filename,
+            stat_result=stat_result
+        )
+
+    def _not_modified(self, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        etag = self.headers.get("etag")
+        if not if_none_match or not etag:
+            return False
+        tags = parse_etags(if_none_match)
+        return "*" in tags or etag in tags
+
+    @asynccontextmanager
+    async def _open_file(self) -> AsyncIterator:
+        if self.frame_index is None:
+            async with super()._open_file() as file:
+                yield file
+            return
+        reader = await anyio.to_thread.run_sync(FramedReader, str(self.path), self.frame_index)
+        try:
+            yield _AsyncFramedReader(reader)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(reader.close)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self._not_modified(Headers(scope=scope)):
+            headers = {name: self.headers[name] for name in ("etag", "cache-control")}
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+        if self.frame_index is not None and "http.response.pathsend" in scope.get("extensions", {}):
+            extensions = {key: value for key, value in scope["extensions"].items() if key != "http.response.pathsend"}
+            scope = {**scope, "extensions": extensions}
+        await super().__call__(scope, receive, send)
@@ -15,6 +15,7 @@ from backend.middleware.admin_protection import apply_admin_protection
 from backend.middleware.dev_role_protection import apply_dev_role_protection
 from backend.middleware.input_validation import validate_request_data
 from backend.core.init_db import init_db
+from backend.services.sandbox_worker_pool import sandbox_worker_pool
 # Import all models to register them with SQLAlchemy
 from backend import models
 from backend.models import pipeline_run, auth_token
@@ -94,6 +95,9 @@ def create_app():
                 await db.close()
             break  # Only run once
 
+        # Pre-fork sandbox workers for user transformation functions
+        await sandbox_worker_pool.start()
+
         print("🚀 Data Aggregator Platform API started successfully")
         print(f"📚 API Documentation: http://localhost:8001/docs")
         print(f"🔒 Security middleware: ACTIVE")
@@ -106,6 +110,8 @@ def create_app():
             app.state.redis.close()
             print("✅ Redis connection closed")
 
+        await sandbox_worker_pool.shutdown()
+
     @app.get("/health")
     async def health_check():
         return {
@@ -5,6 +5,7 @@ from .transformation import Transformation
 from .activity_log import UserActivityLog
 from .file_upload import (
     FileUpload,
+    FileBlob,
     FileProcessingJob,
     FileConversion,
     FilePreview,
@@ -30,6 +31,7 @@ __all__ = [
     "Transformation",
     "UserActivityLog",
     "FileUpload",
+    "FileBlob",
     "FileProcessingJob",
     "FileConversion",
     "FilePreview",
@@ -5,7 +5,7 @@ Models for managing file uploads, processing, and metadata.
 Part of Sub-Phase 5A: File Processing
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, BigInteger, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, BigInteger, ForeignKey, LargeBinary, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -60,7 +60,10 @@ class FileUpload(Base):
     # File properties
     file_size = Column(BigInteger, nullable=False)  # Size in bytes
     file_hash = Column(String(64))  # SHA-256 hash for deduplication
+    blob_hash = Column(String(64), ForeignKey("file_blobs.content_hash"), nullable=True, index=True)  # Stored content, once complete
     chunk_count = Column(Integer, default=1)  # Number of chunks for large files
+    chunk_size = Column(Integer)  # Bytes per chunk; chunk n is written at n * chunk_size
+    received_chunks = Column(LargeBinary)  # Bitmap of received chunks, bit n % 8 of byte n // 8
 
     # Processing status
     status = Column(SQLEnum(FileStatus), default=FileStatus.UPLOADING, nullable=False)
@@ -96,6 +99,30 @@ class FileUpload(Base):
     pipeline = relationship("Pipeline", back_populates="file_uploads")
     processing_jobs = relationship("FileProcessingJob", back_populates="file_upload", cascade="all, delete-orphan")
     conversions = relationship("FileConversion", back_populates="source_file", cascade="all, delete-orphan")
+    blob = relationship("FileBlob", back_populates="uploads")
+
+
+class FileBlob(Base):
+    """
+    File Blob Model
+
+    Content-addressed storage for uploaded bytes. Uploads with identical
+    content share one blob; blobs whose reference count drops to zero are
+    garbage-collected with expired uploads.
+    """
+    __tablename__ = "file_blobs"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the content
+    file_size = Column(BigInteger, nullable=False)
+    storage_path = Column(String(500), nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)  # Uploads referencing this blob
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_referenced_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    uploads = relationship("FileUpload", back_populates="blob")
 
 
 class FileProcessingJob(Base):
@@ -27,6 +27,7 @@ class PipelineRun(Base):
     execution_config = Column(JSON, nullable=True)  # Runtime configuration
     error_message = Column(Text, nullable=True)
     logs = Column(Text, nullable=True)  # Execution logs
+    checkpoint = Column(JSON, nullable=True)  # Last persisted progress, used to resume cancelled runs
 
     # Metadata
     triggered_by = Column(String, nullable=True)  # manual, scheduled, webhook
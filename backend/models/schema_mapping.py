@@ -90,3 +90,20 @@ class MappingTemplate(Base):
     created_by = Column(Integer)  # User ID who created the template
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class DataProfile(Base):
+    """Model for column profiles of a file upload or source table"""
+
+    __tablename__ = "data_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_type = Column(String, nullable=False)  # file, table
+    source_ref = Column(String, nullable=False, index=True)  # File upload id or table reference
+    row_count = Column(Integer, nullable=False, default=0)
+
+    columns = Column(JSON, nullable=False)  # Per-column statistics
+    sketches = Column(JSON)  # Serialized mergeable sketches, for merging later profiles
+
+    created_by = Column(Integer)  # User ID who requested the profile
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
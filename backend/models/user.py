@@ -48,3 +48,7 @@ class User(Base):
     connectors = relationship("Connector", back_populates="owner")
     transformations = relationship("Transformation", back_populates="owner")
 
+    @property
+    def can_admin(self) -> bool:
+        """Only admins can perform admin actions."""
+        return self.role == "admin" or bool(self.is_superuser)
@@ -26,6 +26,7 @@ class PipelineRunUpdate(BaseModel):
     records_failed: Optional[int] = None
     error_message: Optional[str] = None
     logs: Optional[str] = None
+    checkpoint: Optional[Dict[str, Any]] = None
     completed_at: Optional[datetime] = None
 
 
@@ -36,6 +37,7 @@ class PipelineRun(PipelineRunBase):
     started_at: datetime
     completed_at: Optional[datetime] = None
     logs: Optional[str] = None
+    checkpoint: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -20,6 +20,7 @@ class NodeType(str, Enum):
     AGGREGATE = "aggregate"
     JOIN = "join"
     SORT = "sort"
+    DEDUPLICATE = "deduplicate"
 
     # Destination nodes
     DATABASE_DESTINATION = "database_destination"
@@ -99,3 +100,4 @@ class PipelineExecutionStep(BaseModel):
     end_time: Optional[str] = None
     records_processed: int = 0
     error_message: Optional[str] = None
+    metrics: Dict[str, Any] = Field(default_factory=dict)  # Operator metrics, e.g. dedup memory use
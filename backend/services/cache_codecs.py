@@ -0,0 +1,248 @@
+"""
+Cache Codecs
+Encodings for cached values that keep datetime, date, Decimal and UUID types, compressing large values
+"""
+
+from typing import Any, Callable, Dict, Optional, Union
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import logging
+import os
+import uuid
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional "cache" extra
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional "cache" extra
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Values encoding to at least this many bytes are stored zlib-compressed
+COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 4096))
+# Low levels get most of the size reduction on repetitive JSON-like payloads for a fraction of the CPU
+COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", 1))
+
+# Stored values start with a format byte and a flags byte. Neither format byte
+# can start JSON text, so values written before the header existed still decode
+FORMAT_JSON = 0x01
+FORMAT_MSGPACK = 0x02
+FLAG_COMPRESSED = 0x01
+
+# Tagged JSON objects standing in for types JSON has no notation for
+_TYPE_TAG = "$type"
+_TYPE_TAG_BYTES = b'"$type"'
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+_EXT_UUID = 4
+
+
+class CacheCodecError(Exception):
+    """Raised when a codec is unknown or unavailable, or a cached value cannot be decoded"""
+    pass
+
+
+def _tag(value: Any) -> Any:
+    """JSON stand-in for a typed value; anything else unknown is stored as its string, as json.dumps(default=str) did"""
+    if isinstance(value, datetime):
+        return {_TYPE_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {_TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {_TYPE_TAG: "decimal", "value": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {_TYPE_TAG: "uuid", "value": str(value)}
+    return str(value)
+
+
+_UNTAG: Dict[str, Callable[[str], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "decimal": Decimal,
+    "uuid": uuid.UUID,
+}
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    kind = obj.get(_TYPE_TAG)
+    if kind in _UNTAG and len(obj) == 2:
+        return _UNTAG[kind](obj["value"])
+    return obj
+
+
+def _untag_tree(value: Any) -> Any:
+    """Revive tagged objects throughout a decoded value (orjson has no object hook)"""
+    if isinstance(value, dict):
+        if _TYPE_TAG in value:
+            revived = _untag(value)
+            if revived is not value:
+                return revived
+        return {key: _untag_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_untag_tree(item) for item in value]
+    return value
+
+
+def _decode_json(data: bytes) -> Any:
+    if orjson is not None:
+        value = orjson.loads(data)
+        # Only walk the value when the payload holds tagged objects at all
+        return _untag_tree(value) if _TYPE_TAG_BYTES in data else value
+    return json.loads(data, object_hook=_untag)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    return str(value)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def _decode_msgpack(data: bytes) -> Any:
+    if msgpack is None:
+        raise CacheCodecError("Cached value is msgpack-encoded but msgpack is not installed")
+    return msgpack.unpackb(data, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook)
+
+
+_DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    FORMAT_JSON: _decode_json,
+    FORMAT_MSGPACK: _decode_msgpack,
+}
+
+
+class CacheCodec:
+    """Encodes values into one of the stored formats"""
+
+    name = ""
+    format = FORMAT_JSON
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+
+class JsonCodec(CacheCodec):
+    """Standard library JSON with tagged objects for typed values"""
+
+    name = "json"
+    format = FORMAT_JSON
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=_tag, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(CacheCodec):
+    """
+    orjson, writing the same tagged JSON as JsonCodec. orjson serializes
+    UUIDs natively as strings, so UUIDs come back as strings; use msgpack
+    where UUID values must keep their type.
+    """
+
+    name = "orjson"
+    format = FORMAT_JSON
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_tag, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack with extension types for datetime, date, Decimal and UUID"""
+
+    name = "msgpack"
+    format = FORMAT_MSGPACK
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+CODECS = {
+    "msgpack": (MsgpackCodec, lambda: msgpack is not None),
+    "orjson": (OrjsonCodec, lambda: orjson is not None),
+    "json": (JsonCodec, lambda: True),
+}
+
+
+def available_codecs() -> Dict[str, CacheCodec]:
+    """Installed codecs, fastest first"""
+    return {name: codec_class() for name, (codec_class, available) in CODECS.items() if available()}
+
+
+def get_codec(name: str = "auto") -> CacheCodec:
+    """A codec by name; "auto" picks the fastest installed one"""
+    if name == "auto":
+        return next(iter(available_codecs().values()))
+    if name not in CODECS:
+        raise CacheCodecError(f"Unknown cache codec: {name}")
+    codec_class, available = CODECS[name]
+    if not available():
+        raise CacheCodecError(f"Cache codec {name} is not installed")
+    return codec_class()
+
+
+class CacheSerializer:
+    """
+    Turns values into stored bytes and back
+
+    Stored bytes name their format, so every replica decodes values written
+    with any codec (given the library), and compression is applied per value.
+    Values without a header are JSON written by older versions.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[CacheCodec] = None,
+        compress_min_bytes: int = COMPRESS_MIN_BYTES,
+        compress_level: int = COMPRESS_LEVEL
+    ):
+        self.codec = codec or get_codec()
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def dumps(self, value: Any) -> bytes:
+        payload = self.codec.encode(value)
+        flags = 0
+        if 0 < self.compress_min_bytes <= len(payload):
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= FLAG_COMPRESSED
+        return bytes((self.codec.format, flags)) + payload
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        decoder = _DECODERS.get(data[0]) if data else None
+        if decoder is None:
+            return json.loads(data)
+        payload = data[2:]
+        try:
+            if data[1] & FLAG_COMPRESSED:
+                payload = zlib.decompress(payload)
+            return decoder(payload)
+        except (zlib.error, ValueError) as e:
+            raise CacheCodecError(f"Undecodable cached value: {e}")
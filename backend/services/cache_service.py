@@ -7,37 +7,233 @@ Part of Phase 6: Performance Optimization (T035)
 
 import os
 import json
+import math
+import time
+import uuid
+import random
+import asyncio
 import hashlib
-from typing import Optional, Any, Dict, List
+import logging
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Tuple
 from datetime import timedelta
 import redis.asyncio as redis
 
+from backend.monitoring.prometheus import cache_hits_total, cache_misses_total
+from backend.services.cache_codecs import CacheSerializer, get_codec
+
+logger = logging.getLogger(__name__)
+
+# Published by every replica that changes or deletes keys, so the others drop them from their local tier
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+_MISSING = object()
+
+# get_or_compute entries carry their freshness alongside the value
+_ENTRY_MARKER = "__cache_entry__"
+LOCK_POLL_INTERVAL = 0.05
+
+# Deletes the lock only if it still holds our token, so an expired lease taken over by another process is kept
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Tag sets hold the keys cached under a tag, so a tag is invalidated without scanning the keyspace
+TAG_KEY_PREFIX = "tag:"
+# Members checked for expiry each time a key joins a tag, so sets of long-lived tags shed expired keys
+TAG_PRUNE_SAMPLE = 2
+
+# Adds ARGV[1] to each tag set, drops sampled members that have expired, and
+# keeps each set alive at least as long as the key (ARGV[2] seconds)
+_TAG_KEY_SCRIPT = """
+for _, tag_key in ipairs(KEYS) do
+    for _, member in ipairs(redis.call("srandmember", tag_key, ARGV[3])) do
+        if redis.call("exists", member) == 0 then
+            redis.call("srem", tag_key, member)
+        end
+    end
+    redis.call("sadd", tag_key, ARGV[1])
+    if redis.call("ttl", tag_key) < tonumber(ARGV[2]) then
+        redis.call("expire", tag_key, ARGV[2])
+    end
+end
+return #KEYS
+"""
+
+# Label children resolved once. L1 counts are kept as plain integers and added
+# to the Prometheus counters in batches, since a counter increment costs more
+# than an L1 hit
+_memory_hits = cache_hits_total.labels(cache_type="memory")
+_memory_misses = cache_misses_total.labels(cache_type="memory")
+_redis_hits = cache_hits_total.labels(cache_type="redis")
+_redis_misses = cache_misses_total.labels(cache_type="redis")
+
+
+class LocalCache:
+    """
+    In-process LRU cache with per-entry expiry (the L1 tier)
+
+    Entries expire after their TTL shortened by a random fraction of up to
+    `jitter`, so keys cached together do not all expire, and go back to
+    Redis, at the same moment. Values are returned as stored, not copied:
+    callers must treat cached values as read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000, jitter: float = 0.1):
+        self.max_entries = max_entries
+        self.jitter = jitter
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """The cached value, or _MISSING"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+        return _MISSING
+
+    def set(self, key: str, value: Any, ttl: float):
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl * (1 - self.jitter * random.random())
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Drop keys matching a Redis glob pattern"""
+        matches = [key for key in self._entries if fnmatchcase(key, pattern)]
+        self.delete(*matches)
+        return len(matches)
+
+    def clear(self):
+        self._entries.clear()
+
 
 class CacheService:
-    """Service for caching API responses and database query results"""
+    """
+    Service for caching API responses and database query results
+
+    Reads go through an in-process L1 (LocalCache) before Redis (L2). L1
+    entries live at most CACHE_L1_TTL seconds; writes and deletes are
+    broadcast on INVALIDATION_CHANNEL so other replicas drop their L1 copy
+    straight away rather than at expiry.
+
+    Values are stored in the encoding of CACHE_CODEC ("auto" picks msgpack
+    or orjson when installed), keeping datetime, Decimal and UUID types,
+    and zlib-compressed from CACHE_COMPRESS_MIN_BYTES.
+
+    Entries can carry tags (e.g. "analytics", "pipeline:42"). Each tag is a
+    Redis set of its keys that expires with its longest-lived key, and
+    invalidate_tags deletes exactly those keys in pipelined batches.
+    """
 
     def __init__(self):
         """Initialize Redis connection"""
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.default_ttl = int(os.getenv("CACHE_DEFAULT_TTL", 300))  # 5 minutes
+        self.l1_ttl = float(os.getenv("CACHE_L1_TTL", 30))
+        self.local = LocalCache(
+            max_entries=int(os.getenv("CACHE_L1_MAX_ENTRIES", 10000)),
+            jitter=float(os.getenv("CACHE_L1_JITTER", 0.1))
+        )
+        self.serializer = CacheSerializer(get_codec(os.getenv("CACHE_CODEC", "auto")))
+        self.instance_id = uuid.uuid4().hex
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self._exported_local = (0, 0)
+        # Longest one process holds a key's compute lock before others may compute it too
+        self.lock_lease = float(os.getenv("CACHE_LOCK_LEASE", 10))
+        self.tag_batch_size = int(os.getenv("CACHE_TAG_BATCH_SIZE", 500))
         self._redis_client: Optional[redis.Redis] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        # Loader calls in flight in this process, by key
+        self._inflight: Dict[str, asyncio.Task] = {}
 
     async def get_redis(self) -> redis.Redis:
         """Get or create Redis client"""
         if self._redis_client is None:
+            # Values are binary; responses are left as bytes
             self._redis_client = await redis.from_url(
                 self.redis_url,
                 encoding="utf-8",
-                decode_responses=True
+                decode_responses=False
             )
+        if self.local.max_entries > 0 and (self._listener_task is None or self._listener_task.done()):
+            self._listener_task = asyncio.create_task(self._listen_for_invalidations())
         return self._redis_client
 
     async def close(self):
         """Close Redis connection"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
         if self._redis_client:
             await self._redis_client.close()
             self._redis_client = None
 
+    async def _publish_invalidation(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None):
+        """Tell other replicas to drop keys (or a key pattern) from their L1"""
+        try:
+            redis_client = await self.get_redis()
+            message = {"origin": self.instance_id, "keys": keys or [], "pattern": pattern}
+            await redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish error: {e}")
+
+    def _apply_invalidation(self, data: bytes):
+        """Handle an invalidation message from another replica"""
+        message = json.loads(data)
+        if message.get("origin") == self.instance_id:
+            return
+        self.local.delete(*message.get("keys") or ())
+        if message.get("pattern"):
+            self.local.delete_pattern(message["pattern"])
+
+    async def _listen_for_invalidations(self):
+        """Apply other replicas' invalidations to L1, resubscribing after connection errors"""
+        while True:
+            try:
+                pubsub = self._redis_client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    # Messages may have been missed while unsubscribed
+                    self.local.clear()
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                        if message and message.get("type") == "message":
+                            self._apply_invalidation(message["data"])
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+
     def _generate_cache_key(self, prefix: str, **kwargs) -> str:
         """
         Generate cache key from prefix and parameters
@@ -51,8 +247,8 @@ class CacheService:
         """
         # Sort kwargs for consistent key generation
         params = sorted(kwargs.items())
-        params_str = json.dumps(params, sort_keys=True)
-        params_hash = hashlib.md5(params_str.encode()).hexdigest()
+        params_str = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        params_hash = hashlib.blake2b(params_str.encode(), digest_size=16).hexdigest()
         return f"{prefix}:{params_hash}"
 
     async def get(self, key: str) -> Optional[Any]:
@@ -65,12 +261,25 @@ class CacheService:
         Returns:
             Cached value or None if not found
         """
+        value = self.local.get(key)
+        if value is not _MISSING:
+            if not self.local.hits & 1023:
+                self._export_local_metrics()
+            return value
+        self._export_local_metrics()
+
         try:
             redis_client = await self.get_redis()
             value = await redis_client.get(key)
 
             if value:
-                return json.loads(value)
+                self.redis_hits += 1
+                _redis_hits.inc()
+                value = self.serializer.loads(value)
+                self.local.set(key, value, self.l1_ttl)
+                return value
+            self.redis_misses += 1
+            _redis_misses.inc()
             return None
         except Exception as e:
             print(f"Cache get error: {e}")
@@ -80,7 +289,8 @@ class CacheService:
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
         """
         Set value in cache
@@ -89,6 +299,7 @@ class CacheService:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (None for default)
+            tags: Tags to invalidate the key by
 
         Returns:
             True if successful
@@ -97,12 +308,23 @@ class CacheService:
             redis_client = await self.get_redis()
             ttl = ttl or self.default_ttl
 
-            serialized_value = json.dumps(value, default=str)
-            await redis_client.setex(
-                key,
-                timedelta(seconds=ttl),
-                serialized_value
-            )
+            serialized_value = self.serializer.dumps(value)
+            tag_keys = [self._tag_key(tag) for tag in tags or ()]
+            if tag_keys:
+                # The key and its tag memberships are written together, so an invalidation never misses it
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    pipe.setex(key, timedelta(seconds=ttl), serialized_value)
+                    pipe.eval(_TAG_KEY_SCRIPT, len(tag_keys), *tag_keys, key, ttl, TAG_PRUNE_SAMPLE)
+                    await pipe.execute()
+            else:
+                await redis_client.setex(
+                    key,
+                    timedelta(seconds=ttl),
+                    serialized_value
+                )
+            # Keep L1 in the form a Redis read would return
+            self.local.set(key, self.serializer.loads(serialized_value), min(ttl, self.l1_ttl))
+            await self._publish_invalidation([key])
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
@@ -118,9 +340,13 @@ class CacheService:
         Returns:
             True if successful
         """
+        self.local.delete(key)
         try:
             redis_client = await self.get_redis()
             await redis_client.delete(key)
+            # A get racing the delete may have put the old value back in L1
+            self.local.delete(key)
+            await self._publish_invalidation([key])
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
@@ -130,26 +356,90 @@ class CacheService:
         """
         Delete all keys matching pattern
 
+        This scans the whole keyspace; invalidate keys cached with tags
+        through invalidate_tags instead.
+
         Args:
             pattern: Key pattern (e.g., "user:*")
 
         Returns:
             Number of keys deleted
         """
+        self.local.delete_pattern(pattern)
         try:
             redis_client = await self.get_redis()
+            deleted = 0
             keys = []
 
             async for key in redis_client.scan_iter(match=pattern):
                 keys.append(key)
-
+                if len(keys) >= self.tag_batch_size:
+                    deleted += await redis_client.unlink(*keys)
+                    keys = []
             if keys:
-                return await redis_client.delete(*keys)
-            return 0
+                deleted += await redis_client.unlink(*keys)
+            # Drop what gets racing the scan put back in L1
+            self.local.delete_pattern(pattern)
+
+            await self._publish_invalidation(pattern=pattern)
+            return deleted
         except Exception as e:
             print(f"Cache delete pattern error: {e}")
             return 0
 
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"{TAG_KEY_PREFIX}{tag}"
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every key cached with any of the given tags
+
+        Each round trip pops up to CACHE_TAG_BATCH_SIZE members from every
+        tag set while unlinking the previous batch and telling other
+        replicas to drop it from their L1, so neither Redis nor this
+        process ever handles a whole tag at once. This process drops each
+        batch from its L1 when popped and again once unlinked, so a get
+        racing the unlink cannot keep the old value.
+
+        Args:
+            *tags: Tags to invalidate
+
+        Returns:
+            Number of keys deleted
+        """
+        deleted = 0
+        pending = [self._tag_key(tag) for tag in tags]
+        members: List[str] = []
+        try:
+            redis_client = await self.get_redis()
+            while pending or members:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    if members:
+                        pipe.unlink(*members)
+                        pipe.publish(
+                            INVALIDATION_CHANNEL,
+                            json.dumps({"origin": self.instance_id, "keys": members, "pattern": None})
+                        )
+                    for tag_key in pending:
+                        pipe.spop(tag_key, self.tag_batch_size)
+                    results = await pipe.execute()
+                if members:
+                    deleted += results[0]
+                    results = results[2:]
+                    self.local.delete(*members)
+                popped = [(tag_key, batch) for tag_key, batch in zip(pending, results) if batch]
+                pending = [tag_key for tag_key, _ in popped]
+                members = [
+                    member.decode() if isinstance(member, bytes) else member
+                    for _, batch in popped for member in batch
+                ]
+                self.local.delete(*members)
+            return deleted
+        except Exception as e:
+            logger.warning(f"Cache tag invalidation error: {e}")
+            return deleted
+
     async def exists(self, key: str) -> bool:
         """
         Check if key exists in cache
@@ -185,6 +475,147 @@ class CacheService:
             print(f"Cache get TTL error: {e}")
             return None
 
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        beta: float = 1.0,
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """
+        Get a value, computing it with `loader` when it is missing
+
+        Concurrent misses for a key share one loader call in this process,
+        and a short Redis lock lets one process compute at a time while the
+        others wait for its result. For `stale_ttl` seconds after expiry the
+        old value is still returned while one background refresh replaces
+        it. Before expiry a refresh starts early with a probability that
+        grows as expiry nears and with the loader's duration (scaled by
+        `beta`), so hot keys are usually refreshed before they expire.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function computing the value
+            ttl: Seconds the value stays fresh (None for default)
+            stale_ttl: Seconds an expired value may still be served
+            beta: Early refresh eagerness (0 disables it)
+            tags: Tags to invalidate the key by
+
+        Returns:
+            Cached or computed value
+        """
+        ttl = ttl or self.default_ttl
+        entry = await self.get(key)
+        if isinstance(entry, dict) and entry.get(_ENTRY_MARKER):
+            now = time.time()
+            early = entry["compute_time"] * beta * -math.log(1.0 - random.random())
+            if now + early < entry["fresh_until"]:
+                return entry["value"]
+            if now < entry["fresh_until"] + stale_ttl:
+                if key not in self._inflight:
+                    self._start_compute(key, loader, ttl, stale_ttl, tags, background=True)
+                return entry["value"]
+
+        task = self._inflight.get(key) or self._start_compute(key, loader, ttl, stale_ttl, tags, background=False)
+        value = await asyncio.shield(task)
+        if value is _MISSING:
+            # Joined a background refresh that found another process already refreshing
+            value = await self._compute(key, loader, ttl, stale_ttl, tags, background=False)
+        return value
+
+    def _start_compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[Iterable[str]],
+        background: bool
+    ) -> asyncio.Task:
+        task = asyncio.ensure_future(self._compute(key, loader, ttl, stale_ttl, tags, background))
+        self._inflight[key] = task
+
+        def done(finished: asyncio.Task):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled() and finished.exception() is not None and background:
+                logger.warning(f"Cache refresh of {key} failed: {finished.exception()}")
+
+        task.add_done_callback(done)
+        return task
+
+    async def _compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[Iterable[str]],
+        background: bool
+    ) -> Any:
+        """Run the loader under the key's Redis lock and store the result"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        locked = await self._acquire_lock(lock_key, token)
+        if not locked:
+            if background:
+                return _MISSING
+            value = await self._wait_for_entry(key, lock_key)
+            if value is not _MISSING:
+                return value
+            # The holder finished without storing a value, or its lease ran out
+
+        try:
+            started = time.monotonic()
+            value = await loader()
+            entry = {
+                _ENTRY_MARKER: 1,
+                "value": value,
+                "fresh_until": time.time() + ttl,
+                "compute_time": time.monotonic() - started
+            }
+            await self.set(key, entry, int(math.ceil(ttl + stale_ttl)), tags)
+            return value
+        finally:
+            if locked:
+                await self._release_lock(lock_key, token)
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        """Take a key's compute lock; without Redis every process computes for itself"""
+        try:
+            redis_client = await self.get_redis()
+            return bool(await redis_client.set(lock_key, token, nx=True, px=int(self.lock_lease * 1000)))
+        except Exception as e:
+            logger.warning(f"Cache lock error: {e}")
+            return True
+
+    async def _release_lock(self, lock_key: str, token: str):
+        try:
+            redis_client = await self.get_redis()
+            await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.warning(f"Cache unlock error: {e}")
+
+    async def _wait_for_entry(self, key: str, lock_key: str) -> Any:
+        """Wait for the lock holder's value, up to one lease"""
+        deadline = time.monotonic() + self.lock_lease
+        try:
+            redis_client = await self.get_redis()
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                value = await redis_client.get(key)
+                if value:
+                    entry = self.serializer.loads(value)
+                    if isinstance(entry, dict) and entry.get(_ENTRY_MARKER):
+                        return entry["value"]
+                if not await redis_client.exists(lock_key):
+                    break
+        except Exception as e:
+            logger.warning(f"Cache wait error: {e}")
+        return _MISSING
+
     # Specialized caching methods
 
     async def cache_query_result(
@@ -192,6 +623,7 @@ class CacheService:
         query_name: str,
         result: Any,
         ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
         **params
     ) -> bool:
         """
@@ -201,13 +633,14 @@ class CacheService:
             query_name: Query identifier
             result: Query result to cache
             ttl: Cache TTL
+            tags: Tags besides "query" and "query:<query_name>"
             **params: Query parameters
 
         Returns:
             True if successful
         """
         key = self._generate_cache_key(f"query:{query_name}", **params)
-        return await self.set(key, result, ttl)
+        return await self.set(key, result, ttl, ["query", f"query:{query_name}", *(tags or ())])
 
     async def get_cached_query(
         self,
@@ -240,18 +673,14 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
-        if query_name:
-            pattern = f"query:{query_name}:*"
-        else:
-            pattern = "query:*"
-
-        return await self.delete_pattern(pattern)
+        return await self.invalidate_tags(f"query:{query_name}" if query_name else "query")
 
     async def cache_api_response(
         self,
         endpoint: str,
         response: Any,
         ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
         **params
     ) -> bool:
         """
@@ -261,13 +690,14 @@ class CacheService:
             endpoint: API endpoint
             response: Response data
             ttl: Cache TTL
+            tags: Tags besides "api" and "api:<endpoint>"
             **params: Request parameters
 
         Returns:
             True if successful
         """
         key = self._generate_cache_key(f"api:{endpoint}", **params)
-        return await self.set(key, response, ttl)
+        return await self.set(key, response, ttl, ["api", f"api:{endpoint}", *(tags or ())])
 
     async def get_cached_response(
         self,
@@ -300,12 +730,7 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
-        if endpoint:
-            pattern = f"api:{endpoint}:*"
-        else:
-            pattern = "api:*"
-
-        return await self.delete_pattern(pattern)
+        return await self.invalidate_tags(f"api:{endpoint}" if endpoint else "api")
 
     async def cache_user_session(
         self,
@@ -399,13 +824,38 @@ class CacheService:
                 "uptime_seconds": info.get("uptime_in_seconds", 0),
                 "hit_rate": info.get("keyspace_hits", 0) / max(
                     info.get("keyspace_hits", 0) + info.get("keyspace_misses", 1), 1
-                )
+                ),
+                "tiers": self._tier_stats()
             }
         except Exception as e:
             return {
                 "connected": False,
-                "error": str(e)
+                "error": str(e),
+                "tiers": self._tier_stats()
+            }
+
+    def _export_local_metrics(self):
+        """Add L1 hits and misses since the last export to the Prometheus counters"""
+        hits, misses = self._exported_local
+        _memory_hits.inc(self.local.hits - hits)
+        _memory_misses.inc(self.local.misses - misses)
+        self._exported_local = (self.local.hits, self.local.misses)
+
+    def _tier_stats(self) -> Dict[str, Any]:
+        """Hits and misses of this process's lookups, per tier"""
+        self._export_local_metrics()
+        return {
+            "memory": {
+                "entries": len(self.local),
+                "max_entries": self.local.max_entries,
+                "hits": self.local.hits,
+                "misses": self.local.misses
+            },
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses
             }
+        }
 
 
 # Global cache service instance
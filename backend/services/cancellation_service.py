@@ -0,0 +1,267 @@
+"""
+Cooperative Cancellation Service
+Propagates cancellation of pipeline executions to in-flight work
+"""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import inspect
+import logging
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a cancelled run may take to release its resources
+DEFAULT_RELEASE_TIMEOUT_SECONDS = 10.0
+
+# How long a worker process gets to exit after SIGTERM before it is killed
+PROCESS_TERMINATE_GRACE_SECONDS = 2.0
+
+
+class PipelineCancelledError(Exception):
+    """Raised inside running work once its cancellation token has fired."""
+    pass
+
+
+class CancellationToken:
+    """
+    Cancellation signal shared by every piece of work belonging to one run.
+
+    Operators check the token between batches, source cursors are iterated
+    through `iterate()`, HTTP requests and other awaitables are wrapped with
+    `run()`, and worker processes, connections and temp files are registered
+    so they can be released once the token fires.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[datetime] = None
+        self._event = asyncio.Event()
+        # Threading event so synchronous cursors in worker threads can poll too
+        self._thread_event = threading.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        self._processes: List[Any] = []
+        self._temp_paths: List[Path] = []
+        self._cleanups: List[Tuple[str, Callable[[], Any]]] = []
+        self._released = False
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._thread_event.is_set()
+
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """
+        Fire the token. Returns False if it had already been cancelled.
+        """
+        if self.is_cancelled:
+            return False
+
+        self.reason = reason
+        self.cancelled_at = datetime.now()
+        self._thread_event.set()
+        self._event.set()
+
+        # Interrupt awaitables that are blocked on I/O
+        for task in list(self._tasks):
+            if not task.done():
+                task.cancel()
+
+        # Ask worker processes to stop straight away
+        for process in self._processes:
+            self._terminate_process(process)
+
+        logger.info(f"Cancellation requested for {self.key}: {reason}")
+        return True
+
+    def raise_if_cancelled(self):
+        """Raise PipelineCancelledError if the token has fired"""
+        if self.is_cancelled:
+            raise PipelineCancelledError(self.reason or "Cancelled")
+
+    async def wait(self):
+        """Wait until the token fires"""
+        await self._event.wait()
+
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        """
+        Await `awaitable`, aborting it as soon as the token fires.
+
+        Used for node execution, HTTP requests and database calls so that a
+        cancellation does not have to wait for the current call to return.
+        """
+        self.raise_if_cancelled()
+
+        task = asyncio.ensure_future(awaitable)
+        self._tasks.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.is_cancelled:
+                raise PipelineCancelledError(self.reason or "Cancelled")
+            raise
+        finally:
+            self._tasks.discard(task)
+
+    async def iterate(
+        self,
+        source: Union[Iterable[Any], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate a source cursor, checking the token before every item.
+        """
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                self.raise_if_cancelled()
+                yield item
+        else:
+            for item in source:
+                self.raise_if_cancelled()
+                yield item
+
+    def track_process(self, process: Any):
+        """Register a worker process (subprocess.Popen or multiprocessing.Process)"""
+        self._processes.append(process)
+        if self.is_cancelled:
+            self._terminate_process(process)
+
+    def track_temp_path(self, path: Union[str, Path]):
+        """Register a temp file or directory to delete when the run is released"""
+        self._temp_paths.append(Path(path))
+
+    def register_cleanup(self, callback: Callable[[], Any], name: Optional[str] = None):
+        """
+        Register a callback (sync or async) that releases a resource such as a
+        source connection or HTTP client. Callbacks run in reverse order.
+        """
+        self._cleanups.append((name or getattr(callback, "__name__", "cleanup"), callback))
+
+    async def release_resources(
+        self,
+        timeout: float = DEFAULT_RELEASE_TIMEOUT_SECONDS
+    ) -> Dict[str, Any]:
+        """
+        Release everything registered on the token within a bounded time.
+
+        Returns a summary of what was released and what timed out or failed.
+        """
+        summary: Dict[str, Any] = {"released": [], "failed": [], "timed_out": False}
+        if self._released:
+            return summary
+        self._released = True
+
+        try:
+            await asyncio.wait_for(self._release_all(summary), timeout=timeout)
+        except asyncio.TimeoutError:
+            summary["timed_out"] = True
+            logger.warning(f"Releasing resources for {self.key} exceeded {timeout}s")
+
+        # Processes that ignored SIGTERM are killed regardless of the timeout
+        for process in self._processes:
+            if self._process_alive(process):
+                self._kill_process(process)
+
+        return summary
+
+    async def _release_all(self, summary: Dict[str, Any]):
+        for task in list(self._tasks):
+            if not task.done():
+                task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for name, callback in reversed(self._cleanups):
+            try:
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+                summary["released"].append(name)
+            except Exception as e:
+                logger.error(f"Cleanup '{name}' for {self.key} failed: {e}")
+                summary["failed"].append(name)
+
+        for process in self._processes:
+            await self._wait_for_process(process)
+
+        for path in self._temp_paths:
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                elif path.exists():
+                    path.unlink()
+                summary["released"].append(str(path))
+            except OSError as e:
+                logger.error(f"Failed to remove temp path {path}: {e}")
+                summary["failed"].append(str(path))
+
+    @staticmethod
+    def _process_alive(process: Any) -> bool:
+        if hasattr(process, "poll"):
+            return process.poll() is None
+        if hasattr(process, "is_alive"):
+            return process.is_alive()
+        return False
+
+    def _terminate_process(self, process: Any):
+        try:
+            if self._process_alive(process):
+                process.terminate()
+        except Exception as e:
+            logger.error(f"Failed to terminate worker process for {self.key}: {e}")
+
+    def _kill_process(self, process: Any):
+        try:
+            process.kill()
+        except Exception as e:
+            logger.error(f"Failed to kill worker process for {self.key}: {e}")
+
+    async def _wait_for_process(self, process: Any):
+        self._terminate_process(process)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + PROCESS_TERMINATE_GRACE_SECONDS
+        while self._process_alive(process) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._process_alive(process):
+            self._kill_process(process)
+
+
+class CancellationService:
+    """Registry of cancellation tokens for active runs"""
+
+    def __init__(self):
+        self.tokens: Dict[str, CancellationToken] = {}
+
+    def create_token(self, key: str) -> CancellationToken:
+        """Create and register a token, replacing any stale token for the key"""
+        return self.register_token(CancellationToken(key))
+
+    def register_token(self, token: CancellationToken) -> CancellationToken:
+        """Register an existing token under its key"""
+        self.tokens[token.key] = token
+        return token
+
+    def get_token(self, key: str) -> Optional[CancellationToken]:
+        return self.tokens.get(key)
+
+    def cancel(self, key: str, reason: str = "Cancelled by user") -> bool:
+        """
+        Cancel the run registered under `key`.
+        Returns False if no such run is active in this process.
+        """
+        token = self.tokens.get(key)
+        if not token:
+            return False
+        token.cancel(reason)
+        return True
+
+    def release(self, key: str, token: Optional[CancellationToken] = None):
+        """Forget a token once its run has finished"""
+        if token is None or self.tokens.get(key) is token:
+            self.tokens.pop(key, None)
+
+
+# Global service instance
+cancellation_service = CancellationService()
@@ -0,0 +1,807 @@
+"""
+Column Profile Service
+Streams files and source tables through mergeable per-column sketches and serves cardinality estimates
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+import base64
+import hashlib
+import logging
+import math
+import threading
+
+import numpy as np
+from sqlalchemy import MetaData, Table, create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.file_upload import FileUpload
+from backend.models.schema_mapping import DataProfile
+from backend.schemas.pipeline_visual import NodeType
+from backend.services.columnar_sidecar_service import iter_sidecar_batches, open_sidecar
+from backend.services.node_output_cache import ColumnarBatch
+from backend.services.schema_inference_service import ProgressCallback, iter_file_batches
+from backend.services.schema_introspection_cache import connection_fingerprint
+from backend.services.schema_introspector import ColumnTypeTracker, DataType, widen_data_type
+
+logger = logging.getLogger(__name__)
+
+HLL_PRECISION = 12
+TDIGEST_COMPRESSION = 100
+TDIGEST_BUFFER_SIZE = 10000
+TOP_K = 10
+# Misra-Gries counters kept per top-K entry; a count is low by at most N / (capacity + 1)
+TOP_K_CAPACITY_FACTOR = 10
+# Power-of-two length buckets: 0, 1, 2-3, 4-7, ... up to 2^(LENGTH_BUCKETS - 2)
+LENGTH_BUCKETS = 24
+REPORTED_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+DEFAULT_PROFILE_BATCH_SIZE = 10000
+DEFAULT_CACHED_PROFILES = 256
+
+NUMERIC_TYPES = (DataType.INTEGER, DataType.FLOAT)
+PROFILE_SOURCE_NODE_TYPES = (NodeType.FILE_SOURCE, NodeType.DATABASE_SOURCE)
+# Nodes whose output rows and columns are estimated as their input's
+PASS_THROUGH_NODE_TYPES = (NodeType.FILTER, NodeType.MAP, NodeType.SORT)
+
+
+class ProfilingError(Exception):
+    """Raised when a source cannot be profiled"""
+    pass
+
+
+def _hash64(value: Any) -> bytes:
+    return hashlib.blake2b(repr(value).encode("utf-8", "surrogatepass"), digest_size=8).digest()
+
+
+def _json_value(value: Any) -> Any:
+    """Values as stored in JSON: scalars as-is, everything else as text"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch with 2^precision one-byte registers
+    (standard error about 1.04 / sqrt(2^precision), 1.6% at precision 12).
+    Sketches of the same precision merge by taking register maxima.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, digests: List[bytes]):
+        if not digests:
+            return
+        hashes = np.frombuffer(b"".join(digests), dtype=">u8").astype(np.uint64)
+        p = np.uint64(self.precision)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Rank of the first set bit in the next 32 bits (exact in float64)
+        rest = ((hashes << p) >> np.uint64(32)).astype(np.float64)
+        _, exponent = np.frexp(rest)
+        rank = np.where(rest > 0, 33 - exponent, 33).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, values: Iterable[Any]):
+        self.add_hashes([_hash64(value) for value in values])
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ProfilingError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(state["precision"])
+        sketch.registers = np.frombuffer(base64.b64decode(state["registers"]), dtype=np.uint8).copy()
+        return sketch
+
+
+class TDigest:
+    """
+    Merging t-digest for quantiles of numeric columns. Values are buffered
+    and merged into at most about `compression` centroids, whose sizes are
+    bounded by the arcsine scale function so the tails stay accurate.
+    Digests merge by re-merging each other's centroids.
+    """
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    def add(self, values: Iterable[float]):
+        array = np.fromiter(values, dtype=np.float64)
+        array = array[np.isfinite(array)]
+        if not len(array):
+            return
+        self.count += len(array)
+        self.min = min(self.min, float(array.min()))
+        self.max = max(self.max, float(array.max()))
+        self._buffer.append(array)
+        self._buffered += len(array)
+        if self._buffered >= TDIGEST_BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        other._compress()
+        if not other.count:
+            return
+        self._compress()
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(force=True)
+
+    def _compress(self, force: bool = False):
+        if not self._buffered and not force:
+            return
+        buffered = np.concatenate(self._buffer) if self._buffer else np.empty(0)
+        means = np.concatenate([self.means, buffered])
+        weights = np.concatenate([self.weights, np.ones(len(buffered))])
+        self._buffer, self._buffered = [], 0
+        if not len(means):
+            return
+
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Each centroid spans at most one unit of k(q) = delta * (asin(2q - 1) / pi + 1/2)
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression * (np.arcsin(np.clip(2 * midpoints - 1, -1, 1)) / np.pi + 0.5)
+        bucket = np.floor(k).astype(np.int64)
+        _, starts = np.unique(bucket, return_index=True)
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        if not self.count:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], cumulative, [float(self.count)]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.count, positions, values))
+
+    def to_state(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TDigest":
+        digest = cls(state["compression"])
+        digest.means = np.array(state["means"], dtype=np.float64)
+        digest.weights = np.array(state["weights"], dtype=np.float64)
+        digest.count = state["count"]
+        if digest.count:
+            digest.min, digest.max = state["min"], state["max"]
+        return digest
+
+
+class TopK:
+    """
+    Frequent values by the Misra-Gries summary. Counts are lower bounds,
+    low by at most `error_bound`; any value occurring in more than
+    1 / (capacity + 1) of the rows is guaranteed to be kept. Summaries
+    merge by adding counters and trimming back to capacity.
+    """
+
+    def __init__(self, k: int = TOP_K, capacity: Optional[int] = None):
+        self.k = k
+        self.capacity = capacity or k * TOP_K_CAPACITY_FACTOR
+        self.counters: Dict[Any, int] = {}
+        self.error_bound = 0
+
+    def add_counts(self, counts: Dict[Any, int]):
+        merged = Counter(self.counters)
+        merged.update(counts)
+        if len(merged) > self.capacity:
+            threshold = sorted(merged.values(), reverse=True)[self.capacity]
+            self.error_bound += threshold
+            merged = Counter({value: count - threshold for value, count in merged.items() if count > threshold})
+        self.counters = dict(merged)
+
+    def merge(self, other: "TopK"):
+        self.error_bound += other.error_bound
+        self.add_counts(other.counters)
+
+    def top(self) -> List[Tuple[Any, int]]:
+        return sorted(self.counters.items(), key=lambda item: (-item[1], repr(item[0])))[:self.k]
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "k": self.k,
+            "capacity": self.capacity,
+            "error_bound": self.error_bound,
+            "counters": [[_json_value(value), count] for value, count in self.counters.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TopK":
+        sketch = cls(state["k"], state["capacity"])
+        sketch.error_bound = state["error_bound"]
+        sketch.counters = {value: count for value, count in state["counters"]}
+        return sketch
+
+
+class LengthHistogram:
+    """Counts of text lengths in power-of-two buckets; merges by addition"""
+
+    def __init__(self):
+        self.counts = np.zeros(LENGTH_BUCKETS, dtype=np.int64)
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.total_length = 0
+
+    def add(self, lengths: List[int]):
+        if not lengths:
+            return
+        array = np.asarray(lengths, dtype=np.int64)
+        _, exponent = np.frexp(array.astype(np.float64))
+        np.add.at(self.counts, np.minimum(exponent, LENGTH_BUCKETS - 1), 1)
+        low, high = int(array.min()), int(array.max())
+        self.min_length = low if self.min_length is None else min(self.min_length, low)
+        self.max_length = high if self.max_length is None else max(self.max_length, high)
+        self.total_length += int(array.sum())
+
+    def merge(self, other: "LengthHistogram"):
+        self.counts += other.counts
+        if other.min_length is not None:
+            self.add_bounds(other.min_length, other.max_length)
+        self.total_length += other.total_length
+
+    def add_bounds(self, low: int, high: int):
+        self.min_length = low if self.min_length is None else min(self.min_length, low)
+        self.max_length = high if self.max_length is None else max(self.max_length, high)
+
+    def buckets(self) -> List[Dict[str, int]]:
+        result = []
+        for bucket, count in enumerate(self.counts.tolist()):
+            if count:
+                low = 0 if bucket == 0 else 1 << (bucket - 1)
+                high = 0 if bucket == 0 else (1 << bucket) - 1
+                result.append({"min_length": low, "max_length": high, "count": count})
+        return result
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "counts": self.counts.tolist(),
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "total_length": self.total_length,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "LengthHistogram":
+        histogram = cls()
+        histogram.counts = np.array(state["counts"], dtype=np.int64)
+        histogram.min_length = state["min_length"]
+        histogram.max_length = state["max_length"]
+        histogram.total_length = state["total_length"]
+        return histogram
+
+
+class ColumnProfile:
+    """
+    Statistics for one column, built from mergeable sketches so profiles of
+    separate files, partitions or batches can be combined. Text values are
+    also typed with ColumnTypeTracker; numeric-looking text feeds the
+    quantile digest.
+    """
+
+    def __init__(self, name: str, parse_text: bool = True):
+        self.name = name
+        self.rows = 0
+        self.null_count = 0
+        self.tracker = ColumnTypeTracker(parse_text)
+        self.distinct = HyperLogLog()
+        self.quantiles = TDigest()
+        self.frequent = TopK()
+        self.lengths = LengthHistogram()
+        self.text_min: Optional[str] = None
+        self.text_max: Optional[str] = None
+        self.numeric_sum = 0.0
+        # Type of profiles merged into this one, widened with the tracked type
+        self.merged_type: Optional[DataType] = None
+
+    def add_missing(self, rows: int):
+        """Account for rows in which the column does not appear"""
+        self.rows += rows
+        self.null_count += rows
+
+    def update(self, values: List[Any]):
+        self.rows += len(values)
+        observe = self.tracker.observe
+        numbers: List[float] = []
+        texts: List[str] = []
+        counts: Counter = Counter()
+
+        for value in values:
+            if value is None or value == "":
+                self.null_count += 1
+                continue
+            observe(value)
+            value_type = type(value)
+            if value_type is str:
+                texts.append(value)
+                if self.tracker.parse_text:
+                    try:
+                        numbers.append(float(value))
+                    except ValueError:
+                        pass
+            elif value_type in (int, float, Decimal):
+                numbers.append(float(value))
+            try:
+                counts[value] += 1
+            except TypeError:
+                counts[repr(value)] += 1
+
+        self.distinct.add(counts)
+        self.frequent.add_counts(counts)
+        if numbers:
+            self.quantiles.add(numbers)
+            self.numeric_sum += math.fsum(n for n in numbers if math.isfinite(n))
+        if texts:
+            self.lengths.add([len(text) for text in texts])
+            low, high = min(texts), max(texts)
+            self.text_min = low if self.text_min is None or low < self.text_min else self.text_min
+            self.text_max = high if self.text_max is None or high > self.text_max else self.text_max
+
+    @property
+    def non_null_count(self) -> int:
+        return self.rows - self.null_count
+
+    def distinct_estimate(self) -> int:
+        # Never report more distinct values than non-null rows
+        return min(self.distinct.estimate(), self.non_null_count)
+
+    def data_type(self) -> DataType:
+        tracked = self.tracker.resolve() if self.tracker.count else None
+        if self.merged_type is None:
+            return tracked or self.tracker.resolve()
+        return widen_data_type(tracked, self.merged_type) if tracked else self.merged_type
+
+    def to_dict(self) -> Dict[str, Any]:
+        data_type = self.data_type()
+        non_null = self.non_null_count
+        distinct = self.distinct_estimate()
+        top = self.frequent.top()
+        numeric = data_type in NUMERIC_TYPES and self.quantiles.count
+
+        if numeric:
+            minimum, maximum = self.quantiles.min, self.quantiles.max
+        else:
+            minimum, maximum = self.text_min, self.text_max
+
+        return {
+            "name": self.name,
+            "data_type": data_type.value,
+            "row_count": self.rows,
+            "null_count": self.null_count,
+            "null_rate": round(self.null_count / self.rows, 6) if self.rows else 0.0,
+            "distinct_estimate": distinct,
+            "distinct_ratio": round(distinct / non_null, 6) if non_null else 0.0,
+            # Within the HyperLogLog error of one distinct value per row
+            "is_candidate_key": bool(non_null) and self.null_count == 0 and distinct >= 0.97 * non_null,
+            "min": _json_value(minimum),
+            "max": _json_value(maximum),
+            "mean": self.numeric_sum / self.quantiles.count if numeric else None,
+            "quantiles": {
+                f"p{int(q * 100):02d}": self.quantiles.quantile(q) for q in REPORTED_QUANTILES
+            } if numeric else None,
+            "top_values": [{"value": _json_value(value), "count": count} for value, count in top],
+            "top_value_share": round(top[0][1] / non_null, 6) if top and non_null else 0.0,
+            "top_values_error_bound": self.frequent.error_bound,
+            "min_length": self.lengths.min_length,
+            "max_length": self.lengths.max_length,
+            "mean_length": round(self.lengths.total_length / int(self.lengths.counts.sum()), 3)
+            if self.lengths.min_length is not None else None,
+            "length_histogram": self.lengths.buckets(),
+        }
+
+    def merge(self, other: "ColumnProfile"):
+        if other.non_null_count:
+            other_type = other.data_type()
+            self.merged_type = widen_data_type(self.merged_type, other_type) if self.merged_type else other_type
+        self.rows += other.rows
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        self.frequent.merge(other.frequent)
+        self.lengths.merge(other.lengths)
+        self.numeric_sum += other.numeric_sum
+        for bound in (other.text_min, other.text_max):
+            if bound is not None:
+                self.text_min = bound if self.text_min is None else min(self.text_min, bound)
+                self.text_max = bound if self.text_max is None else max(self.text_max, bound)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "null_count": self.null_count,
+            "data_type": self.data_type().value if self.non_null_count else None,
+            "parse_text": self.tracker.parse_text,
+            "hll": self.distinct.to_state(),
+            "tdigest": self.quantiles.to_state(),
+            "top_k": self.frequent.to_state(),
+            "lengths": self.lengths.to_state(),
+            "text_min": self.text_min,
+            "text_max": self.text_max,
+            "numeric_sum": self.numeric_sum,
+        }
+
+    @classmethod
+    def from_state(cls, name: str, state: Dict[str, Any]) -> "ColumnProfile":
+        profile = cls(name, state["parse_text"])
+        profile.rows = state["rows"]
+        profile.null_count = state["null_count"]
+        profile.merged_type = DataType(state["data_type"]) if state["data_type"] else None
+        profile.distinct = HyperLogLog.from_state(state["hll"])
+        profile.quantiles = TDigest.from_state(state["tdigest"])
+        profile.frequent = TopK.from_state(state["top_k"])
+        profile.lengths = LengthHistogram.from_state(state["lengths"])
+        profile.text_min = state["text_min"]
+        profile.text_max = state["text_max"]
+        profile.numeric_sum = state["numeric_sum"]
+        return profile
+
+
+class TableProfiler:
+    """
+    Profiles a stream of columnar batches. Columns are added as they first
+    appear; rows in which a column is absent count as nulls.
+    """
+
+    def __init__(self, parse_text: bool = True):
+        self.parse_text = parse_text
+        self.row_count = 0
+        self.columns: "OrderedDict[str, ColumnProfile]" = OrderedDict()
+
+    def update(self, batch: ColumnarBatch):
+        rows = len(next(iter(batch.values()))) if batch else 0
+        for name, values in batch.items():
+            profile = self.columns.get(name)
+            if profile is None:
+                profile = self.columns[name] = ColumnProfile(name, self.parse_text)
+                profile.add_missing(self.row_count)
+            profile.update(values)
+        for name, profile in self.columns.items():
+            if name not in batch:
+                profile.add_missing(rows)
+        self.row_count += rows
+
+    def merge(self, other: "TableProfiler"):
+        for name, profile in self.columns.items():
+            if name not in other.columns:
+                profile.add_missing(other.row_count)
+        for name, profile in other.columns.items():
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, profile.tracker.parse_text)
+                self.columns[name].add_missing(self.row_count)
+            self.columns[name].merge(profile)
+        self.row_count += other.row_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "column_count": len(self.columns),
+            "columns": [profile.to_dict() for profile in self.columns.values()],
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "columns": {name: profile.to_state() for name, profile in self.columns.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TableProfiler":
+        profiler = cls()
+        profiler.row_count = state["row_count"]
+        for name, column_state in state["columns"].items():
+            profiler.columns[name] = ColumnProfile.from_state(name, column_state)
+        return profiler
+
+
+def table_source_ref(connection_string: str, table_name: str, schema_name: Optional[str] = None) -> str:
+    """Stable reference to a source table; credentials are not part of it"""
+    qualified = f"{schema_name}.{table_name}" if schema_name else table_name
+    return f"{connection_fingerprint(connection_string)}/{qualified}"
+
+
+def profile_file(
+    file_path: str,
+    file_format: str,
+    delimiter: str = ",",
+    has_header: bool = True,
+    batch_size: int = DEFAULT_PROFILE_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    file_hash: Optional[str] = None
+) -> TableProfiler:
+    """
+    Profile every record of a CSV or JSON file in one streaming pass. A
+    current columnar sidecar is read instead of the text, already typed.
+    """
+    sidecar = open_sidecar(file_path, file_hash, file_format, delimiter, has_header)
+    if sidecar is not None:
+        profiler = TableProfiler(parse_text=False)
+        total = sidecar.metadata.num_rows
+        # Dates as ISO text are typed as they are in JSON files
+        for batch in iter_sidecar_batches(sidecar, batch_size=batch_size, temporal_as_text=True):
+            profiler.update(batch)
+            if progress is not None:
+                progress(profiler.row_count, total, profiler.row_count)
+        return profiler
+
+    profiler = TableProfiler(parse_text=file_format == "csv")
+    for batch in iter_file_batches(file_path, file_format, delimiter, has_header, batch_size, progress=progress):
+        profiler.update(batch)
+    return profiler
+
+
+def profile_table(
+    connection_string: str,
+    table_name: str,
+    schema_name: Optional[str] = None,
+    batch_size: int = DEFAULT_PROFILE_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None
+) -> TableProfiler:
+    """
+    Profile every row of a source table, streamed with a server-side
+    cursor where the driver supports one. Progress is reported in rows.
+    """
+    profiler = TableProfiler(parse_text=False)
+    engine = create_engine(connection_string)
+    try:
+        with engine.connect() as connection:
+            table = Table(table_name, MetaData(), autoload_with=connection, schema=schema_name)
+            total = connection.execute(select(func.count()).select_from(table)).scalar() or 0
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(select(table))
+            names = list(result.keys())
+            for rows in result.partitions(batch_size):
+                profiler.update({name: list(values) for name, values in zip(names, zip(*rows))})
+                if progress is not None:
+                    progress(profiler.row_count, total, profiler.row_count)
+            if progress is not None:
+                progress(total, total, profiler.row_count)
+    finally:
+        engine.dispose()
+    return profiler
+
+
+def estimate_distinct(columns: Dict[str, Dict[str, Any]], row_count: int, fields: List[str]) -> Optional[int]:
+    """
+    Distinct combinations of `fields` from per-column estimates: at least
+    the largest single-column estimate, at most their product and the row
+    count. Returns None if a field was not profiled.
+    """
+    if not fields or any(field not in columns for field in fields):
+        return None
+    estimates = [max(columns[field]["distinct_estimate"], 1) for field in fields]
+    return max(max(estimates), min(math.prod(estimates), row_count))
+
+
+class ColumnProfileService:
+    """
+    Stores column profiles and answers cardinality questions from them.
+
+    The latest profile summary per source is kept in a small LRU so the
+    pipeline planner can estimate cardinalities without a database round
+    trip on every run.
+    """
+
+    def __init__(self, max_cached: int = DEFAULT_CACHED_PROFILES):
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._latest: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+    def _remember(self, source_type: str, source_ref: str, summary: Dict[str, Any]):
+        with self._lock:
+            self._latest[(source_type, source_ref)] = summary
+            self._latest.move_to_end((source_type, source_ref))
+            while len(self._latest) > self.max_cached:
+                self._latest.popitem(last=False)
+
+    @staticmethod
+    def _summary(record: DataProfile) -> Dict[str, Any]:
+        return {
+            "profile_id": record.id,
+            "source_type": record.source_type,
+            "source_ref": record.source_ref,
+            "row_count": record.row_count,
+            "columns": {column["name"]: column for column in record.columns},
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+        }
+
+    async def save(
+        self,
+        db: AsyncSession,
+        source_type: str,
+        source_ref: str,
+        profiler: TableProfiler,
+        created_by: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Store a profile; returns its summary with per-column statistics"""
+        profile = profiler.to_dict()
+        record = DataProfile(
+            source_type=source_type,
+            source_ref=source_ref,
+            row_count=profile["row_count"],
+            columns=profile["columns"],
+            sketches=profiler.to_state(),
+            created_by=created_by
+        )
+        db.add(record)
+        await db.commit()
+        await db.refresh(record)
+
+        summary = self._summary(record)
+        self._remember(source_type, source_ref, summary)
+        return self.to_response(record)
+
+    @staticmethod
+    def to_response(record: DataProfile) -> Dict[str, Any]:
+        return {
+            "profile_id": record.id,
+            "source_type": record.source_type,
+            "source_ref": record.source_ref,
+            "row_count": record.row_count,
+            "column_count": len(record.columns),
+            "columns": record.columns,
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+        }
+
+    async def get(self, db: AsyncSession, profile_id: int) -> Optional[DataProfile]:
+        result = await db.execute(select(DataProfile).where(DataProfile.id == profile_id))
+        return result.scalar_one_or_none()
+
+    async def get_latest(self, db: AsyncSession, source_type: str, source_ref: str) -> Optional[DataProfile]:
+        result = await db.execute(
+            select(DataProfile)
+            .where(DataProfile.source_type == source_type, DataProfile.source_ref == source_ref)
+            .order_by(DataProfile.created_at.desc(), DataProfile.id.desc())
+            .limit(1)
+        )
+        record = result.scalar_one_or_none()
+        if record is not None:
+            self._remember(source_type, source_ref, self._summary(record))
+        return record
+
+    @staticmethod
+    async def readable_sources(
+        db: AsyncSession,
+        sources: Iterable[Tuple[str, str]],
+        user_id: Optional[int]
+    ) -> List[Tuple[str, str]]:
+        """
+        The sources a user may read. Uploads are readable by their owner
+        (or by anyone when unowned); tables by whoever holds their
+        connection string, which a pipeline's own source nodes do.
+        """
+        sources = list(dict.fromkeys(sources))
+        file_ids = [int(ref) for kind, ref in sources if kind == "file" and ref.isdigit()]
+        readable_files = set()
+        if file_ids:
+            result = await db.execute(select(FileUpload.id, FileUpload.user_id).where(FileUpload.id.in_(file_ids)))
+            readable_files = {str(upload_id) for upload_id, owner in result.all() if owner in (None, user_id)}
+        return [
+            (kind, ref) for kind, ref in sources
+            if kind == "table" or (kind == "file" and ref in readable_files)
+        ]
+
+    async def latest_summaries(
+        self,
+        db: AsyncSession,
+        sources: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Latest profile summaries for the given sources, from the LRU when possible"""
+        summaries = {}
+        for source in set(sources):
+            with self._lock:
+                summary = self._latest.get(source)
+            if summary is None:
+                record = await self.get_latest(db, *source)
+                summary = self._summary(record) if record is not None else None
+            if summary is not None:
+                summaries[source] = summary
+        return summaries
+
+    @staticmethod
+    def source_of(node: Any) -> Optional[Tuple[str, str]]:
+        """The profiled source a pipeline source node reads, if it names one"""
+        config = node.config or node.data.get("config") or {}
+        if node.type == NodeType.FILE_SOURCE and config.get("file_id") is not None:
+            return "file", str(config["file_id"])
+        if node.type == NodeType.DATABASE_SOURCE and config.get("connection_string") and config.get("table_name"):
+            try:
+                return "table", table_source_ref(
+                    config["connection_string"], config["table_name"], config.get("schema_name")
+                )
+            except Exception:
+                return None
+        return None
+
+    @staticmethod
+    def estimate_cardinalities(
+        nodes: Dict[str, Any],
+        plan: List[str],
+        upstream: Dict[str, List[str]],
+        summaries: Dict[Tuple[str, str], Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Estimate output rows per node in plan order. Sources take their
+        profiled row count; DEDUPLICATE and AGGREGATE nodes take the
+        distinct count of their key or group-by fields; other nodes pass
+        their input through. Column statistics follow a single-input chain
+        from its source so key estimates are available downstream.
+        Nodes without an estimate are left out.
+        """
+        estimates: Dict[str, Dict[str, Any]] = {}
+        for node_id in plan:
+            node = nodes[node_id]
+            config = node.config or node.data.get("config") or {}
+            inputs = [estimates[u] for u in upstream.get(node_id, []) if u in estimates]
+
+            if node.type in PROFILE_SOURCE_NODE_TYPES:
+                summary = summaries.get(ColumnProfileService.source_of(node))
+                if summary is not None:
+                    estimates[node_id] = {"rows": summary["row_count"], "columns": summary["columns"]}
+                continue
+            if not inputs:
+                continue
+
+            rows = sum(estimate["rows"] for estimate in inputs)
+            columns = inputs[0]["columns"] if len(inputs) == 1 else {}
+            if node.type == NodeType.DEDUPLICATE:
+                fields = config.get("key_fields") or config.get("unique_fields") or []
+                distinct = estimate_distinct(columns, rows, fields)
+                estimates[node_id] = {"rows": distinct if distinct is not None else rows,
+                                      "columns": columns, "distinct_keys": distinct}
+            elif node.type == NodeType.AGGREGATE:
+                fields = config.get("group_by") or []
+                distinct = estimate_distinct(columns, rows, fields) if fields else 1
+                if distinct is not None:
+                    estimates[node_id] = {"rows": distinct, "columns": {}}
+            elif node.type in PASS_THROUGH_NODE_TYPES:
+                estimates[node_id] = {"rows": rows, "columns": columns}
+            else:
+                estimates[node_id] = {"rows": rows, "columns": {}}
+        return estimates
+
+
+# Global column profile service instance
+column_profile_service = ColumnProfileService()
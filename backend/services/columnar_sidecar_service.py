@@ -0,0 +1,493 @@
+"""
+Columnar Sidecar Service
+Converts validated CSV, JSON and Excel uploads into typed Parquet sidecars read by pipelines, previews and profiling
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from collections import OrderedDict
+from datetime import date, datetime, time, timezone
+from functools import partial
+from itertools import chain
+import json
+import logging
+import math
+import os
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.database import AsyncSessionLocal
+from backend.models.file_upload import FileStatus, FileType, FileUpload
+from backend.services.compressed_storage import stored_size
+from backend.services.node_output_cache import ColumnarBatch
+from backend.services.schema_inference_service import ProgressCallback, iter_file_batches, schema_inference_service
+from backend.services.schema_introspector import ColumnTypeTracker, DataType
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is the optional "columnar" extra
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_SUFFIX = ".parquet"
+# Rows per conversion batch; each batch is written as one Parquet row group
+CONVERSION_BATCH_SIZE = 65536
+DEFAULT_READ_BATCH_SIZE = 10000
+SIDECAR_VERSION = "1"
+_METADATA_PREFIX = "data_aggregator."
+
+UPLOAD_SOURCE_FORMATS = {FileType.CSV: "csv", FileType.JSON: "json", FileType.EXCEL: "excel"}
+TRUE_LITERALS = frozenset({"true", "yes", "t", "1"})
+
+
+class ColumnarConversionError(Exception):
+    """Raised when an upload cannot be converted to a columnar sidecar"""
+    pass
+
+
+def columnar_available() -> bool:
+    """Whether pyarrow is installed"""
+    return pq is not None
+
+
+def columnar_path(file_path: str) -> str:
+    """Sidecar stored next to the file it was converted from"""
+    return file_path + COLUMNAR_SUFFIX
+
+
+def _source_options(file_format: str, delimiter: str, has_header: bool) -> Dict[str, str]:
+    """Read options a sidecar was built with; only those that shape the columns"""
+    if file_format == "csv":
+        return {"delimiter": delimiter, "has_header": str(has_header).lower()}
+    if file_format == "excel":
+        return {"has_header": str(has_header).lower()}
+    return {}
+
+
+def _iter_excel_batches(file_path: str, has_header: bool = True, batch_size: int = DEFAULT_READ_BATCH_SIZE) -> Iterator[ColumnarBatch]:
+    """
+    Stream the first worksheet as columnar batches. Dates and times become
+    ISO strings so they are typed like JSON dates.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        if has_header:
+            headers = [str(value) if value is not None else f"column_{i}" for i, value in enumerate(first)]
+        else:
+            headers = [f"column_{i}" for i in range(len(first))]
+            rows = chain([first], rows)
+
+        width = len(headers)
+        chunk = []
+        for row in rows:
+            row = list(row[:width]) + [None] * (width - len(row))
+            chunk.append([value.isoformat() if isinstance(value, (date, time)) else value for value in row])
+            if len(chunk) == batch_size:
+                yield {name: list(values) for name, values in zip(headers, zip(*chunk))}
+                chunk = []
+        if chunk:
+            yield {name: list(values) for name, values in zip(headers, zip(*chunk))}
+    finally:
+        workbook.close()
+
+
+def _iter_source_batches(
+    file_path: str,
+    file_format: str,
+    delimiter: str = ",",
+    has_header: bool = True,
+    encoding: str = "utf-8",
+    batch_size: int = DEFAULT_READ_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None
+) -> Iterator[ColumnarBatch]:
+    """Parse the uploaded file itself"""
+    if file_format == "excel":
+        return _iter_excel_batches(file_path, has_header, batch_size)
+    return iter_file_batches(file_path, file_format, delimiter, has_header, batch_size, encoding, progress)
+
+
+def _arrow_type(data_type: DataType) -> "pa.DataType":
+    if data_type == DataType.INTEGER:
+        return pa.int64()
+    if data_type == DataType.FLOAT:
+        return pa.float64()
+    if data_type == DataType.BOOLEAN:
+        return pa.bool_()
+    if data_type == DataType.DATE:
+        return pa.date32()
+    if data_type in (DataType.DATETIME, DataType.TIMESTAMP):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _parse_temporal(value: str, formats: List[str]) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for fmt in formats:
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+        raise
+    # Timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _value_converter(tracker: ColumnTypeTracker) -> Callable[[Any], Any]:
+    """Convert a column's raw values (text or JSON) to its inferred type"""
+    data_type = tracker.resolve()
+    if data_type == DataType.INTEGER:
+        return lambda value: int(value.strip()) if type(value) is str else int(value)
+    if data_type == DataType.FLOAT:
+        return lambda value: float(value.strip()) if type(value) is str else float(value)
+    if data_type == DataType.BOOLEAN:
+        return lambda value: value.strip().lower() in TRUE_LITERALS if type(value) is str else bool(value)
+    if data_type in (DataType.DATE, DataType.DATETIME):
+        formats = [pattern[1] for pattern in tracker.datetime_formats + tracker.date_formats if pattern[1] != "iso8601"]
+        if data_type == DataType.DATE:
+            return lambda value: _parse_temporal(value.strip(), formats).date()
+        return lambda value: _parse_temporal(value.strip(), formats)
+    if data_type in (DataType.ARRAY, DataType.OBJECT):
+        return lambda value: json.dumps(value, default=str)
+    return lambda value: value if type(value) is str else json.dumps(value, default=str)
+
+
+def _infer_columns(batches: Iterator[ColumnarBatch], parse_text: bool) -> "OrderedDict[str, ColumnTypeTracker]":
+    """First pass: type every column, in order of first appearance"""
+    trackers: "OrderedDict[str, ColumnTypeTracker]" = OrderedDict()
+    for batch in batches:
+        for name, values in batch.items():
+            tracker = trackers.get(name)
+            if tracker is None:
+                tracker = trackers[name] = ColumnTypeTracker(parse_text)
+            observe = tracker.observe
+            for value in values:
+                observe(value)
+    return trackers
+
+
+def convert_to_columnar(
+    file_path: str,
+    file_format: str,
+    file_hash: Optional[str] = None,
+    delimiter: str = ",",
+    has_header: bool = True,
+    encoding: str = "utf-8",
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Write a typed Parquet sidecar next to the file in two streaming passes:
+    one infers column types with ColumnTypeTracker, the other converts and
+    writes one row group per batch. Blocking; run it in a worker thread.
+    """
+    if pq is None:
+        raise ColumnarConversionError("Columnar conversion requires the pyarrow library")
+    if file_format not in ("csv", "json", "ndjson", "excel"):
+        raise ColumnarConversionError(f"Unsupported file format: {file_format}")
+
+    read = partial(_iter_source_batches, file_path, file_format, delimiter, has_header, encoding, CONVERSION_BATCH_SIZE)
+    total_bytes = stored_size(file_path)
+
+    def first_pass(bytes_read, _, records):
+        progress(bytes_read, 2 * total_bytes, records)
+
+    def second_pass(bytes_read, _, records):
+        progress(total_bytes + bytes_read, 2 * total_bytes, records)
+
+    trackers = _infer_columns(
+        read(progress=first_pass if progress and file_format != "excel" else None),
+        parse_text=file_format == "csv"
+    )
+
+    fields = []
+    for name, tracker in trackers.items():
+        data_type = tracker.resolve()
+        metadata = {b"logical_type": b"json"} if data_type in (DataType.ARRAY, DataType.OBJECT) else None
+        fields.append(pa.field(name, _arrow_type(data_type), nullable=True, metadata=metadata))
+    metadata = {
+        f"{_METADATA_PREFIX}version": SIDECAR_VERSION,
+        f"{_METADATA_PREFIX}source_format": file_format,
+        f"{_METADATA_PREFIX}source_hash": file_hash or "",
+        **{f"{_METADATA_PREFIX}{key}": value for key, value in _source_options(file_format, delimiter, has_header).items()},
+    }
+    schema = pa.schema(fields, metadata=metadata)
+    converters = {name: _value_converter(tracker) for name, tracker in trackers.items()}
+
+    sidecar_path = columnar_path(file_path)
+    temp_path = sidecar_path + ".tmp"
+    written = 0
+    try:
+        with pq.ParquetWriter(temp_path, schema) as writer:
+            for batch in read(progress=second_pass if progress and file_format != "excel" else None):
+                rows = len(next(iter(batch.values()))) if batch else 0
+                arrays = []
+                for field in schema:
+                    values = batch.get(field.name)
+                    if values is None:
+                        arrays.append(pa.nulls(rows, field.type))
+                        continue
+                    convert = converters[field.name]
+                    try:
+                        arrays.append(pa.array(
+                            [None if value is None or value == "" else convert(value) for value in values],
+                            type=field.type
+                        ))
+                    except (ValueError, OverflowError, pa.ArrowException) as e:
+                        raise ColumnarConversionError(f"Column '{field.name}' does not fit type {field.type}: {e}")
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                written += rows
+        os.replace(temp_path, sidecar_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    if progress is not None:
+        progress(2 * total_bytes, 2 * total_bytes, written)
+    return {
+        "path": sidecar_path,
+        "format": "parquet",
+        "row_count": written,
+        "columns": [{"name": field.name, "type": str(field.type)} for field in schema],
+        "bytes": os.path.getsize(sidecar_path),
+    }
+
+
+def open_sidecar(
+    file_path: str,
+    file_hash: Optional[str] = None,
+    file_format: Optional[str] = None,
+    delimiter: str = ",",
+    has_header: bool = True
+) -> Optional["pq.ParquetFile"]:
+    """
+    The file's sidecar, or None if there is none, pyarrow is missing, or it
+    was built from other content or with other read options
+    """
+    path = columnar_path(file_path)
+    if pq is None or not os.path.exists(path):
+        return None
+    try:
+        parquet_file = pq.ParquetFile(path)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Unreadable columnar sidecar {path}: {e}")
+        return None
+
+    metadata = {
+        key.decode(): value.decode() for key, value in (parquet_file.schema_arrow.metadata or {}).items()
+    }
+    expected = {"version": SIDECAR_VERSION}
+    if file_hash:
+        expected["source_hash"] = file_hash
+    if file_format is not None:
+        expected.update(_source_options(file_format, delimiter, has_header))
+    if any(metadata.get(f"{_METADATA_PREFIX}{key}") != value for key, value in expected.items()):
+        return None
+    return parquet_file
+
+
+def _to_columns(data: Any, schema: "pa.Schema", temporal_as_text: bool = False) -> ColumnarBatch:
+    """Record batch or table to Python columns, decoding JSON columns"""
+    columns = data.to_pydict()
+    for name, values in columns.items():
+        field = schema.field(name)
+        if field.metadata and field.metadata.get(b"logical_type") == b"json":
+            columns[name] = [json.loads(value) if value is not None else None for value in values]
+        elif temporal_as_text and (pa.types.is_date(field.type) or pa.types.is_timestamp(field.type)):
+            columns[name] = [value.isoformat() if value is not None else None for value in values]
+    return columns
+
+
+def iter_sidecar_batches(
+    parquet_file: "pq.ParquetFile",
+    columns: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_READ_BATCH_SIZE,
+    temporal_as_text: bool = False
+) -> Iterator[ColumnarBatch]:
+    """Stream typed columnar batches, reading only `columns` (all by default)"""
+    schema = parquet_file.schema_arrow
+    if columns is not None:
+        columns = [name for name in columns if name in schema.names]
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield _to_columns(record_batch, schema, temporal_as_text)
+
+
+def _preview_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def preview_sidecar(parquet_file: "pq.ParquetFile", start: int, limit: int, as_records: bool = False) -> Dict[str, Any]:
+    """A window of rows, reading only the row groups that hold it"""
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    groups = []
+    first_row = row = 0
+    for i in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(i).num_rows
+        if row + group_rows > start and row < start + limit:
+            if not groups:
+                first_row = row
+            groups.append(i)
+        row += group_rows
+
+    rows = []
+    if groups and limit > 0:
+        table = parquet_file.read_row_groups(groups).slice(start - first_row, limit)
+        columns = _to_columns(table, schema)
+        values = [[_preview_value(value) for value in row] for row in zip(*columns.values())]
+        rows = [dict(zip(columns, row)) for row in values] if as_records else values
+
+    return {
+        "columns": None if as_records else schema.names,
+        "rows": rows,
+        "start": start,
+        "row_count": len(rows),
+        "total_rows": metadata.num_rows
+    }
+
+
+def iter_upload_batches(
+    file_path: str,
+    file_format: str,
+    file_hash: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    delimiter: str = ",",
+    has_header: bool = True,
+    encoding: str = "utf-8",
+    batch_size: int = DEFAULT_READ_BATCH_SIZE
+) -> Iterator[ColumnarBatch]:
+    """
+    Columnar batches of an upload: read from its sidecar when there is a
+    current one (only `columns`, no parsing), otherwise parsed from the file.
+    Parsed batches get the types a sidecar would have: a first pass infers
+    each column's type and the second converts the values, so pipelines see
+    the same values whether or not the upload was converted.
+    """
+    sidecar = open_sidecar(file_path, file_hash, file_format, delimiter, has_header)
+    if sidecar is not None:
+        yield from iter_sidecar_batches(sidecar, columns, batch_size)
+        return
+
+    def read() -> Iterator[ColumnarBatch]:
+        for batch in _iter_source_batches(file_path, file_format, delimiter, has_header, encoding, batch_size):
+            yield {name: batch[name] for name in columns if name in batch} if columns is not None else batch
+
+    trackers = _infer_columns(read(), parse_text=file_format == "csv")
+    converters = {
+        # Sidecars store these as JSON text and decode them on read
+        name: (lambda value: value) if tracker.resolve() in (DataType.ARRAY, DataType.OBJECT) else _value_converter(tracker)
+        for name, tracker in trackers.items()
+    }
+    for batch in read():
+        rows = len(next(iter(batch.values()))) if batch else 0
+        typed = {}
+        for name, convert in converters.items():
+            values = batch.get(name)
+            if values is None:
+                typed[name] = [None] * rows
+                continue
+            try:
+                typed[name] = [None if value is None or value == "" else convert(value) for value in values]
+            except (ValueError, OverflowError) as e:
+                raise ColumnarConversionError(f"Column '{name}' does not fit type {trackers[name].resolve().value}: {e}")
+        yield typed
+
+
+class ColumnarSidecarService:
+    """
+    Converts uploads that asked for a columnar sidecar once they are
+    validated. Conversions run as background jobs (see
+    schema_inference_service.submit); the state is kept on the upload under
+    processing_metadata["columnar"].
+    """
+
+    @staticmethod
+    def requested(file_upload: FileUpload) -> bool:
+        return bool((file_upload.processing_metadata or {}).get("columnar", {}).get("requested"))
+
+    @staticmethod
+    def _set_state(file_upload: FileUpload, **state: Any) -> Dict[str, Any]:
+        # Reassign so the JSONB column is marked as changed
+        processing_metadata = dict(file_upload.processing_metadata or {})
+        processing_metadata["columnar"] = {**processing_metadata.get("columnar", {}), **state}
+        file_upload.processing_metadata = processing_metadata
+        return processing_metadata["columnar"]
+
+    async def schedule(self, db: AsyncSession, file_upload: FileUpload) -> Optional[Dict[str, Any]]:
+        """
+        Queue conversion of a validated upload that asked for a sidecar.
+        Content already converted (a shared blob) is marked ready at once.
+
+        Returns:
+            The upload's columnar state, or None if no sidecar was requested
+        """
+        if not self.requested(file_upload) or file_upload.status != FileStatus.UPLOADED:
+            return None
+
+        file_format = UPLOAD_SOURCE_FORMATS.get(file_upload.file_type)
+        if file_format is None:
+            state = self._set_state(file_upload, status="unsupported", error="Only CSV, JSON and Excel files are converted")
+        elif not columnar_available():
+            state = self._set_state(file_upload, status="unavailable", error="Columnar conversion requires the pyarrow library")
+        elif open_sidecar(file_upload.file_path, file_upload.file_hash, file_format) is not None:
+            state = self._set_state(file_upload, status="ready", path=columnar_path(file_upload.file_path), error=None)
+        else:
+            encoding = (file_upload.file_metadata or {}).get("encoding") or "utf-8"
+            convert = partial(
+                convert_to_columnar, file_upload.file_path, file_format, file_upload.file_hash, encoding=encoding
+            )
+
+            def work(progress: ProgressCallback) -> Dict[str, Any]:
+                # Failures are recorded on the upload, which keeps being read as text
+                try:
+                    return convert(progress=progress)
+                except Exception as e:
+                    logger.warning(f"Columnar conversion of upload {file_upload.id} failed: {e}")
+                    return {"error": str(e)}
+
+            job = schema_inference_service.submit(
+                "columnar_conversion",
+                work,
+                on_complete=partial(self._record, file_upload.id),
+                file_id=file_upload.id
+            )
+            state = self._set_state(file_upload, status="converting", job_id=job["job_id"], error=None)
+
+        await db.commit()
+        return state
+
+    async def _record(self, file_id: int, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a finished conversion on the upload"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(FileUpload).where(FileUpload.id == file_id))
+            file_upload = result.scalar_one_or_none()
+            if file_upload is not None:
+                if "error" in summary:
+                    self._set_state(file_upload, status="failed", error=summary["error"])
+                else:
+                    self._set_state(
+                        file_upload, status="ready", path=summary["path"], row_count=summary["row_count"],
+                        columns=summary["columns"], error=None
+                    )
+                await db.commit()
+        if "error" in summary:
+            raise ColumnarConversionError(summary["error"])
+        return summary
+
+
+# Global columnar sidecar service instance
+columnar_sidecar_service = ColumnarSidecarService()
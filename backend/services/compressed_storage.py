@@ -0,0 +1,275 @@
+"""
+Compressed Storage
+Blocked gzip files with a frame index, so reads decompress only the frames they touch
+"""
+
+from typing import BinaryIO, Dict, Optional
+import io
+import logging
+import os
+import struct
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Uncompressed bytes per frame: larger frames compress better, smaller ones make range reads cheaper
+FRAME_SIZE = int(os.getenv("COMPRESSED_FRAME_SIZE", 1024 * 1024))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+FRAME_INDEX_SUFFIX = ".frames"
+
+# magic, version, frame size, frame count, uncompressed size, compressed size
+_INDEX_HEADER = struct.Struct("<4sHIIQQ")
+_INDEX_MAGIC = b"DAFX"
+_INDEX_VERSION = 1
+
+# Each frame is a complete gzip member (wbits 31 reads the gzip header)
+_GZIP_WBITS = 31
+
+
+class CompressedStorageError(Exception):
+    """Raised when a compressed file or its frame index cannot be read"""
+    pass
+
+
+def frame_index_path(file_path: str) -> str:
+    """Frame index stored next to the file it describes"""
+    return file_path + FRAME_INDEX_SUFFIX
+
+
+class FrameWriter:
+    """
+    Writes a file as a sequence of gzip members of FRAME_SIZE uncompressed
+    bytes each. Concatenated members are still one valid gzip stream, so
+    gzip tools read the file sequentially; the index written on close lets
+    this module seek into it.
+    """
+
+    def __init__(self, file_path: str, frame_size: int = FRAME_SIZE, level: int = COMPRESSION_LEVEL):
+        self.file_path = file_path
+        self.frame_size = frame_size
+        self.level = level
+        self._file = open(file_path, "wb")
+        self._buffer = bytearray()
+        self._offsets = []
+        self.uncompressed_size = 0
+        self.compressed_size = 0
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._offsets)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.frame_size:
+            self._write_frame(bytes(self._buffer[:self.frame_size]))
+            del self._buffer[:self.frame_size]
+        return len(data)
+
+    def _write_frame(self, data: bytes):
+        frame = zlib.compress(data, self.level, wbits=_GZIP_WBITS)
+        self._offsets.append((self.compressed_size, self.uncompressed_size))
+        self._file.write(frame)
+        self.compressed_size += len(frame)
+        self.uncompressed_size += len(data)
+
+    def close(self):
+        """Flush the last partial frame and write the index"""
+        if self._file.closed:
+            return
+        if self._buffer:
+            self._write_frame(bytes(self._buffer))
+            self._buffer.clear()
+        self._file.close()
+
+        # A closing entry makes every frame's extent offsets[i] .. offsets[i + 1]
+        offsets = np.array(self._offsets + [(self.compressed_size, self.uncompressed_size)], dtype="<u8")
+        header = _INDEX_HEADER.pack(
+            _INDEX_MAGIC, _INDEX_VERSION, self.frame_size, len(self._offsets),
+            self.uncompressed_size, self.compressed_size
+        )
+        temp_path = frame_index_path(self.file_path) + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            f.write(offsets.tobytes())
+        os.replace(temp_path, frame_index_path(self.file_path))
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def compress_file(
+    source_path: str,
+    target_path: str,
+    frame_size: int = FRAME_SIZE,
+    level: int = COMPRESSION_LEVEL
+) -> Dict[str, int]:
+    """Compress a file into framed storage, reading it one frame at a time"""
+    with open(source_path, "rb") as source, FrameWriter(target_path, frame_size, level) as writer:
+        while block := source.read(frame_size):
+            writer.write(block)
+    return {
+        "uncompressed_size": writer.uncompressed_size,
+        "compressed_size": writer.compressed_size,
+        "frames": writer.frame_count
+    }
+
+
+class FrameIndex:
+    """Compressed and uncompressed start offsets of every frame"""
+
+    def __init__(self, offsets: np.ndarray, frame_size: int):
+        self.compressed_offsets = offsets[:, 0]
+        self.uncompressed_offsets = offsets[:, 1]
+        self.frame_size = frame_size
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.uncompressed_offsets) - 1
+
+    @property
+    def uncompressed_size(self) -> int:
+        return int(self.uncompressed_offsets[-1])
+
+    @property
+    def compressed_size(self) -> int:
+        return int(self.compressed_offsets[-1])
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["FrameIndex"]:
+        """The file's frame index, or None if the file is not framed or the index is stale"""
+        try:
+            with open(frame_index_path(file_path), "rb") as f:
+                magic, version, frame_size, frame_count, _, compressed_size = _INDEX_HEADER.unpack(
+                    f.read(_INDEX_HEADER.size)
+                )
+                data = f.read()
+            file_size = os.path.getsize(file_path)
+        except (OSError, struct.error):
+            return None
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION or compressed_size != file_size:
+            return None
+        offsets = np.frombuffer(data, dtype="<u8")
+        if offsets.size != (frame_count + 1) * 2:
+            return None
+        return cls(offsets.reshape(-1, 2), frame_size)
+
+    def locate(self, position: int) -> int:
+        """Frame holding an uncompressed offset"""
+        return int(np.searchsorted(self.uncompressed_offsets, position, side="right")) - 1
+
+
+class FramedReader(io.RawIOBase):
+    """
+    Seekable reader over framed storage. Reads decompress only the frames
+    they cover; the most recent frame is kept so sequential reads smaller
+    than a frame inflate it once.
+    """
+
+    def __init__(self, file_path: str, index: Optional[FrameIndex] = None):
+        super().__init__()
+        self.index = index or FrameIndex.load(file_path)
+        if self.index is None:
+            raise CompressedStorageError(f"No frame index for {file_path}")
+        self._file = open(file_path, "rb")
+        self._position = 0
+        self._frame_number = -1
+        self._frame = b""
+        self.frames_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.index.uncompressed_size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._position = offset
+        return offset
+
+    def _load_frame(self, number: int) -> bytes:
+        if number != self._frame_number:
+            start = int(self.index.compressed_offsets[number])
+            end = int(self.index.compressed_offsets[number + 1])
+            self._file.seek(start)
+            try:
+                self._frame = zlib.decompress(self._file.read(end - start), _GZIP_WBITS)
+            except zlib.error as e:
+                raise CompressedStorageError(f"Corrupt frame {number}: {e}")
+            self._frame_number = number
+            self.frames_read += 1
+        return self._frame
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self.index.uncompressed_size or not len(buffer):
+            return 0
+        number = self.index.locate(self._position)
+        frame = self._load_frame(number)
+        start = self._position - int(self.index.uncompressed_offsets[number])
+        count = min(len(buffer), len(frame) - start)
+        memoryview(buffer)[:count] = frame[start:start + count]
+        self._position += count
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+            self._frame = b""
+        super().close()
+
+
+def is_compressed(file_path: str) -> bool:
+    """Whether a stored file is framed (has a current frame index)"""
+    return FrameIndex.load(file_path) is not None
+
+
+def open_stored(file_path: str, buffering: int = -1) -> BinaryIO:
+    """
+    Open a stored file for binary reading, decompressing framed files
+    transparently. buffering=0 returns the raw reader, as open() does.
+    """
+    index = FrameIndex.load(file_path)
+    if index is None:
+        return open(file_path, "rb", buffering=buffering)
+    reader = FramedReader(file_path, index)
+    if buffering == 0:
+        return reader
+    return io.BufferedReader(reader, buffer_size=buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE)
+
+
+def stored_size(file_path: str) -> int:
+    """Size of a stored file's content, uncompressed"""
+    index = FrameIndex.load(file_path)
+    if index is None:
+        return os.path.getsize(file_path)
+    return index.uncompressed_size
+
+
+def read_range(file_path: str, start: int, length: int) -> bytes:
+    """Bytes start .. start + length - 1 of a stored file's content"""
+    with open_stored(file_path, buffering=0) as f:
+        f.seek(start)
+        chunks = []
+        while length > 0:
+            chunk = f.read(length)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            length -= len(chunk)
+    return b"".join(chunks)
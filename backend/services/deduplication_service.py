@@ -0,0 +1,569 @@
+"""
+Deduplication Service
+Bounded-memory streaming deduplication operators (exact, approximate, windowed)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.services.node_output_cache import ColumnarBatch
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MODES = ("exact", "approximate", "windowed")
+
+DEFAULT_DEDUP_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+DEFAULT_EXPECTED_ITEMS = 1_000_000
+
+# Approximate per-key cost of a 16-byte digest in a Python set / OrderedDict
+SET_ENTRY_BYTES = sys.getsizeof(b"\x00" * 16) + 32
+WINDOW_ENTRY_BYTES = SET_ENTRY_BYTES + 100
+
+# Share of the exact-mode budget given to the Bloom filter guarding spilled keys
+SPILL_FILTER_FRACTION = 0.25
+BLOOM_HASHES_FOR_GUARD = 7
+
+# Scalable Bloom filter parameters (Almeida et al.): each new filter is
+# GROWTH times larger with an error rate TIGHTENING times smaller
+BLOOM_GROWTH = 2
+BLOOM_TIGHTENING = 0.85
+
+# SQLite limits bound parameters per statement
+SQLITE_PROBE_CHUNK = 900
+
+
+class DeduplicationConfigError(ValueError):
+    """Raised for an invalid deduplication node configuration"""
+    pass
+
+
+def key_digests(batch: ColumnarBatch, key_fields: Sequence[str]) -> List[bytes]:
+    """128-bit digest of each row's key (all columns when no key fields are given)"""
+    rows = len(next(iter(batch.values()))) if batch else 0
+    fields = list(key_fields) or list(batch)
+    columns = [batch.get(field, [None] * rows) for field in fields]
+    blake2b = hashlib.blake2b
+    return [
+        blake2b(repr(key).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        for key in zip(*columns)
+    ]
+
+
+def _take(batch: ColumnarBatch, keep: List[int]) -> ColumnarBatch:
+    if len(keep) == len(next(iter(batch.values()), [])):
+        return batch
+    return {name: [values[i] for i in keep] for name, values in batch.items()}
+
+
+class BloomFilter:
+    """
+    Bloom filter over 16-byte digests, stored as a numpy bit array.
+    Positions use double hashing of the two 64-bit halves of each digest.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, capacity: Optional[int] = None):
+        self.num_bits = max(8, int(num_bits))
+        self.num_hashes = max(1, int(num_hashes))
+        self.capacity = capacity
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes, capacity)
+
+    @classmethod
+    def for_bytes(cls, nbytes: int, num_hashes: int = BLOOM_HASHES_FOR_GUARD) -> "BloomFilter":
+        return cls(nbytes * 8, num_hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    def _positions(self, digests: Sequence[bytes]) -> np.ndarray:
+        halves = np.frombuffer(b"".join(digests), dtype=np.uint64).reshape(-1, 2)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            combined = halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))
+        return combined % np.uint64(self.num_bits)
+
+    def contains(self, digests: Sequence[bytes]) -> np.ndarray:
+        if not digests:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(digests)
+        bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def add(self, digests: Sequence[bytes]):
+        if not digests:
+            return
+        positions = self._positions(digests).ravel()
+        np.bitwise_or.at(
+            self.bits,
+            positions >> np.uint64(3),
+            np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        )
+        self.count += len(digests)
+
+    def estimated_error_rate(self) -> float:
+        if not self.count:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that adds larger, tighter filters as it fills so the
+    compound false-positive rate stays below `error_rate`. Once another
+    filter would exceed `max_bytes` it stops growing and keeps filling the
+    last one; the error rate then rises and `saturated` is reported.
+    """
+
+    def __init__(self, initial_capacity: int, error_rate: float, max_bytes: int):
+        self.error_rate = error_rate
+        self.max_bytes = max_bytes
+        self.saturated = False
+        first = BloomFilter.for_capacity(initial_capacity, error_rate * (1 - BLOOM_TIGHTENING))
+        if first.nbytes > max_bytes:
+            # Shrink the first filter to the budget rather than overshoot it
+            capacity = max(1, int(initial_capacity * max_bytes / first.nbytes))
+            first = BloomFilter.for_capacity(capacity, error_rate * (1 - BLOOM_TIGHTENING))
+        self.filters: List[BloomFilter] = [first]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(f.nbytes for f in self.filters)
+
+    @property
+    def count(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def contains(self, digests: Sequence[bytes]) -> np.ndarray:
+        found = np.zeros(len(digests), dtype=bool)
+        for bloom in self.filters:
+            found |= bloom.contains(digests)
+        return found
+
+    def add(self, digests: Sequence[bytes]):
+        index = 0
+        while index < len(digests):
+            current = self.filters[-1]
+            room = len(digests) - index if self.saturated else max(0, current.capacity - current.count)
+            if room == 0:
+                self._grow()
+                continue
+            chunk = digests[index:index + room]
+            current.add(chunk)
+            index += len(chunk)
+
+    def _grow(self):
+        last = self.filters[-1]
+        error = self.error_rate * (1 - BLOOM_TIGHTENING) * BLOOM_TIGHTENING ** len(self.filters)
+        candidate_capacity = last.capacity * BLOOM_GROWTH
+        candidate_bits = math.ceil(-candidate_capacity * math.log(error) / (math.log(2) ** 2))
+        if self.nbytes + candidate_bits // 8 > self.max_bytes:
+            self.saturated = True
+            logger.warning(
+                f"Bloom filter reached its {self.max_bytes} byte budget after {self.count} keys; "
+                f"false-positive rate will exceed {self.error_rate}"
+            )
+            return
+        self.filters.append(BloomFilter.for_capacity(candidate_capacity, error))
+
+    def estimated_error_rate(self) -> float:
+        miss = 1.0
+        for bloom in self.filters:
+            miss *= 1 - bloom.estimated_error_rate()
+        return 1 - miss
+
+
+class Deduplicator:
+    """Base class for streaming deduplication operators over columnar batches"""
+
+    mode = "base"
+
+    def __init__(self, key_fields: Sequence[str], memory_limit_bytes: int):
+        self.key_fields = list(key_fields)
+        self.memory_limit_bytes = memory_limit_bytes
+        self.records_in = 0
+        self.records_out = 0
+
+    def process(self, batch: ColumnarBatch) -> ColumnarBatch:
+        """Return the rows of `batch` whose key has not been seen yet"""
+        if not batch:
+            return batch
+        digests = key_digests(batch, self.key_fields)
+        keep = self._select(digests)
+        self.records_in += len(digests)
+        self.records_out += len(keep)
+        return _take(batch, keep)
+
+    def _select(self, digests: List[bytes]) -> List[int]:
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "key_fields": self.key_fields,
+            "records_in": self.records_in,
+            "records_out": self.records_out,
+            "duplicates_removed": self.records_in - self.records_out,
+            "memory_bytes": self.memory_bytes(),
+            "memory_limit_bytes": self.memory_limit_bytes,
+        }
+
+
+class ExactDeduplicator(Deduplicator):
+    """
+    Exact deduplication. Key digests are held in memory until the budget
+    is reached, then flushed to an on-disk SQLite B-tree. A fixed-size
+    Bloom filter over the spilled keys skips the disk probe for most new
+    keys; it may only cause extra probes, never missed duplicates.
+    """
+
+    mode = "exact"
+
+    def __init__(self, key_fields: Sequence[str], memory_limit_bytes: int, spill_dir: Path):
+        super().__init__(key_fields, memory_limit_bytes)
+        guard_bytes = int(memory_limit_bytes * SPILL_FILTER_FRACTION)
+        self.max_memory_keys = max(1024, (memory_limit_bytes - guard_bytes) // SET_ENTRY_BYTES)
+        self.spill_dir = Path(spill_dir)
+        self._guard_bytes = guard_bytes
+        self._seen: set = set()
+        self._spilled: Optional[BloomFilter] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self.spill_path: Optional[Path] = None
+        self.spilled_keys = 0
+        self.spills = 0
+        self.disk_probes = 0
+
+    def _open_spill(self):
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.spill_path = self.spill_dir / f"dedup_{uuid.uuid4().hex}.db"
+        self._db = sqlite3.connect(str(self.spill_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        # Keep SQLite's page cache small so the spill store stays off-heap
+        self._db.execute("PRAGMA cache_size=-2048")
+        self._db.execute("CREATE TABLE seen (k BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._spilled = BloomFilter.for_bytes(max(1024, self._guard_bytes))
+
+    def _spill(self):
+        if self._db is None:
+            self._open_spill()
+        keys = list(self._seen)
+        self._db.executemany("INSERT OR IGNORE INTO seen (k) VALUES (?)", ((k,) for k in keys))
+        self._db.commit()
+        self._spilled.add(keys)
+        self.spilled_keys += len(keys)
+        self.spills += 1
+        self._seen = set()
+        logger.debug(f"Dedup spilled {len(keys)} keys to {self.spill_path}")
+
+    def _on_disk(self, candidates: List[bytes]) -> set:
+        if self._db is None or not candidates:
+            return set()
+        maybe = [d for d, hit in zip(candidates, self._spilled.contains(candidates)) if hit]
+        found = set()
+        for start in range(0, len(maybe), SQLITE_PROBE_CHUNK):
+            chunk = maybe[start:start + SQLITE_PROBE_CHUNK]
+            self.disk_probes += len(chunk)
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT k FROM seen WHERE k IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def _select(self, digests: List[bytes]) -> List[int]:
+        seen = self._seen
+        unknown = list({d for d in digests if d not in seen})
+        on_disk = self._on_disk(unknown)
+
+        keep = []
+        new_keys = set()
+        for index, digest in enumerate(digests):
+            if digest in seen or digest in on_disk or digest in new_keys:
+                continue
+            new_keys.add(digest)
+            keep.append(index)
+
+        seen.update(new_keys)
+        if len(seen) > self.max_memory_keys:
+            self._spill()
+        return keep
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._seen) + len(self._seen) * sys.getsizeof(b"\x00" * 16) + \
+            (self._spilled.nbytes if self._spilled else 0)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+        self._seen = set()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics.update({
+            "keys_in_memory": len(self._seen),
+            "spilled_keys": self.spilled_keys,
+            "spills": self.spills,
+            "spill_bytes": self.spill_path.stat().st_size if self.spill_path and self.spill_path.exists() else 0,
+            "disk_probes": self.disk_probes,
+        })
+        return metrics
+
+
+class ApproximateDeduplicator(Deduplicator):
+    """
+    Approximate deduplication with a scalable Bloom filter. A new key is
+    occasionally reported as seen (dropped) with probability at most
+    `false_positive_rate` while the filter is within its memory budget;
+    duplicates are never let through.
+    """
+
+    mode = "approximate"
+
+    def __init__(
+        self,
+        key_fields: Sequence[str],
+        memory_limit_bytes: int,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        expected_items: int = DEFAULT_EXPECTED_ITEMS
+    ):
+        super().__init__(key_fields, memory_limit_bytes)
+        self.false_positive_rate = false_positive_rate
+        self.filter = ScalableBloomFilter(expected_items, false_positive_rate, memory_limit_bytes)
+
+    def _select(self, digests: List[bytes]) -> List[int]:
+        # First occurrence within the batch, then one vectorized filter pass
+        first: Dict[bytes, int] = {}
+        for index, digest in enumerate(digests):
+            first.setdefault(digest, index)
+        candidates = list(first)
+        seen = self.filter.contains(candidates)
+        fresh = [digest for digest, hit in zip(candidates, seen) if not hit]
+        self.filter.add(fresh)
+        return sorted(first[digest] for digest in fresh)
+
+    def memory_bytes(self) -> int:
+        return self.filter.nbytes
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics.update({
+            "false_positive_rate": self.false_positive_rate,
+            "estimated_false_positive_rate": round(self.filter.estimated_error_rate(), 6),
+            "filters": len(self.filter.filters),
+            "keys_added": self.filter.count,
+            "saturated": self.filter.saturated,
+        })
+        return metrics
+
+
+class WindowedDeduplicator(Deduplicator):
+    """
+    Deduplication within a sliding window: a key is dropped if it was seen
+    in the last `window_records` records and/or `window_seconds` seconds.
+    Time comes from `timestamp_field` (epoch seconds or datetimes) when
+    set, otherwise from the processing clock. If the window holds more keys
+    than the memory budget allows, the oldest are forgotten early.
+    """
+
+    mode = "windowed"
+
+    def __init__(
+        self,
+        key_fields: Sequence[str],
+        memory_limit_bytes: int,
+        window_records: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        timestamp_field: Optional[str] = None
+    ):
+        super().__init__(key_fields, memory_limit_bytes)
+        if not window_records and not window_seconds:
+            raise DeduplicationConfigError("Windowed deduplication requires window_records or window_seconds")
+        self.window_records = window_records
+        self.window_seconds = window_seconds
+        self.timestamp_field = timestamp_field
+        self.max_keys = max(1, memory_limit_bytes // WINDOW_ENTRY_BYTES)
+        # digest -> (record position, timestamp) of its latest sighting
+        self._window: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._position = 0
+        self.evicted_early = 0
+
+    @staticmethod
+    def _to_seconds(value: Any) -> Optional[float]:
+        if value is None:
+            return None
+        if hasattr(value, "timestamp"):
+            return value.timestamp()
+        return float(value)
+
+    def _timestamps(self, batch: ColumnarBatch, rows: int) -> Iterable[Optional[float]]:
+        if self.window_seconds is None:
+            return [None] * rows
+        if self.timestamp_field:
+            return [self._to_seconds(v) for v in batch.get(self.timestamp_field, [None] * rows)]
+        return [time.time()] * rows
+
+    def process(self, batch: ColumnarBatch) -> ColumnarBatch:
+        if not batch:
+            return batch
+        digests = key_digests(batch, self.key_fields)
+        timestamps = self._timestamps(batch, len(digests))
+
+        keep = []
+        window = self._window
+        for index, (digest, ts) in enumerate(zip(digests, timestamps)):
+            self._expire(ts)
+            if digest in window:
+                window.move_to_end(digest)
+            else:
+                keep.append(index)
+            window[digest] = (self._position, ts)
+            self._position += 1
+            while len(window) > self.max_keys:
+                window.popitem(last=False)
+                self.evicted_early += 1
+
+        self.records_in += len(digests)
+        self.records_out += len(keep)
+        return _take(batch, keep)
+
+    def _expire(self, now: Optional[float]):
+        window = self._window
+        while window:
+            position, ts = next(iter(window.values()))
+            too_old = self.window_records and position <= self._position - self.window_records
+            too_late = (
+                self.window_seconds is not None and now is not None and ts is not None
+                and ts < now - self.window_seconds
+            )
+            if not (too_old or too_late):
+                break
+            window.popitem(last=False)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._window) + len(self._window) * WINDOW_ENTRY_BYTES
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics.update({
+            "window_records": self.window_records,
+            "window_seconds": self.window_seconds,
+            "keys_in_window": len(self._window),
+            "evicted_early": self.evicted_early,
+        })
+        return metrics
+
+
+class DeduplicationService:
+    """Creates deduplication operators from DEDUPLICATE node configuration"""
+
+    def __init__(self, spill_dir: Optional[Path] = None):
+        self.spill_dir = Path(spill_dir) if spill_dir else settings.temp_files_dir / "dedup"
+
+    @staticmethod
+    def _config_number(
+        config: Dict[str, Any],
+        name: str,
+        convert: type,
+        errors: List[str],
+        default: Any = None,
+        positive: bool = False
+    ):
+        """
+        A numeric setting converted with `convert`; a value that does not
+        convert, or is not above zero when `positive` is set, is reported in `errors`
+        """
+        value = config.get(name, default)
+        if value is None:
+            return None
+        try:
+            number = convert(value)
+        except (TypeError, ValueError, OverflowError):
+            errors.append(f"{name} must be {'an integer' if convert is int else 'a number'}")
+            return None
+        if positive and not number > 0:
+            errors.append(f"{name} must be greater than 0")
+            return None
+        return number
+
+    @staticmethod
+    def validate_config(config: Dict[str, Any]) -> List[str]:
+        """Return configuration errors for a DEDUPLICATE node"""
+        errors = []
+        mode = config.get("mode", "exact")
+        if mode not in DEDUP_MODES:
+            errors.append(f"Unknown deduplication mode '{mode}'; expected one of {', '.join(DEDUP_MODES)}")
+        if mode == "approximate":
+            rate = DeduplicationService._config_number(
+                config, "false_positive_rate", float, errors, DEFAULT_FALSE_POSITIVE_RATE
+            )
+            if rate is not None and not 0 < rate < 1:
+                errors.append("false_positive_rate must be between 0 and 1")
+            DeduplicationService._config_number(config, "expected_items", int, errors, positive=True)
+        if mode == "windowed":
+            DeduplicationService._config_number(config, "window_records", int, errors, positive=True)
+            DeduplicationService._config_number(config, "window_seconds", float, errors, positive=True)
+            if config.get("window_records") is None and config.get("window_seconds") is None:
+                errors.append("Windowed deduplication requires window_records or window_seconds")
+        return errors
+
+    def create_operator(self, config: Dict[str, Any], memory_limit_bytes: Optional[int] = None) -> Deduplicator:
+        errors = self.validate_config(config)
+        if errors:
+            raise DeduplicationConfigError("; ".join(errors))
+
+        mode = config.get("mode", "exact")
+        key_fields = config.get("key_fields") or config.get("unique_fields") or []
+        memory = int(memory_limit_bytes or config.get("memory_bytes") or DEFAULT_DEDUP_MEMORY_BYTES)
+
+        if mode == "approximate":
+            return ApproximateDeduplicator(
+                key_fields,
+                memory,
+                false_positive_rate=float(config.get("false_positive_rate", DEFAULT_FALSE_POSITIVE_RATE)),
+                expected_items=int(config.get("expected_items", DEFAULT_EXPECTED_ITEMS))
+            )
+        if mode == "windowed":
+            window_records = config.get("window_records")
+            window_seconds = config.get("window_seconds")
+            return WindowedDeduplicator(
+                key_fields,
+                memory,
+                window_records=int(window_records) if window_records is not None else None,
+                window_seconds=float(window_seconds) if window_seconds is not None else None,
+                timestamp_field=config.get("timestamp_field")
+            )
+        return ExactDeduplicator(key_fields, memory, self.spill_dir)
+
+
+# Global deduplication service instance
+deduplication_service = DeduplicationService()
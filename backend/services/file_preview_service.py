@@ -0,0 +1,330 @@
+"""
+File Preview Service
+Sparse record-offset indexes for random-access row previews of large CSV and JSON Lines files
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from itertools import islice
+import asyncio
+import csv
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from backend.services.columnar_sidecar_service import open_sidecar, preview_sidecar
+from backend.services.compressed_storage import FrameIndex, FramedReader, open_stored, stored_size
+
+logger = logging.getLogger(__name__)
+
+# One offset is kept for every LINE_INDEX_EVERY records, so a preview parses at most that many extra records
+LINE_INDEX_EVERY = int(os.getenv("LINE_INDEX_EVERY", 1000))
+LINE_INDEX_SUFFIX = ".idx"
+MAX_PREVIEW_ROWS = 1000
+SCAN_BLOCK_SIZE = 64 * 1024
+
+# magic, version, quote-aware flag, records per offset, record count, file size
+_INDEX_HEADER = struct.Struct("<4sHHIQQ")
+_INDEX_MAGIC = b"DAIX"
+_INDEX_VERSION = 1
+_OFFSET = struct.Struct("<Q")
+
+_NEWLINE = ord("\n")
+_QUOTE = ord('"')
+
+
+class FilePreviewError(Exception):
+    """Raised when a file cannot be previewed"""
+    pass
+
+
+def line_index_path(file_path: str) -> str:
+    """Index sidecar stored next to the file it indexes"""
+    return file_path + LINE_INDEX_SUFFIX
+
+
+def _record_ends(data: np.ndarray, quote_aware: bool, in_quotes: bool) -> Tuple[np.ndarray, bool]:
+    """
+    Positions just past every record-ending newline in a block, and whether
+    the block ends inside a quoted field. With RFC 4180 quoting an escaped
+    quote ("") toggles twice, so quote parity alone tells which newlines
+    are inside fields.
+    """
+    newlines = np.flatnonzero(data == _NEWLINE)
+    if quote_aware:
+        quotes = np.flatnonzero(data == _QUOTE)
+        if quotes.size:
+            quotes_before = np.searchsorted(quotes, newlines) + in_quotes
+            newlines = newlines[quotes_before % 2 == 0]
+            in_quotes = bool((quotes.size + in_quotes) % 2)
+        elif in_quotes:
+            newlines = newlines[:0]
+    return newlines + 1, in_quotes
+
+
+class LineIndexBuilder:
+    """Builds a sparse record-offset index from a file's blocks, in order"""
+
+    def __init__(self, quote_aware: bool = True, every: int = LINE_INDEX_EVERY):
+        self.quote_aware = quote_aware
+        self.every = every
+        self.in_quotes = False
+        self.position = 0
+        self.record_ends = 0
+        self.last_record_end = 0
+        self.offsets: List[np.ndarray] = [np.zeros(1, dtype=np.uint64)]
+
+    def update(self, block):
+        data = np.frombuffer(block, dtype=np.uint8)
+        ends, self.in_quotes = _record_ends(data, self.quote_aware, self.in_quotes)
+        if ends.size:
+            # The record starting at ends[j] is number record_ends + j + 1
+            first = -(self.record_ends + 1) % self.every
+            self.offsets.append((ends[first::self.every] + self.position).astype(np.uint64))
+            self.record_ends += ends.size
+            self.last_record_end = self.position + int(ends[-1])
+        self.position += data.size
+
+    @property
+    def record_count(self) -> int:
+        """Records seen, counting a last record without a trailing newline"""
+        return self.record_ends + (1 if self.last_record_end < self.position else 0)
+
+    def save(self, file_path: str, usable: bool = True):
+        """
+        Write the index next to the file it was built from. An unusable
+        index (quoting the offsets cannot follow) only records that
+        previews must parse the file from the start.
+        """
+        offsets = np.concatenate(self.offsets)
+        offsets = offsets[offsets < self.position] if self.position else offsets[:1]
+        if not usable:
+            offsets = offsets[:0]
+        header = _INDEX_HEADER.pack(
+            _INDEX_MAGIC, _INDEX_VERSION, int(self.quote_aware), self.every if usable else 0,
+            self.record_count, self.position
+        )
+        temp_path = line_index_path(file_path) + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            f.write(offsets.astype("<u8").tobytes())
+        os.replace(temp_path, line_index_path(file_path))
+
+
+class LineIndex:
+    """Reader for a saved index; each lookup reads one offset from disk"""
+
+    def __init__(self, path: str, quote_aware: bool, every: int, record_count: int, file_size: int):
+        self.path = path
+        self.quote_aware = quote_aware
+        self.every = every
+        self.record_count = record_count
+        self.file_size = file_size
+
+    @property
+    def usable(self) -> bool:
+        return self.every > 0
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["LineIndex"]:
+        """The file's index, or None if it is missing or stale"""
+        path = line_index_path(file_path)
+        try:
+            with open(path, "rb") as f:
+                magic, version, quote_aware, every, record_count, file_size = _INDEX_HEADER.unpack(
+                    f.read(_INDEX_HEADER.size)
+                )
+        except (OSError, struct.error):
+            return None
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION or file_size != stored_size(file_path):
+            return None
+        return cls(path, bool(quote_aware), every, record_count, file_size)
+
+    def nearest(self, record: int) -> Tuple[int, int]:
+        """(record number, byte offset) of the indexed record at or before `record`"""
+        # Offsets stop at the last record; later records are scanned from it
+        slot = min(record // self.every, max(0, (self.record_count - 1) // self.every))
+        with open(self.path, "rb") as f:
+            f.seek(_INDEX_HEADER.size + slot * _OFFSET.size)
+            offset, = _OFFSET.unpack(f.read(_OFFSET.size))
+        return slot * self.every, offset
+
+
+def build_line_index(file_path: str, quote_aware: bool = True, every: int = LINE_INDEX_EVERY) -> LineIndexBuilder:
+    """Index a file in one sequential read"""
+    builder = LineIndexBuilder(quote_aware, every)
+    with open_stored(file_path) as f:
+        while block := f.read(1024 * 1024):
+            builder.update(block)
+    builder.save(file_path)
+    return builder
+
+
+class _FramedBuffer:
+    """Slicing over a compressed file, standing in for the mapped file; slices decompress only their frames"""
+
+    def __init__(self, reader: FramedReader):
+        self.reader = reader
+
+    def __len__(self) -> int:
+        return self.reader.index.uncompressed_size
+
+    def __getitem__(self, window: slice) -> bytes:
+        self.reader.seek(window.start)
+        chunks = []
+        remaining = window.stop - window.start
+        while remaining > 0 and (chunk := self.reader.read(remaining)):
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+
+def _record_bounds(buffer, offset: int, records: int, quote_aware: bool) -> List[int]:
+    """Start offsets of the next `records` records from a record start, plus the end of the last"""
+    bounds = [offset]
+    in_quotes = False
+    position = offset
+    size = len(buffer)
+    while len(bounds) <= records and position < size:
+        count = min(SCAN_BLOCK_SIZE, size - position)
+        if isinstance(buffer, mmap.mmap):
+            block = np.frombuffer(buffer, dtype=np.uint8, count=count, offset=position)
+        else:
+            block = np.frombuffer(buffer[position:position + count], dtype=np.uint8)
+        ends, in_quotes = _record_ends(block, quote_aware, in_quotes)
+        bounds.extend((ends + position).tolist())
+        position += block.size
+    if len(bounds) <= records and bounds[-1] < size:
+        # Last record has no trailing newline
+        bounds.append(size)
+    return bounds[:records + 1]
+
+
+def read_records(
+    file_path: str,
+    start: int,
+    count: int,
+    quote_aware: bool = True,
+    index: Optional[LineIndex] = None
+) -> List[bytes]:
+    """
+    Raw bytes of records start .. start + count - 1. The file is mapped and
+    only the records from the nearest indexed offset to the end of the
+    window are scanned; compressed files decompress only the frames those
+    records lie in.
+    """
+    if stored_size(file_path) == 0:
+        return []
+
+    first, offset = index.nearest(start) if index is not None else (0, 0)
+    frames = FrameIndex.load(file_path)
+    if frames is not None:
+        with FramedReader(file_path, frames) as reader:
+            return _window(_FramedBuffer(reader), offset, start - first, count, quote_aware)
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return _window(buffer, offset, start - first, count, quote_aware)
+
+
+def _window(buffer, offset: int, skip: int, count: int, quote_aware: bool) -> List[bytes]:
+    skipped = _record_bounds(buffer, offset, skip, quote_aware)
+    if len(skipped) <= skip:
+        return []
+    window = _record_bounds(buffer, skipped[-1], count, quote_aware)
+    return [buffer[begin:end] for begin, end in zip(window, window[1:])]
+
+
+def preview_file(
+    file_path: str,
+    file_format: str,
+    start: int = 0,
+    limit: int = 50,
+    has_header: bool = True,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    file_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Parse a window of rows. CSV rows follow the header when there is one;
+    JSON Lines rows are lines. Builds the index on first use. Uploads with
+    a current columnar sidecar are previewed from it instead, typed and
+    without parsing; Excel files only then.
+    """
+    sidecar = open_sidecar(file_path, file_hash, file_format, delimiter, has_header)
+    if sidecar is not None:
+        return preview_sidecar(sidecar, start, max(0, min(limit, MAX_PREVIEW_ROWS)), as_records=file_format == "jsonl")
+
+    if file_format == "excel":
+        raise FilePreviewError("Excel files can only be previewed once converted to columnar format")
+    if file_format not in ("csv", "jsonl"):
+        raise FilePreviewError("Only CSV and JSON Lines files can be previewed by row")
+
+    quote_aware = file_format == "csv"
+    index = LineIndex.load(file_path)
+    if index is None or index.quote_aware != quote_aware:
+        build_line_index(file_path, quote_aware)
+        index = LineIndex.load(file_path)
+
+    limit = max(0, min(limit, MAX_PREVIEW_ROWS))
+    skip = 1 if file_format == "csv" and has_header else 0
+
+    columns = None
+    if file_format == "csv" and not index.usable:
+        # Quoting the index cannot follow: parse from the start
+        with io.TextIOWrapper(open_stored(file_path), encoding=encoding, errors="replace", newline="") as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            if has_header:
+                columns = next(reader, [])
+            rows = list(islice(reader, start, start + limit))
+    elif file_format == "csv":
+        records = read_records(file_path, start + skip, limit, quote_aware, index)
+        text = b"".join(records).decode(encoding, errors="replace")
+        rows = list(csv.reader(io.StringIO(text, newline=""), delimiter=delimiter))
+        if has_header:
+            header = read_records(file_path, 0, 1, quote_aware, index)
+            header_text = b"".join(header).decode(encoding, errors="replace").lstrip("\ufeff")
+            columns = next(csv.reader(io.StringIO(header_text, newline=""), delimiter=delimiter), [])
+    else:
+        records = read_records(file_path, start, limit, quote_aware, index)
+        text = b"".join(records).decode(encoding, errors="replace")
+        try:
+            rows = [json.loads(line) if line.strip() else None for line in text.splitlines()]
+        except json.JSONDecodeError as e:
+            raise FilePreviewError(f"Invalid JSON line in preview window: {e.msg}")
+
+    return {
+        "columns": columns,
+        "rows": rows,
+        "start": start,
+        "row_count": len(rows),
+        "total_rows": max(0, index.record_count - skip)
+    }
+
+
+class FilePreviewService:
+    """Serves row-range previews off the event loop"""
+
+    async def preview(
+        self,
+        file_path: str,
+        file_format: str,
+        start: int = 0,
+        limit: int = 50,
+        has_header: bool = True,
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        file_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(preview_file, file_path, file_format, start, limit, has_header, delimiter, encoding, file_hash)
+        )
+
+
+# Global file preview service instance
+file_preview_service = FilePreviewService()
@@ -6,19 +6,86 @@ Part of Sub-Phase 5A: File Processing (B014)
 """
 
 import os
+import asyncio
 import hashlib
+import math
 import aiofiles
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_
+from sqlalchemy.dialects.postgresql import insert
 
 from backend.models.file_upload import (
     FileUpload,
+    FileBlob,
     FileStatus,
     FileType
 )
+from backend.services.columnar_sidecar_service import columnar_path
+from backend.services.compressed_storage import compress_file, frame_index_path, read_range, stored_size
+from backend.services.file_preview_service import line_index_path
+
+
+class ChunkUploadError(ValueError):
+    """Raised for a chunk that does not fit the upload's chunk layout"""
+    pass
+
+
+class UploadTooLargeError(ValueError):
+    """Raised for an upload larger than MAX_FILE_SIZE"""
+    pass
+
+
+class ChunkBitmap:
+    """Received-chunk bitmap: chunk n is bit n % 8 of byte n // 8"""
+
+    def __init__(self, total_chunks: int, data: Optional[bytes] = None):
+        self.total_chunks = total_chunks
+        self.bits = bytearray((total_chunks + 7) // 8)
+        if data:
+            self.bits[:len(data)] = data[:len(self.bits)]
+
+    @classmethod
+    def full(cls, total_chunks: int) -> "ChunkBitmap":
+        bitmap = cls(total_chunks, b"\xff" * ((total_chunks + 7) // 8))
+        if total_chunks % 8:
+            bitmap.bits[-1] = (1 << (total_chunks % 8)) - 1
+        return bitmap
+
+    def __contains__(self, chunk_number: int) -> bool:
+        return bool(self.bits[chunk_number >> 3] & (1 << (chunk_number & 7)))
+
+    def add(self, chunk_number: int):
+        self.bits[chunk_number >> 3] |= 1 << (chunk_number & 7)
+
+    def count(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    def missing(self, limit: Optional[int] = None) -> List[int]:
+        """Missing chunk numbers in order, at most `limit` of them"""
+        missing = []
+        for index, byte in enumerate(self.bits):
+            if byte == 0xFF:
+                continue
+            for n in range(index * 8, min(index * 8 + 8, self.total_chunks)):
+                if not byte & (1 << (n & 7)):
+                    if limit is not None and len(missing) >= limit:
+                        return missing
+                    missing.append(n)
+        return missing
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+class _UploadHashState:
+    """SHA-256 over the contiguous prefix of received chunks"""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.next_chunk = 0
 
 
 class FileUploadService:
@@ -29,12 +96,27 @@ class FileUploadService:
     TEMP_DIR = os.getenv("TEMP_DIR", "/tmp/data_aggregator/temp")
     MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 5 * 1024 * 1024 * 1024))  # 5GB default
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 5 * 1024 * 1024))  # 5MB chunks
+    # Bounds on client-chosen chunk layouts, keeping received-chunk bitmaps small
+    MIN_CHUNK_SIZE = int(os.getenv("MIN_CHUNK_SIZE", 256 * 1024))  # 256KB
+    MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE", 64 * 1024 * 1024))  # 64MB, the largest chunk request body
+    MAX_CHUNK_COUNT = int(os.getenv("MAX_CHUNK_COUNT", 10000))
+    # Chunk status lists at most this many missing chunks
+    MAX_LISTED_MISSING_CHUNKS = int(os.getenv("MAX_LISTED_MISSING_CHUNKS", 1000))
     TEMP_FILE_EXPIRY_HOURS = int(os.getenv("TEMP_FILE_EXPIRY_HOURS", 24))
+    # Completed uploads are stored once per content hash, on the same filesystem as staged uploads
+    BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+    # Text uploads can be stored as seekable compressed frames; readers decompress only what they read
+    COMPRESS_UPLOADS = os.getenv("COMPRESS_UPLOADS", "false").lower() == "true"
+    COMPRESSIBLE_TYPES = {FileType.CSV, FileType.JSON, FileType.XML, FileType.TEXT}
 
     def __init__(self):
         """Initialize upload directories"""
         os.makedirs(self.UPLOAD_DIR, exist_ok=True)
         os.makedirs(self.TEMP_DIR, exist_ok=True)
+        os.makedirs(self.BLOB_DIR, exist_ok=True)
+        # Incremental hashes of in-progress chunked uploads, by upload id
+        self._hash_states: Dict[int, _UploadHashState] = {}
+        self._hash_locks: Dict[int, asyncio.Lock] = {}
 
     @staticmethod
     def _detect_file_type(filename: str, mime_type: Optional[str] = None) -> FileType:
@@ -74,6 +156,142 @@ class FileUploadService:
 
         return sha256_hash.hexdigest()
 
+    def _blob_path(self, content_hash: str) -> str:
+        """Blob location, fanned out over two directory levels by hash prefix"""
+        return os.path.join(self.BLOB_DIR, content_hash[:2], content_hash[2:4], content_hash)
+
+    @staticmethod
+    def _move_into_place(source: str, target: str):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+
+    @staticmethod
+    def _compress_into_place(source: str, target: str):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        compress_file(source, target)
+        os.remove(source)
+
+    @staticmethod
+    def _remove_file(path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+    @classmethod
+    def _remove_stored_file(cls, path: str):
+        """Remove stored content along with its frame index, record index and columnar sidecars"""
+        cls._remove_file(path)
+        cls._remove_file(frame_index_path(path))
+        cls._remove_file(line_index_path(path))
+        cls._remove_file(columnar_path(path))
+
+    @staticmethod
+    async def _lock_blob(db: AsyncSession, content_hash: str) -> Optional[FileBlob]:
+        result = await db.execute(
+            select(FileBlob)
+            .where(FileBlob.content_hash == content_hash)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _blob_available(blob: Optional[FileBlob], file_size: int) -> bool:
+        return blob is not None and blob.file_size == file_size and os.path.exists(blob.storage_path)
+
+    @staticmethod
+    async def _blob_referenced_by(
+        db: AsyncSession,
+        content_hash: str,
+        user_id: Optional[int],
+        pipeline_id: Optional[int]
+    ) -> bool:
+        """
+        Whether the user, or the pipeline, already holds an upload of a blob.
+        A hash alone proves nothing about possessing the content, so only
+        those owners may claim the blob without sending it.
+        """
+        owners = []
+        if user_id is not None:
+            owners.append(FileUpload.user_id == user_id)
+        if pipeline_id is not None:
+            owners.append(FileUpload.pipeline_id == pipeline_id)
+        if not owners:
+            return False
+        result = await db.execute(
+            select(FileUpload.id).where(FileUpload.blob_hash == content_hash, or_(*owners)).limit(1)
+        )
+        return result.scalar_one_or_none() is not None
+
+    @staticmethod
+    def _reference_blob(file_upload: FileUpload, blob: FileBlob):
+        """Point an upload at a blob and count the reference"""
+        blob.ref_count = (blob.ref_count or 0) + 1
+        blob.last_referenced_at = datetime.utcnow()
+        file_upload.blob_hash = blob.content_hash
+        file_upload.file_hash = blob.content_hash
+        file_upload.file_path = blob.storage_path
+
+    async def _store_blob(
+        self,
+        db: AsyncSession,
+        file_upload: FileUpload,
+        content_hash: str
+    ) -> bool:
+        """
+        Move a finished upload's staged file into blob storage, or drop it
+        if the same content is already stored
+
+        Returns:
+            True if an existing blob was reused
+        """
+        loop = asyncio.get_running_loop()
+        blob_path = self._blob_path(content_hash)
+        # FOR UPDATE locks nothing while the row does not exist, so create it
+        # first: a concurrent upload of the same content then waits on the
+        # lock below and reuses the stored file instead of racing to insert
+        await db.execute(
+            insert(FileBlob)
+            .values(content_hash=content_hash, file_size=file_upload.file_size, storage_path=blob_path, ref_count=0)
+            .on_conflict_do_nothing(index_elements=[FileBlob.content_hash])
+        )
+        blob = await self._lock_blob(db, content_hash)
+        reused = self._blob_available(blob, file_upload.file_size)
+
+        if reused:
+            await loop.run_in_executor(None, self._remove_file, file_upload.file_path)
+        else:
+            if self.COMPRESS_UPLOADS and file_upload.file_type in self.COMPRESSIBLE_TYPES:
+                await loop.run_in_executor(None, self._compress_into_place, file_upload.file_path, blob_path)
+            else:
+                await loop.run_in_executor(None, self._move_into_place, file_upload.file_path, blob_path)
+            blob.file_size = file_upload.file_size
+            blob.storage_path = blob_path
+
+        self._reference_blob(file_upload, blob)
+        return reused
+
+    async def _release_blob(self, db: AsyncSession, content_hash: str):
+        """Drop one reference; unreferenced blobs are removed by cleanup_expired_files"""
+        blob = await self._lock_blob(db, content_hash)
+        if blob is not None:
+            blob.ref_count = max(0, (blob.ref_count or 0) - 1)
+
+    async def _collect_blobs(self, db: AsyncSession) -> int:
+        """Delete unreferenced blobs and their content"""
+        result = await db.execute(
+            select(FileBlob).where(FileBlob.ref_count <= 0).with_for_update(skip_locked=True)
+        )
+        count = 0
+        for blob in result.scalars().all():
+            try:
+                self._remove_stored_file(blob.storage_path)
+                count += 1
+            except OSError as e:
+                print(f"Error deleting blob {blob.content_hash}: {e}")
+                continue
+            await db.delete(blob)
+        return count
+
     async def create_upload(
         self,
         db: AsyncSession,
@@ -83,7 +301,10 @@ class FileUploadService:
         user_id: Optional[int] = None,
         pipeline_id: Optional[int] = None,
         is_temporary: bool = True,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        columnar: bool = False
     ) -> FileUpload:
         """
         Create a new file upload record
@@ -97,10 +318,37 @@ class FileUploadService:
             pipeline_id: Associated pipeline ID
             is_temporary: Whether file is temporary
             metadata: Additional metadata
+            chunk_size: Bytes per chunk for chunked uploads (defaults to CHUNK_SIZE)
+            file_hash: SHA-256 of the content, if known up front. When a blob
+                with this hash and size is already stored and referenced by
+                an upload of the same user or pipeline, the upload is
+                completed immediately and no bytes need to be sent;
+                otherwise the content is uploaded as usual.
+            columnar: Convert the file to a columnar sidecar once validated
+                (see columnar_sidecar_service)
 
         Returns:
             FileUpload record
+
+        Raises:
+            UploadTooLargeError: file_size is above MAX_FILE_SIZE
+            ChunkUploadError: chunk_size is outside MIN_CHUNK_SIZE and
+                MAX_CHUNK_SIZE, or splits the file into more than
+                MAX_CHUNK_COUNT chunks
         """
+        if file_size > self.MAX_FILE_SIZE:
+            raise UploadTooLargeError(f"File size {file_size} exceeds the {self.MAX_FILE_SIZE}-byte limit")
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        if chunk_size < self.MIN_CHUNK_SIZE:
+            raise ChunkUploadError(f"Chunk size must be at least {self.MIN_CHUNK_SIZE} bytes")
+        if chunk_size > self.MAX_CHUNK_SIZE:
+            raise ChunkUploadError(f"Chunk size must be at most {self.MAX_CHUNK_SIZE} bytes")
+        if math.ceil(file_size / chunk_size) > self.MAX_CHUNK_COUNT:
+            raise ChunkUploadError(
+                f"A {file_size}-byte file needs chunks of at least "
+                f"{math.ceil(file_size / self.MAX_CHUNK_COUNT)} bytes"
+            )
+
         # Generate unique filename
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         unique_filename = f"{timestamp}_{filename}"
@@ -124,39 +372,133 @@ class FileUploadService:
             file_type=file_type,
             mime_type=mime_type,
             file_size=file_size,
+            chunk_size=chunk_size,
+            chunk_count=max(1, math.ceil(file_size / chunk_size)),
             status=FileStatus.UPLOADING,
             user_id=user_id,
             pipeline_id=pipeline_id,
             is_temporary=is_temporary,
             expires_at=expires_at,
-            file_metadata=metadata or {}
+            file_metadata=metadata or {},
+            processing_metadata={"columnar": {"requested": True, "status": "requested"}} if columnar else None
         )
 
+        if file_hash:
+            blob = await self._lock_blob(db, file_hash.lower())
+            if self._blob_available(blob, file_size) and await self._blob_referenced_by(
+                db, blob.content_hash, user_id, pipeline_id
+            ):
+                self._reference_blob(file_upload, blob)
+                file_upload.status = FileStatus.UPLOADED
+                file_upload.upload_progress = 100
+                file_upload.upload_completed_at = datetime.utcnow()
+                file_upload.received_chunks = ChunkBitmap.full(file_upload.chunk_count).to_bytes()
+
         db.add(file_upload)
         await db.commit()
         await db.refresh(file_upload)
 
         return file_upload
 
+    def expected_chunk_length(self, file_upload: FileUpload, chunk_number: int, total_chunks: int) -> int:
+        """
+        Length of chunk `chunk_number` of an upload split into `total_chunks`.
+        Known before the chunk is read, so request bodies can be checked up front.
+
+        Raises:
+            ChunkUploadError: the layout does not match the upload, or the
+                chunk is out of range or larger than MAX_CHUNK_SIZE
+        """
+        if total_chunks > self.MAX_CHUNK_COUNT:
+            raise ChunkUploadError(f"An upload has at most {self.MAX_CHUNK_COUNT} chunks")
+        chunk_size = self._chunk_layout(file_upload, total_chunks)
+        file_size = file_upload.file_size
+        expected_chunks = max(1, math.ceil(file_size / chunk_size))
+        if total_chunks != expected_chunks:
+            raise ChunkUploadError(
+                f"A {file_size}-byte file in {chunk_size}-byte chunks has {expected_chunks} chunks, not {total_chunks}"
+            )
+        if not 0 <= chunk_number < total_chunks:
+            raise ChunkUploadError(f"Chunk number {chunk_number} is out of range")
+        expected_length = min(chunk_size, file_size - chunk_number * chunk_size)
+        if expected_length > self.MAX_CHUNK_SIZE:
+            raise ChunkUploadError(f"Chunks must be at most {self.MAX_CHUNK_SIZE} bytes; upload in more chunks")
+        return expected_length
+
+    @staticmethod
+    def _chunk_layout(file_upload: FileUpload, total_chunks: int) -> int:
+        """Chunk size of an upload; older records without one split the file evenly"""
+        if file_upload.chunk_size:
+            return file_upload.chunk_size
+        return max(1, math.ceil(file_upload.file_size / total_chunks))
+
+    @staticmethod
+    def _write_chunk(file_path: str, offset: int, chunk_data: bytes, file_size: int):
+        """Write a chunk at its offset; chunks may arrive in any order and in parallel"""
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < file_size:
+                os.ftruncate(fd, file_size)
+            view = memoryview(chunk_data)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view = view[written:]
+                offset += written
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _advance_hash(
+        state: _UploadHashState,
+        file_path: str,
+        received: ChunkBitmap,
+        chunk_size: int,
+        file_size: int,
+        chunk_number: int,
+        chunk_data: bytes
+    ):
+        """
+        Extend the hash over every newly contiguous chunk. The chunk just
+        received is hashed from memory; chunks that arrived ahead of a gap
+        are read back from disk once the gap fills.
+        """
+        fd = None
+        try:
+            while state.next_chunk < received.total_chunks and state.next_chunk in received:
+                if state.next_chunk == chunk_number:
+                    state.sha256.update(chunk_data)
+                else:
+                    if fd is None:
+                        fd = os.open(file_path, os.O_RDONLY)
+                    offset = state.next_chunk * chunk_size
+                    state.sha256.update(os.pread(fd, min(chunk_size, file_size - offset), offset))
+                state.next_chunk += 1
+        finally:
+            if fd is not None:
+                os.close(fd)
+
     async def upload_chunk(
         self,
         db: AsyncSession,
         file_id: int,
         chunk_data: bytes,
         chunk_number: int,
-        total_chunks: int,
-        append: bool = True
+        total_chunks: int
     ) -> Dict[str, Any]:
         """
         Upload a file chunk
 
+        Chunk n is written at n * chunk_size, so chunks can be sent in
+        parallel and in any order; re-sending a chunk overwrites it. The
+        SHA-256 is extended as contiguous prefixes complete, so the upload
+        is finalized without reading the file again.
+
         Args:
             db: Database session
             file_id: File upload ID
             chunk_data: Chunk data bytes
             chunk_number: Current chunk number (0-indexed)
             total_chunks: Total number of chunks
-            append: Whether to append or overwrite
 
         Returns:
             Upload status dict
@@ -168,29 +510,65 @@ class FileUploadService:
         if not file_upload:
             raise ValueError(f"File upload {file_id} not found")
 
-        if file_upload.status == FileStatus.COMPLETED:
+        # Once stored as a blob the content may be shared, so it is never written again
+        if file_upload.status == FileStatus.COMPLETED or file_upload.blob_hash:
             raise ValueError("File upload already completed")
 
-        # Write chunk to file
-        mode = "ab" if append else "wb"
-        async with aiofiles.open(file_upload.file_path, mode) as f:
-            await f.write(chunk_data)
+        staged_path = file_upload.file_path
+        expected_length = self.expected_chunk_length(file_upload, chunk_number, total_chunks)
+        chunk_size = self._chunk_layout(file_upload, total_chunks)
+        file_size = file_upload.file_size
+        offset = chunk_number * chunk_size
+        if len(chunk_data) != expected_length:
+            raise ChunkUploadError(f"Chunk {chunk_number} must be {expected_length} bytes, got {len(chunk_data)}")
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, self._write_chunk, file_upload.file_path, offset, chunk_data, file_size
+        )
 
-        # Update progress
-        progress = int(((chunk_number + 1) / total_chunks) * 100)
-        file_upload.upload_progress = progress
-        file_upload.chunk_count = total_chunks
+        lock = self._hash_locks.setdefault(file_id, asyncio.Lock())
+        async with lock:
+            # Re-read the bitmap under a row lock so parallel chunks are not lost
+            result = await db.execute(
+                select(FileUpload)
+                .where(FileUpload.id == file_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            file_upload = result.scalar_one_or_none() or file_upload
+            if file_upload.blob_hash:
+                # Completed while this chunk was being written
+                await loop.run_in_executor(None, self._remove_file, staged_path)
+                raise ValueError("File upload already completed")
+
+            received = ChunkBitmap(total_chunks, file_upload.received_chunks)
+            received.add(chunk_number)
+            received_count = received.count()
+            file_upload.received_chunks = received.to_bytes()
+            file_upload.chunk_size = chunk_size
+            file_upload.chunk_count = total_chunks
+            file_upload.upload_progress = int(received_count / total_chunks * 100)
+
+            # Missing state (another process, or a restart) rehashes the received prefix from disk
+            state = self._hash_states.setdefault(file_id, _UploadHashState())
+            await loop.run_in_executor(
+                None, self._advance_hash, state, file_upload.file_path, received,
+                chunk_size, file_size, chunk_number, chunk_data
+            )
 
-        # Check if upload is complete
-        if chunk_number + 1 == total_chunks:
-            file_upload.status = FileStatus.UPLOADED
-            file_upload.upload_completed_at = datetime.utcnow()
+            # Check if upload is complete
+            if received_count == total_chunks and file_upload.status == FileStatus.UPLOADING:
+                file_upload.status = FileStatus.UPLOADED
+                file_upload.upload_completed_at = datetime.utcnow()
+                await self._store_blob(db, file_upload, state.sha256.hexdigest())
 
-            # Calculate file hash
-            file_hash = await self._calculate_file_hash(file_upload.file_path)
-            file_upload.file_hash = file_hash
+            await db.commit()
+
+            if file_upload.status != FileStatus.UPLOADING:
+                self._hash_states.pop(file_id, None)
+                self._hash_locks.pop(file_id, None)
 
-        await db.commit()
         await db.refresh(file_upload)
 
         return {
@@ -199,9 +577,39 @@ class FileUploadService:
             "progress": file_upload.upload_progress,
             "chunk_number": chunk_number,
             "total_chunks": total_chunks,
+            "received_chunks": received_count,
             "completed": file_upload.status == FileStatus.COMPLETED
         }
 
+    async def get_chunk_status(
+        self,
+        db: AsyncSession,
+        file_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Received and missing chunks of an upload, for resuming it. At most
+        MAX_LISTED_MISSING_CHUNKS missing chunks are listed, lowest first;
+        missing_chunks_truncated says whether there are more.
+        """
+        file_upload = await self.get_file_upload(db, file_id)
+        if not file_upload:
+            return None
+
+        total_chunks = file_upload.chunk_count or 1
+        received = ChunkBitmap(total_chunks, file_upload.received_chunks)
+        received_count = received.count()
+        missing = received.missing(self.MAX_LISTED_MISSING_CHUNKS)
+        return {
+            "file_id": file_upload.id,
+            "status": file_upload.status.value,
+            "file_size": file_upload.file_size,
+            "chunk_size": self._chunk_layout(file_upload, total_chunks),
+            "total_chunks": total_chunks,
+            "received_chunks": received_count,
+            "missing_chunks": missing,
+            "missing_chunks_truncated": total_chunks - received_count > len(missing)
+        }
+
     async def upload_complete_file(
         self,
         db: AsyncSession,
@@ -211,7 +619,8 @@ class FileUploadService:
         user_id: Optional[int] = None,
         pipeline_id: Optional[int] = None,
         is_temporary: bool = True,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        columnar: bool = False
     ) -> FileUpload:
         """
         Upload a complete file (non-chunked)
@@ -225,6 +634,7 @@ class FileUploadService:
             pipeline_id: Pipeline ID
             is_temporary: Whether file is temporary
             metadata: Additional metadata
+            columnar: Convert the file to a columnar sidecar once validated
 
         Returns:
             FileUpload record
@@ -240,22 +650,27 @@ class FileUploadService:
             user_id=user_id,
             pipeline_id=pipeline_id,
             is_temporary=is_temporary,
-            metadata=metadata
+            metadata=metadata,
+            columnar=columnar
         )
 
-        # Write file
-        async with aiofiles.open(file_upload.file_path, "wb") as f:
-            await f.write(file_data)
+        # Hash the bytes already in memory rather than reading the file back
+        content_hash = hashlib.sha256(file_data).hexdigest()
+
+        # Only write the file if this content is not stored yet
+        blob = await self._lock_blob(db, content_hash)
+        if self._blob_available(blob, file_size):
+            self._reference_blob(file_upload, blob)
+        else:
+            async with aiofiles.open(file_upload.file_path, "wb") as f:
+                await f.write(file_data)
+            await self._store_blob(db, file_upload, content_hash)
 
         # Update status
         file_upload.status = FileStatus.UPLOADED
         file_upload.upload_progress = 100
         file_upload.upload_completed_at = datetime.utcnow()
 
-        # Calculate hash
-        file_hash = await self._calculate_file_hash(file_upload.file_path)
-        file_upload.file_hash = file_hash
-
         await db.commit()
         await db.refresh(file_upload)
 
@@ -350,10 +765,12 @@ class FileUploadService:
         if not file_upload:
             return False
 
-        # Delete physical file
-        if remove_physical_file and os.path.exists(file_upload.file_path):
+        # Delete physical file; shared blobs are only released, and collected once unreferenced
+        if file_upload.blob_hash:
+            await self._release_blob(db, file_upload.blob_hash)
+        elif remove_physical_file and os.path.exists(file_upload.file_path):
             try:
-                os.remove(file_upload.file_path)
+                self._remove_stored_file(file_upload.file_path)
             except Exception as e:
                 print(f"Error deleting physical file: {e}")
 
@@ -370,7 +787,8 @@ class FileUploadService:
         db: AsyncSession
     ) -> int:
         """
-        Clean up expired temporary files
+        Clean up expired temporary files, then garbage-collect blobs no
+        upload references any more
 
         Returns:
             Number of files cleaned up
@@ -392,9 +810,11 @@ class FileUploadService:
         count = 0
         for file_upload in expired_files:
             # Delete physical file
-            if os.path.exists(file_upload.file_path):
+            if file_upload.blob_hash:
+                await self._release_blob(db, file_upload.blob_hash)
+            elif os.path.exists(file_upload.file_path):
                 try:
-                    os.remove(file_upload.file_path)
+                    self._remove_stored_file(file_upload.file_path)
                     count += 1
                 except Exception as e:
                     print(f"Error deleting expired file {file_upload.id}: {e}")
@@ -403,6 +823,10 @@ class FileUploadService:
             file_upload.status = FileStatus.DELETED
             await db.delete(file_upload)
 
+        # Deleted uploads must be flushed before their blobs go
+        await db.flush()
+        count += await self._collect_blobs(db)
+
         await db.commit()
         return count
 
@@ -414,7 +838,8 @@ class FileUploadService:
         length: Optional[int] = None
     ) -> Optional[bytes]:
         """
-        Read file content
+        Read file content into memory. For whole files prefer the download
+        endpoint, which streams with Range support.
 
         Args:
             db: Database session
@@ -431,14 +856,11 @@ class FileUploadService:
         if not file_upload or not os.path.exists(file_upload.file_path):
             return None
 
-        async with aiofiles.open(file_upload.file_path, "rb") as f:
-            if offset > 0:
-                await f.seek(offset)
-
-            if length:
-                return await f.read(length)
-            else:
-                return await f.read()
+        # Compressed blobs inflate only the frames the range covers
+        loop = asyncio.get_running_loop()
+        if not length:
+            length = max(0, await loop.run_in_executor(None, stored_size, file_upload.file_path) - offset)
+        return await loop.run_in_executor(None, read_range, file_upload.file_path, offset, length)
 
     async def check_duplicate(
         self,
@@ -455,3 +877,7 @@ class FileUploadService:
             ).order_by(FileUpload.created_at.desc())
         )
         return result.scalar_one_or_none()
+
+
+# Global file upload service instance
+file_upload_service = FileUploadService()
@@ -6,14 +6,290 @@ Part of Sub-Phase 5A: File Processing (B014)
 """
 
 import os
+import io
+import csv
+import queue
+import asyncio
+import hashlib
+import threading
 import magic
 import chardet
-from typing import Optional, Dict, Any, List
+from functools import partial
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from backend.models.file_upload import FileUpload, FileStatus, FileType
+from backend.services.columnar_sidecar_service import columnar_sidecar_service
+from backend.services.compressed_storage import open_stored, stored_size
+from backend.services.file_preview_service import LineIndexBuilder
+from backend.services.schema_inference_service import SchemaInferenceError, iter_json_records
+
+
+READ_BLOCK_SIZE = 1024 * 1024
+# libmagic and chardet only look at the start of the file
+MIME_SNIFF_BYTES = READ_BLOCK_SIZE
+ENCODING_SNIFF_BYTES = 64 * 1024
+# Blocks in flight to the virus scanner before the read waits for it
+SCAN_QUEUE_BLOCKS = 4
+# Larger files exceed clamd's default StreamMaxLength and are scanned by path instead
+CLAMAV_STREAM_MAX_BYTES = int(os.getenv("CLAMAV_STREAM_MAX_BYTES", 25 * 1024 * 1024))
+
+
+class _TeeStream(io.RawIOBase):
+    """Raw file stream handing every block it reads to an observer"""
+
+    def __init__(self, raw: io.RawIOBase, observe: Callable[[memoryview], None]):
+        self.raw = raw
+        self.observe = observe
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.raw.readinto(buffer)
+        if count:
+            self.observe(memoryview(buffer)[:count])
+        return count
+
+
+class _ScanStream:
+    """
+    File-like stream feeding pyclamd's INSTREAM scan from a worker thread.
+    The validation pass pushes blocks into a bounded queue; if the scanner
+    fails, pushes are dropped instead of blocking the pass.
+    """
+
+    def __init__(self, scanner: Any):
+        self.blocks: "queue.Queue[Optional[bytes]]" = queue.Queue(SCAN_QUEUE_BLOCKS)
+        self.pending = memoryview(b"")
+        self.finished = threading.Event()
+        self.response = None
+        self.error: Optional[Exception] = None
+        self.thread = threading.Thread(target=self._scan, args=(scanner,), daemon=True)
+        self.thread.start()
+
+    def _scan(self, scanner: Any):
+        try:
+            self.response = scanner.scan_stream(self, chunk_size=READ_BLOCK_SIZE)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def read(self, size: int) -> bytes:
+        if not self.pending:
+            block = self.blocks.get()
+            if block is None:
+                return b""
+            self.pending = memoryview(block)
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return bytes(chunk)
+
+    def push(self, block: Optional[bytes]):
+        while not self.finished.is_set():
+            try:
+                self.blocks.put(block, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def result(self) -> Tuple[str, Optional[str]]:
+        self.push(None)
+        self.thread.join()
+        if self.error is not None:
+            return "error", f"Scan error: {self.error}"
+        if self.response is None:
+            return "clean", None
+        return "infected", str(self.response)
+
+
+def _connect_scanner() -> Tuple[Optional[Any], str, Optional[str]]:
+    """ClamAV daemon connection, or None with the scan result to record instead"""
+    try:
+        import pyclamd
+    except ImportError:
+        return None, "not_scanned", "pyclamd library not available"
+
+    try:
+        scanner = pyclamd.ClamdUnixSocket()
+        if not scanner.ping():
+            # ClamAV not available - skip scanning but don't fail
+            return None, "not_scanned", "ClamAV daemon not available"
+    except Exception as e:
+        return None, "error", f"Scan error: {str(e)}"
+
+    return scanner, "clean", None
+
+
+def _sniff_encoding(head: bytes) -> str:
+    detected = chardet.detect(head[:ENCODING_SNIFF_BYTES])["encoding"]
+    # An ASCII head says nothing about the rest of the file; UTF-8 is a superset
+    if not detected or detected.lower() == "ascii":
+        return "utf-8"
+    return detected
+
+
+def _check_csv(stream: io.BufferedReader, encoding: str) -> Tuple[List[str], Optional[int]]:
+    """
+    Structural CSV check over every row. Also returns the number of records
+    parsed (header included), or None if the file could not be parsed to the end.
+    """
+    errors = []
+    records = None
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+
+        if not header or not any(cell.strip() for cell in header):
+            errors.append("CSV file is empty")
+            return errors, None
+
+        # Check for consistent column count, reporting the first mismatch
+        column_count = len(header)
+        count = 1
+        for row in reader:
+            count += 1
+            if row and len(row) != column_count and not errors:
+                errors.append(
+                    f"Inconsistent column count at row {count}: expected {column_count}, got {len(row)}"
+                )
+        records = count
+
+    except Exception as e:
+        errors.append(f"CSV validation error: {str(e)}")
+    finally:
+        # Leave the byte stream open for the rest of the pass
+        text.detach()
+
+    return errors, records
+
+
+def _check_json(stream: io.BufferedReader, head: bytes) -> List[str]:
+    """
+    Structural JSON check holding one top-level value (or array element)
+    at a time: a top-level array, or objects/arrays one after another
+    """
+    errors = []
+
+    try:
+        is_array = head.lstrip(b" \t\r\n\xef\xbb\xbf")[:1] == b"["
+        values = 0
+        for value in iter_json_records(stream):
+            values += 1
+            if not is_array and not isinstance(value, (dict, list)):
+                errors.append("JSON must be an object or array")
+                break
+            if not is_array and not value and values == 1:
+                errors.append("JSON file is empty")
+                break
+
+        if values == 0:
+            errors.append("JSON file is empty")
+
+    except SchemaInferenceError as e:
+        errors.append(str(e))
+    except Exception as e:
+        errors.append(f"JSON validation error: {str(e)}")
+
+    return errors
+
+
+def scan_file_contents(
+    file_path: str,
+    file_type: FileType,
+    scan_viruses: bool = False
+) -> Dict[str, Any]:
+    """
+    Read a file once and feed every block to SHA-256, MIME sniffing,
+    encoding detection, the CSV/JSON structural check and, optionally, a
+    ClamAV stream. CSV and JSON Lines files also get their sparse record
+    index (see file_preview_service) from the same blocks. Memory is bounded
+    by the read buffer, the sniffed head and the scan queue. Compressed
+    uploads are read through their frames, so every check sees the
+    original content. Blocking; run it in an executor.
+    """
+    sha256 = hashlib.sha256()
+    head = bytearray()
+    scan_stream = None
+    scan = None
+    line_index = None
+    if file_type in (FileType.CSV, FileType.JSON):
+        line_index = LineIndexBuilder(quote_aware=file_type == FileType.CSV)
+
+    if scan_viruses:
+        scanner, scan_result, scan_error = _connect_scanner()
+        if scanner is None:
+            scan = (scan_result, scan_error)
+        else:
+            scan_stream = _ScanStream(scanner)
+
+    def observe(block: memoryview):
+        sha256.update(block)
+        if len(head) < MIME_SNIFF_BYTES:
+            head.extend(block[:MIME_SNIFF_BYTES - len(head)])
+        if scan_stream is not None:
+            scan_stream.push(bytes(block))
+        if line_index is not None:
+            line_index.update(block)
+
+    errors = []
+    bytes_read = 0
+    encoding = None
+    record_count = None
+    with open_stored(file_path, buffering=0) as raw:
+        stream = io.BufferedReader(_TeeStream(raw, observe), READ_BLOCK_SIZE)
+        # Fill the head before anything is decoded
+        stream.peek(READ_BLOCK_SIZE)
+
+        if file_type == FileType.JSON and head.lstrip(b" \t\r\n\xef\xbb\xbf")[:1] == b"[":
+            # A top-level array has no record lines to index
+            line_index = None
+
+        if file_type == FileType.CSV:
+            encoding = _sniff_encoding(bytes(head))
+            csv_errors, csv_records = _check_csv(stream, encoding)
+            errors.extend(csv_errors)
+        elif file_type == FileType.JSON:
+            errors.extend(_check_json(stream, bytes(head)))
+
+        # Finish the read for the hash and the scanner after the check stops
+        while stream.read(READ_BLOCK_SIZE):
+            pass
+        bytes_read = raw.tell()
+
+    if line_index is not None:
+        record_count = line_index.record_count
+        # Offsets are only usable if every record the parser saw ends where the index says
+        usable = file_type != FileType.CSV or csv_records == record_count
+        try:
+            line_index.save(file_path, usable)
+        except OSError:
+            record_count = None
+
+    mime_type = None
+    mime_error = None
+    try:
+        mime_type = magic.Magic(mime=True).from_buffer(bytes(head))
+    except Exception as e:
+        mime_error = str(e)
+
+    if scan_stream is not None:
+        scan = scan_stream.result()
+
+    return {
+        "file_hash": sha256.hexdigest(),
+        "bytes_read": bytes_read,
+        "mime_type": mime_type,
+        "mime_error": mime_error,
+        "encoding": encoding,
+        "record_count": record_count,
+        "errors": errors,
+        "scan": scan
+    }
 
 
 class FileValidationService:
@@ -69,17 +345,24 @@ class FileValidationService:
     async def validate_file(
         self,
         db: AsyncSession,
-        file_id: int
+        file_id: int,
+        scan_viruses: bool = False
     ) -> Dict[str, Any]:
         """
         Validate uploaded file
 
+        The content is read once, in a worker thread, feeding hashing, MIME
+        and encoding detection, structural checks and - with scan_viruses -
+        a ClamAV stream, so the event loop stays free during large files.
+
         Args:
             db: Database session
             file_id: File upload ID
+            scan_viruses: Also stream the content to ClamAV during the read
 
         Returns:
-            Validation result dict
+            Validation result dict; includes "scan" when the file was
+            scanned during the read
         """
         # Get file upload record
         result = await db.execute(select(FileUpload).where(FileUpload.id == file_id))
@@ -112,7 +395,7 @@ class FileValidationService:
                 validation_errors.append(f"File extension {ext} is not allowed")
 
             # Verify actual file size
-            actual_size = os.path.getsize(file_upload.file_path)
+            actual_size = stored_size(file_upload.file_path)
             if actual_size != file_upload.file_size:
                 validation_errors.append(
                     f"File size mismatch. Expected {file_upload.file_size}, got {actual_size}"
@@ -126,26 +409,18 @@ class FileValidationService:
                     f"File size ({actual_size} bytes) exceeds limit ({size_limit} bytes)"
                 )
 
-            # Detect actual MIME type
-            try:
-                detected_mime = self.magic.from_file(file_upload.file_path)
-                file_upload.mime_type = detected_mime
-
-                # Check if MIME type is allowed
-                if detected_mime not in self.ALLOWED_MIME_TYPES:
-                    # Be lenient for some types
-                    if not any(allowed in detected_mime for allowed in [
-                        "text", "application/json", "application/xml", "image"
-                    ]):
-                        validation_errors.append(
-                            f"MIME type {detected_mime} is not allowed"
-                        )
-            except Exception as e:
-                validation_errors.append(f"Error detecting MIME type: {str(e)}")
+            # Rejected files are not worth reading
+            content = None
+            if not validation_errors:
+                content = await self._scan_contents(
+                    file_upload,
+                    scan_viruses=scan_viruses and actual_size <= CLAMAV_STREAM_MAX_BYTES
+                )
+                validation_errors.extend(self._content_errors(file_upload, content))
 
-            # File-type specific validation
-            type_errors = await self._validate_file_type_specific(file_upload)
-            validation_errors.extend(type_errors)
+            # Formats that need random access are checked from the file itself
+            if not validation_errors and file_upload.file_type in (FileType.EXCEL, FileType.IMAGE):
+                validation_errors.extend(await self._validate_file_type_specific(file_upload))
 
             # Update validation status
             if validation_errors:
@@ -157,16 +432,29 @@ class FileValidationService:
                 file_upload.is_validated = True
                 file_upload.validation_errors = None
 
+            scan = None
+            if content is not None and content["scan"] is not None:
+                scan = self._apply_scan_result(file_upload, *content["scan"])
+
             await db.commit()
             await db.refresh(file_upload)
 
-            return {
+            validation = {
                 "valid": len(validation_errors) == 0,
                 "errors": validation_errors,
                 "file_id": file_upload.id,
                 "mime_type": file_upload.mime_type,
                 "file_size": file_upload.file_size
             }
+            if scan is not None:
+                validation["scan"] = scan
+
+            # Uploads that asked for a columnar sidecar are converted in the background
+            if file_upload.is_validated and file_upload.status == FileStatus.UPLOADED:
+                columnar = await columnar_sidecar_service.schedule(db, file_upload)
+                if columnar is not None:
+                    validation["columnar"] = columnar
+            return validation
 
         except Exception as e:
             file_upload.status = FileStatus.FAILED
@@ -177,6 +465,52 @@ class FileValidationService:
                 "errors": [f"Validation error: {str(e)}"]
             }
 
+    async def _scan_contents(
+        self,
+        file_upload: FileUpload,
+        scan_viruses: bool = False
+    ) -> Dict[str, Any]:
+        """Run the single read pass in a worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(scan_file_contents, file_upload.file_path, file_upload.file_type, scan_viruses)
+        )
+
+    def _content_errors(self, file_upload: FileUpload, content: Dict[str, Any]) -> List[str]:
+        """Check the results of the read pass and record what it learned"""
+        errors = []
+
+        if content["mime_error"] is not None:
+            errors.append(f"Error detecting MIME type: {content['mime_error']}")
+        else:
+            detected_mime = content["mime_type"]
+            file_upload.mime_type = detected_mime
+
+            # Check if MIME type is allowed
+            if detected_mime not in self.ALLOWED_MIME_TYPES:
+                # Be lenient for some types
+                if not any(allowed in detected_mime for allowed in [
+                    "text", "application/json", "application/xml", "image"
+                ]):
+                    errors.append(
+                        f"MIME type {detected_mime} is not allowed"
+                    )
+
+        # Chunked uploads hash the content as it arrives; the read must agree
+        if file_upload.file_hash and file_upload.file_hash != content["file_hash"]:
+            errors.append("File content does not match the uploaded hash")
+        file_upload.file_hash = file_upload.file_hash or content["file_hash"]
+
+        metadata = {
+            key: content[key] for key in ("encoding", "record_count") if content[key] is not None
+        }
+        if metadata:
+            file_upload.file_metadata = {**(file_upload.file_metadata or {}), **metadata}
+
+        errors.extend(content["errors"])
+        return errors
+
     async def _validate_file_type_specific(
         self,
         file_upload: FileUpload
@@ -200,85 +534,28 @@ class FileValidationService:
 
     async def _validate_csv(self, file_upload: FileUpload) -> List[str]:
         """Validate CSV file"""
-        errors = []
-
-        try:
-            # Detect encoding
-            with open(file_upload.file_path, 'rb') as f:
-                raw_data = f.read(10000)  # Read first 10KB
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-
-            # Try to read first few lines
-            with open(file_upload.file_path, 'r', encoding=encoding) as f:
-                # Check if file is empty
-                first_line = f.readline()
-                if not first_line.strip():
-                    errors.append("CSV file is empty")
-                    return errors
-
-                # Count columns
-                import csv
-                f.seek(0)
-                reader = csv.reader(f)
-                header = next(reader, None)
-
-                if not header:
-                    errors.append("CSV file has no header row")
-                    return errors
-
-                # Check for consistent column count (sample first 100 rows)
-                column_count = len(header)
-                for i, row in enumerate(reader):
-                    if i >= 100:
-                        break
-                    if len(row) != column_count:
-                        errors.append(
-                            f"Inconsistent column count at row {i+2}: expected {column_count}, got {len(row)}"
-                        )
-                        break
-
-        except Exception as e:
-            errors.append(f"CSV validation error: {str(e)}")
-
-        return errors
+        content = await self._scan_contents(file_upload)
+        return content["errors"]
 
     async def _validate_json(self, file_upload: FileUpload) -> List[str]:
         """Validate JSON file"""
-        errors = []
-
-        try:
-            import json
-
-            with open(file_upload.file_path, 'r') as f:
-                try:
-                    data = json.load(f)
-
-                    # Check if it's empty
-                    if not data:
-                        errors.append("JSON file is empty")
-
-                    # Check if it's valid structure (array or object)
-                    if not isinstance(data, (dict, list)):
-                        errors.append("JSON must be an object or array")
-
-                except json.JSONDecodeError as e:
-                    errors.append(f"Invalid JSON: {str(e)}")
-
-        except Exception as e:
-            errors.append(f"JSON validation error: {str(e)}")
-
-        return errors
+        content = await self._scan_contents(file_upload)
+        return content["errors"]
 
     async def _validate_excel(self, file_upload: FileUpload) -> List[str]:
         """Validate Excel file"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._check_excel, file_upload.file_path)
+
+    @staticmethod
+    def _check_excel(file_path: str) -> List[str]:
         errors = []
 
         try:
             import openpyxl
 
             try:
-                workbook = openpyxl.load_workbook(file_upload.file_path, read_only=True)
+                workbook = openpyxl.load_workbook(file_path, read_only=True)
 
                 # Check if it has sheets
                 if len(workbook.sheetnames) == 0:
@@ -298,18 +575,23 @@ class FileValidationService:
 
     async def _validate_image(self, file_upload: FileUpload) -> List[str]:
         """Validate image file"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._check_image, file_upload.file_path)
+
+    @staticmethod
+    def _check_image(file_path: str) -> List[str]:
         errors = []
 
         try:
             from PIL import Image
 
             try:
-                with Image.open(file_upload.file_path) as img:
+                with Image.open(file_path) as img:
                     # Verify it's a valid image
                     img.verify()
 
                     # Check image dimensions
-                    img = Image.open(file_upload.file_path)  # Reopen after verify
+                    img = Image.open(file_path)  # Reopen after verify
                     width, height = img.size
 
                     if width > 50000 or height > 50000:
@@ -384,25 +666,12 @@ class FileValidationService:
                 scan_error = f"Scan error: {str(e)}"
 
             # Update file upload record
-            file_upload.is_virus_scanned = True
-            file_upload.virus_scan_result = scan_result
-
-            if scan_result == "infected":
-                file_upload.status = FileStatus.FAILED
-                file_upload.validation_errors = {
-                    "errors": [f"Virus detected: {scan_error}"]
-                }
+            scan = self._apply_scan_result(file_upload, scan_result, scan_error)
 
             await db.commit()
             await db.refresh(file_upload)
 
-            return {
-                "scanned": True,
-                "result": scan_result,
-                "clean": scan_result == "clean",
-                "error": scan_error,
-                "file_id": file_upload.id
-            }
+            return scan
 
         except Exception as e:
             file_upload.is_virus_scanned = False
@@ -416,6 +685,30 @@ class FileValidationService:
                 "error": f"Scan error: {str(e)}"
             }
 
+    @staticmethod
+    def _apply_scan_result(
+        file_upload: FileUpload,
+        scan_result: str,
+        scan_error: Optional[str]
+    ) -> Dict[str, Any]:
+        """Record a scan result on the upload"""
+        file_upload.is_virus_scanned = True
+        file_upload.virus_scan_result = scan_result
+
+        if scan_result == "infected":
+            file_upload.status = FileStatus.FAILED
+            file_upload.validation_errors = {
+                "errors": [f"Virus detected: {scan_error}"]
+            }
+
+        return {
+            "scanned": True,
+            "result": scan_result,
+            "clean": scan_result == "clean",
+            "error": scan_error,
+            "file_id": file_upload.id
+        }
+
     async def validate_and_scan(
         self,
         db: AsyncSession,
@@ -431,20 +724,22 @@ class FileValidationService:
         Returns:
             Combined validation and scan results
         """
-        # Validate file
-        validation_result = await self.validate_file(db, file_id)
+        # Validate file, scanning it during the same read when clamd can take it as a stream
+        validation_result = await self.validate_file(db, file_id, scan_viruses=True)
+        scan_result = validation_result.get("scan")
 
         # If validation failed, don't scan
         if not validation_result["valid"]:
             return {
                 "valid": False,
-                "scanned": False,
+                "scanned": scan_result is not None,
                 "validation": validation_result,
-                "scan": None
+                "scan": scan_result
             }
 
-        # Scan for viruses
-        scan_result = await self.scan_virus(db, file_id)
+        # Files too large to stream are scanned by path
+        if scan_result is None:
+            scan_result = await self.scan_virus(db, file_id)
 
         return {
             "valid": validation_result["valid"],
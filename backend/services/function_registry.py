@@ -0,0 +1,225 @@
+"""
+Compiled Function Registry
+Compiles transformation functions once per version and caches the callables
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+from types import CodeType
+import logging
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.pipeline_template import TransformationFunction
+from backend.services.node_output_cache import ColumnarBatch, columns_to_records, records_to_columns
+from backend.services.sandbox_worker_pool import SAFE_BUILTINS
+from backend.services.vectorized_builtins import get_vectorized_builtin, is_blocking_builtin
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_SIZE = 256
+
+
+class FunctionCompilationError(Exception):
+    """Raised when a function's source does not define the named function."""
+    pass
+
+
+class CompiledFunction:
+    """
+    A transformation function compiled from a specific version of its source.
+
+    Compiling never runs the source. User functions are executed in
+    sandbox_worker_pool; builtins carry `columnar_func`, a vectorized
+    implementation that operates on columnar batches in-process, and their
+    Python source is only used for display and `test_function`. Blocking
+    builtins (grouping, sorting, limiting, deduplicating) must be called on
+    all of a node's input at once.
+    """
+
+    def __init__(
+        self,
+        function_id: Optional[int],
+        name: str,
+        version: Any,
+        code: CodeType,
+        source: str,
+        columnar_func: Optional[Callable[..., ColumnarBatch]] = None,
+        blocking: bool = False
+    ):
+        self.function_id = function_id
+        self.name = name
+        self.version = version
+        self.code = code
+        self.source = source
+        self.columnar_func = columnar_func
+        self.blocking = blocking
+        self.call_count = 0
+        self._func: Optional[Callable[..., Any]] = None
+
+    @property
+    def trusted(self) -> bool:
+        """Whether the function may run in the API process"""
+        return self.columnar_func is not None
+
+    @property
+    def func(self) -> Callable[..., Any]:
+        """In-process callable, bound on first use with the restricted builtins"""
+        if self._func is None:
+            namespace: Dict[str, Any] = {"__builtins__": dict(SAFE_BUILTINS)}
+            exec(self.code, namespace)
+            self._func = namespace[self.name]
+        return self._func
+
+    def __call__(self, *args, **kwargs) -> Any:
+        self.call_count += 1
+        return self.func(*args, **kwargs)
+
+    def call_batch(self, batch: List[Dict[str, Any]], parameters: Optional[Dict[str, Any]] = None) -> Any:
+        """Apply the function to a batch of records"""
+        return self(batch, **(parameters or {}))
+
+    def call_columnar(self, batch: ColumnarBatch, parameters: Optional[Dict[str, Any]] = None) -> ColumnarBatch:
+        """Apply the function to a columnar batch, vectorized when possible"""
+        if self.columnar_func is not None:
+            self.call_count += 1
+            return self.columnar_func(batch, **(parameters or {}))
+
+        result = self.call_batch(columns_to_records(batch), parameters)
+        if isinstance(result, dict):
+            result = [result]
+        return records_to_columns(result or [])
+
+
+class FunctionRegistry:
+    """
+    LRU cache of compiled transformation functions.
+
+    Entries are keyed by (function_id, version) where the version is the
+    row's updated_at (or created_at for never-updated rows), so a function
+    is parsed and compiled only once per revision.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_REGISTRY_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, CompiledFunction]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.compilations = 0
+
+    @staticmethod
+    def version_of(function: Any) -> Any:
+        version = getattr(function, "updated_at", None) or getattr(function, "created_at", None)
+        return version.isoformat() if isinstance(version, datetime) else version
+
+    @staticmethod
+    def compile_source(name: str, source: str, function_id: Optional[int] = None) -> CodeType:
+        """
+        Compile `source` without executing it and check that it defines a
+        top-level function called `name`
+        """
+        code = compile(source, f"<transformation:{function_id or name}>", "exec")
+
+        defined = {const.co_name for const in code.co_consts if isinstance(const, CodeType)}
+        if name not in defined:
+            raise FunctionCompilationError(f"Function '{name}' not found in code")
+        return code
+
+    def get(self, function: Any) -> CompiledFunction:
+        """Return the compiled callable for a TransformationFunction row"""
+        key = (function.id, self.version_of(function))
+
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        code = self.compile_source(function.name, function.function_code, function.id)
+        # Only trusted builtins are swapped for their vectorized versions
+        columnar_func = get_vectorized_builtin(function.name) if getattr(function, "is_builtin", False) else None
+        compiled = CompiledFunction(
+            function.id, function.name, key[1], code, function.function_code, columnar_func,
+            blocking=columnar_func is not None and is_blocking_builtin(function.name)
+        )
+
+        with self._lock:
+            self.compilations += 1
+            # Drop older revisions of the same function
+            for stale_key in [k for k in self._cache if k[0] == function.id]:
+                del self._cache[stale_key]
+            self._cache[key] = compiled
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+        return compiled
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        function_id: Optional[int] = None,
+        name: Optional[str] = None
+    ) -> Optional[CompiledFunction]:
+        """
+        Resolve a function by id or name.
+        Only the version columns are read when the compiled revision is cached.
+        """
+        if function_id is not None:
+            condition = TransformationFunction.id == function_id
+        elif name is not None:
+            condition = TransformationFunction.name == name
+        else:
+            raise ValueError("function_id or name is required")
+
+        result = await db.execute(
+            select(
+                TransformationFunction.id,
+                TransformationFunction.updated_at,
+                TransformationFunction.created_at
+            ).where(condition)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        key = (row.id, self.version_of(row))
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compiled
+
+        result = await db.execute(select(TransformationFunction).where(TransformationFunction.id == row.id))
+        function = result.scalar_one_or_none()
+        return self.get(function) if function else None
+
+    def invalidate(self, function_id: int):
+        """Drop every compiled revision of a function"""
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == function_id]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "compilations": self.compilations
+            }
+
+
+# Global registry instance
+function_registry = FunctionRegistry()
@@ -6,7 +6,6 @@ Part of Sub-Phase 5B: Advanced Monitoring (B016)
 """
 
 import os
-import gzip
 import structlog
 import logging
 from datetime import datetime, timedelta
@@ -16,6 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, desc
 
 from backend.models.monitoring import SystemLog, LogLevel, LogArchive
+from backend.services.compressed_storage import FrameWriter, frame_index_path
 
 
 class EnhancedLoggingService:
@@ -394,9 +394,10 @@ class EnhancedLoggingService:
         archive_name = f"logs_{before_date.strftime('%Y%m%d')}.jsonl.gz"
         archive_path = os.path.join(self.ARCHIVE_DIR, archive_name)
 
-        # Write logs to compressed file
+        # Write logs as seekable gzip frames: still one gzip stream for zcat,
+        # while open_stored() reads a range by decompressing only its frames
         import json
-        with gzip.open(archive_path, 'wt', encoding='utf-8') as f:
+        with FrameWriter(archive_path) as f:
             for log in logs_to_archive:
                 log_dict = {
                     "id": log.id,
@@ -413,7 +414,7 @@ class EnhancedLoggingService:
                     "exception_message": log.exception_message,
                     "extra_data": log.extra_data
                 }
-                f.write(json.dumps(log_dict) + '\n')
+                f.write((json.dumps(log_dict) + '\n').encode('utf-8'))
 
         # Get file size
         file_size = os.path.getsize(archive_path)
@@ -427,7 +428,7 @@ class EnhancedLoggingService:
             end_date=logs_to_archive[-1].timestamp,
             file_size_bytes=file_size,
             is_compressed=True,
-            compression_type="gzip",
+            compression_type="gzip-frames",
             storage_type="local",
             retention_days=self.ARCHIVE_RETENTION_DAYS,
             expires_at=datetime.utcnow() + timedelta(days=self.ARCHIVE_RETENTION_DAYS)
@@ -482,6 +483,8 @@ class EnhancedLoggingService:
             if os.path.exists(archive.archive_path):
                 try:
                     os.remove(archive.archive_path)
+                    if os.path.exists(frame_index_path(archive.archive_path)):
+                        os.remove(frame_index_path(archive.archive_path))
                     count += 1
                 except Exception as e:
                     print(f"Error deleting archive file {archive.archive_path}: {e}")
@@ -0,0 +1,332 @@
+"""
+Memory Budget Service
+Per-process memory broker for concurrent pipeline runs and their operators
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+import asyncio
+import logging
+import threading
+
+import psutil
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# cgroup v2 / v1 memory limit files
+CGROUP_V2_LIMIT = Path("/sys/fs/cgroup/memory.max")
+CGROUP_V1_LIMIT = Path("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+
+# cgroup v1 reports "unlimited" as a very large number
+CGROUP_UNLIMITED_THRESHOLD = 1 << 60
+
+# Pool usage above which the largest consumers are asked to spill
+DEFAULT_SPILL_THRESHOLD = 0.85
+
+# Default memory granted to a run at admission time
+DEFAULT_RUN_GRANT_BYTES = 64 * 1024 * 1024
+
+ADMISSION_POLL_INTERVAL_SECONDS = 0.05
+
+
+class MemoryBudgetExceededError(Exception):
+    """Raised when a run or operator cannot be given the memory it needs."""
+    pass
+
+
+def detect_memory_limit() -> int:
+    """
+    Detect the memory available to this process.
+    Uses the cgroup limit when running in a container, otherwise physical memory.
+    """
+    physical = psutil.virtual_memory().total
+
+    for path in (CGROUP_V2_LIMIT, CGROUP_V1_LIMIT):
+        try:
+            raw = path.read_text().strip()
+        except OSError:
+            continue
+        if raw == "max":
+            break
+        try:
+            limit = int(raw)
+        except ValueError:
+            continue
+        if 0 < limit < CGROUP_UNLIMITED_THRESHOLD:
+            return min(limit, physical)
+
+    return physical
+
+
+class MemoryReservation:
+    """Memory held by a single operator of a run"""
+
+    def __init__(
+        self,
+        broker: "MemoryBudgetService",
+        run_id: str,
+        operator_id: str,
+        spill_callback: Optional[Callable[[], Any]] = None
+    ):
+        self.broker = broker
+        self.run_id = run_id
+        self.operator_id = operator_id
+        self.spill_callback = spill_callback
+        self.reserved_bytes = 0
+        self.peak_bytes = 0
+        self.spill_requests = 0
+        self.spill_requested = False
+        self.released = False
+
+    def grow(self, nbytes: int) -> bool:
+        """
+        Ask for `nbytes` more memory.
+        Returns False when the pool cannot cover it; the operator must spill.
+        """
+        return self.broker.try_grow(self, nbytes)
+
+    def shrink(self, nbytes: int):
+        """Give back memory, e.g. after spilling to disk"""
+        self.broker.shrink(self, nbytes)
+
+    def release(self):
+        """Return all memory held by the operator"""
+        self.broker.release_reservation(self)
+
+    def __enter__(self) -> "MemoryReservation":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class MemoryBudgetService:
+    """
+    Memory broker shared by all runs in the process.
+
+    Each admitted run holds a grant. Operators reserve against their run,
+    and the run is charged max(grant, sum of operator reservations) against
+    the pool. When an operator cannot grow it is told to spill. Above the
+    spill threshold the largest consumers are also asked to spill.
+    """
+
+    def __init__(
+        self,
+        pool_bytes: Optional[int] = None,
+        pool_fraction: Optional[float] = None,
+        spill_threshold: float = DEFAULT_SPILL_THRESHOLD
+    ):
+        self._pool_bytes = pool_bytes
+        self.pool_fraction = pool_fraction
+        self.spill_threshold = spill_threshold
+        self._lock = threading.Lock()
+        self.runs: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def pool_bytes(self) -> int:
+        if self._pool_bytes is None:
+            if settings.PIPELINE_MEMORY_POOL_BYTES:
+                self._pool_bytes = settings.PIPELINE_MEMORY_POOL_BYTES
+            else:
+                fraction = self.pool_fraction or settings.PIPELINE_MEMORY_POOL_FRACTION
+                self._pool_bytes = int(detect_memory_limit() * fraction)
+            logger.info(f"Pipeline memory pool sized at {self._pool_bytes} bytes")
+        return self._pool_bytes
+
+    # ------------------------------------------------------------------
+    # Accounting helpers (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _run_reserved(run: Dict[str, Any]) -> int:
+        return sum(r.reserved_bytes for r in run["operators"].values())
+
+    def _run_charge(self, run: Dict[str, Any]) -> int:
+        return max(run["granted_bytes"], self._run_reserved(run))
+
+    def _used_bytes(self) -> int:
+        return sum(self._run_charge(run) for run in self.runs.values())
+
+    def _collect_spill_targets(self, exclude: Optional[MemoryReservation] = None) -> List[MemoryReservation]:
+        """Pick the largest reservations to free memory, largest first"""
+        candidates = [
+            r
+            for run in self.runs.values()
+            for r in run["operators"].values()
+            if r is not exclude and r.reserved_bytes > 0 and not r.spill_requested
+        ]
+        candidates.sort(key=lambda r: r.reserved_bytes, reverse=True)
+
+        overshoot = self._used_bytes() - int(self.pool_bytes * self.spill_threshold)
+        targets = []
+        for reservation in candidates:
+            if overshoot <= 0:
+                break
+            reservation.spill_requested = True
+            reservation.spill_requests += 1
+            targets.append(reservation)
+            overshoot -= reservation.reserved_bytes
+        return targets
+
+    @staticmethod
+    def _notify_spill(targets: List[MemoryReservation]):
+        for reservation in targets:
+            if reservation.spill_callback:
+                try:
+                    reservation.spill_callback()
+                except Exception as e:
+                    logger.error(
+                        f"Spill callback for {reservation.run_id}/{reservation.operator_id} failed: {e}"
+                    )
+
+    # ------------------------------------------------------------------
+    # Run admission
+    # ------------------------------------------------------------------
+
+    async def admit_run(
+        self,
+        run_id: str,
+        grant_bytes: int = DEFAULT_RUN_GRANT_BYTES,
+        timeout: float = 30.0
+    ):
+        """
+        Admit a run once `grant_bytes` is available in the pool.
+        Waits up to `timeout` seconds before raising MemoryBudgetExceededError.
+        """
+        if grant_bytes > self.pool_bytes:
+            raise MemoryBudgetExceededError(
+                f"Run {run_id} needs {grant_bytes} bytes but the pool is {self.pool_bytes} bytes"
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._lock:
+                if run_id in self.runs:
+                    return
+                if self._used_bytes() + grant_bytes <= self.pool_bytes:
+                    self.runs[run_id] = {"granted_bytes": grant_bytes, "operators": {}}
+                    return
+            if loop.time() >= deadline:
+                raise MemoryBudgetExceededError(
+                    f"Run {run_id} was not admitted: {grant_bytes} bytes not available within {timeout}s"
+                )
+            await asyncio.sleep(ADMISSION_POLL_INTERVAL_SECONDS)
+
+    def release_run(self, run_id: str):
+        """Release the run's grant and every operator reservation it still holds"""
+        with self._lock:
+            run = self.runs.pop(run_id, None)
+        if run:
+            for reservation in run["operators"].values():
+                reservation.released = True
+                reservation.reserved_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Operator reservations
+    # ------------------------------------------------------------------
+
+    def reserve(
+        self,
+        run_id: str,
+        operator_id: str,
+        nbytes: int = 0,
+        spill_callback: Optional[Callable[[], Any]] = None
+    ) -> MemoryReservation:
+        """
+        Register an operator of an admitted run and reserve its initial memory.
+        Raises MemoryBudgetExceededError if the initial reservation cannot be met.
+        """
+        with self._lock:
+            run = self.runs.get(run_id)
+            if run is None:
+                raise MemoryBudgetExceededError(f"Run {run_id} has not been admitted")
+            reservation = MemoryReservation(self, run_id, operator_id, spill_callback)
+            run["operators"][operator_id] = reservation
+
+        if nbytes and not self.try_grow(reservation, nbytes):
+            self.release_reservation(reservation)
+            raise MemoryBudgetExceededError(
+                f"Operator {operator_id} of run {run_id} could not reserve {nbytes} bytes"
+            )
+        return reservation
+
+    def try_grow(self, reservation: MemoryReservation, nbytes: int) -> bool:
+        """Grow a reservation; returns False (and flags a spill) if the pool is exhausted"""
+        targets: List[MemoryReservation] = []
+        with self._lock:
+            run = self.runs.get(reservation.run_id)
+            if run is None or reservation.released:
+                return False
+
+            current_charge = self._run_charge(run)
+            new_charge = max(run["granted_bytes"], self._run_reserved(run) + nbytes)
+            granted = self._used_bytes() - current_charge + new_charge <= self.pool_bytes
+
+            if granted:
+                reservation.reserved_bytes += nbytes
+                reservation.peak_bytes = max(reservation.peak_bytes, reservation.reserved_bytes)
+            else:
+                reservation.spill_requested = True
+                reservation.spill_requests += 1
+
+            if self._used_bytes() >= self.pool_bytes * self.spill_threshold or not granted:
+                targets = self._collect_spill_targets(exclude=reservation)
+
+        self._notify_spill(targets)
+        return granted
+
+    def shrink(self, reservation: MemoryReservation, nbytes: int):
+        with self._lock:
+            reservation.reserved_bytes = max(0, reservation.reserved_bytes - nbytes)
+            if self._used_bytes() < self.pool_bytes * self.spill_threshold:
+                reservation.spill_requested = False
+
+    def release_reservation(self, reservation: MemoryReservation):
+        with self._lock:
+            run = self.runs.get(reservation.run_id)
+            if run and run["operators"].get(reservation.operator_id) is reservation:
+                del run["operators"][reservation.operator_id]
+            reservation.reserved_bytes = 0
+            reservation.released = True
+
+    # ------------------------------------------------------------------
+    # Observability
+    # ------------------------------------------------------------------
+
+    def get_usage(self) -> Dict[str, Any]:
+        """Pool, per-run and per-operator memory usage"""
+        with self._lock:
+            used = self._used_bytes()
+            runs = {
+                run_id: {
+                    "granted_bytes": run["granted_bytes"],
+                    "reserved_bytes": self._run_reserved(run),
+                    "charged_bytes": self._run_charge(run),
+                    "operators": {
+                        operator_id: {
+                            "reserved_bytes": r.reserved_bytes,
+                            "peak_bytes": r.peak_bytes,
+                            "spill_requests": r.spill_requests,
+                            "spill_requested": r.spill_requested
+                        }
+                        for operator_id, r in run["operators"].items()
+                    }
+                }
+                for run_id, run in self.runs.items()
+            }
+
+        return {
+            "pool_bytes": self.pool_bytes,
+            "used_bytes": used,
+            "available_bytes": max(0, self.pool_bytes - used),
+            "utilization_percent": round(used / self.pool_bytes * 100, 2) if self.pool_bytes else 0,
+            "process_rss_bytes": psutil.Process().memory_info().rss,
+            "runs": runs
+        }
+
+
+# Global broker instance
+memory_budget_service = MemoryBudgetService()
@@ -0,0 +1,279 @@
+"""
+Node Output Cache
+Content-addressed on-disk cache of pipeline node outputs for incremental re-runs
+"""
+
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Config keys that identify the snapshot of source data a node reads
+WATERMARK_KEYS = ("watermark", "snapshot_id", "source_version", "file_hash")
+
+# Node data keys that only affect the canvas and never the output
+PRESENTATION_KEYS = {"label", "position", "style", "selected", "dragging"}
+
+META_FILE = "meta.json"
+
+# A columnar batch maps column name -> list of values
+ColumnarBatch = Dict[str, List[Any]]
+
+
+def records_to_columns(records: List[Dict[str, Any]]) -> ColumnarBatch:
+    """Convert a list of records into a columnar batch"""
+    columns: ColumnarBatch = {}
+    for index, record in enumerate(records):
+        for key in record:
+            if key not in columns:
+                columns[key] = [None] * index
+        for key, values in columns.items():
+            values.append(record.get(key))
+    return columns
+
+
+def columns_to_records(batch: ColumnarBatch) -> List[Dict[str, Any]]:
+    """Convert a columnar batch back into a list of records"""
+    if not batch:
+        return []
+    names = list(batch)
+    return [dict(zip(names, row)) for row in zip(*batch.values())]
+
+
+class NodeOutputCache:
+    """
+    Disk cache of node outputs keyed by a content fingerprint.
+
+    A node's fingerprint hashes its type and configuration, the fingerprints
+    of its upstream nodes and, for sources, a watermark or snapshot id. If
+    nothing upstream changed the fingerprint is the same and the stored
+    batches can be reused. Entries are evicted least-recently-used once the
+    total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else settings.temp_files_dir / "node_cache"
+        self.max_bytes = max_bytes if max_bytes is not None else settings.NODE_OUTPUT_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Fingerprinting
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def source_watermark(node: Any) -> Optional[str]:
+        """Return the watermark/snapshot a source node reads, if it declares one"""
+        config = dict(node.data.get("config") or {})
+        config.update(node.config or {})
+        for key in WATERMARK_KEYS:
+            if config.get(key) is not None:
+                return str(config[key])
+        return None
+
+    @staticmethod
+    def compute_fingerprint(
+        node: Any,
+        upstream_fingerprints: List[str],
+        source_watermark: Optional[str] = None,
+        revision: Optional[Any] = None
+    ) -> str:
+        """
+        Hash node configuration, upstream fingerprints and source watermark.
+        `revision` identifies what the config refers to (the version of a
+        transformation function or schema mapping), so editing it changes
+        the fingerprint even though the config does not.
+        """
+        data = {k: v for k, v in node.data.items() if k not in PRESENTATION_KEYS}
+        payload = {
+            "type": node.type.value if hasattr(node.type, "value") else node.type,
+            "config": node.config or {},
+            "data": data,
+            "upstream": sorted(upstream_fingerprints),
+            "watermark": source_watermark
+        }
+        if revision is not None:
+            payload["revision"] = revision
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _entry_dir(self, fingerprint: str) -> Path:
+        return self.cache_dir / fingerprint[:2] / fingerprint
+
+    def _load_index(self):
+        """Rebuild the LRU index from disk, oldest access first"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.cache_dir.exists():
+            return
+
+        found = []
+        for meta_path in self.cache_dir.glob(f"*/*/{META_FILE}"):
+            try:
+                meta = json.loads(meta_path.read_text())
+                found.append((meta.get("last_access", ""), meta_path.parent.name, meta.get("size_bytes", 0)))
+            except (OSError, ValueError):
+                shutil.rmtree(meta_path.parent, ignore_errors=True)
+
+        for _, fingerprint, size in sorted(found):
+            self._entries[fingerprint] = size
+
+    def contains(self, fingerprint: str) -> bool:
+        with self._lock:
+            self._load_index()
+            return fingerprint in self._entries
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached node output.
+        Returns {"batches": [...], "record_count": int, "metadata": {...}} or None.
+        """
+        with self._lock:
+            self._load_index()
+            if fingerprint not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+
+        entry_dir = self._entry_dir(fingerprint)
+        try:
+            meta = json.loads((entry_dir / META_FILE).read_text())
+            batches = []
+            for index in range(meta["batch_count"]):
+                with open(entry_dir / f"batch_{index:05d}.pkl", "rb") as f:
+                    batches.append(pickle.load(f))
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            logger.warning(f"Dropping unreadable node cache entry {fingerprint}: {e}")
+            self.invalidate(fingerprint)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        meta["last_access"] = datetime.now().isoformat()
+        self._write_meta(entry_dir, meta)
+        with self._lock:
+            self.hits += 1
+
+        return {
+            "batches": batches,
+            "record_count": meta["record_count"],
+            "metadata": meta.get("metadata", {})
+        }
+
+    def put(
+        self,
+        fingerprint: str,
+        batches: List[ColumnarBatch],
+        record_count: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Store a node's output batches; returns the bytes written"""
+        entry_dir = self._entry_dir(fingerprint)
+        staging_dir = entry_dir.with_name(f".{fingerprint}.{os.getpid()}.{threading.get_ident()}")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        staging_dir.mkdir(parents=True)
+
+        size = 0
+        try:
+            for index, batch in enumerate(batches):
+                batch_path = staging_dir / f"batch_{index:05d}.pkl"
+                with open(batch_path, "wb") as f:
+                    pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size += batch_path.stat().st_size
+
+            if record_count is None:
+                record_count = sum(len(next(iter(b.values()), [])) for b in batches)
+
+            meta = {
+                "fingerprint": fingerprint,
+                "batch_count": len(batches),
+                "record_count": record_count,
+                "size_bytes": size,
+                "created_at": datetime.now().isoformat(),
+                "last_access": datetime.now().isoformat(),
+                "metadata": metadata or {}
+            }
+            self._write_meta(staging_dir, meta)
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+        except OSError as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            logger.error(f"Failed to write node cache entry {fingerprint}: {e}")
+            return 0
+
+        with self._lock:
+            self._load_index()
+            self._entries[fingerprint] = size
+            self._entries.move_to_end(fingerprint)
+            evicted = self._evict_locked()
+
+        for old_fingerprint in evicted:
+            shutil.rmtree(self._entry_dir(old_fingerprint), ignore_errors=True)
+
+        return size
+
+    @staticmethod
+    def _write_meta(entry_dir: Path, meta: Dict[str, Any]):
+        tmp_path = entry_dir / f"{META_FILE}.tmp"
+        tmp_path.write_text(json.dumps(meta, default=str))
+        os.replace(tmp_path, entry_dir / META_FILE)
+
+    def _evict_locked(self) -> List[str]:
+        """Drop least-recently-used entries until under max_bytes (caller holds lock)"""
+        evicted = []
+        total = sum(self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            fingerprint, size = self._entries.popitem(last=False)
+            evicted.append(fingerprint)
+            total -= size
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} node cache entries")
+        return evicted
+
+    def invalidate(self, fingerprint: str):
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+        shutil.rmtree(self._entry_dir(fingerprint), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load_index()
+            total_requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": sum(self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total_requests * 100, 2) if total_requests else 0
+            }
+
+
+# Global cache instance
+node_output_cache = NodeOutputCache()
@@ -7,7 +7,17 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from enum import Enum
 import asyncio
+import json
 import logging
+import uuid
+
+from sqlalchemy import select
+
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.models.file_upload import FileStatus
+from backend.models.pipeline import Pipeline
+from backend.models.user import User
 
 from backend.schemas.pipeline_visual import (
     VisualPipelineDefinition,
@@ -15,24 +25,49 @@ from backend.schemas.pipeline_visual import (
     NodeType
 )
 from backend.services.realtime_pipeline_service import realtime_pipeline_service
+from backend.services.cancellation_service import (
+    CancellationToken,
+    PipelineCancelledError,
+    cancellation_service
+)
+from backend.services.memory_budget_service import MemoryReservation, memory_budget_service
+from backend.services.node_output_cache import node_output_cache
+from backend.services.function_registry import CompiledFunction, function_registry
+from backend.services.vectorized_builtins import concat_batches
+from backend.services.deduplication_service import DEFAULT_DEDUP_MEMORY_BYTES, deduplication_service
+from backend.services.sandbox_worker_pool import sandbox_worker_pool
+from backend.services.schema_mapping_compiler import CompiledSchemaMapping, schema_mapping_compiler
+from backend.services.column_profile_service import column_profile_service
+from backend.services.columnar_sidecar_service import UPLOAD_SOURCE_FORMATS, iter_upload_batches
+from backend.services.file_upload_service import file_upload_service
 
 logger = logging.getLogger(__name__)
 
+# Initial memory reservation per operator; blocking operators buffer their input
+DEFAULT_OPERATOR_MEMORY_BYTES = 8 * 1024 * 1024
+BLOCKING_OPERATOR_MEMORY_BYTES = 64 * 1024 * 1024
+BLOCKING_NODE_TYPES = {NodeType.AGGREGATE, NodeType.JOIN, NodeType.SORT}
+# Operators sized from their reservation grow it in steps no smaller than this
+RESERVATION_GROW_STEP_BYTES = 1024 * 1024
+
 
 class ExecutionStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
     ROLLED_BACK = "rolled_back"
 
 
 class PipelineExecutionState:
     """Tracks the state of pipeline execution"""
 
-    def __init__(self, pipeline_id: int, definition: VisualPipelineDefinition):
+    def __init__(self, pipeline_id: int, definition: VisualPipelineDefinition, user: Optional[User] = None):
         self.pipeline_id = pipeline_id
         self.definition = definition
+        # User the pipeline runs for; source nodes only read what they may access
+        self.user = user
         self.status = ExecutionStatus.PENDING
         self.steps: List[PipelineExecutionStep] = []
         self.current_step = 0
@@ -41,6 +76,21 @@ class PipelineExecutionState:
         self.total_records_processed = 0
         self.execution_log: List[Dict[str, Any]] = []
         self.rollback_data: Dict[str, Any] = {}
+        # Unique per execution: the key is also the run's memory budget id,
+        # which concurrent runs of the same pipeline must not share
+        self.cancellation_token = CancellationToken(f"visual:{pipeline_id}:{uuid.uuid4().hex}")
+        self.checkpoint: Dict[str, Any] = {}
+        # Columnar output batches per node, filled in by node implementations
+        self.node_outputs: Dict[str, List[Dict[str, List[Any]]]] = {}
+        self.node_fingerprints: Dict[str, Optional[str]] = {}
+        self.cached_nodes: List[str] = []
+        self.upstream: Dict[str, List[str]] = {}
+        # Operator metrics per node (e.g. deduplication memory and spill counts)
+        self.node_metrics: Dict[str, Dict[str, Any]] = {}
+        # memory_budget_service reservation of the node being executed
+        self.reservations: Dict[str, MemoryReservation] = {}
+        # Estimated output rows per node, from the sources' column profiles
+        self.cardinality_estimates: Dict[str, Dict[str, Any]] = {}
 
     def add_log(self, level: str, message: str, metadata: Optional[Dict] = None):
         """Add entry to execution log"""
@@ -63,20 +113,34 @@ class PipelineExecutionEngine:
         self,
         pipeline_id: int,
         definition: VisualPipelineDefinition,
-        dry_run: bool = False
+        dry_run: bool = False,
+        use_cache: bool = False,
+        user: Optional[User] = None
     ) -> PipelineExecutionState:
         """
         Execute a visual pipeline step by step
+
+        With `use_cache`, nodes whose configuration, upstream outputs and
+        source watermark are unchanged since a previous run are served from
+        the node output cache instead of being executed again. FILE_SOURCE
+        nodes only read uploads owned by `user`, unless `user` is an admin.
         """
         # Create execution state
-        state = PipelineExecutionState(pipeline_id, definition)
+        state = PipelineExecutionState(pipeline_id, definition, user)
         state.status = ExecutionStatus.RUNNING
         state.start_time = datetime.now()
 
+        token = state.cancellation_token
+
         if not dry_run:
             self.active_executions[pipeline_id] = state
+            cancellation_service.register_token(token)
 
         try:
+            if not dry_run:
+                # Wait for memory before starting so concurrent runs cannot exhaust the worker
+                await token.run(memory_budget_service.admit_run(token.key))
+
             # Broadcast pipeline started
             await realtime_pipeline_service.broadcast_pipeline_status(
                 pipeline_id=pipeline_id,
@@ -88,8 +152,21 @@ class PipelineExecutionEngine:
             execution_plan = self._build_execution_plan(definition)
             state.add_log("INFO", f"Execution plan built with {len(execution_plan)} steps")
 
+            upstream: Dict[str, List[str]] = {node.id: [] for node in definition.nodes}
+            for edge in definition.edges:
+                upstream.setdefault(edge.target, []).append(edge.source)
+            state.upstream = upstream
+
+            state.cardinality_estimates = await self._estimate_cardinalities(state, execution_plan)
+            if state.cardinality_estimates:
+                state.add_log("INFO", "Cardinality estimates from column profiles", {
+                    node_id: estimate["rows"] for node_id, estimate in state.cardinality_estimates.items()
+                })
+
             # Execute each step
             for step_number, node_id in enumerate(execution_plan, 1):
+                token.raise_if_cancelled()
+
                 node = next((n for n in definition.nodes if n.id == node_id), None)
 
                 if not node:
@@ -117,11 +194,32 @@ class PipelineExecutionEngine:
                     records_processed=state.total_records_processed
                 )
 
+                fingerprint = None
+                if use_cache:
+                    fingerprint = await self._node_fingerprint(state, node, upstream.get(node_id, []))
+                cached = await self._load_cached_output(fingerprint) if fingerprint else None
+
                 # Execute the step
-                if not dry_run:
-                    records_processed = await self._execute_node(state, node)
+                if cached is not None:
+                    state.node_outputs[node_id] = cached["batches"]
+                    state.cached_nodes.append(node_id)
+                    step.records_processed = cached["record_count"]
+                    if not dry_run:
+                        state.total_records_processed += step.records_processed
+                    state.add_log("INFO", f"Step {step_number} served from node output cache")
+                elif not dry_run:
+                    with memory_budget_service.reserve(
+                        token.key, node.id, self._initial_reservation_bytes(node)
+                    ) as reservation:
+                        state.reservations[node_id] = reservation
+                        records_processed = await token.run(self._execute_node(state, node))
                     step.records_processed = records_processed
+                    step.metrics = state.node_metrics.get(node_id, {})
+                    if node_id in state.cardinality_estimates:
+                        step.metrics = dict(step.metrics, estimated_rows=state.cardinality_estimates[node_id]["rows"])
                     state.total_records_processed += records_processed
+                    if fingerprint:
+                        await self._store_cached_output(state, node_id, fingerprint, records_processed)
                 else:
                     # Simulate execution in dry run
                     await asyncio.sleep(0.1)
@@ -136,6 +234,7 @@ class PipelineExecutionEngine:
                     f"Step {step_number} completed: {node.type}",
                     {"records_processed": step.records_processed}
                 )
+                self._update_checkpoint(state, node_id)
 
             # Mark pipeline as completed
             state.status = ExecutionStatus.COMPLETED
@@ -154,6 +253,25 @@ class PipelineExecutionEngine:
                 }
             )
 
+        except PipelineCancelledError as e:
+            state.status = ExecutionStatus.CANCELLED
+            state.end_time = datetime.now()
+            state.add_log("WARNING", f"Execution cancelled: {e}")
+
+            for step in state.steps:
+                if step.status == "running":
+                    step.status = "cancelled"
+                    step.end_time = datetime.now().isoformat()
+
+            if not dry_run:
+                await self._persist_checkpoint(state)
+
+            await realtime_pipeline_service.broadcast_pipeline_status(
+                pipeline_id=pipeline_id,
+                status="cancelled",
+                metadata={"checkpoint": state.checkpoint}
+            )
+
         except Exception as e:
             state.status = ExecutionStatus.FAILED
             state.end_time = datetime.now()
@@ -172,8 +290,15 @@ class PipelineExecutionEngine:
                 await self._rollback_execution(state)
 
         finally:
-            if not dry_run and pipeline_id in self.active_executions:
-                del self.active_executions[pipeline_id]
+            release_summary = await token.release_resources()
+            if release_summary["timed_out"] or release_summary["failed"]:
+                state.add_log("WARNING", "Some resources were not released cleanly", release_summary)
+
+            if not dry_run:
+                memory_budget_service.release_run(token.key)
+                cancellation_service.release(token.key, token)
+                if self.active_executions.get(pipeline_id) is state:
+                    del self.active_executions[pipeline_id]
 
         return state
 
@@ -211,6 +336,353 @@ class PipelineExecutionEngine:
 
         return execution_plan
 
+    async def _node_revision(self, node: Any) -> Optional[Any]:
+        """Version of the transformation function or schema mapping a node's config refers to"""
+        config = node.config or node.data.get("config") or {}
+        if config.get("function_id") is not None or config.get("function_name"):
+            return (await self._resolve_function(config)).version
+        if node.type == NodeType.MAP and config.get("schema_mapping_id") is not None:
+            return (await self._resolve_schema_mapping(config["schema_mapping_id"])).version
+        return None
+
+    async def _node_fingerprint(
+        self,
+        state: PipelineExecutionState,
+        node: Any,
+        upstream_ids: List[str]
+    ) -> Optional[str]:
+        """
+        Fingerprint a node for the output cache.
+        Returns None when the node is not cacheable: a source without a
+        watermark/snapshot, or any upstream node that is not cacheable.
+        Function and mapping nodes include the revision they resolve to,
+        so edits to the function or mapping miss the cache.
+        """
+        if upstream_ids:
+            upstream_fingerprints = [state.node_fingerprints.get(uid) for uid in upstream_ids]
+            if any(fp is None for fp in upstream_fingerprints):
+                fingerprint = None
+            else:
+                fingerprint = node_output_cache.compute_fingerprint(
+                    node, upstream_fingerprints, revision=await self._node_revision(node)
+                )
+        else:
+            watermark = node_output_cache.source_watermark(node)
+            fingerprint = (
+                node_output_cache.compute_fingerprint(node, [], watermark, await self._node_revision(node))
+                if watermark is not None else None
+            )
+
+        state.node_fingerprints[node.id] = fingerprint
+        return fingerprint
+
+    async def _load_cached_output(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, node_output_cache.get, fingerprint
+        )
+
+    async def _store_cached_output(
+        self,
+        state: PipelineExecutionState,
+        node_id: str,
+        fingerprint: str,
+        record_count: int
+    ):
+        batches = state.node_outputs.get(node_id, [])
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: node_output_cache.put(
+                fingerprint, batches, record_count, {"pipeline_id": state.pipeline_id, "node_id": node_id}
+            )
+        )
+
+    async def _estimate_cardinalities(
+        self,
+        state: PipelineExecutionState,
+        execution_plan: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Estimate rows per node from the latest profiles of the pipeline's
+        sources. Only profiles of sources the pipeline owner may read are used.
+        """
+        nodes = {node.id: node for node in state.definition.nodes}
+        sources = [source for source in map(column_profile_service.source_of, nodes.values()) if source]
+        if not sources:
+            return {}
+        try:
+            async with AsyncSessionLocal() as db:
+                owner_id = await db.scalar(select(Pipeline.owner_id).where(Pipeline.id == state.pipeline_id))
+                sources = await column_profile_service.readable_sources(db, sources, owner_id)
+                summaries = await column_profile_service.latest_summaries(db, sources)
+        except Exception as e:
+            logger.warning(f"Column profiles unavailable for cardinality estimates: {e}")
+            return {}
+        return column_profile_service.estimate_cardinalities(nodes, execution_plan, state.upstream, summaries)
+
+    @staticmethod
+    def _operator_memory_bytes(node: Any) -> int:
+        """Initial memory reservation for a node, overridable via its config"""
+        config = node.config or node.data.get("config") or {}
+        if config.get("memory_bytes"):
+            return int(config["memory_bytes"])
+        if node.type in BLOCKING_NODE_TYPES:
+            return BLOCKING_OPERATOR_MEMORY_BYTES
+        if node.type == NodeType.DEDUPLICATE:
+            return DEFAULT_DEDUP_MEMORY_BYTES
+        return DEFAULT_OPERATOR_MEMORY_BYTES
+
+    def _initial_reservation_bytes(self, node: Any) -> int:
+        """
+        Memory reserved before a node runs. DEDUPLICATE operators start small
+        and grow the reservation towards their budget (see _grow_reservation).
+        """
+        if node.type == NodeType.DEDUPLICATE:
+            return min(DEFAULT_OPERATOR_MEMORY_BYTES, self._operator_memory_bytes(node))
+        return self._operator_memory_bytes(node)
+
+    @staticmethod
+    def _grow_reservation(reservation: MemoryReservation, target_bytes: int) -> int:
+        """
+        Grow a reservation towards `target_bytes`, asking for less each time
+        the broker refuses. Returns the bytes the reservation ends up holding.
+        """
+        step = target_bytes - reservation.reserved_bytes
+        while step >= RESERVATION_GROW_STEP_BYTES and reservation.reserved_bytes < target_bytes:
+            if not reservation.grow(min(step, target_bytes - reservation.reserved_bytes)):
+                step //= 2
+        return reservation.reserved_bytes
+
+    def _update_checkpoint(self, state: PipelineExecutionState, node_id: str):
+        """Record progress after a completed step so a cancelled run can resume"""
+        completed = state.checkpoint.get("completed_node_ids", [])
+        state.checkpoint = {
+            "pipeline_id": state.pipeline_id,
+            "completed_node_ids": completed + [node_id],
+            "last_completed_step": state.current_step,
+            "records_processed": state.total_records_processed,
+            "updated_at": datetime.now().isoformat()
+        }
+
+    async def _persist_checkpoint(self, state: PipelineExecutionState):
+        """Write the latest checkpoint to the checkpoints directory"""
+        checkpoint_dir = settings.temp_files_dir / "checkpoints"
+        checkpoint_path = checkpoint_dir / f"pipeline_{state.pipeline_id}.json"
+        payload = dict(state.checkpoint, cancelled_reason=state.cancellation_token.reason)
+
+        def _write():
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            checkpoint_path.write_text(json.dumps(payload, default=str))
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _write)
+            state.add_log("INFO", "Checkpoint persisted", {"path": str(checkpoint_path)})
+        except OSError as e:
+            logger.error(f"Failed to persist checkpoint for pipeline {state.pipeline_id}: {e}")
+            state.add_log("ERROR", f"Failed to persist checkpoint: {str(e)}")
+
+    async def _resolve_function(self, config: Dict[str, Any]) -> CompiledFunction:
+        """Resolve a node's transformation function through the compiled registry"""
+        async with AsyncSessionLocal() as db:
+            compiled = await function_registry.resolve(
+                db,
+                function_id=config.get("function_id"),
+                name=config.get("function_name")
+            )
+        if compiled is None:
+            raise Exception(
+                f"Transformation function {config.get('function_id') or config.get('function_name')} not found"
+            )
+        return compiled
+
+    async def _resolve_schema_mapping(self, mapping_id: int) -> CompiledSchemaMapping:
+        """Resolve a node's schema mapping through the compiled mapping cache"""
+        async with AsyncSessionLocal() as db:
+            compiled = await schema_mapping_compiler.resolve(db, mapping_id)
+        if compiled is None:
+            raise Exception(f"Schema mapping {mapping_id} not found")
+        return compiled
+
+    async def _execute_mapping_node(
+        self,
+        state: PipelineExecutionState,
+        node: Any,
+        config: Dict[str, Any]
+    ) -> int:
+        """
+        Map every upstream output batch to a destination schema.
+        The schema mapping is compiled once per revision and applied
+        column-wise to each batch.
+        """
+        compiled = await self._resolve_schema_mapping(config["schema_mapping_id"])
+        token = state.cancellation_token
+
+        output_batches = []
+        records_out = 0
+        for upstream_id in state.upstream.get(node.id, []):
+            for batch in state.node_outputs.get(upstream_id, []):
+                token.raise_if_cancelled()
+                result = compiled.apply_batch(batch)
+                rows = len(next(iter(result.values()))) if result else 0
+                if rows:
+                    output_batches.append(result)
+                    records_out += rows
+                await asyncio.sleep(0)
+
+        state.node_outputs[node.id] = output_batches
+        return records_out
+
+    @staticmethod
+    def _can_read_upload(user: Optional[User], upload: Any) -> bool:
+        """Uploads are readable by their owner and by admins"""
+        return user is not None and (upload.user_id == user.id or user.can_admin)
+
+    async def _execute_file_source_node(
+        self,
+        state: PipelineExecutionState,
+        node: Any,
+        config: Dict[str, Any]
+    ) -> int:
+        """
+        Read an uploaded file as columnar batches. Uploads converted to a
+        columnar sidecar are read from it - only the configured `columns`,
+        with no text parsing - and others are parsed from CSV, JSON or Excel.
+        """
+        async with AsyncSessionLocal() as db:
+            upload = await file_upload_service.get_file_upload(db, int(config["file_id"]))
+        if (
+            upload is None
+            or upload.status in (FileStatus.UPLOADING, FileStatus.DELETED)
+            or not self._can_read_upload(state.user, upload)
+        ):
+            raise Exception(f"Uploaded file {config['file_id']} not found")
+        file_format = config.get("file_format") or UPLOAD_SOURCE_FORMATS.get(upload.file_type)
+        if file_format is None:
+            raise Exception(f"Uploaded file {config['file_id']} is not a CSV, JSON or Excel file")
+
+        batches = iter_upload_batches(
+            upload.file_path,
+            file_format,
+            file_hash=upload.file_hash,
+            columns=config.get("columns"),
+            delimiter=config.get("delimiter", ","),
+            has_header=config.get("has_header", True),
+            encoding=(upload.file_metadata or {}).get("encoding") or "utf-8"
+        )
+        token = state.cancellation_token
+        loop = asyncio.get_running_loop()
+
+        output_batches = []
+        records_out = 0
+        try:
+            while True:
+                token.raise_if_cancelled()
+                batch = await loop.run_in_executor(None, next, batches, None)
+                if batch is None:
+                    break
+                rows = len(next(iter(batch.values()))) if batch else 0
+                if rows:
+                    output_batches.append(batch)
+                    records_out += rows
+        finally:
+            batches.close()
+
+        state.node_outputs[node.id] = output_batches
+        return records_out
+
+    async def _execute_function_node(
+        self,
+        state: PipelineExecutionState,
+        node: Any,
+        config: Dict[str, Any]
+    ) -> int:
+        """
+        Apply a transformation function to every upstream output batch.
+        The function is resolved once per node run and the compiled callable
+        from the registry is invoked for each batch. Builtins run their
+        vectorized implementation on the columnar batch directly; user
+        functions run in the sandbox worker pool, one call per batch.
+        Blocking builtins (aggregate, sort, limit, deduplicate) are called
+        once on all upstream batches concatenated, so their result covers
+        every input row; that call runs in a worker thread to keep the
+        event loop responsive.
+        """
+        compiled = await self._resolve_function(config)
+        parameters = config.get("parameters") or {}
+        token = state.cancellation_token
+        loop = asyncio.get_running_loop()
+
+        batches = [
+            batch
+            for upstream_id in state.upstream.get(node.id, [])
+            for batch in state.node_outputs.get(upstream_id, [])
+        ]
+        if compiled.blocking and batches:
+            batches = [await loop.run_in_executor(None, concat_batches, batches)]
+
+        output_batches = []
+        records_out = 0
+        for batch in batches:
+            token.raise_if_cancelled()
+            if compiled.trusted and compiled.blocking:
+                result = await loop.run_in_executor(None, compiled.call_columnar, batch, parameters)
+            elif compiled.trusted:
+                result = compiled.call_columnar(batch, parameters)
+            else:
+                result = await sandbox_worker_pool.call_columnar(compiled, batch, parameters)
+            rows = len(next(iter(result.values()))) if result else 0
+            if rows:
+                output_batches.append(result)
+                records_out += rows
+            # Yield to the event loop between batches
+            await asyncio.sleep(0)
+
+        state.node_outputs[node.id] = output_batches
+        return records_out
+
+    async def _execute_deduplicate_node(
+        self,
+        state: PipelineExecutionState,
+        node: Any,
+        config: Dict[str, Any]
+    ) -> int:
+        """
+        Stream upstream batches through a deduplication operator whose
+        memory is capped at the node's reservation; exact mode spills keys
+        to disk beyond that. The reservation is grown towards the node's
+        budget first, so a busy pool gives the operator less memory rather
+        than overcommitting. Operator metrics are recorded on the step.
+        """
+        distinct_keys = state.cardinality_estimates.get(node.id, {}).get("distinct_keys")
+        if distinct_keys and "expected_items" not in config:
+            # Size the approximate filter from the profiled key cardinality
+            config = dict(config, expected_items=distinct_keys)
+        memory_bytes = self._operator_memory_bytes(node)
+        reservation = state.reservations.get(node.id)
+        if reservation is not None:
+            memory_bytes = self._grow_reservation(reservation, memory_bytes)
+        operator = deduplication_service.create_operator(config, memory_bytes)
+        token = state.cancellation_token
+        token.register_cleanup(operator.close, f"dedup:{node.id}")
+        loop = asyncio.get_running_loop()
+
+        output_batches = []
+        records_out = 0
+        try:
+            for upstream_id in state.upstream.get(node.id, []):
+                for batch in state.node_outputs.get(upstream_id, []):
+                    token.raise_if_cancelled()
+                    result = await loop.run_in_executor(None, operator.process, batch)
+                    rows = len(next(iter(result.values()))) if result else 0
+                    if rows:
+                        output_batches.append(result)
+                        records_out += rows
+            state.node_metrics[node.id] = operator.get_metrics()
+        finally:
+            operator.close()
+
+        state.node_outputs[node.id] = output_batches
+        return records_out
+
     async def _execute_node(
         self,
         state: PipelineExecutionState,
@@ -218,8 +690,24 @@ class PipelineExecutionEngine:
     ) -> int:
         """
         Execute a single pipeline node
-        In production, this would interface with actual data processing
+        In production, this would interface with actual data processing.
+        Node implementations receive `state.cancellation_token` and must
+        register connections, HTTP clients, worker processes and temp files
+        on it so they are released when the run is cancelled. Operators that
+        buffer data grow their memory_budget_service reservation and spill
+        to disk when a grow is refused. Output is written to
+        `state.node_outputs[node.id]` as columnar batches so it can be cached.
         """
+        config = node.config or node.data.get("config") or {}
+        if config.get("function_id") is not None or config.get("function_name"):
+            return await self._execute_function_node(state, node, config)
+        if node.type == NodeType.DEDUPLICATE:
+            return await self._execute_deduplicate_node(state, node, config)
+        if node.type == NodeType.MAP and config.get("schema_mapping_id") is not None:
+            return await self._execute_mapping_node(state, node, config)
+        if node.type == NodeType.FILE_SOURCE and config.get("file_id") is not None:
+            return await self._execute_file_source_node(state, node, config)
+
         # Simulate node execution
         await asyncio.sleep(0.2)
 
@@ -263,13 +751,19 @@ class PipelineExecutionEngine:
         """Get current execution state for a pipeline"""
         return self.active_executions.get(pipeline_id)
 
-    def cancel_execution(self, pipeline_id: int):
-        """Cancel an active pipeline execution"""
-        if pipeline_id in self.active_executions:
-            state = self.active_executions[pipeline_id]
-            state.status = ExecutionStatus.FAILED
-            state.add_log("WARNING", "Execution cancelled by user")
-            del self.active_executions[pipeline_id]
+    def cancel_execution(self, pipeline_id: int) -> bool:
+        """
+        Cancel an active pipeline execution.
+        Fires the run's cancellation token; the running coroutine stops at the
+        next await, releases its resources and persists a checkpoint.
+        """
+        state = self.active_executions.get(pipeline_id)
+        if not state:
+            return False
+
+        state.add_log("WARNING", "Execution cancelled by user")
+        state.cancellation_token.cancel("Execution cancelled by user")
+        return True
 
 
 # Global engine instance
@@ -9,6 +9,12 @@ from backend.models.pipeline_run import PipelineRun
 from backend.crud.pipeline_run import pipeline_run as crud_pipeline_run
 from backend.crud.pipeline import pipeline as crud_pipeline
 from backend.schemas.pipeline_run import PipelineRunCreate, PipelineRunUpdate
+from backend.services.cancellation_service import (
+    CancellationToken,
+    PipelineCancelledError,
+    cancellation_service
+)
+from backend.services.memory_budget_service import memory_budget_service
 
 logger = logging.getLogger(__name__)
 
@@ -63,9 +69,14 @@ class PipelineExecutor:
         run = await crud_pipeline_run.create(self.db, obj_in=run_create)
         await self.db.commit()
 
+        token = cancellation_service.create_token(self._token_key(run.id))
+
         try:
+            # Only start once the memory broker has room for another run
+            await token.run(memory_budget_service.admit_run(token.key))
+
             # Execute the pipeline (this is where the actual data processing would happen)
-            await self._execute_pipeline_logic(run, pipeline)
+            await self._execute_pipeline_logic(run, pipeline, token)
 
             # Update run as completed
             run_update = PipelineRunUpdate(
@@ -75,6 +86,19 @@ class PipelineExecutor:
             run = await crud_pipeline_run.update(self.db, db_obj=run, obj_in=run_update)
             await self.db.commit()
 
+        except PipelineCancelledError as e:
+            logger.info(f"Pipeline {pipeline_id} run {run.id} cancelled: {str(e)}")
+
+            # Persist the last checkpoint so the run can be resumed later
+            run_update = PipelineRunUpdate(
+                status="cancelled",
+                error_message=str(e),
+                checkpoint=run.checkpoint,
+                completed_at=run.completed_at or datetime.utcnow()
+            )
+            run = await crud_pipeline_run.update(self.db, db_obj=run, obj_in=run_update)
+            await self.db.commit()
+
         except Exception as e:
             logger.error(f"Pipeline {pipeline_id} execution failed: {str(e)}")
 
@@ -88,9 +112,23 @@ class PipelineExecutor:
             await self.db.commit()
             raise PipelineExecutionError(f"Pipeline execution failed: {str(e)}")
 
+        finally:
+            await token.release_resources()
+            memory_budget_service.release_run(token.key)
+            cancellation_service.release(token.key, token)
+
         return run
 
-    async def _execute_pipeline_logic(self, run: PipelineRun, pipeline: Pipeline):
+    @staticmethod
+    def _token_key(run_id: int) -> str:
+        return f"run:{run_id}"
+
+    async def _execute_pipeline_logic(
+        self,
+        run: PipelineRun,
+        pipeline: Pipeline,
+        token: CancellationToken
+    ):
         """
         Execute the actual pipeline logic.
 
@@ -99,6 +137,11 @@ class PipelineExecutor:
         2. Extract data according to source_config
         3. Apply transformations according to transformation_config
         4. Load data to destination according to destination_config
+
+        The cancellation token is checked between batches, and every batch
+        ends with a checkpoint. Source connections, HTTP clients, worker
+        processes and temp files are registered on the token so they are
+        released when the run stops.
         """
 
         # Simulate data processing
@@ -110,8 +153,10 @@ class PipelineExecutor:
 
         # Simulate batch processing
         for i in range(0, records_to_process, batch_size):
+            token.raise_if_cancelled()
+
             # Simulate processing time
-            await asyncio.sleep(0.1)  # 100ms per batch
+            await token.run(asyncio.sleep(0.1))  # 100ms per batch
 
             # Simulate some failures (10% failure rate)
             import random
@@ -128,11 +173,26 @@ class PipelineExecutor:
                 records_failed=total_failed,
                 logs=f"Processed batch {i//batch_size + 1}, "
                      f"total processed: {total_processed}, "
-                     f"total failed: {total_failed}"
+                     f"total failed: {total_failed}",
+                checkpoint={
+                    "next_offset": i + batch_size,
+                    "batches_completed": i // batch_size + 1,
+                    "records_processed": total_processed,
+                    "records_failed": total_failed,
+                    "updated_at": datetime.utcnow().isoformat()
+                }
             )
-            await crud_pipeline_run.update(self.db, db_obj=run, obj_in=run_update)
+            run = await crud_pipeline_run.update(self.db, db_obj=run, obj_in=run_update)
             await self.db.commit()
 
+            # A cancel issued from another process only flips the DB status;
+            # the refreshed row picks it up here and fires the local token.
+            # Raise now so a cancel seen on the last batch is not overwritten
+            # by the completed status.
+            if run.status == "cancelled":
+                token.cancel(run.error_message or "Cancelled by user")
+                token.raise_if_cancelled()
+
         logger.info(f"Pipeline {pipeline.id} completed: "
                    f"{total_processed} processed, {total_failed} failed")
 
@@ -154,6 +214,9 @@ class PipelineExecutor:
         run = await crud_pipeline_run.update(self.db, db_obj=run, obj_in=run_update)
         await self.db.commit()
 
+        # Stop in-flight work if the run is executing in this process
+        cancellation_service.cancel(self._token_key(run_id), "Cancelled by user")
+
         return run
 
     async def get_run_status(self, run_id: int) -> Optional[PipelineRun]:
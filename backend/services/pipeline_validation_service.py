@@ -9,6 +9,7 @@ from backend.schemas.pipeline_visual import (
     PipelineValidationResult,
     NodeType
 )
+from backend.services.deduplication_service import DeduplicationService
 
 
 class PipelineValidationService:
@@ -19,28 +20,28 @@ class PipelineValidationService:
         self.valid_connections = {
             NodeType.DATABASE_SOURCE: [
                 NodeType.FILTER, NodeType.MAP, NodeType.AGGREGATE,
-                NodeType.JOIN, NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.JOIN, NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION
             ],
             NodeType.API_SOURCE: [
                 NodeType.FILTER, NodeType.MAP, NodeType.AGGREGATE,
-                NodeType.JOIN, NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.JOIN, NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.API_DESTINATION
             ],
             NodeType.FILE_SOURCE: [
                 NodeType.FILTER, NodeType.MAP, NodeType.AGGREGATE,
-                NodeType.JOIN, NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.JOIN, NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION
             ],
             NodeType.FILTER: [
                 NodeType.MAP, NodeType.AGGREGATE, NodeType.JOIN,
-                NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION,
                 NodeType.API_DESTINATION
             ],
             NodeType.MAP: [
                 NodeType.FILTER, NodeType.AGGREGATE, NodeType.JOIN,
-                NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION,
                 NodeType.API_DESTINATION
             ],
@@ -51,13 +52,19 @@ class PipelineValidationService:
             ],
             NodeType.JOIN: [
                 NodeType.FILTER, NodeType.MAP, NodeType.AGGREGATE,
-                NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.SORT, NodeType.DEDUPLICATE, NodeType.DATABASE_DESTINATION,
                 NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION,
                 NodeType.API_DESTINATION
             ],
             NodeType.SORT: [
                 NodeType.DATABASE_DESTINATION, NodeType.FILE_DESTINATION,
                 NodeType.WAREHOUSE_DESTINATION, NodeType.API_DESTINATION
+            ],
+            NodeType.DEDUPLICATE: [
+                NodeType.FILTER, NodeType.MAP, NodeType.AGGREGATE,
+                NodeType.JOIN, NodeType.SORT, NodeType.DATABASE_DESTINATION,
+                NodeType.FILE_DESTINATION, NodeType.WAREHOUSE_DESTINATION,
+                NodeType.API_DESTINATION
             ]
         }
 
@@ -115,6 +122,14 @@ class PipelineValidationService:
         if not has_destination:
             errors.append("Pipeline must have at least one destination node")
 
+        # Validate operator configuration
+        for node in definition.nodes:
+            if node.type == NodeType.DEDUPLICATE:
+                config = node.config or node.data.get("config") or {}
+                errors.extend(
+                    f"Node '{node.id}': {error}" for error in DeduplicationService.validate_config(config)
+                )
+
         # Validate edges
         edge_validation = self._validate_edges(definition.edges, node_map)
         errors.extend(edge_validation["errors"])
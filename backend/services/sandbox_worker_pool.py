@@ -0,0 +1,523 @@
+"""
+Sandbox Worker Pool
+Pre-forked, resource-limited worker processes for user transformation functions
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+import asyncio
+import io
+import logging
+import multiprocessing
+import pickle
+import signal
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows has no rlimits
+    resource = None
+
+from backend.core.config import settings
+from backend.services.node_output_cache import columns_to_records, records_to_columns
+
+logger = logging.getLogger(__name__)
+
+# Builtins exposed to user transformation code
+SAFE_BUILTINS = {
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "list": list,
+    "dict": dict,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "sorted": sorted,
+    "enumerate": enumerate,
+    "zip": zip
+}
+
+# Compiled functions each worker keeps between calls
+WORKER_FUNCTION_CACHE_SIZE = 64
+
+WORKER_STOP_TIMEOUT_SECONDS = 2.0
+
+# Classes a worker's result may contain; anything else is refused when
+# unpickling in the API process, since the worker runs untrusted code
+SAFE_RESULT_CLASSES = {
+    ("builtins", "set"),
+    ("builtins", "frozenset"),
+    ("builtins", "bytearray"),
+    ("builtins", "complex"),
+    ("datetime", "datetime"),
+    ("datetime", "date"),
+    ("datetime", "time"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("decimal", "Decimal"),
+    ("uuid", "UUID"),
+}
+
+
+class SandboxError(Exception):
+    """Raised when a sandboxed call fails"""
+    pass
+
+
+class SandboxTimeoutError(SandboxError):
+    """Raised when a batch exceeds its wall-clock timeout"""
+    pass
+
+
+class SandboxResourceError(SandboxError):
+    """Raised when a worker exceeds its CPU or memory limit"""
+    pass
+
+
+class SandboxFunctionError(SandboxError):
+    """Raised when the user function itself raises"""
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class _CpuLimitExceeded(BaseException):
+    """Raised inside a worker by SIGXCPU; BaseException so user code rarely swallows it"""
+    pass
+
+
+class _RestrictedUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) in SAFE_RESULT_CLASSES:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Refusing to unpickle {module}.{name} from a sandbox worker")
+
+
+def _restricted_loads(data: bytes) -> Any:
+    return _RestrictedUnpickler(io.BytesIO(data)).load()
+
+
+# ----------------------------------------------------------------------
+# Payload transport: small payloads inline over the pipe, large ones
+# through a shared memory block the receiver unlinks after reading
+# ----------------------------------------------------------------------
+
+def _encode_payload(obj: Any, shm_threshold: int) -> Tuple[str, Any]:
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) < shm_threshold:
+        return ("inline", data)
+
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        block.buf[:len(data)] = data
+        # Ownership passes to the receiver, which unlinks the block
+        resource_tracker.unregister(block._name, "shared_memory")
+        return ("shm", (block.name, len(data)))
+    finally:
+        block.close()
+
+
+def _read_payload(payload: Tuple[str, Any]) -> bytes:
+    kind, value = payload
+    if kind == "inline":
+        return value
+
+    name, size = value
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(block.buf[:size])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _discard_payload(payload: Tuple[str, Any]):
+    """Free a shared memory payload that will never be read"""
+    if payload and payload[0] == "shm":
+        try:
+            _read_payload(payload)
+        except (FileNotFoundError, OSError):
+            pass
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+
+def _raise_cpu_limit(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _set_cpu_limit(cpu_seconds: Optional[int]):
+    """Move the soft CPU limit to `cpu_seconds` past the CPU time used so far"""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + int(cpu_seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _clear_cpu_limit():
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _apply_memory_limit(memory_bytes: Optional[int]):
+    if resource is None or not memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = memory_bytes if hard == resource.RLIM_INFINITY else min(memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _load_function(cache: "OrderedDict[Any, Any]", key: Any, name: str, source: str) -> Any:
+    func = cache.get(key)
+    if func is not None:
+        cache.move_to_end(key)
+        return func
+
+    namespace: Dict[str, Any] = {"__builtins__": dict(SAFE_BUILTINS)}
+    exec(compile(source, f"<transformation:{key[0] or name}>", "exec"), namespace)
+    func = namespace.get(name)
+    if not callable(func):
+        raise NameError(f"Function '{name}' not found in code")
+
+    cache[key] = func
+    while len(cache) > WORKER_FUNCTION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return func
+
+
+def _worker_main(conn, cpu_seconds: Optional[int], memory_bytes: Optional[int], shm_threshold: int):
+    """
+    Worker loop: receive a batch, run the function under the CPU limit and
+    send back the result. Exits after a CPU/memory violation so the pool
+    replaces it with a fresh process.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    _apply_memory_limit(memory_bytes)
+
+    functions: "OrderedDict[Any, Any]" = OrderedDict()
+
+    while True:
+        try:
+            message = pickle.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        fatal = False
+        try:
+            # Read the payload first so a shared memory block is always freed
+            data = pickle.loads(_read_payload(message["payload"]))
+            _set_cpu_limit(cpu_seconds)
+            func = _load_function(functions, message["key"], message["name"], message["source"])
+            if message["columnar"]:
+                data = columns_to_records(data)
+
+            result = func(data, **message["parameters"])
+
+            if message["columnar"]:
+                if isinstance(result, dict):
+                    result = [result]
+                result = records_to_columns(result or [])
+            _clear_cpu_limit()
+            response = {"ok": True, "payload": _encode_payload(result, shm_threshold)}
+        except _CpuLimitExceeded:
+            response = {"ok": False, "kind": "cpu", "error": f"CPU limit of {cpu_seconds}s exceeded"}
+            fatal = True
+        except MemoryError:
+            response = {"ok": False, "kind": "memory", "error": f"Memory limit of {memory_bytes} bytes exceeded"}
+            fatal = True
+        except BaseException as e:  # user code may raise anything
+            response = {"ok": False, "kind": "error", "error_type": type(e).__name__, "error": str(e)}
+        finally:
+            try:
+                _clear_cpu_limit()
+            except _CpuLimitExceeded:
+                fatal = True
+
+        try:
+            conn.send_bytes(pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL))
+        except (OSError, MemoryError, pickle.PicklingError, TypeError) as e:
+            try:
+                conn.send_bytes(pickle.dumps({"ok": False, "kind": "error", "error_type": type(e).__name__,
+                                              "error": f"Result could not be returned: {e}"}))
+            except OSError:
+                break
+        if fatal:
+            break
+
+    conn.close()
+
+
+# ----------------------------------------------------------------------
+# Pool
+# ----------------------------------------------------------------------
+
+class SandboxWorker:
+    """A single worker process and the parent end of its pipe"""
+
+    def __init__(self, context: Any, cpu_seconds: Optional[int], memory_bytes: Optional[int], shm_threshold: int):
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, cpu_seconds, memory_bytes, shm_threshold),
+            daemon=True,
+            name="sandbox-worker"
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.calls = 0
+        self.started_at = datetime.utcnow()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def roundtrip(self, message: bytes, timeout: float) -> bytes:
+        """Send one request and wait for its response (blocking)"""
+        self.conn.send_bytes(message)
+        if not self.conn.poll(timeout):
+            raise SandboxTimeoutError(f"Sandbox batch exceeded {timeout}s timeout")
+        try:
+            return self.conn.recv_bytes()
+        except EOFError:
+            raise SandboxResourceError(f"Sandbox worker {self.pid} exited (exit code {self.process.exitcode})")
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(WORKER_STOP_TIMEOUT_SECONDS)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send_bytes(pickle.dumps(None))
+        except OSError:
+            pass
+        self.process.join(WORKER_STOP_TIMEOUT_SECONDS)
+        self.kill()
+
+
+class SandboxWorkerPool:
+    """
+    Pool of warm worker processes that run user transformation functions.
+
+    Workers are started from a forkserver, so each is a cheap fork of a clean
+    interpreter. Each worker runs under an address-space limit and a
+    per-call CPU-time limit, and every batch has a wall-clock timeout after
+    which the worker is killed. Workers are recycled after
+    `max_calls_per_worker` calls or after any resource violation. Batches
+    cross the process boundary as one pickled payload (through shared
+    memory when large) rather than one call per record.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_calls_per_worker: Optional[int] = None,
+        cpu_seconds: Optional[int] = None,
+        memory_bytes: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        shm_threshold: Optional[int] = None
+    ):
+        self.size = size if size is not None else settings.SANDBOX_WORKERS
+        self.max_calls_per_worker = max_calls_per_worker or settings.SANDBOX_MAX_CALLS_PER_WORKER
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else settings.SANDBOX_CPU_SECONDS_PER_CALL
+        self.memory_bytes = memory_bytes if memory_bytes is not None else settings.SANDBOX_MEMORY_BYTES
+        self.timeout_seconds = timeout_seconds or settings.SANDBOX_BATCH_TIMEOUT_SECONDS
+        self.shm_threshold = shm_threshold if shm_threshold is not None else settings.SANDBOX_SHM_THRESHOLD_BYTES
+
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if self._context.get_start_method() == "forkserver":
+            self._context.set_forkserver_preload([__name__])
+
+        self._workers: List[SandboxWorker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.recycled = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    def _spawn(self) -> SandboxWorker:
+        return SandboxWorker(self._context, self.cpu_seconds, self.memory_bytes, self.shm_threshold)
+
+    async def start(self):
+        """Pre-fork the workers"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.started:
+                return
+            loop = asyncio.get_running_loop()
+            idle: asyncio.Queue = asyncio.Queue()
+            for _ in range(max(1, self.size)):
+                worker = await loop.run_in_executor(None, self._spawn)
+                self._workers.append(worker)
+                idle.put_nowait(worker)
+            self._idle = idle
+            logger.info(f"Sandbox worker pool started with {len(self._workers)} workers")
+
+    async def shutdown(self):
+        """Stop every worker"""
+        if not self.started:
+            return
+        loop = asyncio.get_running_loop()
+        workers, self._workers, self._idle = self._workers, [], None
+        for worker in workers:
+            await loop.run_in_executor(None, worker.stop)
+        logger.info("Sandbox worker pool stopped")
+
+    async def _replace(self, worker: SandboxWorker, kill: bool) -> SandboxWorker:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, worker.kill if kill else worker.stop)
+        replacement = await loop.run_in_executor(None, self._spawn)
+        if worker in self._workers:
+            self._workers[self._workers.index(worker)] = replacement
+        self.recycled += 1
+        return replacement
+
+    async def call(
+        self,
+        function: Any,
+        data: Any,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run `function(data, **parameters)` in a worker.
+        `function` is a compiled registry entry (function_id, version, name, source).
+        """
+        return await self._call(function, data, parameters, timeout, columnar=False)
+
+    async def call_columnar(
+        self,
+        function: Any,
+        batch: Dict[str, List[Any]],
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, List[Any]]:
+        """Run a record-based function on a columnar batch; rows are converted inside the worker"""
+        return await self._call(function, batch, parameters, timeout, columnar=True)
+
+    async def _call(
+        self,
+        function: Any,
+        data: Any,
+        parameters: Optional[Dict[str, Any]],
+        timeout: Optional[float],
+        columnar: bool
+    ) -> Any:
+        if not self.started:
+            await self.start()
+
+        timeout = timeout or self.timeout_seconds
+        payload = _encode_payload(data, self.shm_threshold)
+        message = pickle.dumps({
+            "key": (function.function_id, function.version),
+            "name": function.name,
+            "source": function.source,
+            "payload": payload,
+            "parameters": parameters or {},
+            "columnar": columnar
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        idle = self._idle
+        worker = await idle.get()
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        replace = kill = False
+        started = time.monotonic()
+
+        try:
+            raw = await loop.run_in_executor(None, worker.roundtrip, message, timeout)
+            response = _restricted_loads(raw)
+            worker.calls += 1
+
+            if response.get("ok"):
+                return _restricted_loads(_read_payload(response["payload"]))
+
+            self.failures += 1
+            if response.get("kind") in ("cpu", "memory"):
+                replace = True
+                raise SandboxResourceError(response.get("error"))
+            raise SandboxFunctionError(response.get("error"), response.get("error_type"))
+
+        except SandboxTimeoutError:
+            self.timeouts += 1
+            replace = kill = True
+            _discard_payload(payload)
+            logger.warning(f"Sandbox worker {worker.pid} timed out after {time.monotonic() - started:.1f}s; killing")
+            raise
+        except SandboxResourceError:
+            replace = True
+            kill = not worker.is_alive()
+            raise
+        except (pickle.UnpicklingError, EOFError, OSError) as e:
+            self.failures += 1
+            replace = kill = True
+            raise SandboxError(f"Invalid response from sandbox worker: {e}")
+        except asyncio.CancelledError:
+            # The worker's state is unknown once its caller goes away
+            replace = kill = True
+            _discard_payload(payload)
+            raise
+        finally:
+            if worker.calls >= self.max_calls_per_worker or not worker.is_alive():
+                replace = True
+            if replace and idle is self._idle:
+                worker = await asyncio.shield(self._replace(worker, kill=kill or not worker.is_alive()))
+            if idle is self._idle:
+                idle.put_nowait(worker)
+            else:
+                # Pool was shut down while this call was running
+                worker.kill()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "start_method": self._context.get_start_method(),
+            "size": len(self._workers),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "max_calls_per_worker": self.max_calls_per_worker,
+            "cpu_seconds_per_call": self.cpu_seconds,
+            "memory_bytes": self.memory_bytes,
+            "timeout_seconds": self.timeout_seconds,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "workers": [
+                {"pid": w.pid, "calls": w.calls, "alive": w.is_alive(), "started_at": w.started_at.isoformat()}
+                for w in self._workers
+            ]
+        }
+
+
+# Global sandbox worker pool instance
+sandbox_worker_pool = SandboxWorkerPool()
@@ -0,0 +1,411 @@
+"""
+Schema Inference Service
+Infers CSV and JSON file schemas in a single streaming pass, in a worker thread with progress reporting
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from itertools import chain, islice
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import random
+import threading
+import uuid
+
+from backend.services.compressed_storage import open_stored, stored_size
+from backend.services.node_output_cache import ColumnarBatch, records_to_columns
+from backend.services.schema_introspector import APISchemaIntrospector, FileSchemaIntrospector
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 1024 * 1024
+PROGRESS_EVERY_ROWS = 10000
+DEFAULT_MAX_JOBS = 200
+
+# progress(bytes_read, total_bytes, records)
+ProgressCallback = Callable[[int, int, int], None]
+
+
+class SchemaInferenceError(Exception):
+    """Raised when a file cannot be parsed for schema inference"""
+    pass
+
+
+def reservoir_sample(items: Iterator[Any], sample_size: int, seed: Optional[int] = None) -> List[Any]:
+    """
+    Uniform sample of `sample_size` items from a stream of unknown length
+    (Algorithm R), holding at most `sample_size` items in memory.
+    """
+    rng = random.Random(seed)
+    sample: List[Any] = []
+    for seen, item in enumerate(items):
+        if seen < sample_size:
+            sample.append(item)
+        else:
+            slot = rng.randint(0, seen)
+            if slot < sample_size:
+                sample[slot] = item
+    return sample
+
+
+class _ScanCounter:
+    """Counts records as they stream past and reports progress by bytes read"""
+
+    def __init__(self, raw: io.BufferedReader, total_bytes: int, progress: Optional[ProgressCallback]):
+        self.raw = raw
+        self.total_bytes = total_bytes
+        self.progress = progress
+        self.count = 0
+
+    def wrap(self, items: Iterator[Any]) -> Iterator[Any]:
+        for item in items:
+            self.count += 1
+            if self.progress is not None and self.count % PROGRESS_EVERY_ROWS == 0:
+                self.progress(self.raw.tell(), self.total_bytes, self.count)
+            yield item
+
+    def finish(self):
+        if self.progress is not None:
+            self.progress(self.total_bytes, self.total_bytes, self.count)
+
+
+def iter_json_records(stream: io.BufferedReader, encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Decode JSON values one at a time from a binary stream: the elements of
+    a top-level array, newline-delimited JSON, or concatenated values.
+    Only the value being decoded is buffered; a value longer than the
+    buffer doubles the next read instead of re-reading the file.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    buffer = ""
+    position = 0
+    read_size = READ_BLOCK_SIZE
+    eof = False
+    in_array = None
+
+    def skip(chars: str) -> int:
+        nonlocal position
+        while position < len(buffer) and buffer[position] in chars:
+            position += 1
+        return position
+
+    while True:
+        skip(" \t\r\n\ufeff" + ("," if in_array else ""))
+        if position == len(buffer) and not eof:
+            block = stream.read(read_size)
+            eof = not block
+            buffer = buffer[position:] + text_decoder.decode(block, final=eof)
+            position = 0
+            continue
+
+        if position == len(buffer):
+            if in_array:
+                raise SchemaInferenceError("Unterminated JSON array")
+            return
+
+        if in_array is None:
+            in_array = buffer[position] == "["
+            if in_array:
+                position += 1
+                continue
+
+        if in_array and buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise SchemaInferenceError(f"Invalid JSON at character {e.pos}: {e.msg}")
+            block = stream.read(read_size)
+            eof = not block
+            buffer = buffer[position:] + text_decoder.decode(block, final=eof)
+            position = 0
+            read_size *= 2
+            continue
+
+        # A number at the end of the buffer may continue in the next block
+        if end == len(buffer) and not eof and not isinstance(value, (dict, list, str)):
+            block = stream.read(read_size)
+            eof = not block
+            buffer = buffer[position:] + text_decoder.decode(block, final=eof)
+            position = 0
+            continue
+
+        position = end
+        read_size = READ_BLOCK_SIZE
+        yield value
+
+
+def infer_csv_file(
+    file_path: str,
+    delimiter: str = ",",
+    has_header: bool = True,
+    sample_size: Optional[int] = None,
+    encoding: str = "utf-8",
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Infer a CSV file's schema from every row, or from a uniform reservoir
+    sample of `sample_size` rows, in a single pass. Memory stays bounded by
+    one tracker per column, plus the sample when sampling.
+    """
+    total_bytes = stored_size(file_path)
+    with open_stored(file_path) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=""), delimiter=delimiter)
+        header = next(reader, None) if has_header else None
+        counter = _ScanCounter(raw, total_bytes, progress)
+
+        rows: Iterator[List[str]] = counter.wrap(reader)
+        if sample_size:
+            rows = iter(reservoir_sample(rows, sample_size))
+        if header is not None:
+            rows = chain([header], rows)
+
+        result = FileSchemaIntrospector.infer_csv_rows(rows, has_header)
+        counter.finish()
+
+    if result is None:
+        raise SchemaInferenceError("No data in CSV")
+
+    fields, inferred_rows = result
+    return {
+        "source_type": "csv",
+        "delimiter": delimiter,
+        "has_header": has_header,
+        "fields": [field.to_dict() for field in fields],
+        "field_count": len(fields),
+        "row_count": counter.count,
+        "sampled_row_count": inferred_rows if sample_size else None,
+        "file_size": total_bytes,
+        "introspected_at": datetime.now().isoformat()
+    }
+
+
+def infer_json_file(
+    file_path: str,
+    sample_size: Optional[int] = None,
+    encoding: str = "utf-8",
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Infer a JSON file's schema from every object, or from a reservoir
+    sample of `sample_size` objects. Accepts a top-level array, a single
+    object, or newline-delimited JSON.
+    """
+    total_bytes = stored_size(file_path)
+    with open_stored(file_path) as raw:
+        counter = _ScanCounter(raw, total_bytes, progress)
+        records = counter.wrap(_require_objects(iter_json_records(raw, encoding)))
+        if sample_size:
+            records = iter(reservoir_sample(records, sample_size))
+
+        fields = APISchemaIntrospector.infer_json_fields(records)
+        counter.finish()
+
+    if counter.count == 0:
+        raise SchemaInferenceError("No objects in JSON file")
+
+    return {
+        "source_type": "json",
+        "fields": [field.to_dict() for field in fields],
+        "field_count": len(fields),
+        "record_count": counter.count,
+        "sampled_record_count": min(counter.count, sample_size) if sample_size else None,
+        "file_size": total_bytes,
+        "introspected_at": datetime.now().isoformat()
+    }
+
+
+def _require_objects(values: Iterator[Any]) -> Iterator[Dict[str, Any]]:
+    for value in values:
+        if not isinstance(value, dict):
+            raise SchemaInferenceError("JSON records must be objects")
+        yield value
+
+
+def iter_file_batches(
+    file_path: str,
+    file_format: str,
+    delimiter: str = ",",
+    has_header: bool = True,
+    batch_size: int = 10000,
+    encoding: str = "utf-8",
+    progress: Optional[ProgressCallback] = None
+) -> Iterator[ColumnarBatch]:
+    """
+    Stream a CSV or JSON file as columnar batches of up to `batch_size`
+    records. CSV values stay strings; JSON objects missing a key get None.
+    """
+    if file_format not in ("csv", "json", "ndjson"):
+        raise SchemaInferenceError(f"Unsupported file format: {file_format}")
+
+    total_bytes = stored_size(file_path)
+    with open_stored(file_path) as raw:
+        counter = _ScanCounter(raw, total_bytes, progress)
+
+        if file_format == "csv":
+            reader = csv.reader(io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=""), delimiter=delimiter)
+            first = next(reader, None)
+            if first is None:
+                return
+            headers = first if has_header else [f"column_{i}" for i in range(len(first))]
+            rows = counter.wrap(reader if has_header else chain([first], reader))
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                width = len(headers)
+                chunk = [row[:width] + [None] * (width - len(row)) if len(row) != width else row for row in chunk]
+                yield {name: list(values) for name, values in zip(headers, zip(*chunk))}
+        else:
+            records = counter.wrap(_require_objects(iter_json_records(raw, encoding)))
+            while True:
+                chunk = list(islice(records, batch_size))
+                if not chunk:
+                    break
+                yield records_to_columns(chunk)
+
+        counter.finish()
+
+
+class SchemaInferenceService:
+    """
+    Runs file schema inference, and other scans over files and tables
+    (see `submit`), as background jobs in worker threads.
+
+    Jobs are kept in memory, most recent last, and the oldest finished jobs
+    are dropped beyond `max_jobs`. Each job records its progress as the
+    fraction of the file read so far.
+    """
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def infer_file(
+        file_path: str,
+        file_format: str,
+        delimiter: str = ",",
+        has_header: bool = True,
+        sample_size: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Infer a file's schema synchronously"""
+        if file_format == "csv":
+            return infer_csv_file(file_path, delimiter, has_header, sample_size, progress=progress)
+        if file_format in ("json", "ndjson"):
+            return infer_json_file(file_path, sample_size, progress=progress)
+        raise SchemaInferenceError(f"Unsupported file format: {file_format}")
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(changes)
+
+    def _report_progress(self, job_id: str, bytes_read: int, total_bytes: int, records: int):
+        self._update(
+            job_id,
+            progress=round(bytes_read / total_bytes, 4) if total_bytes else 1.0,
+            bytes_read=bytes_read,
+            records_scanned=records
+        )
+
+    def start_job(
+        self,
+        file_path: str,
+        file_format: str,
+        delimiter: str = ",",
+        has_header: bool = True,
+        sample_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Queue a schema inference job on the running event loop's executor"""
+        work = partial(self.infer_file, file_path, file_format, delimiter, has_header, sample_size)
+        return self.submit("schema_inference", work, file_format=file_format, sample_size=sample_size)
+
+    def submit(
+        self,
+        job_type: str,
+        work: Callable[[ProgressCallback], Any],
+        on_complete: Optional[Callable[[Any], Awaitable[Dict[str, Any]]]] = None,
+        **details: Any
+    ) -> Dict[str, Any]:
+        """
+        Queue a job that scans a source in a worker thread. `work` receives
+        the progress callback; `on_complete`, when given, runs on the event
+        loop with the result (e.g. to persist it) and returns the job result.
+        """
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": "running",
+            **details,
+            "progress": 0.0,
+            "bytes_read": 0,
+            "records_scanned": 0,
+            "result": None,
+            "error": None,
+            "started_at": datetime.now().isoformat(),
+            "completed_at": None
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._evict()
+
+        task = asyncio.get_running_loop().create_task(
+            self._run(job_id, partial(work, partial(self._report_progress, job_id)), on_complete)
+        )
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return dict(job)
+
+    async def _run(
+        self,
+        job_id: str,
+        work: Callable[[], Any],
+        on_complete: Optional[Callable[[Any], Awaitable[Dict[str, Any]]]]
+    ):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, work)
+            if on_complete is not None:
+                result = await on_complete(result)
+            self._update(job_id, status="completed", progress=1.0, result=result,
+                         completed_at=datetime.now().isoformat())
+        except Exception as e:
+            logger.warning(f"Background job {job_id} failed: {e}")
+            message = str(e) if isinstance(e, (SchemaInferenceError, OSError, UnicodeError, csv.Error)) \
+                else "Job failed"
+            self._update(job_id, status="failed", error=message, completed_at=datetime.now().isoformat())
+
+    def _evict(self):
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [j for j, job in self._jobs.items() if job["status"] != "running"][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Wait for a job started on this loop to finish"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await task
+        return self.get_job(job_id)
+
+
+# Global service instance
+schema_inference_service = SchemaInferenceService()
@@ -0,0 +1,279 @@
+"""
+Schema Introspection Cache
+Caches database introspection results and detects schema drift with cheap catalog fingerprints
+"""
+
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import partial
+import asyncio
+import hashlib
+import logging
+import threading
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Connection, make_url
+
+from backend.services.schema_introspector import DatabaseSchemaIntrospector, SchemaComparator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ENTRIES = 64
+DEFAULT_DRIFT_HISTORY = 200
+
+# One aggregate over the catalog, hashed server-side: columns with types,
+# nullability and defaults, constraints and index definitions
+POSTGRES_FINGERPRINT_QUERY = """
+SELECT md5(
+    coalesce((
+        SELECT string_agg(
+            c.relname || '.' || a.attname || ':' || format_type(a.atttypid, a.atttypmod)
+                || ':' || a.attnotnull::text || ':' || coalesce(pg_get_expr(d.adbin, d.adrelid), ''),
+            ',' ORDER BY c.relname, a.attnum
+        )
+        FROM pg_catalog.pg_attribute a
+        JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+        WHERE n.nspname = :schema AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped
+    ), '') || '|' ||
+    coalesce((
+        SELECT string_agg(c.relname || '.' || con.conname || ':' || pg_get_constraintdef(con.oid), ','
+                          ORDER BY c.relname, con.conname)
+        FROM pg_catalog.pg_constraint con
+        JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema
+    ), '') || '|' ||
+    coalesce((
+        SELECT string_agg(indexname || ':' || indexdef, ',' ORDER BY indexname)
+        FROM pg_catalog.pg_indexes
+        WHERE schemaname = :schema
+    ), '')
+) AS fingerprint
+"""
+
+# SQLite keeps the DDL of every object in sqlite_master
+SQLITE_FINGERPRINT_QUERY = "SELECT type, name, tbl_name, sql FROM sqlite_master ORDER BY type, name"
+
+INFORMATION_SCHEMA_FINGERPRINT_QUERY = """
+SELECT table_name, column_name, data_type, is_nullable, character_maximum_length, column_default
+FROM information_schema.columns
+WHERE table_schema = :schema
+ORDER BY table_name, ordinal_position
+"""
+
+DriftListener = Callable[[Dict[str, Any]], None]
+
+
+def connection_fingerprint(connection_string: str) -> str:
+    """
+    Identify a database by dialect, host, port, database and user.
+    The password is left out so credential rotation keeps the cache.
+    """
+    url = make_url(connection_string).render_as_string(hide_password=True)
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def catalog_fingerprint(connection: Connection, schema_name: str) -> Optional[str]:
+    """
+    Hash the parts of the catalog that introspection reports with a single
+    cheap query. Returns None when the dialect's catalog cannot be read,
+    in which case results are never served from cache.
+    """
+    dialect = connection.dialect.name
+    try:
+        if dialect == "postgresql":
+            return connection.execute(text(POSTGRES_FINGERPRINT_QUERY), {"schema": schema_name}).scalar()
+
+        if dialect == "sqlite":
+            rows = connection.execute(text(SQLITE_FINGERPRINT_QUERY)).all()
+        else:
+            rows = connection.execute(text(INFORMATION_SCHEMA_FINGERPRINT_QUERY), {"schema": schema_name}).all()
+
+        digest = hashlib.md5()
+        for row in rows:
+            digest.update(repr(tuple(row)).encode())
+        return digest.hexdigest()
+
+    except Exception as e:
+        logger.warning(f"Catalog fingerprint unavailable for {dialect}: {e}")
+        return None
+
+
+def _page(schema: Dict[str, Any], offset: int, limit: Optional[int]) -> Dict[str, Any]:
+    """Slice a full introspection result the way introspect_database pages"""
+    tables = schema["tables"]
+    page = tables[offset:offset + limit] if limit is not None else tables[offset:]
+    next_offset = offset + len(page)
+    return dict(
+        schema,
+        tables=page,
+        table_count=len(page),
+        offset=offset,
+        next_offset=next_offset if next_offset < len(tables) else None
+    )
+
+
+class SchemaIntrospectionCache:
+    """
+    LRU cache of full database introspection results keyed by
+    (connection fingerprint, schema name).
+
+    Each lookup opens one connection and runs a fingerprint query over the
+    catalog; the full bulk introspection only runs when the fingerprint
+    differs from the cached one. When a re-introspected schema differs from
+    the cached one, a drift event built by SchemaComparator is recorded,
+    tagged with the user whose introspection detected it, and passed to
+    registered listeners.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, drift_history: int = DEFAULT_DRIFT_HISTORY):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._listeners: List[DriftListener] = []
+        self.drift_events: Deque[Dict[str, Any]] = deque(maxlen=drift_history)
+        self.hits = 0
+        self.misses = 0
+
+    def add_drift_listener(self, listener: DriftListener):
+        """Register a callback invoked with each drift event"""
+        self._listeners.append(listener)
+
+    def remove_drift_listener(self, listener: DriftListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Tuple[str, str], entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _record_drift(self, event: Dict[str, Any]):
+        with self._lock:
+            self.drift_events.append(event)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Schema drift listener failed: {e}")
+
+    def introspect(
+        self,
+        connection_string: str,
+        schema_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        refresh: bool = False,
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the introspected schema, from cache when the catalog
+        fingerprint is unchanged. Blocks; async callers use introspect_async.
+
+        The result carries `cached`, `fingerprint` and, when this call
+        detected a change, the `drift` event, recorded under `user_id`.
+        """
+        try:
+            source_key = connection_fingerprint(connection_string)
+            source = make_url(connection_string).render_as_string(hide_password=True)
+
+            engine = create_engine(connection_string)
+            try:
+                with engine.connect() as connection:
+                    schema_name = DatabaseSchemaIntrospector.resolve_schema_name(inspect(connection), schema_name)
+                    fingerprint = catalog_fingerprint(connection, schema_name)
+                    key = (source_key, schema_name)
+                    entry = self._lookup(key)
+
+                    if (
+                        entry is not None and not refresh and fingerprint is not None
+                        and entry["fingerprint"] == fingerprint
+                    ):
+                        with self._lock:
+                            self.hits += 1
+                        return dict(_page(entry["schema"], offset, limit), cached=True, fingerprint=fingerprint)
+
+                    with self._lock:
+                        self.misses += 1
+                    schema = DatabaseSchemaIntrospector.introspect_connection(connection, schema_name)
+            finally:
+                engine.dispose()
+
+        except Exception as e:
+            return {
+                "error": str(e),
+                "source_type": "database",
+                "introspected_at": datetime.now().isoformat()
+            }
+
+        drift = None
+        if entry is not None:
+            event = SchemaComparator.build_drift_event(
+                source, schema_name, entry["schema"], schema, entry["fingerprint"], fingerprint
+            )
+            if event["added_tables"] or event["removed_tables"] or event["changed_tables"]:
+                event["user_id"] = user_id
+                drift = event
+                self._record_drift(event)
+
+        self._store(key, {"fingerprint": fingerprint, "schema": schema, "cached_at": datetime.now().isoformat()})
+        return dict(_page(schema, offset, limit), cached=False, fingerprint=fingerprint, drift=drift)
+
+    async def introspect_async(
+        self,
+        connection_string: str,
+        schema_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        refresh: bool = False,
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Run introspect in a worker thread, off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.introspect, connection_string, schema_name, offset, limit, refresh, user_id)
+        )
+
+    def get_drift_events(self, limit: int = 50, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent drift events, newest first; only those detected for `user_id` when given"""
+        with self._lock:
+            events = list(self.drift_events)[::-1]
+        if user_id is not None:
+            events = [event for event in events if event.get("user_id") == user_id]
+        return events[:limit]
+
+    def invalidate(self, connection_string: Optional[str] = None):
+        """Drop cached schemas for one database, or all of them"""
+        with self._lock:
+            if connection_string is None:
+                self._entries.clear()
+                return
+            source_key = connection_fingerprint(connection_string)
+            for key in [k for k in self._entries if k[0] == source_key]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "drift_events": len(self.drift_events)
+            }
+
+
+# Global cache instance
+schema_introspection_cache = SchemaIntrospectionCache()
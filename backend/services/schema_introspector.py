@@ -3,15 +3,23 @@ Schema Introspection Service
 Provides schema discovery for databases, APIs, and files
 """
 
-from typing import Dict, List, Any, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 from enum import Enum
+from functools import partial
+from io import StringIO
+from itertools import chain
+import asyncio
+import csv
 import json
 import re
-from datetime import datetime
-from sqlalchemy import create_engine, inspect, MetaData
-from sqlalchemy.engine import Engine
+from datetime import date, datetime
+from sqlalchemy import create_engine, inspect, text, MetaData
+from sqlalchemy.engine import Connection, Engine, Inspector
 import requests
 
+# Tables reflected per bulk catalog round trip when streaming
+DEFAULT_INTROSPECTION_PAGE_SIZE = 500
+
 
 class DataType(str, Enum):
     """Common data types across different sources"""
@@ -98,6 +106,210 @@ class SchemaTable:
         }
 
 
+BOOLEAN_LITERALS = frozenset({'true', 'false', 'yes', 'no', 't', 'f', '1', '0'})
+NON_NUMERIC_FLOATS = frozenset({'nan', '+nan', '-nan', 'inf', '+inf', '-inf', 'infinity', '+infinity', '-infinity'})
+
+
+def _iso_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _iso_datetime(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _strptime_validator(fmt: str) -> Callable[[str], bool]:
+    def validate(value: str) -> bool:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            return False
+    return validate
+
+
+# Compiled once: (pattern, format, validator). The cheap regex rejects most
+# values; the validator rejects impossible dates such as 2025-13-45.
+DATE_PATTERNS: List[Tuple[Pattern, str, Callable[[str], bool]]] = [
+    (re.compile(r'^\d{4}-\d{2}-\d{2}$'), '%Y-%m-%d', _iso_date),
+    (re.compile(r'^\d{4}/\d{2}/\d{2}$'), '%Y/%m/%d', _strptime_validator('%Y/%m/%d')),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), '%m/%d/%Y', _strptime_validator('%m/%d/%Y')),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), '%d/%m/%Y', _strptime_validator('%d/%m/%Y')),
+    (re.compile(r'^\d{1,2}-\d{1,2}-\d{4}$'), '%d-%m-%Y', _strptime_validator('%d-%m-%Y')),
+    (re.compile(r'^\d{1,2}\.\d{1,2}\.\d{4}$'), '%d.%m.%Y', _strptime_validator('%d.%m.%Y')),
+]
+DATETIME_PATTERNS: List[Tuple[Pattern, str, Callable[[str], bool]]] = [
+    (re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$'), 'iso8601', _iso_datetime),
+    (re.compile(r'^\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}$'), '%Y/%m/%d %H:%M:%S', _strptime_validator('%Y/%m/%d %H:%M:%S')),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}(:\d{2})?$'), '%m/%d/%Y %H:%M', _strptime_validator('%m/%d/%Y %H:%M')),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}$'), '%m/%d/%Y %H:%M:%S', _strptime_validator('%m/%d/%Y %H:%M:%S')),
+]
+
+# Resolution order for text columns; a column keeps every type all its values parse as
+TEXT_TYPE_PRIORITY = (DataType.INTEGER, DataType.FLOAT, DataType.BOOLEAN, DataType.DATE, DataType.DATETIME)
+
+
+def widen_data_type(first: DataType, second: DataType) -> DataType:
+    """
+    The narrowest type holding values of both types: integer widens to
+    float, date to datetime, and any other mix to string.
+    """
+    if first == second or second == DataType.UNKNOWN:
+        return first
+    if first == DataType.UNKNOWN:
+        return second
+    pair = {first, second}
+    if pair == {DataType.INTEGER, DataType.FLOAT}:
+        return DataType.FLOAT
+    if pair == {DataType.DATE, DataType.DATETIME}:
+        return DataType.DATETIME
+    return DataType.STRING
+
+
+class ColumnTypeTracker:
+    """
+    Infers a column's type from a stream of values in constant memory.
+
+    Text values start with every parseable type as a candidate and each
+    value removes the candidates it does not parse as, so the inferred type
+    only ever widens: integer -> float -> string, date -> datetime -> string.
+    Date values narrow the list of matching DATE_PATTERNS, which settles
+    ambiguous formats such as %m/%d/%Y vs %d/%m/%Y. Native values (from JSON)
+    are tracked by kind; integers and floats widen to float, any other mix
+    to string. Set `parse_text` to False to keep strings as strings apart
+    from date detection, as JSON does.
+    """
+
+    __slots__ = ('parse_text', 'count', 'null_count', 'max_length', 'candidates',
+                 'date_formats', 'datetime_formats', 'kinds')
+
+    def __init__(self, parse_text: bool = True):
+        self.parse_text = parse_text
+        self.count = 0
+        self.null_count = 0
+        self.max_length = 0
+        self.candidates = set(TEXT_TYPE_PRIORITY) if parse_text else {DataType.DATE, DataType.DATETIME}
+        self.date_formats = DATE_PATTERNS
+        self.datetime_formats = DATETIME_PATTERNS
+        self.kinds: set = set()
+
+    def observe(self, value: Any):
+        """Account for one value; None and empty strings count as nulls"""
+        if value is None or value == '':
+            self.null_count += 1
+            return
+        self.count += 1
+        self.kinds.add(type(value))
+        if type(value) is str:
+            if len(value) > self.max_length:
+                self.max_length = len(value)
+            if self.candidates:
+                self._observe_text(value.strip())
+
+    def _observe_text(self, value: str):
+        candidates = self.candidates
+        if DataType.INTEGER in candidates:
+            try:
+                int(value)
+                if value not in ('0', '1'):
+                    candidates.discard(DataType.BOOLEAN)
+                candidates.discard(DataType.DATE)
+                candidates.discard(DataType.DATETIME)
+                return
+            except ValueError:
+                candidates.discard(DataType.INTEGER)
+
+        if DataType.FLOAT in candidates:
+            try:
+                float(value)
+                if value.lower() not in NON_NUMERIC_FLOATS:
+                    candidates.discard(DataType.BOOLEAN)
+                    candidates.discard(DataType.DATE)
+                    candidates.discard(DataType.DATETIME)
+                    return
+            except ValueError:
+                pass
+            candidates.discard(DataType.FLOAT)
+
+        if DataType.BOOLEAN in candidates:
+            if value.lower() in BOOLEAN_LITERALS:
+                candidates.discard(DataType.DATE)
+                candidates.discard(DataType.DATETIME)
+                return
+            candidates.discard(DataType.BOOLEAN)
+
+        if DataType.DATE in candidates or DataType.DATETIME in candidates:
+            matched = [p for p in self.date_formats if p[0].match(value) and p[2](value)]
+            if matched:
+                self.date_formats = matched
+                return
+            candidates.discard(DataType.DATE)
+            matched = [p for p in self.datetime_formats if p[0].match(value) and p[2](value)]
+            if matched:
+                self.datetime_formats = matched
+                return
+            candidates.discard(DataType.DATETIME)
+
+    def resolve(self) -> DataType:
+        """The narrowest type that every observed value fits"""
+        if self.count == 0:
+            return DataType.STRING if self.parse_text else DataType.UNKNOWN
+
+        kinds = self.kinds
+        if kinds == {str}:
+            for data_type in TEXT_TYPE_PRIORITY:
+                if data_type in self.candidates:
+                    return data_type
+            return DataType.STRING
+        if kinds <= {int}:
+            return DataType.INTEGER
+        if kinds <= {int, float}:
+            return DataType.FLOAT
+        if kinds == {bool}:
+            return DataType.BOOLEAN
+        if kinds == {list}:
+            return DataType.ARRAY
+        if kinds == {dict}:
+            return DataType.OBJECT
+        return DataType.STRING
+
+    @property
+    def date_format(self) -> Optional[str]:
+        data_type = self.resolve()
+        if data_type == DataType.DATE:
+            return self.date_formats[0][1]
+        if data_type == DataType.DATETIME and self.datetime_formats is not DATETIME_PATTERNS:
+            return self.datetime_formats[0][1]
+        return None
+
+    def to_schema_field(self, name: str, total: Optional[int] = None) -> SchemaField:
+        """
+        Build the field. `total` is the number of records seen; values
+        missing from some records also make the field nullable.
+        """
+        data_type = self.resolve()
+        seen = self.count + self.null_count
+        constraints: Dict[str, Any] = {"null_count": self.null_count + max((total or seen) - seen, 0)}
+        if self.date_format:
+            constraints["date_format"] = self.date_format
+
+        return SchemaField(
+            name=name,
+            data_type=data_type,
+            nullable=constraints["null_count"] > 0,
+            max_length=self.max_length if data_type == DataType.STRING and self.max_length else None,
+            constraints=constraints
+        )
+
+
 class DatabaseSchemaIntrospector:
     """Introspect database schemas"""
 
@@ -127,85 +339,163 @@ class DatabaseSchemaIntrospector:
         else:
             return DataType.UNKNOWN
 
+    @staticmethod
+    def _build_table(
+        table_name: str,
+        columns: List[Dict[str, Any]],
+        pk_constraint: Optional[Dict[str, Any]],
+        fk_constraints: List[Dict[str, Any]],
+        indexes: List[Dict[str, Any]],
+        row_count: Optional[int] = None
+    ) -> SchemaTable:
+        """Build a SchemaTable from reflected catalog entries"""
+        primary_keys = (pk_constraint or {}).get('constrained_columns') or []
+        foreign_keys = {
+            fk['constrained_columns'][0]: f"{fk['referred_table']}.{fk['referred_columns'][0]}"
+            for fk in fk_constraints
+            if fk['constrained_columns'] and fk['referred_columns']
+        }
+
+        fields = []
+        for column in columns:
+            fields.append(SchemaField(
+                name=column['name'],
+                data_type=DatabaseSchemaIntrospector._map_sql_type_to_data_type(column['type']),
+                nullable=column.get('nullable', True),
+                primary_key=column['name'] in primary_keys,
+                foreign_key=foreign_keys.get(column['name']),
+                default_value=column.get('default'),
+                max_length=getattr(column['type'], 'length', None)
+            ))
+
+        return SchemaTable(name=table_name, fields=fields, row_count=row_count, indexes=indexes)
+
+    @staticmethod
+    def _estimated_row_counts(
+        connection: Connection,
+        schema_name: str,
+        table_names: List[str]
+    ) -> Dict[str, int]:
+        """Planner row estimates from pg_class; other dialects report none"""
+        if connection.dialect.name != 'postgresql' or not table_names:
+            return {}
+
+        rows = connection.execute(
+            text(
+                "SELECT c.relname, c.reltuples::bigint AS estimate "
+                "FROM pg_catalog.pg_class c "
+                "JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = :schema AND c.relkind IN ('r', 'p') AND c.relname = ANY(:names)"
+            ),
+            {"schema": schema_name, "names": list(table_names)}
+        )
+        # reltuples is -1 for tables that have never been analyzed
+        return {row.relname: row.estimate for row in rows if row.estimate >= 0}
+
+    @staticmethod
+    def _introspect_tables(
+        connection: Connection,
+        inspector: Inspector,
+        schema_name: str,
+        table_names: List[str]
+    ) -> List[SchemaTable]:
+        """
+        Reflect a page of tables with one bulk catalog query per kind of
+        object (columns, primary keys, foreign keys, indexes) rather than
+        one query per table
+        """
+        if not table_names:
+            return []
+
+        def by_table(reflected: Dict[Any, Any]) -> Dict[str, Any]:
+            return {key[1]: value for key, value in reflected.items()}
+
+        columns = by_table(inspector.get_multi_columns(schema=schema_name, filter_names=table_names))
+        pk_constraints = by_table(inspector.get_multi_pk_constraint(schema=schema_name, filter_names=table_names))
+        fk_constraints = by_table(inspector.get_multi_foreign_keys(schema=schema_name, filter_names=table_names))
+        indexes = by_table(inspector.get_multi_indexes(schema=schema_name, filter_names=table_names))
+        row_counts = DatabaseSchemaIntrospector._estimated_row_counts(connection, schema_name, table_names)
+
+        return [
+            DatabaseSchemaIntrospector._build_table(
+                table_name,
+                columns.get(table_name, []),
+                pk_constraints.get(table_name),
+                fk_constraints.get(table_name, []),
+                indexes.get(table_name, []),
+                row_counts.get(table_name)
+            )
+            for table_name in table_names
+        ]
+
+    @staticmethod
+    def resolve_schema_name(inspector: Inspector, schema_name: Optional[str]) -> str:
+        if schema_name is not None:
+            return schema_name
+        if inspector.default_schema_name:
+            return inspector.default_schema_name
+        schemas = inspector.get_schema_names()
+        return schemas[0] if schemas else 'public'
+
+    @staticmethod
+    def introspect_connection(
+        connection: Connection,
+        schema_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Introspect a page of tables, in name order, over an open connection"""
+        inspector = inspect(connection)
+        schema_name = DatabaseSchemaIntrospector.resolve_schema_name(inspector, schema_name)
+
+        all_tables = sorted(inspector.get_table_names(schema=schema_name))
+        page = all_tables[offset:offset + limit] if limit is not None else all_tables[offset:]
+        tables = DatabaseSchemaIntrospector._introspect_tables(connection, inspector, schema_name, page)
+
+        next_offset = offset + len(page)
+        return {
+            "source_type": "database",
+            "schema_name": schema_name,
+            "connection_type": connection.dialect.name,
+            "tables": [table.to_dict() for table in tables],
+            "table_count": len(tables),
+            "total_tables": len(all_tables),
+            "offset": offset,
+            "next_offset": next_offset if next_offset < len(all_tables) else None,
+            "introspected_at": datetime.now().isoformat()
+        }
+
     @staticmethod
     def introspect_database(
         connection_string: str,
-        schema_name: Optional[str] = None
+        schema_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Introspect a database schema
 
+        The catalog is read in bulk over a single connection. This call
+        blocks; async callers should use introspect_database_async.
+
         Args:
             connection_string: Database connection string
             schema_name: Optional schema name (for databases that support schemas)
+            offset: Index of the first table to return, in name order
+            limit: Maximum number of tables to return (all when None)
 
         Returns:
             Dictionary containing schema information
         """
         try:
             engine = create_engine(connection_string)
-            inspector = inspect(engine)
-
-            # Get schema name
-            schemas = inspector.get_schema_names()
-            if schema_name is None:
-                schema_name = schemas[0] if schemas else 'public'
-
-            # Get all table names
-            table_names = inspector.get_table_names(schema=schema_name)
-
-            tables = []
-            for table_name in table_names:
-                # Get columns
-                columns = inspector.get_columns(table_name, schema=schema_name)
-
-                # Get primary keys
-                pk_constraint = inspector.get_pk_constraint(table_name, schema=schema_name)
-                primary_keys = pk_constraint.get('constrained_columns', [])
-
-                # Get foreign keys
-                fk_constraints = inspector.get_foreign_keys(table_name, schema=schema_name)
-                foreign_keys = {
-                    fk['constrained_columns'][0]: f"{fk['referred_table']}.{fk['referred_columns'][0]}"
-                    for fk in fk_constraints
-                    if fk['constrained_columns'] and fk['referred_columns']
-                }
-
-                # Get indexes
-                indexes = inspector.get_indexes(table_name, schema=schema_name)
-
-                # Build fields
-                fields = []
-                for column in columns:
-                    field = SchemaField(
-                        name=column['name'],
-                        data_type=DatabaseSchemaIntrospector._map_sql_type_to_data_type(column['type']),
-                        nullable=column.get('nullable', True),
-                        primary_key=column['name'] in primary_keys,
-                        foreign_key=foreign_keys.get(column['name']),
-                        default_value=column.get('default'),
-                        max_length=getattr(column['type'], 'length', None)
+            try:
+                with engine.connect() as connection:
+                    return DatabaseSchemaIntrospector.introspect_connection(
+                        connection, schema_name, offset, limit
                     )
-                    fields.append(field)
-
-                # Create table
-                table = SchemaTable(
-                    name=table_name,
-                    fields=fields,
-                    indexes=indexes
-                )
-                tables.append(table)
-
-            engine.dispose()
-
-            return {
-                "source_type": "database",
-                "schema_name": schema_name,
-                "connection_type": engine.dialect.name,
-                "tables": [table.to_dict() for table in tables],
-                "table_count": len(tables),
-                "introspected_at": datetime.now().isoformat()
-            }
+            finally:
+                engine.dispose()
 
         except Exception as e:
             return {
@@ -214,6 +504,51 @@ class DatabaseSchemaIntrospector:
                 "introspected_at": datetime.now().isoformat()
             }
 
+    @staticmethod
+    async def introspect_database_async(
+        connection_string: str,
+        schema_name: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Run introspect_database in a worker thread, off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(DatabaseSchemaIntrospector.introspect_database, connection_string, schema_name, offset, limit)
+        )
+
+    @staticmethod
+    def iter_tables(
+        connection_string: str,
+        schema_name: Optional[str] = None,
+        page_size: int = DEFAULT_INTROSPECTION_PAGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a header, then each table, reflected page by page over one
+        connection so large schemas can be streamed as they are read.
+        The header carries the schema name, dialect and total table count.
+        """
+        engine = create_engine(connection_string)
+        try:
+            with engine.connect() as connection:
+                inspector = inspect(connection)
+                schema_name = DatabaseSchemaIntrospector.resolve_schema_name(inspector, schema_name)
+                all_tables = sorted(inspector.get_table_names(schema=schema_name))
+
+                yield {
+                    "source_type": "database",
+                    "schema_name": schema_name,
+                    "connection_type": connection.dialect.name,
+                    "total_tables": len(all_tables)
+                }
+                for start in range(0, len(all_tables), page_size):
+                    for table in DatabaseSchemaIntrospector._introspect_tables(
+                        connection, inspector, schema_name, all_tables[start:start + page_size]
+                    ):
+                        yield table.to_dict()
+        finally:
+            engine.dispose()
+
 
 class APISchemaIntrospector:
     """Introspect API schemas (REST, GraphQL)"""
@@ -334,32 +669,22 @@ class APISchemaIntrospector:
             schema_name: Name for the schema
         """
         try:
-            # Handle array of objects
-            if isinstance(json_data, list):
-                if json_data and isinstance(json_data[0], dict):
-                    json_data = json_data[0]
-                else:
-                    return {
-                        "error": "Array must contain objects",
-                        "source_type": "json_sample"
-                    }
-
-            fields = []
-            for field_name, field_value in json_data.items():
-                data_type = APISchemaIntrospector._infer_type_from_value(field_value)
-
-                field = SchemaField(
-                    name=field_name,
-                    data_type=data_type,
-                    nullable=field_value is None
-                )
-                fields.append(field)
+            if isinstance(json_data, dict):
+                json_data = [json_data]
+            elif not json_data or not all(isinstance(item, dict) for item in json_data):
+                return {
+                    "error": "Array must contain objects",
+                    "source_type": "json_sample"
+                }
+
+            fields = APISchemaIntrospector.infer_json_fields(json_data)
 
             return {
                 "source_type": "json_sample",
                 "schema_name": schema_name,
                 "fields": [field.to_dict() for field in fields],
                 "field_count": len(fields),
+                "sample_record_count": len(json_data),
                 "introspected_at": datetime.now().isoformat()
             }
 
@@ -370,6 +695,24 @@ class APISchemaIntrospector:
                 "introspected_at": datetime.now().isoformat()
             }
 
+    @staticmethod
+    def infer_json_fields(records: Iterable[Dict[str, Any]]) -> List[SchemaField]:
+        """
+        Infer fields over every record in one pass. Fields are listed in
+        first-seen order; a field missing from some records is nullable.
+        """
+        trackers: Dict[str, ColumnTypeTracker] = {}
+        total = 0
+        for record in records:
+            total += 1
+            for field_name, field_value in record.items():
+                tracker = trackers.get(field_name)
+                if tracker is None:
+                    tracker = trackers[field_name] = ColumnTypeTracker(parse_text=False)
+                tracker.observe(field_value)
+
+        return [tracker.to_schema_field(name, total) for name, tracker in trackers.items()]
+
     @staticmethod
     def _infer_type_from_value(value: Any) -> DataType:
         """Infer DataType from a value"""
@@ -414,49 +757,22 @@ class FileSchemaIntrospector:
             has_header: Whether first row is header
         """
         try:
-            import csv
-            from io import StringIO
-
             reader = csv.reader(StringIO(sample_data), delimiter=delimiter)
-            rows = list(reader)
-
-            if not rows:
+            result = FileSchemaIntrospector.infer_csv_rows(reader, has_header)
+            if result is None:
                 return {
                     "error": "No data in CSV",
                     "source_type": "csv"
                 }
 
-            # Get headers
-            if has_header:
-                headers = rows[0]
-                data_rows = rows[1:]
-            else:
-                headers = [f"column_{i}" for i in range(len(rows[0]))]
-                data_rows = rows
-
-            # Infer types from data
-            fields = []
-            for i, header in enumerate(headers):
-                # Collect values for this column
-                values = [row[i] if i < len(row) else None for row in data_rows]
-
-                # Infer type
-                data_type = FileSchemaIntrospector._infer_csv_column_type(values)
-
-                field = SchemaField(
-                    name=header,
-                    data_type=data_type,
-                    nullable=any(v is None or v == '' for v in values)
-                )
-                fields.append(field)
-
+            fields, row_count = result
             return {
                 "source_type": "csv",
                 "delimiter": delimiter,
                 "has_header": has_header,
                 "fields": [field.to_dict() for field in fields],
                 "field_count": len(fields),
-                "sample_row_count": len(data_rows),
+                "sample_row_count": row_count,
                 "introspected_at": datetime.now().isoformat()
             }
 
@@ -468,42 +784,43 @@ class FileSchemaIntrospector:
             }
 
     @staticmethod
-    def _infer_csv_column_type(values: List[Any]) -> DataType:
-        """Infer column type from CSV values"""
-        # Filter out empty values
-        non_empty_values = [v for v in values if v is not None and v != '']
-
-        if not non_empty_values:
-            return DataType.STRING
-
-        # Try to detect type from samples
-        sample_values = non_empty_values[:10]
+    def infer_csv_rows(
+        rows: Iterable[List[str]],
+        has_header: bool = True
+    ) -> Optional[Tuple[List[SchemaField], int]]:
+        """
+        Infer column fields over every row in one pass, keeping only one
+        ColumnTypeTracker per column. Returns None when there are no rows.
+        Short rows leave their missing columns null; extra values in long
+        rows are ignored.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return None
 
-        # Try integer
-        try:
-            all(int(v) for v in sample_values)
-            return DataType.INTEGER
-        except (ValueError, TypeError):
-            pass
+        if has_header:
+            headers = first
+        else:
+            headers = [f"column_{i}" for i in range(len(first))]
+            rows = chain([first], rows)
 
-        # Try float
-        try:
-            all(float(v) for v in sample_values)
-            return DataType.FLOAT
-        except (ValueError, TypeError):
-            pass
+        trackers = [ColumnTypeTracker() for _ in headers]
+        row_count = 0
+        for row in rows:
+            row_count += 1
+            for tracker, value in zip(trackers, row):
+                tracker.observe(value)
 
-        # Try boolean
-        bool_values = {'true', 'false', '1', '0', 'yes', 'no', 't', 'f'}
-        if all(str(v).lower() in bool_values for v in sample_values):
-            return DataType.BOOLEAN
+        return [tracker.to_schema_field(name, row_count) for name, tracker in zip(headers, trackers)], row_count
 
-        # Try date
-        if all(re.match(r'^\d{4}-\d{2}-\d{2}', str(v)) for v in sample_values):
-            return DataType.DATE
-
-        # Default to string
-        return DataType.STRING
+    @staticmethod
+    def _infer_csv_column_type(values: List[Any]) -> DataType:
+        """Infer column type from CSV values"""
+        tracker = ColumnTypeTracker()
+        for value in values:
+            tracker.observe(value)
+        return tracker.resolve()
 
 
 class SchemaComparator:
@@ -612,3 +929,85 @@ class SchemaComparator:
 
         score = max(0, 100 - total_penalty)
         return round(score, 2)
+
+    @staticmethod
+    def compare_database_schemas(
+        previous: Dict[str, Any],
+        current: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Compare two database introspection results table by table
+
+        Args:
+            previous: Earlier introspect_database result
+            current: Later introspect_database result
+
+        Returns:
+            Dictionary with added/removed tables and per-table field and index changes
+        """
+        previous_tables = {t['name']: t for t in previous.get('tables', [])}
+        current_tables = {t['name']: t for t in current.get('tables', [])}
+
+        changed_tables = []
+        for name in sorted(set(previous_tables) & set(current_tables)):
+            table_comparison = SchemaComparator.compare_schemas(previous_tables[name], current_tables[name])
+            old_indexes = {i.get('name') for i in previous_tables[name].get('indexes', [])}
+            new_indexes = {i.get('name') for i in current_tables[name].get('indexes', [])}
+            index_changes = {
+                "added": sorted(new_indexes - old_indexes, key=str),
+                "removed": sorted(old_indexes - new_indexes, key=str)
+            }
+            if not table_comparison["schemas_match"] or index_changes["added"] or index_changes["removed"]:
+                changed_tables.append({
+                    "table": name,
+                    "added_fields": table_comparison["added_fields"],
+                    "removed_fields": table_comparison["removed_fields"],
+                    "modified_fields": table_comparison["modified_fields"],
+                    "type_changes": table_comparison["type_changes"],
+                    "index_changes": index_changes
+                })
+
+        added_tables = sorted(set(current_tables) - set(previous_tables))
+        removed_tables = sorted(set(previous_tables) - set(current_tables))
+
+        return {
+            "schemas_match": not (added_tables or removed_tables or changed_tables),
+            "added_tables": added_tables,
+            "removed_tables": removed_tables,
+            "changed_tables": changed_tables,
+            "compared_at": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def build_drift_event(
+        source: str,
+        schema_name: str,
+        previous: Dict[str, Any],
+        current: Dict[str, Any],
+        previous_fingerprint: Optional[str] = None,
+        current_fingerprint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a structured schema drift event from two introspection results
+
+        A drift is breaking when a table or field was removed or a field's
+        type changed, since pipelines reading the source may then fail.
+        """
+        comparison = SchemaComparator.compare_database_schemas(previous, current)
+        breaking = bool(comparison["removed_tables"]) or any(
+            table["removed_fields"] or table["type_changes"]
+            for table in comparison["changed_tables"]
+        )
+
+        return {
+            "event_type": "schema_drift",
+            "source": source,
+            "schema_name": schema_name,
+            "previous_fingerprint": previous_fingerprint,
+            "current_fingerprint": current_fingerprint,
+            "breaking": breaking,
+            "added_tables": comparison["added_tables"],
+            "removed_tables": comparison["removed_tables"],
+            "changed_tables": comparison["changed_tables"],
+            "detected_at": comparison["compared_at"]
+        }
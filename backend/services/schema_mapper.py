@@ -4,9 +4,13 @@ Provides field mapping storage, transformation rule generation, and mapping vali
 """
 
 from typing import Dict, List, Any, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime
 from enum import Enum
+from operator import itemgetter
 import json
+import math
+import re
 
 
 class MappingType(str, Enum):
@@ -139,9 +143,193 @@ class SchemaMapping:
         }
 
 
+# Abbreviations and synonyms expanded to canonical tokens when matching field names
+FIELD_NAME_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "acct": ("account",),
+    "addr": ("address",),
+    "amt": ("amount",),
+    "avg": ("average",),
+    "bal": ("balance",),
+    "cd": ("code",),
+    "cnt": ("count",),
+    "cust": ("customer",),
+    "client": ("customer",),
+    "desc": ("description",),
+    "dept": ("department",),
+    "dob": ("birth", "date"),
+    "dt": ("date",),
+    "e-mail": ("email",),
+    "mail": ("email",),
+    "emp": ("employee",),
+    "fname": ("first", "name"),
+    "forename": ("first", "name"),
+    "givenname": ("first", "name"),
+    "identifier": ("id",),
+    "lname": ("last", "name"),
+    "surname": ("last", "name"),
+    "familyname": ("last", "name"),
+    "msg": ("message",),
+    "nm": ("name",),
+    "nbr": ("number",),
+    "no": ("number",),
+    "num": ("number",),
+    "org": ("organization",),
+    "organisation": ("organization",),
+    "pct": ("percent",),
+    "percentage": ("percent",),
+    "tel": ("phone",),
+    "telephone": ("phone",),
+    "postcode": ("postal", "code"),
+    "zip": ("postal", "code"),
+    "zipcode": ("postal", "code"),
+    "prod": ("product",),
+    "qty": ("quantity",),
+    "ref": ("reference",),
+    "stat": ("status",),
+    "ts": ("timestamp",),
+    "txn": ("transaction",),
+    "upd": ("updated",),
+    "usr": ("user",),
+}
+
+# Data types that can be converted into one another by a generated transformation
+TYPE_FAMILIES: Dict[str, str] = {
+    "integer": "numeric",
+    "float": "numeric",
+    "boolean": "boolean",
+    "date": "temporal",
+    "datetime": "temporal",
+    "timestamp": "temporal",
+    "json": "structured",
+    "array": "structured",
+    "object": "structured",
+    "binary": "binary",
+}
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])")
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]+")
+
+
+def normalize_field_name(name: str) -> Tuple[str, ...]:
+    """
+    Split a field name into canonical lowercase tokens: camelCase, snake_case
+    and digit boundaries are split, abbreviations and synonyms are expanded
+    and simple plurals are singularised
+    """
+    tokens: List[str] = []
+    for part in _NON_ALNUM.split(_CAMEL_BOUNDARY.sub("_", name)):
+        if not part:
+            continue
+        token = part.lower()
+        expanded = FIELD_NAME_SYNONYMS.get(token)
+        if expanded:
+            tokens.extend(expanded)
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+        tokens.append(token)
+    return tuple(tokens)
+
+
+def types_compatible(source_type: Optional[str], dest_type: Optional[str]) -> bool:
+    """Whether a source type can be mapped to a destination type, directly or by a cast"""
+    if source_type == dest_type or source_type in (None, "string", "unknown") or dest_type in (None, "string", "unknown"):
+        return True
+    return TYPE_FAMILIES.get(source_type) == TYPE_FAMILIES.get(dest_type)
+
+
+class FieldMatchIndex:
+    """
+    Inverted index over source field names for fuzzy matching.
+
+    Each field is indexed by its canonical tokens and by character trigrams
+    of its normalized name. A lookup accumulates IDF-weighted hits from the
+    posting lists, rarest first within a fixed budget, and only the
+    top candidates are scored, so matching m destination fields against n
+    source fields costs roughly O(m) instead of O(n*m) comparisons.
+    """
+
+    NGRAM_SIZE = 3
+    MAX_CANDIDATES = 10
+
+    def __init__(self, fields: Dict[str, Dict[str, Any]]):
+        self.names: List[str] = list(fields)
+        self.types: List[Optional[str]] = [fields[name].get('data_type') for name in self.names]
+        self.tokens: List[frozenset] = []
+        self.grams: List[frozenset] = []
+        self.token_postings: Dict[str, List[int]] = defaultdict(list)
+        self.gram_postings: Dict[str, List[int]] = defaultdict(list)
+
+        for index, name in enumerate(self.names):
+            tokens, grams = self._features(name)
+            self.tokens.append(tokens)
+            self.grams.append(grams)
+            for token in tokens:
+                self.token_postings[token].append(index)
+            for gram in grams:
+                self.gram_postings[gram].append(index)
+
+        # Upper bound on posting entries visited per lookup
+        self.posting_budget = max(256, len(self.names) // 20)
+
+    @classmethod
+    def _features(cls, name: str) -> Tuple[frozenset, frozenset]:
+        tokens = normalize_field_name(name)
+        padded = f"#{'_'.join(tokens)}#"
+        grams = frozenset(padded[i:i + cls.NGRAM_SIZE] for i in range(len(padded) - cls.NGRAM_SIZE + 1))
+        return frozenset(tokens), grams
+
+    def _candidates(self, tokens: frozenset, grams: frozenset) -> List[int]:
+        total = len(self.names)
+        postings = [
+            (self.token_postings.get(token), 2.0) for token in tokens
+        ] + [
+            (self.gram_postings.get(gram), 1.0) for gram in grams
+        ]
+        # Rarest features first; stop once the posting budget is spent
+        postings = sorted((p for p in postings if p[0]), key=lambda p: len(p[0]))
+
+        hits: Dict[int, float] = {}
+        visited = 0
+        for indexes, weight in postings:
+            if visited and visited + len(indexes) > self.posting_budget:
+                break
+            visited += len(indexes)
+            idf = weight * math.log(1 + total / len(indexes))
+            for index in indexes:
+                hits[index] = hits.get(index, 0.0) + idf
+
+        ranked = sorted(hits.items(), key=itemgetter(1), reverse=True)
+        return [index for index, _ in ranked[:self.MAX_CANDIDATES]]
+
+    def best_match(self, name: str, data_type: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """Return the best type-compatible source field for `name` and its score"""
+        tokens, grams = self._features(name)
+        best_name, best_score = None, 0.0
+
+        for index in sorted(self._candidates(tokens, grams)):
+            if not types_compatible(self.types[index], data_type):
+                continue
+            candidate_tokens, candidate_grams = self.tokens[index], self.grams[index]
+            token_score = 2 * len(tokens & candidate_tokens) / ((len(tokens) + len(candidate_tokens)) or 1)
+            gram_score = 2 * len(grams & candidate_grams) / ((len(grams) + len(candidate_grams)) or 1)
+            score = max(token_score, gram_score)
+            # The character-overlap score cannot exceed the length ratio
+            candidate = self.names[index]
+            if min(len(name), len(candidate)) > max(score, best_score) * max(len(name), len(candidate)):
+                score = max(score, MappingGenerator._similarity_score(name, candidate))
+            if score > best_score:
+                best_name, best_score = self.names[index], score
+
+        return best_name, best_score
+
+
 class MappingGenerator:
     """Generate mappings automatically based on schema analysis"""
 
+    # Minimum similarity for a fuzzy match to be suggested
+    FUZZY_MATCH_THRESHOLD = 0.7
+
     @staticmethod
     def auto_generate_mappings(
         source_schema: Dict[str, Any],
@@ -150,6 +338,11 @@ class MappingGenerator:
         """
         Automatically generate field mappings based on field names and types
 
+        Exact and case-insensitive name matches are found by dictionary
+        lookup. Remaining fields are matched through a FieldMatchIndex over
+        the source fields, which only scores a few type-compatible candidates
+        per destination field.
+
         Args:
             source_schema: Source schema with fields
             destination_schema: Destination schema with fields
@@ -162,44 +355,30 @@ class MappingGenerator:
         source_fields = {f['name']: f for f in source_schema.get('fields', [])}
         dest_fields = {f['name']: f for f in destination_schema.get('fields', [])}
 
-        for dest_name, dest_field in dest_fields.items():
-            # Try exact name match
-            if dest_name in source_fields:
-                mapping = MappingGenerator._create_mapping_with_type_check(
-                    dest_name,
-                    dest_name,
-                    source_fields[dest_name],
-                    dest_field
-                )
-                mappings.append(mapping)
-                continue
+        lower_source_names: Dict[str, str] = {}
+        for source_name in source_fields:
+            lower_source_names.setdefault(source_name.lower(), source_name)
+        index: Optional[FieldMatchIndex] = None
 
-            # Try case-insensitive match
-            lower_dest_name = dest_name.lower()
-            for source_name, source_field in source_fields.items():
-                if source_name.lower() == lower_dest_name:
-                    mapping = MappingGenerator._create_mapping_with_type_check(
-                        source_name,
-                        dest_name,
-                        source_field,
-                        dest_field
-                    )
-                    mappings.append(mapping)
-                    break
-            else:
-                # Try fuzzy matching (similar names)
-                best_match = MappingGenerator._find_similar_field(
-                    dest_name,
-                    list(source_fields.keys())
-                )
-                if best_match and MappingGenerator._similarity_score(dest_name, best_match) > 0.7:
-                    mapping = MappingGenerator._create_mapping_with_type_check(
-                        best_match,
-                        dest_name,
-                        source_fields[best_match],
-                        dest_field
-                    )
-                    mappings.append(mapping)
+        for dest_name, dest_field in dest_fields.items():
+            # Try exact name match, then case-insensitive match
+            source_name = dest_name if dest_name in source_fields else lower_source_names.get(dest_name.lower())
+
+            if source_name is None:
+                # Try fuzzy matching (similar names); the index is built on first use
+                if index is None:
+                    index = FieldMatchIndex(source_fields)
+                best_match, score = index.best_match(dest_name, dest_field.get('data_type'))
+                if best_match is None or score <= MappingGenerator.FUZZY_MATCH_THRESHOLD:
+                    continue
+                source_name = best_match
+
+            mappings.append(MappingGenerator._create_mapping_with_type_check(
+                source_name,
+                dest_name,
+                source_fields[source_name],
+                dest_field
+            ))
 
         return mappings
 
@@ -0,0 +1,593 @@
+"""
+Schema Mapping Compiler
+Compiles schema mappings into cached transformers that are applied column-wise to batches
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import reduce
+import logging
+import operator
+import re
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.schema_mapping import SchemaMappingDefinition
+from backend.services.node_output_cache import ColumnarBatch, columns_to_records, records_to_columns
+from backend.services.schema_mapper import FieldMapping, MappingType, SchemaMapping, TransformationType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPILER_CACHE_SIZE = 128
+
+# Tried in order by FORMAT_DATE with format "auto-detect", after the last format that matched
+AUTO_DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%Y%m%d",
+]
+
+TRUE_STRINGS = {"true", "t", "yes", "y", "1", "on"}
+FALSE_STRINGS = {"false", "f", "no", "n", "0", "off", ""}
+
+ValueTransform = Callable[[Any], Any]
+ColumnBuilder = Callable[[ColumnarBatch, int], List[Any]]
+
+
+class MappingCompilationError(Exception):
+    """Raised when a field mapping cannot be compiled."""
+    pass
+
+
+class MappingApplicationError(Exception):
+    """Raised when a compiled mapping fails on a value."""
+    pass
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+        raise ValueError(f"invalid boolean literal: {value!r}")
+    return bool(value)
+
+
+CAST_FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "int": int,
+    "integer": int,
+    "bigint": int,
+    "float": float,
+    "double": float,
+    "number": float,
+    "str": str,
+    "string": str,
+    "text": str,
+    "bool": _to_bool,
+    "boolean": _to_bool,
+}
+
+MATH_OPERATIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "floor_divide": operator.floordiv,
+    "modulo": operator.mod,
+    "power": operator.pow,
+    "round": round,
+    "min": min,
+    "max": max,
+}
+
+CONDITION_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": operator.eq,
+    "not_equals": operator.ne,
+    "greater_than": operator.gt,
+    "less_than": operator.lt,
+    "greater_or_equal": operator.ge,
+    "less_or_equal": operator.le,
+    "in": lambda value, options: value in options,
+    "not_in": lambda value, options: value not in options,
+    "contains": lambda value, part: value is not None and part in value,
+    "starts_with": lambda value, prefix: isinstance(value, str) and value.startswith(prefix),
+    "ends_with": lambda value, suffix: isinstance(value, str) and value.endswith(suffix),
+}
+
+
+class DateParser:
+    """
+    Parses date strings with a fixed format, or with "auto-detect" by trying
+    ISO 8601 and AUTO_DATE_FORMATS. The format that matched last is tried
+    first, so a column with a consistent format costs one strptime per value.
+    """
+
+    def __init__(self, input_format: Optional[str], output_format: Optional[str]):
+        self.auto = not input_format or input_format == "auto-detect"
+        self.formats = list(AUTO_DATE_FORMATS) if self.auto else [input_format]
+        self.output_format = output_format
+        self.last_format: Optional[str] = None if self.auto else input_format
+
+    def _parse(self, value: str) -> Optional[datetime]:
+        value = value.strip()
+        if self.last_format is not None:
+            try:
+                return datetime.strptime(value, self.last_format)
+            except ValueError:
+                if not self.auto:
+                    return None
+
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+
+        for fmt in self.formats:
+            if fmt == self.last_format:
+                continue
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            self.last_format = fmt
+            return parsed
+        return None
+
+    def __call__(self, value: Any) -> Any:
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            parsed = datetime(value.year, value.month, value.day)
+        else:
+            parsed = self._parse(str(value))
+            if parsed is None:
+                return None
+        return parsed.strftime(self.output_format) if self.output_format else parsed
+
+
+def _guarded(func: Callable[[Any], Any], field: str, on_error: str) -> ValueTransform:
+    """Skip nulls and apply the transformation's error policy"""
+    if on_error not in ("raise", "null"):
+        raise MappingCompilationError(f"Unknown on_error policy '{on_error}' for field '{field}'")
+
+    def apply(value: Any) -> Any:
+        if value is None:
+            return None
+        try:
+            return func(value)
+        except (ValueError, TypeError, ArithmeticError) as e:
+            if on_error == "null":
+                return None
+            raise MappingApplicationError(f"Field '{field}': cannot transform {value!r}: {e}") from e
+
+    apply.fast = func
+    return apply
+
+
+def _truthy_only(func: Callable[[Any], Any]) -> ValueTransform:
+    """Apply a string method to truthy values and map falsy ones to None"""
+    def apply(value: Any) -> Any:
+        return func(value) if value else None
+
+    apply.fast = func
+    return apply
+
+
+def compile_value_transform(transformation: Dict[str, Any], field: str) -> Optional[ValueTransform]:
+    """
+    Compile a TRANSFORM mapping's transformation into a per-value function.
+    Regexes, date formats and cast functions are resolved here, once.
+    Returns None for the identity transformation.
+    """
+    trans_type = transformation.get("type")
+    on_error = transformation.get("on_error", "raise")
+
+    if trans_type is None:
+        return None
+
+    # Keep the semantics of the generated code: falsy values become None
+    if trans_type == TransformationType.UPPERCASE.value:
+        return _truthy_only(str.upper)
+    if trans_type == TransformationType.LOWERCASE.value:
+        return _truthy_only(str.lower)
+    if trans_type == TransformationType.TRIM.value:
+        return _truthy_only(str.strip)
+
+    if trans_type == TransformationType.SUBSTRING.value:
+        start = int(transformation.get("start", 0))
+        end = transformation.get("end")
+        if end is None and transformation.get("length") is not None:
+            end = start + int(transformation["length"])
+        window = slice(start, None if end is None else int(end))
+        return _guarded(lambda value: value[window], field, on_error)
+
+    if trans_type == TransformationType.REPLACE.value:
+        old, new = transformation.get("old"), transformation.get("new", "")
+        if old is None:
+            raise MappingCompilationError(f"Replace transformation for '{field}' requires 'old'")
+        if transformation.get("regex"):
+            pattern = re.compile(old)
+            return _guarded(lambda value: pattern.sub(new, value), field, on_error)
+        return _guarded(lambda value: value.replace(old, new), field, on_error)
+
+    if trans_type == TransformationType.CAST.value:
+        name = transformation.get("function") or transformation.get("to_type", "str")
+        cast = CAST_FUNCTIONS.get(str(name).lower())
+        if cast is None:
+            raise MappingCompilationError(f"Unsupported cast '{name}' for field '{field}'")
+        return _guarded(cast, field, on_error)
+
+    if trans_type == TransformationType.FORMAT_DATE.value:
+        return DateParser(transformation.get("format"), transformation.get("output_format"))
+
+    if trans_type == TransformationType.REGEX_EXTRACT.value:
+        try:
+            pattern = re.compile(transformation["pattern"])
+        except KeyError:
+            raise MappingCompilationError(f"Regex transformation for '{field}' requires 'pattern'")
+        except re.error as e:
+            raise MappingCompilationError(f"Invalid regex for field '{field}': {e}")
+        group = transformation.get("group", 1 if pattern.groups else 0)
+
+        def extract(value: Any) -> Any:
+            match = pattern.search(value if isinstance(value, str) else str(value))
+            return match.group(group) if match else None
+
+        return _guarded(extract, field, on_error)
+
+    if trans_type == TransformationType.MATH_OPERATION.value:
+        name = transformation.get("operation")
+        op = MATH_OPERATIONS.get(name)
+        if op is None:
+            raise MappingCompilationError(f"Unsupported math operation '{name}' for field '{field}'")
+        operand = transformation.get("operand", 0 if name == "round" else None)
+        if operand is None:
+            raise MappingCompilationError(f"Math operation '{name}' for field '{field}' requires 'operand'")
+        return _guarded(lambda value: op(value, operand), field, on_error)
+
+    raise MappingCompilationError(f"Transformation '{trans_type}' for field '{field}' cannot be compiled")
+
+
+def _map_column(func: Optional[ValueTransform], column: List[Any]) -> List[Any]:
+    """
+    Map a transformation over a column. Columns without nulls or empty
+    strings first try the bare function, skipping the per-value guard; any
+    error falls back to the guarded path, which applies the error policy.
+    """
+    if func is None:
+        return list(column)
+    fast = getattr(func, "fast", None)
+    if fast is not None and None not in column and "" not in column:
+        try:
+            return list(map(fast, column))
+        except (ValueError, TypeError, ArithmeticError):
+            pass
+    return list(map(func, column))
+
+
+def _column(batch: ColumnarBatch, name: Optional[str], rows: int) -> List[Any]:
+    column = batch.get(name)
+    return column if column is not None else [None] * rows
+
+
+def _compile_condition(condition: Any, fields: List[str], field: str) -> Callable[[Sequence[Any]], bool]:
+    """
+    Compile a condition into a predicate over a row tuple. Each referenced
+    field is assigned a position in `fields`, so evaluating a row involves
+    no dictionary lookups. Conditions are {"field", "operator", "value"}
+    dicts, lists of them (all must hold) or {"all": [...]} / {"any": [...]}.
+    """
+    if isinstance(condition, list):
+        condition = {"all": condition}
+    if not isinstance(condition, dict):
+        raise MappingCompilationError(f"Conditional mapping for '{field}' requires a condition")
+
+    for combinator, combine in (("all", all), ("any", any)):
+        if combinator in condition:
+            parts = [_compile_condition(c, fields, field) for c in condition[combinator]]
+            return lambda row: combine(part(row) for part in parts)
+
+    name = condition.get("field")
+    if not name:
+        raise MappingCompilationError(f"Condition for '{field}' requires a 'field'")
+    if name not in fields:
+        fields.append(name)
+    index = fields.index(name)
+    op_name = condition.get("operator", "equals")
+    expected = condition.get("value")
+
+    if op_name == "is_null":
+        return lambda row: row[index] is None
+    if op_name == "not_null":
+        return lambda row: row[index] is not None
+    if op_name == "matches":
+        pattern = re.compile(str(expected))
+        return lambda row: row[index] is not None and pattern.search(str(row[index])) is not None
+
+    compare = CONDITION_OPERATORS.get(op_name)
+    if compare is None:
+        raise MappingCompilationError(f"Unsupported condition operator '{op_name}' for field '{field}'")
+    if op_name in ("in", "not_in"):
+        expected = frozenset(expected or ())
+
+    def predicate(row: Sequence[Any]) -> bool:
+        try:
+            return bool(compare(row[index], expected))
+        except TypeError:
+            # Comparisons against nulls or mismatched types are false
+            return False
+
+    return predicate
+
+
+def _compile_branch(spec: Dict[str, Any], value_key: str, field_key: str, fields: List[str]) -> Callable[[Sequence[Any]], Any]:
+    if field_key in spec:
+        name = spec[field_key]
+        if name not in fields:
+            fields.append(name)
+        index = fields.index(name)
+        return lambda row: row[index]
+    constant = spec.get(value_key)
+    return lambda row: constant
+
+
+def compile_field_mapping(mapping: FieldMapping) -> ColumnBuilder:
+    """Compile one field mapping into a function producing its destination column"""
+    field = mapping.destination_field
+    transformation = mapping.transformation or {}
+    mapping_type = mapping.mapping_type
+
+    if mapping_type == MappingType.DIRECT:
+        source = mapping.source_field
+        # Zero-copy: the destination shares the source column
+        return lambda batch, rows: _column(batch, source, rows)
+
+    if mapping_type == MappingType.CONSTANT:
+        constant = transformation.get("value")
+        return lambda batch, rows: [constant] * rows
+
+    if mapping_type == MappingType.TRANSFORM:
+        func = compile_value_transform(transformation, field)
+        source = mapping.source_field
+        return lambda batch, rows: _map_column(func, _column(batch, source, rows))
+
+    if mapping_type == MappingType.CONCAT:
+        sources = transformation.get("fields") or [mapping.source_field]
+        separator = transformation.get("separator", "")
+
+        def concat(batch: ColumnarBatch, rows: int) -> List[Any]:
+            columns = [_column(batch, name, rows) for name in sources]
+            return [
+                separator.join(str(v) for v in values if v is not None)
+                for values in zip(*columns)
+            ]
+
+        return concat
+
+    if mapping_type == MappingType.SPLIT:
+        separator = transformation.get("separator", ",")
+        index = int(transformation.get("index", 0))
+        source = mapping.source_field
+
+        def split_value(value: Any) -> Any:
+            parts = str(value).split(separator)
+            return parts[index] if -len(parts) <= index < len(parts) else None
+
+        func = _guarded(split_value, field, "null")
+        return lambda batch, rows: _map_column(func, _column(batch, source, rows))
+
+    if mapping_type == MappingType.CALCULATED:
+        sources = transformation.get("fields") or []
+        name = transformation.get("operation", "add")
+        op = MATH_OPERATIONS.get(name)
+        if not sources or op is None:
+            raise MappingCompilationError(
+                f"Calculated mapping for '{field}' requires 'fields' and a supported 'operation'"
+            )
+        on_error = transformation.get("on_error", "raise")
+        calculate = _guarded(lambda values: reduce(op, values), field, on_error)
+
+        def calculated(batch: ColumnarBatch, rows: int) -> List[Any]:
+            columns = [_column(batch, name, rows) for name in sources]
+            return [
+                None if None in values else calculate(values)
+                for values in zip(*columns)
+            ]
+
+        return calculated
+
+    if mapping_type == MappingType.CONDITIONAL:
+        # Per-row fallback: only the referenced columns are zipped into tuples
+        fields: List[str] = []
+        if mapping.source_field:
+            fields.append(mapping.source_field)
+        predicate = _compile_condition(mapping.condition, fields, field)
+
+        if "then" in transformation or "then_field" in transformation:
+            then_value = _compile_branch(transformation, "then", "then_field", fields)
+        else:
+            func = compile_value_transform(transformation, field) or (lambda value: value)
+            source_index = 0 if mapping.source_field else None
+            then_value = (lambda row: func(row[source_index])) if source_index is not None else (lambda row: None)
+        else_value = _compile_branch(transformation, "else", "else_field", fields)
+
+        def conditional(batch: ColumnarBatch, rows: int) -> List[Any]:
+            columns = [_column(batch, name, rows) for name in fields]
+            return [
+                then_value(row) if predicate(row) else else_value(row)
+                for row in zip(*columns)
+            ]
+
+        return conditional
+
+    raise MappingCompilationError(f"Mapping type '{mapping_type}' for field '{field}' cannot be compiled")
+
+
+class CompiledSchemaMapping:
+    """
+    A schema mapping compiled into one column builder per destination field.
+
+    Applying it to a columnar batch runs each builder over whole columns;
+    DIRECT mappings share the source column, TRANSFORM mappings map a
+    precompiled function over it and CONDITIONAL mappings evaluate a
+    compiled predicate over row tuples of just the columns they reference.
+    """
+
+    def __init__(self, mapping_id: Any, version: Any, builders: List[Tuple[str, ColumnBuilder]]):
+        self.mapping_id = mapping_id
+        self.version = version
+        self.builders = builders
+        self.batches_applied = 0
+
+    @property
+    def destination_fields(self) -> List[str]:
+        return [name for name, _ in self.builders]
+
+    def apply_batch(self, batch: ColumnarBatch) -> ColumnarBatch:
+        """Map a columnar batch to the destination schema"""
+        rows = len(next(iter(batch.values()))) if batch else 0
+        self.batches_applied += 1
+        return {name: build(batch, rows) for name, build in self.builders}
+
+    def apply_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Map a list of records to the destination schema"""
+        return columns_to_records(self.apply_batch(records_to_columns(records)))
+
+    def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply_records([record])[0]
+
+
+def compile_schema_mapping(schema_mapping: SchemaMapping, version: Any = None) -> CompiledSchemaMapping:
+    """Compile every field mapping of a SchemaMapping"""
+    builders = []
+    for mapping in schema_mapping.field_mappings:
+        if not mapping.destination_field:
+            raise MappingCompilationError("Field mapping has no destination field")
+        builders.append((mapping.destination_field, compile_field_mapping(mapping)))
+    return CompiledSchemaMapping(schema_mapping.mapping_id, version, builders)
+
+
+class SchemaMappingCompiler:
+    """
+    LRU cache of compiled schema mappings keyed by (mapping_id, updated_at),
+    so a mapping is compiled once per revision.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_COMPILER_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[Any, Any], CompiledSchemaMapping]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.compilations = 0
+
+    @staticmethod
+    def version_of(mapping: Any) -> Any:
+        version = getattr(mapping, "updated_at", None) or getattr(mapping, "created_at", None)
+        return version.isoformat() if isinstance(version, datetime) else version
+
+    def _lookup(self, key: Tuple[Any, Any]) -> Optional[CompiledSchemaMapping]:
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return compiled
+
+    def _store(self, key: Tuple[Any, Any], compiled: CompiledSchemaMapping):
+        with self._lock:
+            self.compilations += 1
+            # Drop older revisions of the same mapping
+            for stale_key in [k for k in self._cache if k[0] == key[0]]:
+                del self._cache[stale_key]
+            self._cache[key] = compiled
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def get(self, schema_mapping: SchemaMapping) -> CompiledSchemaMapping:
+        """Return the compiled transformer for a SchemaMapping"""
+        key = (schema_mapping.mapping_id, self.version_of(schema_mapping))
+        compiled = self._lookup(key)
+        if compiled is not None:
+            return compiled
+
+        with self._lock:
+            self.misses += 1
+        compiled = compile_schema_mapping(schema_mapping, key[1])
+        self._store(key, compiled)
+        return compiled
+
+    async def resolve(self, db: AsyncSession, mapping_id: int) -> Optional[CompiledSchemaMapping]:
+        """
+        Resolve a stored schema mapping by id.
+        Only the version columns are read when the compiled revision is cached.
+        """
+        result = await db.execute(
+            select(
+                SchemaMappingDefinition.id,
+                SchemaMappingDefinition.updated_at,
+                SchemaMappingDefinition.created_at
+            ).where(SchemaMappingDefinition.id == mapping_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        compiled = self._lookup((row.id, self.version_of(row)))
+        if compiled is not None:
+            return compiled
+
+        result = await db.execute(
+            select(SchemaMappingDefinition).where(SchemaMappingDefinition.id == mapping_id)
+        )
+        mapping_def = result.scalar_one_or_none()
+        if mapping_def is None:
+            return None
+
+        return self.get(SchemaMapping(
+            mapping_id=mapping_def.id,
+            name=mapping_def.name,
+            field_mappings=[FieldMapping.from_dict(fm) for fm in mapping_def.field_mappings or []],
+            created_at=mapping_def.created_at,
+            updated_at=mapping_def.updated_at or mapping_def.created_at
+        ))
+
+    def invalidate(self, mapping_id: Any):
+        """Drop every compiled revision of a mapping"""
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == mapping_id]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "compilations": self.compilations
+            }
+
+
+# Global compiler instance
+schema_mapping_compiler = SchemaMappingCompiler()
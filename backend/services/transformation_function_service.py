@@ -8,6 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 
 from backend.models.pipeline_template import TransformationFunction
+from backend.services.function_registry import FunctionCompilationError, function_registry
+from backend.services.sandbox_worker_pool import sandbox_worker_pool
 
 
 class TransformationFunctionService:
@@ -129,6 +131,7 @@ class TransformationFunctionService:
 
         await db.commit()
         await db.refresh(function)
+        function_registry.invalidate(function_id)
         return function
 
     @staticmethod
@@ -138,6 +141,7 @@ class TransformationFunctionService:
             delete(TransformationFunction).where(TransformationFunction.id == function_id)
         )
         await db.commit()
+        function_registry.invalidate(function_id)
         return result.rowcount > 0
 
     @staticmethod
@@ -182,44 +186,19 @@ class TransformationFunctionService:
             return {"error": "Function not found"}
 
         try:
-            # This is a simplified test - in production, use a sandboxed execution environment
-            # For security, validate and sanitize the function code before execution
+            # Compiled once per function revision and run in a sandboxed worker process
+            compiled = function_registry.get(function)
+            result = await sandbox_worker_pool.call(compiled, test_input)
 
-            # Create a safe execution context
-            safe_globals = {
-                "__builtins__": {
-                    "len": len,
-                    "str": str,
-                    "int": int,
-                    "float": float,
-                    "list": list,
-                    "dict": dict,
-                    "sum": sum,
-                    "min": min,
-                    "max": max,
-                    "sorted": sorted,
-                    "enumerate": enumerate,
-                    "zip": zip
-                }
+            return {
+                "success": True,
+                "input": test_input,
+                "output": result,
+                "function_name": function.name
             }
 
-            # Execute function code
-            exec(function.function_code, safe_globals)
-
-            # Get the function from context
-            if function.name in safe_globals:
-                func = safe_globals[function.name]
-                result = func(test_input)
-
-                return {
-                    "success": True,
-                    "input": test_input,
-                    "output": result,
-                    "function_name": function.name
-                }
-            else:
-                return {"error": f"Function '{function.name}' not found in code"}
-
+        except FunctionCompilationError as e:
+            return {"error": str(e)}
         except Exception as e:
             return {
                 "success": False,
@@ -229,7 +208,11 @@ class TransformationFunctionService:
 
     @staticmethod
     def get_builtin_functions() -> List[Dict[str, Any]]:
-        """Get built-in transformation functions"""
+        """
+        Get built-in transformation functions.
+        The Python source is for display and test_function; pipelines run the
+        columnar implementations in vectorized_builtins.
+        """
         return [
             {
                 "name": "filter_null_values",
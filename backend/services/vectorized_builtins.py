@@ -0,0 +1,230 @@
+"""
+Vectorized Builtin Functions
+Columnar batch implementations of the builtin transformation functions
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.node_output_cache import ColumnarBatch
+
+# numpy dtype kinds that sort natively (bool, int, uint, float, unicode, bytes)
+SORTABLE_KINDS = "biufUS"
+
+# numpy dtype kinds that can be summed natively (uint64 is left to Python ints)
+INTEGER_KINDS = "bi"
+FLOAT_KINDS = "f"
+
+# Python value types that convert losslessly into a typed numpy array
+NATIVE_TYPE_SETS = ({bool}, {int, bool}, {int, float}, {float}, {str})
+
+# Integer sums stay in int64 only while no total can exceed it
+INT64_MAX = np.iinfo(np.int64).max
+
+# Builtins whose output depends on all of their input rows together: they
+# are called once on the concatenated upstream batches, not once per batch
+BLOCKING_BUILTINS = frozenset({"aggregate_sum", "sort_records", "limit_records", "deduplicate"})
+
+
+def _row_count(batch: ColumnarBatch) -> int:
+    return len(next(iter(batch.values()))) if batch else 0
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    """1-D object array of `values` (never broadcast nested lists into 2-D)"""
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _native_array(values: Sequence[Any]) -> Optional[np.ndarray]:
+    """
+    Typed 1-D array of `values`, or None when they only fit in an object
+    array (nulls, mixed types, Decimals, dates, nested values). Mixed
+    columns are rejected up front so numpy never coerces ints to strings.
+    """
+    types = set(map(type, values))
+    if not types or not any(types <= allowed for allowed in NATIVE_TYPE_SETS):
+        return None
+    try:
+        array = np.asarray(values)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return array if array.ndim == 1 and array.dtype.kind != "O" else None
+
+
+def _take(batch: ColumnarBatch, indices: np.ndarray) -> ColumnarBatch:
+    """Gather the rows at `indices` from every column"""
+    return {name: _object_array(values)[indices].tolist() for name, values in batch.items()}
+
+
+def concat_batches(batches: Sequence[ColumnarBatch]) -> ColumnarBatch:
+    """One batch with the rows of `batches` in order; a column missing from a batch is None in its rows"""
+    if len(batches) == 1:
+        return batches[0]
+    names = list(dict.fromkeys(name for batch in batches for name in batch))
+    result: ColumnarBatch = {name: [] for name in names}
+    for batch in batches:
+        rows = _row_count(batch)
+        for name in names:
+            values = batch.get(name)
+            result[name].extend(values if values is not None else [None] * rows)
+    return result
+
+
+def _null_mask(values: Sequence[Any]) -> np.ndarray:
+    """Boolean mask that is True where a value is None"""
+    return np.equal(_object_array(values), None)
+
+
+def _group_codes(batch: ColumnarBatch, fields: Sequence[str], rows: int) -> Tuple[np.ndarray, int]:
+    """
+    Hash the key columns into dense group codes numbered in order of first
+    appearance. Multi-column keys are combined pairwise and re-factorized so
+    codes stay below the row count.
+    """
+    codes = np.zeros(rows, dtype=np.int64)
+    groups = 1
+    for field in fields:
+        column = batch.get(field)
+        if column is None:
+            # A missing column is None for every row and does not split groups
+            continue
+        column_codes, uniques = pd.factorize(_object_array(column), use_na_sentinel=False)
+        codes, combined = pd.factorize(codes * len(uniques) + column_codes)
+        groups = len(combined)
+    return codes, groups if rows else 0
+
+
+def _first_occurrences(codes: np.ndarray) -> np.ndarray:
+    """Row index of the first row of each group, ordered by group code"""
+    _, first = np.unique(codes, return_index=True)
+    return first
+
+
+def filter_null_values(batch: ColumnarBatch, fields: Optional[List[str]] = None) -> ColumnarBatch:
+    """Drop rows with a null in any of `fields` (all columns when omitted)"""
+    rows = _row_count(batch)
+    if not rows:
+        return dict(batch)
+
+    checked = fields or list(batch)
+    if any(field not in batch for field in checked):
+        # Missing columns are null in every row
+        return {name: [] for name in batch}
+
+    keep = np.ones(rows, dtype=bool)
+    for field in checked:
+        keep &= ~_null_mask(batch[field])
+
+    if keep.all():
+        return dict(batch)
+    return _take(batch, np.flatnonzero(keep))
+
+
+def map_fields(batch: ColumnarBatch, field_mapping: Dict[str, str]) -> ColumnarBatch:
+    """Rename columns; the column lists are shared, not copied"""
+    return {new_key: batch[old_key] for old_key, new_key in field_mapping.items() if old_key in batch}
+
+
+def aggregate_sum(batch: ColumnarBatch, group_by: List[str], sum_field: str) -> ColumnarBatch:
+    """Sum `sum_field` per distinct `group_by` key using hash grouping"""
+    rows = _row_count(batch)
+    if not rows:
+        return {**{field: [] for field in group_by}, "total": []}
+
+    codes, groups = _group_codes(batch, group_by, rows)
+    first = _first_occurrences(codes)
+
+    values = batch.get(sum_field)
+    if values is None:
+        totals: List[Any] = [0] * groups
+    else:
+        array = _native_array(values)
+        if array is not None and array.dtype.kind in INTEGER_KINDS and _fits_int64_sum(array):
+            sums = np.zeros(groups, dtype=np.int64)
+            np.add.at(sums, codes, array.astype(np.int64))
+            totals = sums.tolist()
+        elif array is not None and array.dtype.kind in FLOAT_KINDS:
+            totals = np.bincount(codes, weights=array, minlength=groups).tolist()
+        else:
+            # Nulls, Decimals or mixed types: accumulate with Python semantics
+            totals = [0] * groups
+            for code, value in zip(codes.tolist(), values):
+                if value is not None:
+                    totals[code] += value
+
+    result: ColumnarBatch = {}
+    for field in group_by:
+        column = batch.get(field)
+        result[field] = _object_array(column)[first].tolist() if column is not None else [None] * groups
+    result["total"] = totals
+    return result
+
+
+def _fits_int64_sum(array: np.ndarray) -> bool:
+    """Whether any sum of the values is bounded by int64; larger sums are left to Python ints"""
+    if not array.size:
+        return True
+    bound = max(abs(int(array.min())), abs(int(array.max())))
+    return bound * array.size <= INT64_MAX
+
+
+def sort_records(batch: ColumnarBatch, sort_by: str, reverse: bool = False) -> ColumnarBatch:
+    """Stable sort of every column by the argsort of `sort_by`"""
+    column = batch.get(sort_by)
+    rows = _row_count(batch)
+    if column is None or rows < 2:
+        return dict(batch)
+
+    array = _native_array(column)
+    if array is not None and array.dtype.kind in SORTABLE_KINDS:
+        if reverse:
+            # Descending but still stable: sort the reversed column ascending
+            order = rows - 1 - np.argsort(array[::-1], kind="stable")[::-1]
+        else:
+            order = np.argsort(array, kind="stable")
+    else:
+        order = np.asarray(sorted(range(rows), key=column.__getitem__, reverse=reverse), dtype=np.int64)
+
+    return _take(batch, order)
+
+
+def limit_records(batch: ColumnarBatch, limit: int, offset: int = 0) -> ColumnarBatch:
+    """Slice every column to `limit` rows starting at `offset`"""
+    return {name: values[offset:offset + limit] for name, values in batch.items()}
+
+
+def deduplicate(batch: ColumnarBatch, unique_fields: List[str]) -> ColumnarBatch:
+    """Keep the first row of each distinct `unique_fields` key"""
+    rows = _row_count(batch)
+    if not rows:
+        return dict(batch)
+
+    codes, groups = _group_codes(batch, unique_fields, rows)
+    if groups == rows:
+        return dict(batch)
+    return _take(batch, _first_occurrences(codes))
+
+
+# Builtin function name -> columnar implementation
+VECTORIZED_BUILTINS: Dict[str, Callable[..., ColumnarBatch]] = {
+    "filter_null_values": filter_null_values,
+    "map_fields": map_fields,
+    "aggregate_sum": aggregate_sum,
+    "sort_records": sort_records,
+    "limit_records": limit_records,
+    "deduplicate": deduplicate,
+}
+
+
+def get_vectorized_builtin(name: str) -> Optional[Callable[..., ColumnarBatch]]:
+    """Columnar implementation of a builtin transformation function, if one exists"""
+    return VECTORIZED_BUILTINS.get(name)
+
+
+def is_blocking_builtin(name: str) -> bool:
+    """Whether a builtin must be called once on all of its input rather than per batch"""
+    return name in BLOCKING_BUILTINS
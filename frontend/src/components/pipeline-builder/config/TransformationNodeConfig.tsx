@@ -141,6 +141,79 @@ export function TransformationNodeConfig({ config, onChange, subtype }: Transfor
     );
   }
 
+  // Deduplicate Transformation
+  if (subtype === 'deduplicate') {
+    const mode = config.mode || 'exact';
+    return (
+      <div className="space-y-4">
+        <div>
+          <label htmlFor="key_fields" className="block text-sm font-medium text-gray-700 mb-1">Key Fields</label>
+          <Input
+            id="key_fields"
+            type="text"
+            value={(config.key_fields || []).join(', ')}
+            onChange={(e) => updateConfig('key_fields', e.target.value.split(',').map((f) => f.trim()).filter(Boolean))}
+            placeholder="email, phone"
+          />
+          <p className="text-xs text-gray-500 mt-1">
+            Leave empty to compare whole records
+          </p>
+        </div>
+
+        <div>
+          <label htmlFor="mode" className="block text-sm font-medium text-gray-700 mb-1">Mode</label>
+          <Select
+            id="mode"
+            value={mode}
+            onChange={(e) => updateConfig('mode', e.target.value)}
+          >
+            <option value="exact">Exact (spills to disk)</option>
+            <option value="approximate">Approximate (Bloom filter)</option>
+            <option value="windowed">Windowed</option>
+          </Select>
+        </div>
+
+        {mode === 'approximate' && (
+          <div>
+            <label htmlFor="false_positive_rate" className="block text-sm font-medium text-gray-700 mb-1">False Positive Rate</label>
+            <Input
+              id="false_positive_rate"
+              type="number"
+              step="0.001"
+              value={config.false_positive_rate ?? 0.01}
+              onChange={(e) => updateConfig('false_positive_rate', parseFloat(e.target.value))}
+            />
+          </div>
+        )}
+
+        {mode === 'windowed' && (
+          <>
+            <div>
+              <label htmlFor="window_records" className="block text-sm font-medium text-gray-700 mb-1">Window (records)</label>
+              <Input
+                id="window_records"
+                type="number"
+                value={config.window_records ?? ''}
+                onChange={(e) => updateConfig('window_records', e.target.value ? parseInt(e.target.value, 10) : undefined)}
+                placeholder="100000"
+              />
+            </div>
+            <div>
+              <label htmlFor="window_seconds" className="block text-sm font-medium text-gray-700 mb-1">Window (seconds)</label>
+              <Input
+                id="window_seconds"
+                type="number"
+                value={config.window_seconds ?? ''}
+                onChange={(e) => updateConfig('window_seconds', e.target.value ? parseFloat(e.target.value) : undefined)}
+                placeholder="3600"
+              />
+            </div>
+          </>
+        )}
+      </div>
+    );
+  }
+
   // Join Transformation
   if (subtype === 'join') {
     return (
@@ -1,6 +1,6 @@
 'use client';
 
-import { Database, Globe, FileText, Filter, Layers, BarChart3, GitMerge, ArrowUpDown, FileOutput, Warehouse } from 'lucide-react';
+import { Database, Globe, FileText, Filter, Layers, BarChart3, GitMerge, ArrowUpDown, Copy, FileOutput, Warehouse } from 'lucide-react';
 
 const nodeCategories = [
   {
@@ -18,7 +18,8 @@ const nodeCategories = [
       { type: 'transformation', subtype: 'map', label: 'Map', icon: Layers, color: 'purple' },
       { type: 'transformation', subtype: 'aggregate', label: 'Aggregate', icon: BarChart3, color: 'purple' },
       { type: 'transformation', subtype: 'join', label: 'Join', icon: GitMerge, color: 'purple' },
-      { type: 'transformation', subtype: 'sort', label: 'Sort', icon: ArrowUpDown, color: 'purple' }
+      { type: 'transformation', subtype: 'sort', label: 'Sort', icon: ArrowUpDown, color: 'purple' },
+      { type: 'transformation', subtype: 'deduplicate', label: 'Deduplicate', icon: Copy, color: 'purple' }
     ]
   },
   {
@@ -1,12 +1,12 @@
 'use client';
 
 import { Handle, Position } from 'reactflow';
-import { Filter, Layers, BarChart3, GitMerge, ArrowUpDown, CheckCircle } from 'lucide-react';
+import { Filter, Layers, BarChart3, GitMerge, ArrowUpDown, Copy, CheckCircle } from 'lucide-react';
 
 interface TransformationNodeProps {
   data: {
     label: string;
-    transformationType?: 'filter' | 'map' | 'aggregate' | 'join' | 'sort';
+    transformationType?: 'filter' | 'map' | 'aggregate' | 'join' | 'sort' | 'deduplicate';
     config?: any;
     isConfigured?: boolean;
   };
@@ -26,6 +26,8 @@ export function TransformationNode({ data, selected }: TransformationNodeProps)
         return <GitMerge className="h-5 w-5" />;
       case 'sort':
         return <ArrowUpDown className="h-5 w-5" />;
+      case 'deduplicate':
+        return <Copy className="h-5 w-5" />;
       default:
         return <Layers className="h-5 w-5" />;
     }
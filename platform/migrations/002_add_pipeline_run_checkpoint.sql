@@ -0,0 +1,7 @@
+-- Migration: Add checkpoint column to pipeline_runs
+-- Date: 2026-10-19
+-- Description: Stores the last persisted progress of a run so cancelled runs can be resumed
+
+ALTER TABLE pipeline_runs ADD COLUMN IF NOT EXISTS checkpoint JSON;
+
+COMMENT ON COLUMN pipeline_runs.checkpoint IS 'Last persisted progress of the run (offsets, batches and record counts)';
@@ -0,0 +1,21 @@
+-- Migration: Add data_profiles table
+-- Date: 2026-10-19
+-- Description: Stores per-column profiles (null rates, distinct estimates, quantiles, frequent values) of file uploads and source tables
+
+CREATE TABLE IF NOT EXISTS data_profiles (
+    id SERIAL PRIMARY KEY,
+    source_type VARCHAR NOT NULL,
+    source_ref VARCHAR NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    columns JSON NOT NULL,
+    sketches JSON,
+    created_by INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Latest profile per source
+CREATE INDEX IF NOT EXISTS idx_data_profiles_source ON data_profiles(source_type, source_ref, created_at DESC);
+
+COMMENT ON TABLE data_profiles IS 'Column profiles of file uploads and source tables';
+COMMENT ON COLUMN data_profiles.source_ref IS 'File upload id, or connection fingerprint and table name';
+COMMENT ON COLUMN data_profiles.sketches IS 'Serialized HyperLogLog, t-digest, top-K and length histogram state per column';
@@ -0,0 +1,9 @@
+-- Migration: Add chunk tracking columns to file_uploads
+-- Date: 2026-10-19
+-- Description: Supports parallel, out-of-order chunked uploads with resume
+
+ALTER TABLE file_uploads ADD COLUMN IF NOT EXISTS chunk_size INTEGER;
+ALTER TABLE file_uploads ADD COLUMN IF NOT EXISTS received_chunks BYTEA;
+
+COMMENT ON COLUMN file_uploads.chunk_size IS 'Bytes per chunk; chunk n is written at offset n * chunk_size';
+COMMENT ON COLUMN file_uploads.received_chunks IS 'Bitmap of received chunks (bit n % 8 of byte n / 8)';
@@ -0,0 +1,21 @@
+-- Migration: Add content-addressed file blob storage
+-- Date: 2026-10-19
+-- Description: Stores upload content once per SHA-256 with reference counts; file_uploads rows reference blobs by hash
+
+CREATE TABLE IF NOT EXISTS file_blobs (
+    content_hash VARCHAR(64) PRIMARY KEY,
+    file_size BIGINT NOT NULL,
+    storage_path VARCHAR(500) NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_referenced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE file_uploads ADD COLUMN IF NOT EXISTS blob_hash VARCHAR(64) REFERENCES file_blobs(content_hash);
+
+-- Garbage collection scans unreferenced blobs only
+CREATE INDEX IF NOT EXISTS idx_file_blobs_unreferenced ON file_blobs(ref_count) WHERE ref_count <= 0;
+CREATE INDEX IF NOT EXISTS idx_file_uploads_blob_hash ON file_uploads(blob_hash);
+
+COMMENT ON TABLE file_blobs IS 'Upload content stored once per SHA-256, shared by uploads with identical bytes';
+COMMENT ON COLUMN file_blobs.ref_count IS 'Number of file_uploads referencing the blob; zero-count blobs are removed by expired-file cleanup';
@@ -0,0 +1,219 @@
+"""
+Benchmark Harness
+Timing, peak RSS sampling, latency percentiles and baseline regression checks
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import gc
+import json
+import os
+import platform
+import threading
+import time
+
+import psutil
+
+RSS_SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Metrics compared against baselines and which direction is worse
+HIGHER_IS_BETTER = ("rows_per_sec",)
+LOWER_IS_BETTER = ("latency_p95_ms", "peak_rss_delta_bytes")
+
+# Absolute slack so tiny memory deltas do not trip the gate on allocator noise
+RSS_NOISE_FLOOR_BYTES = 16 * 1024 * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of `values` (pct in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class PeakRSSSampler:
+    """Samples process RSS in a background thread and keeps the maximum"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_rss = 0
+        self.peak_rss = 0
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakRSSSampler":
+        self.start_rss = self.peak_rss = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements for one benchmark scenario"""
+    name: str
+    rows: int
+    repeats: int
+    total_seconds: float
+    latencies_ms: List[float] = field(default_factory=list)
+    start_rss_bytes: int = 0
+    peak_rss_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "repeats": self.repeats,
+            "total_seconds": round(self.total_seconds, 6),
+            "rows_per_sec": round(self.rows * self.repeats / self.total_seconds, 2) if self.total_seconds else 0.0,
+            "latency_p50_ms": round(percentile(self.latencies_ms, 50), 4),
+            "latency_p95_ms": round(percentile(self.latencies_ms, 95), 4),
+            "latency_p99_ms": round(percentile(self.latencies_ms, 99), 4),
+            "latency_samples": len(self.latencies_ms),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "peak_rss_delta_bytes": max(0, self.peak_rss_bytes - self.start_rss_bytes),
+        }
+
+
+def run_scenario(
+    name: str,
+    rows: int,
+    run_once: Callable[[Callable[[], None]], None],
+    repeats: int = 3,
+    setup: Optional[Callable[[], None]] = None
+) -> ScenarioResult:
+    """
+    Time a scenario.
+
+    `run_once(mark)` executes the scenario once and calls `mark()` at the end
+    of every unit of work (a batch for streaming operators, the whole input
+    for blocking ones); the time between marks is recorded as a latency.
+    """
+    latencies: List[float] = []
+    total = 0.0
+
+    gc.collect()
+    with PeakRSSSampler() as sampler:
+        for _ in range(repeats):
+            if setup:
+                setup()
+            last = time.perf_counter()
+            start = last
+
+            def mark():
+                nonlocal last
+                now = time.perf_counter()
+                latencies.append((now - last) * 1000)
+                last = now
+
+            run_once(mark)
+            total += time.perf_counter() - start
+
+    return ScenarioResult(
+        name=name,
+        rows=rows,
+        repeats=repeats,
+        total_seconds=total,
+        latencies_ms=latencies,
+        start_rss_bytes=sampler.start_rss,
+        peak_rss_bytes=sampler.peak_rss,
+    )
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": psutil.virtual_memory().total,
+    }
+
+
+def build_report(results: Iterable[ScenarioResult], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Machine-readable benchmark report"""
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment_info(),
+        "config": config,
+        "scenarios": {result.name: result.to_dict() for result in results},
+    }
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.3,
+    rss_tolerance: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare a report against a committed baseline.
+
+    Returns one entry per regressed metric: throughput below
+    baseline * (1 - tolerance), or latency/memory above
+    baseline * (1 + tolerance); memory also gets RSS_NOISE_FLOOR_BYTES of
+    absolute slack. Scenarios missing from either side are skipped.
+    """
+    rss_tolerance = tolerance if rss_tolerance is None else rss_tolerance
+    regressions = []
+
+    for name, current in report.get("scenarios", {}).items():
+        expected = baseline.get("scenarios", {}).get(name)
+        if not expected:
+            continue
+
+        for metric in HIGHER_IS_BETTER:
+            if metric in expected and current.get(metric, 0) < expected[metric] * (1 - tolerance):
+                regressions.append(_regression(name, metric, expected[metric], current.get(metric, 0)))
+
+        for metric in LOWER_IS_BETTER:
+            if metric not in expected:
+                continue
+            if metric.startswith("peak_rss"):
+                limit = max(expected[metric] * (1 + rss_tolerance), expected[metric] + RSS_NOISE_FLOOR_BYTES)
+            else:
+                limit = expected[metric] * (1 + tolerance)
+            if current.get(metric, 0) > limit:
+                regressions.append(_regression(name, metric, expected[metric], current.get(metric, 0)))
+
+    return regressions
+
+
+def _regression(scenario: str, metric: str, baseline_value: float, current_value: float) -> Dict[str, Any]:
+    change = ((current_value - baseline_value) / baseline_value * 100) if baseline_value else 0.0
+    return {
+        "scenario": scenario,
+        "metric": metric,
+        "baseline": baseline_value,
+        "current": current_value,
+        "change_percent": round(change, 2),
+    }
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Dict[str, Any]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
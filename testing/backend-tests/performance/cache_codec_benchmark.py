@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Cache Codec Benchmark
+
+Compares the cache codecs, with and without compression, against the
+previous json.dumps(default=str) encoding on payloads shaped like the
+values the dashboard and analytics endpoints cache.
+
+Usage:
+    python testing/backend-tests/performance/cache_codec_benchmark.py
+    python testing/backend-tests/performance/cache_codec_benchmark.py --repeats 500 --output report.json
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+PERFORMANCE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = PERFORMANCE_DIR.parents[2]
+
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PERFORMANCE_DIR))
+
+from bench_harness import environment_info, percentile, write_json  # noqa: E402
+from backend.services.cache_codecs import COMPRESS_MIN_BYTES, CacheSerializer, available_codecs  # noqa: E402
+
+
+def _entry(value: Any) -> Dict[str, Any]:
+    """get_or_compute's stored form"""
+    return {"__cache_entry__": 1, "value": value, "fresh_until": time.time() + 60, "compute_time": 0.042}
+
+
+def build_payloads(seed: int = 7) -> Dict[str, Any]:
+    """Deterministic payloads shaped like the cached endpoint results"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+
+    dashboard_stats = {
+        "total_pipelines": 128, "active_pipelines": 97, "total_connectors": 45,
+        "total_transformations": 210, "recent_runs": 1532, "success_rate": 97.4
+    }
+    timeseries = [
+        {"date": (start + timedelta(days=day)).strftime("%Y-%m-%d"), "records": rng.randint(10_000, 5_000_000)}
+        for day in range(365)
+    ]
+    aggregated = {
+        "time_range": "90d",
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=90)).isoformat(),
+        "summary": {"total_pipelines": 128, "active_pipelines": 97, "total_records_processed": 412_345_678},
+        "connector_breakdown": [{"type": name, "count": rng.randint(1, 40)} for name in ("postgres", "mysql", "s3", "rest", "kafka")],
+        "time_series": [
+            {
+                "timestamp": (start + timedelta(days=day)).isoformat(),
+                "date": (start + timedelta(days=day)).strftime("%Y-%m-%d"),
+                "records_processed": rng.randint(100_000, 5_000_000),
+                "success_rate": round(rng.uniform(95.0, 99.9), 2),
+                "avg_duration_seconds": round(rng.uniform(120, 600), 2),
+                "failed_count": rng.randint(0, 5)
+            }
+            for day in range(90)
+        ]
+    }
+    # Query results keep their column types now that the codecs preserve them
+    pipeline_runs = [
+        {
+            "id": run,
+            "run_id": uuid.UUID(int=rng.getrandbits(128)),
+            "pipeline_id": rng.randint(1, 128),
+            "status": rng.choice(("completed", "completed", "completed", "failed", "running")),
+            "started_at": start + timedelta(seconds=run * 37),
+            "finished_at": start + timedelta(seconds=run * 37 + rng.randint(30, 900)),
+            "run_date": date(2024, 1, 1) + timedelta(days=run // 100),
+            "records_processed": rng.randint(0, 1_000_000),
+            "cost": Decimal(rng.randint(0, 100_000)) / 100
+        }
+        for run in range(2000)
+    ]
+    return {
+        "dashboard_stats": _entry(dashboard_stats),
+        "analytics_timeseries": _entry(timeseries),
+        "aggregated_analytics": _entry(aggregated),
+        "pipeline_runs": _entry(pipeline_runs)
+    }
+
+
+class _LegacyJson:
+    """The encoding CacheService used before the codec layer"""
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+def serializers(compress_min_bytes: int = COMPRESS_MIN_BYTES) -> Dict[str, Any]:
+    """Every installed codec, plain and compressed, plus the legacy encoding"""
+    candidates: Dict[str, Any] = {"legacy-json": _LegacyJson()}
+    for name, codec in available_codecs().items():
+        candidates[name] = CacheSerializer(codec, compress_min_bytes=0)
+        candidates[f"{name}+zlib"] = CacheSerializer(codec, compress_min_bytes=compress_min_bytes)
+    return candidates
+
+
+def _time_us(operation: Callable[[], Any], repeats: int) -> List[float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return samples
+
+
+def run_codec_benchmarks(repeats: int = 200, compress_min_bytes: int = COMPRESS_MIN_BYTES) -> Dict[str, Dict[str, Any]]:
+    """Encode/decode latency percentiles and stored size per payload and serializer"""
+    results: Dict[str, Dict[str, Any]] = {}
+    for payload_name, payload in build_payloads().items():
+        for serializer_name, serializer in serializers(compress_min_bytes).items():
+            data = serializer.dumps(payload)
+            encode = _time_us(lambda: serializer.dumps(payload), repeats)
+            decode = _time_us(lambda: serializer.loads(data), repeats)
+            results[f"{payload_name}/{serializer_name}"] = {
+                "bytes": len(data),
+                "encode_p50_us": round(percentile(encode, 50), 2),
+                "encode_p95_us": round(percentile(encode, 95), 2),
+                "decode_p50_us": round(percentile(decode, 50), 2),
+                "decode_p95_us": round(percentile(decode, 95), 2)
+            }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare cache codecs on cached endpoint payloads")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed encodes and decodes per payload and codec")
+    parser.add_argument("--compress-min-bytes", type=int, default=COMPRESS_MIN_BYTES,
+                        help="Compression threshold of the +zlib variants")
+    parser.add_argument("--output", default=None, help="Also write the results as a JSON report")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run_codec_benchmarks(args.repeats, args.compress_min_bytes)
+
+    print(f"{'payload/codec':<40}{'bytes':>10}{'enc p50 us':>12}{'enc p95 us':>12}{'dec p50 us':>12}{'dec p95 us':>12}")
+    for name, metrics in results.items():
+        print(
+            f"{name:<40}{metrics['bytes']:>10,}{metrics['encode_p50_us']:>12.1f}{metrics['encode_p95_us']:>12.1f}"
+            f"{metrics['decode_p50_us']:>12.1f}{metrics['decode_p95_us']:>12.1f}"
+        )
+
+    if args.output:
+        write_json(args.output, {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "environment": environment_info(),
+            "config": {"repeats": args.repeats, "compress_min_bytes": args.compress_min_bytes},
+            "results": results
+        })
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
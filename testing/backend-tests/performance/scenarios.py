@@ -0,0 +1,178 @@
+"""
+Pipeline Engine Benchmark Scenarios
+Per-operator and end-to-end scenarios over synthetic sources
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+import tempfile
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, insert
+
+from bench_harness import ScenarioResult, run_scenario
+from synthetic_source import SyntheticSource
+
+
+def load_builtin_operators() -> Dict[str, Any]:
+    """
+    The builtin transformation functions as pipelines run them: compiled by
+    the function registry, which dispatches builtins to their vectorized
+    columnar implementations
+    """
+    from backend.services.function_registry import FunctionRegistry
+    from backend.services.transformation_function_service import TransformationFunctionService
+
+    registry = FunctionRegistry()
+    operators: Dict[str, Any] = {}
+    for function_id, builtin in enumerate(TransformationFunctionService.get_builtin_functions(), 1):
+        function = SimpleNamespace(
+            id=function_id, name=builtin["name"], function_code=builtin["function_code"],
+            is_builtin=True, updated_at=None, created_at=None
+        )
+        operators[builtin["name"]] = registry.get(function)
+    return operators
+
+
+def hash_join(
+    left: List[Dict[str, Any]],
+    right_index: Dict[Any, Dict[str, Any]],
+    key: str
+) -> List[Dict[str, Any]]:
+    """Inner join probe of `left` against a prebuilt index of the right side"""
+    joined = []
+    for record in left:
+        match = right_index.get(record.get(key))
+        if match is not None:
+            merged = dict(record)
+            merged.update(match)
+            joined.append(merged)
+    return joined
+
+
+class DestinationWriter:
+    """Writes record batches into a benchmark table via SQLAlchemy"""
+
+    def __init__(self, database_url: Optional[str] = None):
+        self._tmpdir = None
+        if not database_url:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="bench_dest_")
+            database_url = f"sqlite:///{self._tmpdir.name}/bench.db"
+        self.engine = create_engine(database_url)
+        self.metadata = MetaData()
+        self.table = Table(
+            "bench_destination",
+            self.metadata,
+            Column("id", Integer),
+            Column("key", Integer),
+            Column("amount", Float),
+            Column("category", String(64)),
+            Column("created_at", DateTime),
+            Column("col_0", String(64)),
+            Column("col_1", Integer),
+            Column("col_2", Float),
+            Column("col_3", Boolean),
+        )
+        self.columns = [c.name for c in self.table.columns]
+
+    def reset(self):
+        self.metadata.drop_all(self.engine)
+        self.metadata.create_all(self.engine)
+
+    def write(self, batch: List[Dict[str, Any]]):
+        rows = [{name: record.get(name) for name in self.columns} for record in batch]
+        with self.engine.begin() as conn:
+            conn.execute(insert(self.table), rows)
+
+    def close(self):
+        self.metadata.drop_all(self.engine)
+        self.engine.dispose()
+        if self._tmpdir:
+            self._tmpdir.cleanup()
+
+
+def run_all(
+    rows: int = 100_000,
+    batch_size: int = 10_000,
+    repeats: int = 3,
+    key_cardinality: int = 1000,
+    skew: float = 1.1,
+    database_url: Optional[str] = None,
+    only: Optional[List[str]] = None
+) -> List[ScenarioResult]:
+    """
+    Run every scenario (or those named in `only`) and return the results.
+    Operators run on columnar batches, as the pipeline engine passes them;
+    blocking operators get the batches concatenated, as the engine does.
+    """
+    from backend.services.node_output_cache import columns_to_records, records_to_columns
+    from backend.services.vectorized_builtins import concat_batches
+
+    ops = load_builtin_operators()
+
+    def call(name: str, batch: Dict[str, List[Any]], **parameters) -> Dict[str, List[Any]]:
+        return ops[name].call_columnar(batch, parameters)
+
+    source = SyntheticSource.default(rows, key_cardinality=key_cardinality, skew=skew)
+    records = source.records()
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+    column_batches = [records_to_columns(batch) for batch in batches]
+
+    dimension = SyntheticSource.default(key_cardinality, extra_columns=0, seed=7).records()
+    dimension_index = {row["id"]: {"dim_category": row["category"], "dim_amount": row["amount"]} for row in dimension}
+
+    field_mapping = {"id": "record_id", "key": "customer_key", "amount": "total", "category": "segment"}
+
+    def streaming(operator: Callable[[Any], Any], inputs: List[Any]) -> Callable[[Callable[[], None]], None]:
+        def run_once(mark):
+            for batch in inputs:
+                operator(batch)
+                mark()
+        return run_once
+
+    def blocking(operator: Callable[[Dict[str, List[Any]]], Any]) -> Callable[[Callable[[], None]], None]:
+        def run_once(mark):
+            operator(concat_batches(column_batches))
+            mark()
+        return run_once
+
+    writer = DestinationWriter(database_url)
+
+    def end_to_end(mark):
+        mapped = []
+        for batch in column_batches:
+            filtered = call("filter_null_values", batch, fields=["amount"])
+            writer.write(columns_to_records(filtered))
+            mapped.append(call("map_fields", filtered, field_mapping={"key": "key", "amount": "amount"}))
+            mark()
+        call("aggregate_sum", concat_batches(mapped), group_by=["key"], sum_field="amount")
+        mark()
+
+    scenarios: Dict[str, Dict[str, Any]] = {
+        "filter": {"run_once": streaming(
+            lambda b: call("filter_null_values", b, fields=["amount", "col_0"]), column_batches
+        )},
+        "map": {"run_once": streaming(lambda b: call("map_fields", b, field_mapping=field_mapping), column_batches)},
+        "aggregate": {"run_once": blocking(lambda b: call("aggregate_sum", b, group_by=["key"], sum_field="id"))},
+        "join": {"run_once": streaming(lambda b: hash_join(b, dimension_index, "key"), batches)},
+        "sort": {"run_once": blocking(lambda b: call("sort_records", b, sort_by="id", reverse=True))},
+        "deduplicate": {"run_once": blocking(lambda b: call("deduplicate", b, unique_fields=["key", "category"]))},
+        "destination_write": {"run_once": streaming(writer.write, batches), "setup": writer.reset},
+        "end_to_end": {"run_once": end_to_end, "setup": writer.reset},
+    }
+
+    results = []
+    try:
+        for name, scenario in scenarios.items():
+            if only and name not in only:
+                continue
+            results.append(run_scenario(
+                name,
+                rows,
+                scenario["run_once"],
+                repeats=repeats,
+                setup=scenario.get("setup"),
+            ))
+    finally:
+        writer.close()
+
+    return results
@@ -0,0 +1,123 @@
+"""
+Synthetic Data Sources for Pipeline Benchmarks
+Deterministic generators with configurable rows, columns, types, key cardinality and skew
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional
+import random
+import string
+
+SUPPORTED_TYPES = ("int", "float", "str", "bool", "datetime")
+
+EPOCH = datetime(2024, 1, 1)
+
+
+@dataclass
+class ColumnSpec:
+    """A generated column"""
+    name: str
+    type: str = "int"
+    null_fraction: float = 0.0
+    # Distinct values for key-like columns; None means unbounded
+    cardinality: Optional[int] = None
+    # Zipf exponent over the key domain; 0 gives a uniform distribution
+    skew: float = 0.0
+    str_length: int = 12
+
+    def __post_init__(self):
+        if self.type not in SUPPORTED_TYPES:
+            raise ValueError(f"Unsupported column type '{self.type}', expected one of {SUPPORTED_TYPES}")
+
+
+@dataclass
+class SyntheticSource:
+    """
+    Deterministic synthetic table.
+
+    The same seed always yields the same rows, so benchmark runs on
+    different machines process identical data.
+    """
+    rows: int
+    columns: List[ColumnSpec] = field(default_factory=list)
+    seed: int = 42
+
+    @classmethod
+    def default(
+        cls,
+        rows: int,
+        key_cardinality: int = 1000,
+        skew: float = 0.0,
+        extra_columns: int = 4,
+        null_fraction: float = 0.05,
+        seed: int = 42
+    ) -> "SyntheticSource":
+        """A fact-table shape: id, skewed key, numeric amount, category and filler columns"""
+        columns = [
+            ColumnSpec("id", "int"),
+            ColumnSpec("key", "int", cardinality=key_cardinality, skew=skew),
+            ColumnSpec("amount", "float", null_fraction=null_fraction),
+            ColumnSpec("category", "str", cardinality=50, str_length=8),
+            ColumnSpec("created_at", "datetime"),
+        ]
+        filler_types = ["str", "int", "float", "bool"]
+        for i in range(extra_columns):
+            columns.append(ColumnSpec(f"col_{i}", filler_types[i % len(filler_types)], null_fraction=null_fraction))
+        return cls(rows=rows, columns=columns, seed=seed)
+
+    def _column_values(self, spec: ColumnSpec, rng: random.Random) -> List[Any]:
+        n = self.rows
+
+        if spec.name == "id":
+            values: List[Any] = list(range(n))
+        elif spec.cardinality:
+            domain = self._domain(spec, rng)
+            if spec.skew > 0:
+                weights = [1.0 / (rank ** spec.skew) for rank in range(1, spec.cardinality + 1)]
+                values = rng.choices(domain, cum_weights=list(accumulate(weights)), k=n)
+            else:
+                values = [domain[rng.randrange(spec.cardinality)] for _ in range(n)]
+        else:
+            values = [self._random_value(spec, rng) for _ in range(n)]
+
+        if spec.null_fraction > 0:
+            for i in range(n):
+                if rng.random() < spec.null_fraction:
+                    values[i] = None
+        return values
+
+    def _domain(self, spec: ColumnSpec, rng: random.Random) -> List[Any]:
+        if spec.type == "int":
+            return list(range(spec.cardinality))
+        return [self._random_value(spec, rng) for _ in range(spec.cardinality)]
+
+    @staticmethod
+    def _random_value(spec: ColumnSpec, rng: random.Random) -> Any:
+        if spec.type == "int":
+            return rng.randrange(1_000_000)
+        if spec.type == "float":
+            return round(rng.uniform(0, 10_000), 2)
+        if spec.type == "bool":
+            return rng.random() < 0.5
+        if spec.type == "datetime":
+            return EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        return "".join(rng.choices(string.ascii_letters, k=spec.str_length))
+
+    def columns_data(self) -> Dict[str, List[Any]]:
+        """Generate the whole table in columnar form"""
+        rng = random.Random(self.seed)
+        return {spec.name: self._column_values(spec, rng) for spec in self.columns}
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Generate the whole table as a list of records"""
+        data = self.columns_data()
+        names = list(data)
+        return [dict(zip(names, row)) for row in zip(*data.values())]
+
+    def batches(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the table as record batches"""
+        records = self.records()
+        for start in range(0, len(records), batch_size):
+            yield records[start:start + batch_size]
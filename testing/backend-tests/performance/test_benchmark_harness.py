@@ -0,0 +1,108 @@
+"""
+Tests for the Pipeline Engine Benchmark Harness
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Synthetic source determinism, cardinality and skew
+- Percentile calculation
+- Baseline regression detection
+- Smoke run of every scenario on a small dataset
+- Smoke run of the cache codec comparison
+"""
+
+from collections import Counter
+
+import pytest
+
+from bench_harness import build_report, compare_to_baseline, percentile
+from cache_codec_benchmark import build_payloads, run_codec_benchmarks
+from scenarios import run_all
+from synthetic_source import ColumnSpec, SyntheticSource
+
+
+class TestSyntheticSource:
+    """Test synthetic data generation"""
+
+    def test_deterministic_for_same_seed(self):
+        a = SyntheticSource.default(500, seed=3).records()
+        b = SyntheticSource.default(500, seed=3).records()
+
+        assert a == b
+        assert len(a) == 500
+
+    def test_key_cardinality(self):
+        source = SyntheticSource(rows=5000, columns=[ColumnSpec("key", "int", cardinality=20)])
+        keys = set(source.columns_data()["key"])
+
+        assert keys <= set(range(20))
+        assert len(keys) == 20
+
+    def test_skew_concentrates_hot_keys(self):
+        uniform = SyntheticSource(rows=10000, columns=[ColumnSpec("key", "int", cardinality=100)])
+        skewed = SyntheticSource(rows=10000, columns=[ColumnSpec("key", "int", cardinality=100, skew=1.5)])
+
+        top_uniform = Counter(uniform.columns_data()["key"]).most_common(1)[0][1]
+        top_skewed = Counter(skewed.columns_data()["key"]).most_common(1)[0][1]
+
+        assert top_skewed > top_uniform * 5
+
+    def test_null_fraction(self):
+        source = SyntheticSource(rows=10000, columns=[ColumnSpec("amount", "float", null_fraction=0.2)])
+        nulls = sum(v is None for v in source.columns_data()["amount"])
+
+        assert 1500 < nulls < 2500
+
+    def test_batches(self):
+        batches = list(SyntheticSource.default(250).batches(100))
+
+        assert [len(b) for b in batches] == [100, 100, 50]
+
+    def test_rejects_unknown_type(self):
+        with pytest.raises(ValueError):
+            ColumnSpec("bad", "decimal")
+
+
+class TestHarness:
+    """Test measurement helpers and the regression gate"""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile([], 95) == 0.0
+
+    def test_compare_to_baseline_flags_regressions(self):
+        baseline = {"scenarios": {"filter": {"rows_per_sec": 1000, "latency_p95_ms": 10, "peak_rss_delta_bytes": 0}}}
+        report = {"scenarios": {"filter": {"rows_per_sec": 600, "latency_p95_ms": 20, "peak_rss_delta_bytes": 1024}}}
+
+        regressions = compare_to_baseline(report, baseline, tolerance=0.3)
+
+        assert {r["metric"] for r in regressions} == {"rows_per_sec", "latency_p95_ms"}
+
+    def test_compare_to_baseline_within_tolerance(self):
+        baseline = {"scenarios": {"sort": {"rows_per_sec": 1000, "latency_p95_ms": 10}}}
+        report = {"scenarios": {"sort": {"rows_per_sec": 800, "latency_p95_ms": 12}, "new": {"rows_per_sec": 1}}}
+
+        assert compare_to_baseline(report, baseline, tolerance=0.3) == []
+
+
+def test_all_scenarios_smoke():
+    results = run_all(rows=2000, batch_size=500, repeats=1, key_cardinality=50)
+    report = build_report(results, {"rows": 2000})
+
+    assert set(report["scenarios"]) == {
+        "filter", "map", "aggregate", "join", "sort", "deduplicate", "destination_write", "end_to_end"
+    }
+    for metrics in report["scenarios"].values():
+        assert metrics["rows_per_sec"] > 0
+        assert metrics["peak_rss_bytes"] > 0
+
+
+def test_cache_codec_benchmark_smoke():
+    results = run_codec_benchmarks(repeats=2, compress_min_bytes=1024)
+
+    for payload in build_payloads():
+        assert f"{payload}/legacy-json" in results and f"{payload}/json+zlib" in results
+    assert results["pipeline_runs/json+zlib"]["bytes"] < results["pipeline_runs/json"]["bytes"]
+    assert all(metrics["encode_p50_us"] > 0 and metrics["decode_p50_us"] > 0 for metrics in results.values())
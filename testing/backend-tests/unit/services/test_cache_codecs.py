@@ -0,0 +1,147 @@
+"""
+Unit Tests for Cache Codecs
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Round trips of datetime, date, Decimal and UUID values with every codec
+- Compression of values above the size threshold
+- Decoding values written by other codecs and legacy plain JSON
+- Codec selection
+"""
+
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import PurePosixPath
+
+import pytest
+
+from backend.services import cache_codecs
+from backend.services.cache_codecs import (
+    FLAG_COMPRESSED,
+    CacheCodecError,
+    CacheSerializer,
+    JsonCodec,
+    MsgpackCodec,
+    OrjsonCodec,
+    available_codecs,
+    get_codec,
+)
+
+RUN_ID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+VALUE = {
+    "started_at": datetime(2024, 3, 4, 5, 6, 7, 890000),
+    "finished_at": datetime(2024, 3, 4, 6, 0, tzinfo=timezone.utc),
+    "day": date(2024, 3, 4),
+    "cost": Decimal("12.3400"),
+    "run_id": RUN_ID,
+    "rows": [{"id": i, "name": f"row {i}", "ratio": i / 7} for i in range(3)],
+    "nested": {"$type": "not a tag", "items": [None, True, "text"]},
+}
+
+
+@pytest.fixture(params=list(available_codecs()))
+def codec(request):
+    return get_codec(request.param)
+
+
+class TestRoundTrips:
+    """Test typed values surviving a round trip"""
+
+    def test_types_survive(self, codec):
+        serializer = CacheSerializer(codec, compress_min_bytes=0)
+        decoded = serializer.loads(serializer.dumps(VALUE))
+
+        expected = dict(VALUE)
+        if isinstance(codec, OrjsonCodec):
+            # orjson writes UUIDs natively, as strings
+            expected["run_id"] = str(RUN_ID)
+        assert decoded == expected
+        assert decoded["started_at"].tzinfo is None
+        assert decoded["finished_at"].tzinfo == timezone.utc
+        assert str(decoded["cost"]) == "12.3400"
+
+    def test_unknown_types_stored_as_strings(self, codec):
+        serializer = CacheSerializer(codec)
+
+        assert serializer.loads(serializer.dumps({"path": PurePosixPath("/a/b")})) == {"path": "/a/b"}
+
+    def test_json_codecs_share_a_format(self):
+        pytest.importorskip("orjson")
+        written = CacheSerializer(JsonCodec()).dumps({"when": date(2024, 1, 2)})
+
+        assert CacheSerializer(OrjsonCodec()).loads(written) == {"when": date(2024, 1, 2)}
+
+
+class TestCompression:
+    """Test compression of large values"""
+
+    def test_large_values_compressed(self, codec):
+        serializer = CacheSerializer(codec, compress_min_bytes=1024)
+        value = [{"date": f"2024-01-{i % 28 + 1:02d}", "records": i} for i in range(500)]
+
+        small = serializer.dumps(value[:2])
+        large = serializer.dumps(value)
+
+        assert not small[1] & FLAG_COMPRESSED
+        assert large[1] & FLAG_COMPRESSED
+        assert len(large) < len(codec.encode(value)) / 3
+        assert serializer.loads(large) == value
+
+    def test_incompressible_values_stored_plain(self):
+        serializer = CacheSerializer(JsonCodec(), compress_min_bytes=16)
+        data = serializer.dumps("abcdefghijklmnopqrstuvwxyz")
+
+        assert not data[1] & FLAG_COMPRESSED
+
+    def test_corrupt_value(self):
+        serializer = CacheSerializer(JsonCodec(), compress_min_bytes=16)
+        data = bytearray(serializer.dumps(["x" * 100]))
+        data[10:20] = b"\x00" * 10
+
+        with pytest.raises(CacheCodecError):
+            serializer.loads(bytes(data))
+
+
+class TestCompatibility:
+    """Test reading values written by other codecs and versions"""
+
+    def test_legacy_json(self, codec):
+        serializer = CacheSerializer(codec)
+        legacy = json.dumps({"when": "2024-01-02", "count": 3}, default=str)
+
+        assert serializer.loads(legacy) == {"when": "2024-01-02", "count": 3}
+        assert serializer.loads(legacy.encode()) == {"when": "2024-01-02", "count": 3}
+
+    def test_every_format_readable(self):
+        pytest.importorskip("msgpack")
+        written = CacheSerializer(MsgpackCodec()).dumps(VALUE)
+
+        assert CacheSerializer(JsonCodec()).loads(written) == VALUE
+
+    def test_msgpack_value_without_msgpack(self, monkeypatch):
+        pytest.importorskip("msgpack")
+        written = CacheSerializer(MsgpackCodec()).dumps(1)
+        monkeypatch.setattr(cache_codecs, "msgpack", None)
+
+        with pytest.raises(CacheCodecError, match="msgpack"):
+            CacheSerializer(JsonCodec()).loads(written)
+
+
+class TestSelection:
+    """Test codec selection"""
+
+    def test_auto_falls_back_to_json(self, monkeypatch):
+        monkeypatch.setattr(cache_codecs, "msgpack", None)
+        monkeypatch.setattr(cache_codecs, "orjson", None)
+
+        assert isinstance(get_codec("auto"), JsonCodec)
+
+    def test_unavailable_or_unknown(self, monkeypatch):
+        monkeypatch.setattr(cache_codecs, "msgpack", None)
+
+        with pytest.raises(CacheCodecError, match="not installed"):
+            get_codec("msgpack")
+        with pytest.raises(CacheCodecError, match="Unknown"):
+            get_codec("pickle")
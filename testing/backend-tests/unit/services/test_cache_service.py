@@ -0,0 +1,525 @@
+"""
+Unit Tests for Cache Service
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- In-process L1 with LRU eviction, TTL and jittered expiry
+- Reads served from L1 without a Redis round trip
+- Cross-replica L1 invalidation over Redis pub/sub
+- Per-tier hit and miss statistics
+- get_or_compute: single-flight loads within and across processes,
+  stale-while-revalidate and probabilistic early refresh
+- Tag sets: batched invalidation, expiry and pruning of expired members
+- Deletes and invalidations racing reads in the same process
+"""
+
+import asyncio
+import json
+from datetime import date
+from fnmatch import fnmatchcase
+from unittest.mock import patch
+
+import pytest
+
+from backend.services import cache_service as cache_module
+from backend.services.cache_service import INVALIDATION_CHANNEL, CacheService, LocalCache
+
+
+class FakePubSub:
+    """Pub/sub subscription stand-in delivering FakeRedis.publish messages"""
+
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        return await self.queue.get()
+
+    async def close(self):
+        for queues in self.server.subscribers.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute"""
+
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.server.round_trips += 1
+        calls, self.calls = self.calls, []
+        return [await getattr(self.server, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeRedis:
+    """In-memory Redis stand-in shared by several CacheService instances"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.subscribers = {}
+        self.reads = 0
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.reads += 1
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl.total_seconds()
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, *args):
+        if script == cache_module._TAG_KEY_SCRIPT:
+            member, ttl, sample = args[numkeys:]
+            for tag_key in args[:numkeys]:
+                members = self.data.setdefault(tag_key, set())
+                members.difference_update(m for m in list(members)[:sample] if m not in self.data)
+                members.add(member)
+                self.ttls[tag_key] = max(self.ttls.get(tag_key, -1), ttl)
+            return numkeys
+        key, token = args
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def spop(self, key, count):
+        members = self.data.get(key, set())
+        popped = [members.pop() for _ in range(min(count, len(members)))]
+        if not members:
+            self.data.pop(key, None)
+        return [member.encode() for member in popped]
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatchcase(key, match):
+                yield key
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def close(self):
+        pass
+
+
+def service_on(server):
+    service = CacheService()
+    service._redis_client = server
+    return service
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestLocalCache:
+    """Test the in-process tier"""
+
+    def test_lru_eviction(self):
+        cache = LocalCache(max_entries=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+
+        assert cache.get("b") is cache_module._MISSING
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_jittered_expiry(self):
+        cache = LocalCache(jitter=0.5)
+        with patch.object(cache_module.time, "monotonic", return_value=1000.0), \
+                patch.object(cache_module.random, "random", return_value=1.0):
+            cache.set("key", "value", 10)
+
+        with patch.object(cache_module.time, "monotonic", return_value=1004.9):
+            assert cache.get("key") == "value"
+        with patch.object(cache_module.time, "monotonic", return_value=1005.0):
+            assert cache.get("key") is cache_module._MISSING
+        assert len(cache) == 0
+
+    def test_delete_pattern(self):
+        cache = LocalCache()
+        for key in ("query:a:1", "query:b:1", "api:a:1"):
+            cache.set(key, 1, 60)
+
+        assert cache.delete_pattern("query:*") == 2
+        assert cache.get("api:a:1") == 1
+
+    def test_disabled(self):
+        cache = LocalCache(max_entries=0)
+        cache.set("key", 1, 60)
+
+        assert len(cache) == 0
+
+
+class TestTwoTierCache:
+    """Test L1 in front of Redis"""
+
+    @pytest.mark.asyncio
+    async def test_hot_reads_skip_redis(self):
+        server = FakeRedis()
+        server.data["stats"] = json.dumps({"pipelines": 3})
+        service = service_on(server)
+
+        values = [await service.get("stats") for _ in range(100)]
+
+        assert values[-1] == {"pipelines": 3}
+        assert server.reads == 1
+        tiers = service._tier_stats()
+        assert tiers["memory"]["hits"] == 99 and tiers["memory"]["misses"] == 1
+        assert tiers["redis"] == {"hits": 1, "misses": 0}
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_set_stores_what_redis_returns(self):
+        server = FakeRedis()
+        service = service_on(server)
+        await service.set("key", {"when": date(2024, 1, 2), "pair": (1, 2)})
+
+        assert service.local.get("key") == {"when": date(2024, 1, 2), "pair": [1, 2]}
+        service.local.clear()
+        assert await service.get("key") == {"when": date(2024, 1, 2), "pair": [1, 2]}
+        assert isinstance(server.data["key"], bytes)
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_other_replicas(self):
+        server = FakeRedis()
+        first, second = service_on(server), service_on(server)
+        for service in (first, second):
+            await service.get_redis()
+        await settle()
+        query_key = first._generate_cache_key("query:stats", day=1)
+        await first.set("api:dashboard:1", {"v": 1})
+        await first.cache_query_result("stats", {"v": 1}, day=1)
+        await settle()
+        await second.get("api:dashboard:1")
+        await second.get_cached_query("stats", day=1)
+        assert len(second.local) == 2
+
+        await first.set("api:dashboard:1", {"v": 2})
+        await settle()
+        assert await second.get("api:dashboard:1") == {"v": 2}
+
+        assert await first.invalidate_query_cache("stats") == 1
+        await settle()
+        assert second.local.get(query_key) is cache_module._MISSING
+        assert await second.get_cached_query("stats", day=1) is None
+
+        await first.delete("api:dashboard:1")
+        await settle()
+        assert await second.get("api:dashboard:1") is None
+        await first.close()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_own_messages_ignored(self):
+        service = service_on(FakeRedis())
+        service.local.set("key", 1, 60)
+
+        service._apply_invalidation(json.dumps({"origin": service.instance_id, "keys": ["key"]}))
+        assert service.local.get("key") == 1
+
+        service._apply_invalidation(json.dumps({"origin": "other", "keys": [], "pattern": "k*"}))
+        assert service.local.get("key") is cache_module._MISSING
+
+    @pytest.mark.asyncio
+    async def test_listener_clears_local_tier_on_subscribe(self):
+        server = FakeRedis()
+        service = service_on(server)
+        service.local.set("key", 1, 60)
+
+        await service.get_redis()
+        await settle()
+
+        assert len(service.local) == 0
+        assert len(server.subscribers[INVALIDATION_CHANNEL]) == 1
+        await service.close()
+
+
+class TestGetOrCompute:
+    """Test single-flight loads and stale-while-revalidate"""
+
+    @staticmethod
+    def counting_loader(calls, value="value", delay=0.01):
+        async def loader():
+            calls.append(value)
+            await asyncio.sleep(delay)
+            return value
+        return loader
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        server = FakeRedis()
+        service = service_on(server)
+        calls = []
+
+        values = await asyncio.gather(*(
+            service.get_or_compute("key", self.counting_loader(calls), ttl=60) for _ in range(20)
+        ))
+
+        assert values == ["value"] * 20
+        assert len(calls) == 1
+        assert "lock:key" not in server.data
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_processes_share_one_load(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "LOCK_POLL_INTERVAL", 0.005)
+        server = FakeRedis()
+        first, second = service_on(server), service_on(server)
+        calls = []
+
+        values = await asyncio.gather(
+            first.get_or_compute("key", self.counting_loader(calls, delay=0.05), ttl=60),
+            second.get_or_compute("key", self.counting_loader(calls, delay=0.05), ttl=60)
+        )
+
+        assert values == ["value", "value"]
+        assert len(calls) == 1
+        await first.close()
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, monkeypatch):
+        service = service_on(FakeRedis())
+        clock = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+        calls = []
+        await service.get_or_compute("key", self.counting_loader(calls, "old"), ttl=60, stale_ttl=300, beta=0)
+
+        clock[0] += 100
+        value = await service.get_or_compute("key", self.counting_loader(calls, "new"), ttl=60, stale_ttl=300, beta=0)
+        assert value == "old"
+        await asyncio.sleep(0.05)
+
+        assert await service.get_or_compute("key", self.counting_loader(calls, "newer"), ttl=60, beta=0) == "new"
+        assert calls == ["old", "new"]
+
+        clock[0] += 1000
+        service.local.clear()
+        assert await service.get_or_compute("key", self.counting_loader(calls, "newest"), ttl=60, beta=0) == "newest"
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_near_expiry(self, monkeypatch):
+        service = service_on(FakeRedis())
+        clock = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+        calls = []
+        await service.get_or_compute("key", self.counting_loader(calls, "old"), ttl=60)
+
+        clock[0] += 30
+        monkeypatch.setattr(cache_module.random, "random", lambda: 0.999999)
+        assert await service.get_or_compute("key", self.counting_loader(calls, "mid"), ttl=60) == "old"
+        # Close to expiry, a draw in the tail refreshes ahead of time
+        clock[0] += 29.99
+        assert await service.get_or_compute("key", self.counting_loader(calls, "new"), ttl=60) == "old"
+        await asyncio.sleep(0.05)
+
+        assert calls == ["old", "new"]
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_refresh_skipped_while_another_process_holds_lock(self, monkeypatch):
+        server = FakeRedis()
+        service = service_on(server)
+        clock = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+        calls = []
+        await service.get_or_compute("key", self.counting_loader(calls, "old"), ttl=60, stale_ttl=300, beta=0)
+        server.data["lock:key"] = "other-process"
+
+        clock[0] += 100
+        assert await service.get_or_compute("key", self.counting_loader(calls, "new"), ttl=60, stale_ttl=300) == "old"
+        await asyncio.sleep(0.05)
+
+        assert calls == ["old"]
+        assert server.data["lock:key"] == "other-process"
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_loader_error_reaches_every_waiter(self):
+        server = FakeRedis()
+        service = service_on(server)
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("query failed")
+
+        results = await asyncio.gather(
+            *(service.get_or_compute("key", failing, ttl=60) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(calls) == 1
+        assert "lock:key" not in server.data and "key" not in server.data
+        await service.close()
+
+
+class TestTags:
+    """Test tag-based invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_invalidation_deletes_members_in_batches(self):
+        server = FakeRedis()
+        service = service_on(server)
+        service.tag_batch_size = 3
+        for i in range(7):
+            await service.set(f"runs:{i}", i, tags=["pipeline:42"])
+        await service.set("summary", 1, tags=["pipeline:42", "analytics"])
+        await service.set("trends", 1, tags=["analytics"])
+        server.round_trips = 0
+
+        with patch.object(server, "scan_iter", side_effect=AssertionError("keyspace scanned")):
+            deleted = await service.invalidate_tags("pipeline:42")
+
+        assert deleted == 8
+        # Three batches popped, each unlinked in the round trip that pops the next
+        assert server.round_trips == 4
+        assert set(server.data) == {"trends", "tag:analytics"}
+        assert service.local.get("runs:0") is cache_module._MISSING
+        assert service.local.get("trends") == 1
+        assert await service.invalidate_tags("pipeline:42", "missing") == 0
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_tag_sets_outlive_their_longest_key(self):
+        server = FakeRedis()
+        service = service_on(server)
+
+        await service.set("a", 1, ttl=60, tags=["analytics"])
+        await service.set("b", 1, ttl=600, tags=["analytics"])
+        await service.set("c", 1, ttl=30, tags=["analytics"])
+
+        assert server.ttls["tag:analytics"] == 600
+        assert server.data["tag:analytics"] == {"a", "b", "c"}
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_members_pruned(self):
+        server = FakeRedis()
+        service = service_on(server)
+        await service.set("old", 1, tags=["analytics"])
+        # Expired in Redis
+        del server.data["old"]
+
+        await service.set("new", 1, tags=["analytics"])
+
+        assert server.data["tag:analytics"] == {"new"}
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_api_invalidation_reaches_computed_entries(self):
+        server = FakeRedis()
+        service = service_on(server)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return len(calls)
+
+        tags = ("api", "api:dashboard")
+        assert await service.get_or_compute("api:dashboard:stats", loader, ttl=60, tags=tags) == 1
+        await service.cache_api_response("pipelines", [1, 2], page=1)
+
+        assert await service.invalidate_api_cache("dashboard") == 1
+        assert await service.get_cached_response("pipelines", page=1) == [1, 2]
+        assert await service.get_or_compute("api:dashboard:stats", loader, ttl=60, tags=tags) == 2
+        assert await service.invalidate_api_cache() == 2
+        await service.close()
+
+
+class TestInvalidationRaces:
+    """Test that a get racing a delete cannot keep the old value in L1"""
+
+    def racing_get(self, server, service, key):
+        """Make the server run a get for `key` just before it deletes"""
+        delete = server.delete
+
+        async def delete_after_get(*keys):
+            if key in keys:
+                assert await service.get(key) is not None
+            return await delete(*keys)
+        return delete_after_get
+
+    @pytest.mark.asyncio
+    async def test_delete(self):
+        server = FakeRedis()
+        service = service_on(server)
+        await service.set("stats", {"v": 1})
+        server.delete = self.racing_get(server, service, "stats")
+
+        await service.delete("stats")
+
+        assert service.local.get("stats") is cache_module._MISSING
+        assert await service.get("stats") is None
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_delete_pattern(self):
+        server = FakeRedis()
+        service = service_on(server)
+        await service.set("api:stats", {"v": 1})
+        server.unlink = self.racing_get(server, service, "api:stats")
+
+        await service.delete_pattern("api:*")
+
+        assert service.local.get("api:stats") is cache_module._MISSING
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags(self):
+        server = FakeRedis()
+        service = service_on(server)
+        await service.set("stats", {"v": 1}, tags=["analytics"])
+        server.unlink = self.racing_get(server, service, "stats")
+
+        assert await service.invalidate_tags("analytics") == 1
+
+        assert service.local.get("stats") is cache_module._MISSING
+        assert await service.get("stats") is None
+        await service.close()
@@ -0,0 +1,230 @@
+"""
+Unit Tests for Cooperative Cancellation
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Cancellation token signalling
+- Interrupting in-flight awaitables
+- Releasing cleanups, temp files and worker processes
+- Cancelling a running visual pipeline execution
+- Cancelling a pipeline run from another process, up to its last batch
+"""
+
+import asyncio
+import subprocess
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from backend.schemas.pipeline_visual import (
+    NodePosition,
+    NodeType,
+    PipelineEdge,
+    PipelineNode,
+    VisualPipelineDefinition,
+)
+from backend.services.cancellation_service import (
+    CancellationService,
+    CancellationToken,
+    PipelineCancelledError,
+)
+from backend.services.pipeline_execution_engine import (
+    ExecutionStatus,
+    PipelineExecutionEngine,
+)
+from backend.services.pipeline_executor import PipelineExecutor
+
+
+class TestCancellationToken:
+    """Test CancellationToken class"""
+
+    def test_cancel_sets_reason(self):
+        token = CancellationToken("run:1")
+
+        assert token.is_cancelled is False
+        assert token.cancel("stop") is True
+        assert token.is_cancelled is True
+        assert token.reason == "stop"
+        assert token.cancel("again") is False
+
+    def test_raise_if_cancelled(self):
+        token = CancellationToken("run:1")
+        token.raise_if_cancelled()
+
+        token.cancel()
+        with pytest.raises(PipelineCancelledError):
+            token.raise_if_cancelled()
+
+    @pytest.mark.asyncio
+    async def test_run_interrupts_in_flight_awaitable(self):
+        token = CancellationToken("run:1")
+        asyncio.get_running_loop().call_later(0.05, token.cancel, "stop")
+
+        with pytest.raises(PipelineCancelledError):
+            await asyncio.wait_for(token.run(asyncio.sleep(10)), timeout=2)
+
+    @pytest.mark.asyncio
+    async def test_iterate_stops_source_cursor(self):
+        token = CancellationToken("run:1")
+        seen = []
+
+        with pytest.raises(PipelineCancelledError):
+            async for item in token.iterate(range(100)):
+                seen.append(item)
+                if item == 4:
+                    token.cancel()
+
+        assert seen == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_release_resources_runs_cleanups_and_removes_temp_files(self, tmp_path):
+        token = CancellationToken("run:1")
+        temp_file = tmp_path / "spill.bin"
+        temp_file.write_bytes(b"data")
+        closed = []
+
+        async def close_client():
+            closed.append("client")
+
+        token.register_cleanup(lambda: closed.append("connection"), name="connection")
+        token.register_cleanup(close_client, name="client")
+        token.track_temp_path(temp_file)
+
+        token.cancel()
+        summary = await token.release_resources(timeout=1)
+
+        assert closed == ["client", "connection"]
+        assert not temp_file.exists()
+        assert summary["timed_out"] is False
+        assert summary["failed"] == []
+
+    @pytest.mark.asyncio
+    async def test_release_resources_is_bounded(self):
+        token = CancellationToken("run:1")
+        token.register_cleanup(lambda: asyncio.sleep(10), name="slow")
+
+        summary = await token.release_resources(timeout=0.1)
+
+        assert summary["timed_out"] is True
+
+    @pytest.mark.asyncio
+    async def test_cancel_terminates_worker_process(self):
+        token = CancellationToken("run:1")
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        token.track_process(process)
+
+        token.cancel()
+        await token.release_resources(timeout=5)
+
+        assert process.poll() is not None
+
+
+class TestCancellationService:
+    """Test CancellationService registry"""
+
+    def test_cancel_registered_token(self):
+        service = CancellationService()
+        token = service.create_token("run:7")
+
+        assert service.cancel("run:7") is True
+        assert token.is_cancelled is True
+        assert service.cancel("run:8") is False
+
+    def test_release_only_removes_matching_token(self):
+        service = CancellationService()
+        old_token = service.create_token("run:7")
+        new_token = service.create_token("run:7")
+
+        service.release("run:7", old_token)
+        assert service.get_token("run:7") is new_token
+
+        service.release("run:7", new_token)
+        assert service.get_token("run:7") is None
+
+
+class TestPipelineExecutionCancellation:
+    """Test cancelling a running visual pipeline"""
+
+    @pytest.fixture
+    def definition(self):
+        nodes = [
+            PipelineNode(id="source1", type=NodeType.DATABASE_SOURCE, position=NodePosition(x=0, y=0)),
+            PipelineNode(id="filter1", type=NodeType.FILTER, position=NodePosition(x=100, y=0)),
+            PipelineNode(id="dest1", type=NodeType.DATABASE_DESTINATION, position=NodePosition(x=200, y=0)),
+        ]
+        edges = [
+            PipelineEdge(id="e1", source="source1", target="filter1"),
+            PipelineEdge(id="e2", source="filter1", target="dest1"),
+        ]
+        return VisualPipelineDefinition(nodes=nodes, edges=edges)
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_execution_and_persists_checkpoint(self, definition, tmp_path):
+        engine = PipelineExecutionEngine()
+
+        async def slow_node(state, node):
+            if node.id == "filter1":
+                await asyncio.sleep(10)
+            return 10
+
+        with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                patch('backend.services.pipeline_execution_engine.settings') as mock_settings, \
+                patch.object(engine, "_execute_node", side_effect=slow_node):
+            mock_realtime.broadcast_pipeline_status = AsyncMock()
+            mock_realtime.broadcast_pipeline_progress = AsyncMock()
+            mock_settings.temp_files_dir = tmp_path
+
+            task = asyncio.create_task(engine.execute_pipeline(pipeline_id=42, definition=definition))
+            while not (engine.get_execution_state(42) and engine.get_execution_state(42).current_step == 2):
+                await asyncio.sleep(0.01)
+
+            assert engine.cancel_execution(42) is True
+            state = await asyncio.wait_for(task, timeout=2)
+
+        assert state.status == ExecutionStatus.CANCELLED
+        assert state.checkpoint["completed_node_ids"] == ["source1"]
+        assert state.steps[-1].status == "cancelled"
+        assert (tmp_path / "checkpoints" / "pipeline_42.json").exists()
+        assert engine.get_execution_state(42) is None
+
+    def test_cancel_unknown_execution(self):
+        engine = PipelineExecutionEngine()
+        assert engine.cancel_execution(999) is False
+
+
+class TestPipelineRunCancellation:
+    """Test cancelling a pipeline run from another process"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_seen_on_last_batch_is_kept(self):
+        statuses = []
+        batches = 0
+
+        async def update(db, db_obj, obj_in):
+            nonlocal batches
+            changes = obj_in.model_dump(exclude_unset=True)
+            if "status" in changes:
+                statuses.append(changes["status"])
+            else:
+                batches += 1
+                # Another process cancels the run while its tenth and last batch is processed
+                if batches == 10:
+                    changes["status"] = "cancelled"
+            for name, value in changes.items():
+                setattr(db_obj, name, value)
+            return db_obj
+
+        run = SimpleNamespace(id=5, status="running", checkpoint=None, completed_at=None, error_message=None)
+        pipeline = SimpleNamespace(id=3, is_active=True)
+        with patch("backend.services.pipeline_executor.crud_pipeline.get", new_callable=AsyncMock, return_value=pipeline), \
+                patch("backend.services.pipeline_executor.crud_pipeline_run.create", new_callable=AsyncMock, return_value=run), \
+                patch("backend.services.pipeline_executor.crud_pipeline_run.update", side_effect=update), \
+                patch("backend.services.pipeline_executor.asyncio.sleep", new_callable=AsyncMock):
+            result = await PipelineExecutor(Mock(commit=AsyncMock())).execute_pipeline(3)
+
+        assert batches == 10
+        assert statuses == ["cancelled"]
+        assert result.status == "cancelled"
+        assert result.checkpoint["batches_completed"] == 10
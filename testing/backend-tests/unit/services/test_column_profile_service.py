@@ -0,0 +1,296 @@
+"""
+Unit Tests for the Column Profile Service
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- HyperLogLog, t-digest, top-K and length histogram sketches and their merges
+- Column and table profiles from batches, files and source tables
+- Storing profiles and serving the latest one per source
+- Using only profiles of sources the pipeline owner may read
+- Cardinality estimates for the pipeline planner
+"""
+
+from contextlib import asynccontextmanager
+import importlib
+import json
+import pkgutil
+import random
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.models
+from backend.models.schema_mapping import DataProfile
+from backend.schemas.pipeline_visual import PipelineNode
+from backend.services.column_profile_service import (
+    ColumnProfileService,
+    HyperLogLog,
+    LengthHistogram,
+    TableProfiler,
+    TDigest,
+    TopK,
+    estimate_distinct,
+    profile_file,
+    profile_table,
+    table_source_ref,
+)
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine, PipelineExecutionState
+
+for module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{module.name}")
+
+
+def columns_by_name(profile):
+    return {column["name"]: column for column in profile["columns"]}
+
+
+class TestSketches:
+    """Test the mergeable sketches"""
+
+    def test_hyperloglog_accuracy_and_merge(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        first.add(range(60000))
+        second.add(range(40000, 100000))
+
+        assert abs(first.estimate() - 60000) / 60000 < 0.05
+        first.merge(second)
+        assert abs(first.estimate() - 100000) / 100000 < 0.05
+
+        small = HyperLogLog()
+        small.add(["a", "b", "c", "a"])
+        assert small.estimate() == 3
+
+    def test_tdigest_quantiles_and_merge(self):
+        values = np.random.default_rng(7).lognormal(size=50000)
+        digest, left, right = TDigest(), TDigest(), TDigest()
+        digest.add(values)
+        left.add(values[:20000])
+        right.add(values[20000:])
+        left.merge(right)
+
+        for q in (0.01, 0.5, 0.99):
+            expected = np.quantile(values, q)
+            assert abs(digest.quantile(q) - expected) / expected < 0.02
+            assert abs(left.quantile(q) - expected) / expected < 0.02
+        assert len(digest.means) <= digest.compression + 1
+        assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+
+    def test_top_k_keeps_heavy_hitters(self):
+        rng = random.Random(3)
+        stream = ["hot"] * 3000 + ["warm"] * 1000 + [f"cold{rng.randint(0, 50000)}" for _ in range(20000)]
+        rng.shuffle(stream)
+        first, second = TopK(k=3), TopK(k=3)
+        for chunk in range(0, 12000, 1000):
+            first.add_counts({v: stream[chunk:chunk + 1000].count(v) for v in set(stream[chunk:chunk + 1000])})
+        for chunk in range(12000, len(stream), 1000):
+            second.add_counts({v: stream[chunk:chunk + 1000].count(v) for v in set(stream[chunk:chunk + 1000])})
+        first.merge(second)
+
+        top = first.top()
+        assert [value for value, _ in top[:2]] == ["hot", "warm"]
+        assert 3000 - first.error_bound <= top[0][1] <= 3000
+
+    def test_length_histogram(self):
+        histogram = LengthHistogram()
+        histogram.add([0, 1, 3, 4, 100])
+
+        assert histogram.buckets() == [
+            {"min_length": 0, "max_length": 0, "count": 1},
+            {"min_length": 1, "max_length": 1, "count": 1},
+            {"min_length": 2, "max_length": 3, "count": 1},
+            {"min_length": 4, "max_length": 7, "count": 1},
+            {"min_length": 64, "max_length": 127, "count": 1},
+        ]
+        assert (histogram.min_length, histogram.max_length) == (0, 100)
+
+
+class TestTableProfiler:
+    """Test column and table profiles"""
+
+    def test_profiles_text_columns(self):
+        profiler = TableProfiler()
+        profiler.update({"id": [str(i) for i in range(1000)], "city": ["Oslo"] * 900 + ["Rome"] * 99 + [""]})
+        profiler.update({"id": [str(i) for i in range(1000, 1500)], "note": ["x"] * 500})
+
+        columns = columns_by_name(profiler.to_dict())
+        assert columns["id"]["data_type"] == "integer"
+        assert columns["id"]["is_candidate_key"] is True
+        assert columns["id"]["min"] == 0 and columns["id"]["max"] == 1499
+        assert columns["id"]["quantiles"]["p50"] == pytest.approx(750, rel=0.02)
+        assert columns["city"]["null_count"] == 501
+        assert columns["city"]["distinct_estimate"] == 2
+        assert columns["city"]["top_values"][0] == {"value": "Oslo", "count": 900}
+        assert columns["city"]["is_candidate_key"] is False
+        assert columns["note"]["null_count"] == 1000
+        assert columns["city"]["length_histogram"] == [{"min_length": 4, "max_length": 7, "count": 999}]
+
+    def test_state_round_trip_and_merge(self):
+        first, second = TableProfiler(), TableProfiler()
+        first.update({"n": [str(i) for i in range(100)]})
+        second.update({"n": ["1.5", "2.5"], "extra": ["a", "b"]})
+
+        restored = TableProfiler.from_state(json.loads(json.dumps(first.to_state())))
+        restored.merge(TableProfiler.from_state(json.loads(json.dumps(second.to_state()))))
+
+        columns = columns_by_name(restored.to_dict())
+        assert restored.row_count == 102
+        assert columns["n"]["data_type"] == "float"
+        assert abs(columns["n"]["distinct_estimate"] - 102) <= 3
+        assert columns["extra"]["null_count"] == 100
+
+    def test_profile_csv_and_json_files(self, tmp_path):
+        csv_path = tmp_path / "data.csv"
+        csv_path.write_text("id,score\n" + "\n".join(f"{i},{i % 7}" for i in range(3000)) + "\n3000\n")
+        json_path = tmp_path / "data.json"
+        json_path.write_text(json.dumps([{"id": i, "tags": ["a"] if i % 2 else None} for i in range(50)]))
+
+        csv_columns = columns_by_name(profile_file(str(csv_path), "csv", batch_size=512).to_dict())
+        json_columns = columns_by_name(profile_file(str(json_path), "json").to_dict())
+
+        assert csv_columns["score"]["distinct_estimate"] == 7
+        assert csv_columns["score"]["null_count"] == 1
+        assert csv_columns["id"]["row_count"] == 3001
+        assert json_columns["id"]["data_type"] == "integer"
+        assert json_columns["tags"]["data_type"] == "array"
+        assert json_columns["tags"]["null_rate"] == 0.5
+
+    def test_profile_source_table(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'source.db'}"
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT, total REAL)"))
+            conn.execute(
+                text("INSERT INTO orders (id, status, total) VALUES (:id, :status, :total)"),
+                [{"id": i, "status": ["new", "paid"][i % 2], "total": i * 1.25} for i in range(2500)]
+            )
+        engine.dispose()
+        reported = []
+
+        profile = profile_table(url, "orders", batch_size=1000, progress=lambda *args: reported.append(args)).to_dict()
+
+        columns = columns_by_name(profile)
+        assert profile["row_count"] == 2500
+        assert columns["status"]["distinct_estimate"] == 2
+        assert columns["total"]["data_type"] == "float"
+        assert columns["total"]["max"] == 2499 * 1.25
+        assert reported[-1] == (2500, 2500, 2500)
+
+
+@asynccontextmanager
+async def profile_session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(DataProfile.__table__.create)
+        # Only the ownership columns the access checks read
+        await conn.execute(text("CREATE TABLE file_uploads (id INTEGER PRIMARY KEY, user_id INTEGER)"))
+        await conn.execute(text("CREATE TABLE pipelines (id INTEGER PRIMARY KEY, owner_id INTEGER)"))
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)()
+    finally:
+        await engine.dispose()
+
+
+async def add_uploads(db, *owners):
+    """Uploads as (id, user_id) pairs"""
+    for upload_id, user_id in owners:
+        await db.execute(text("INSERT INTO file_uploads VALUES (:id, :user_id)"), {"id": upload_id, "user_id": user_id})
+
+
+def node(node_id, node_type, **config):
+    return PipelineNode(id=node_id, type=node_type, position={"x": 0, "y": 0}, config=config)
+
+
+class TestColumnProfileService:
+    """Test storage and cardinality estimates"""
+
+    @pytest.mark.asyncio
+    async def test_save_and_latest(self):
+        service = ColumnProfileService()
+        profiler = TableProfiler()
+        profiler.update({"a": ["1", "2"]})
+
+        async with profile_session() as db:
+            await service.save(db, "file", "7", profiler)
+            profiler.update({"a": ["3"]})
+            saved = await service.save(db, "file", "7", profiler)
+            latest = await service.get_latest(db, "file", "7")
+            summaries = await service.latest_summaries(db, [("file", "7"), ("file", "8")])
+
+        assert saved["row_count"] == 3
+        assert latest.id == saved["profile_id"]
+        assert summaries[("file", "7")]["columns"]["a"]["distinct_estimate"] == 3
+        assert ("file", "8") not in summaries
+
+    def test_estimate_distinct(self):
+        columns = {"a": {"distinct_estimate": 10}, "b": {"distinct_estimate": 50}}
+
+        assert estimate_distinct(columns, 1000, ["a", "b"]) == 500
+        assert estimate_distinct(columns, 200, ["a", "b"]) == 200
+        assert estimate_distinct(columns, 1000, ["missing"]) is None
+
+    def test_pipeline_estimates(self):
+        connection = "postgresql://u:secret@db:5432/app"
+        nodes = {n.id: n for n in [
+            node("src", "database_source", connection_string=connection, table_name="events"),
+            node("flt", "filter"),
+            node("dedup", "deduplicate", key_fields=["user_id"]),
+            node("agg", "aggregate", group_by=["country"]),
+        ]}
+        upstream = {"src": [], "flt": ["src"], "dedup": ["flt"], "agg": ["dedup"]}
+        summaries = {("table", table_source_ref(connection, "events")): {
+            "row_count": 100000,
+            "columns": {"user_id": {"distinct_estimate": 8000}, "country": {"distinct_estimate": 40}},
+        }}
+
+        estimates = ColumnProfileService.estimate_cardinalities(
+            nodes, ["src", "flt", "dedup", "agg"], upstream, summaries
+        )
+
+        assert estimates["flt"]["rows"] == 100000
+        assert estimates["dedup"]["distinct_keys"] == 8000
+        assert estimates["agg"]["rows"] == 40
+        assert ColumnProfileService.source_of(nodes["src"])[1] == \
+            table_source_ref("postgresql://u:rotated@db:5432/app", "events")
+
+    @pytest.mark.asyncio
+    async def test_readable_sources(self):
+        sources = [("file", "3"), ("file", "4"), ("file", "5"), ("file", "6"), ("table", "t")]
+
+        async with profile_session() as db:
+            await add_uploads(db, (3, 1), (4, 2), (5, None))
+            readable = await ColumnProfileService.readable_sources(db, sources, 1)
+
+        assert readable == [("file", "3"), ("file", "5"), ("table", "t")]
+
+    async def estimate_with_owner(self, monkeypatch, file_owner):
+        from backend.schemas.pipeline_visual import VisualPipelineDefinition
+        from backend.services import pipeline_execution_engine
+
+        service = ColumnProfileService()
+        service._remember("file", "3", {"row_count": 500, "columns": {"k": {"distinct_estimate": 20}}})
+        monkeypatch.setattr(pipeline_execution_engine, "column_profile_service", service)
+        definition = VisualPipelineDefinition(
+            nodes=[node("src", "file_source", file_id=3), node("dedup", "deduplicate", key_fields=["k"])],
+            edges=[{"id": "e", "source": "src", "target": "dedup"}]
+        )
+        state = PipelineExecutionState(1, definition)
+        state.upstream = {"src": [], "dedup": ["src"]}
+
+        async with profile_session() as db:
+            await db.execute(text("INSERT INTO pipelines VALUES (1, 5)"))
+            await add_uploads(db, (3, file_owner))
+            monkeypatch.setattr(pipeline_execution_engine, "AsyncSessionLocal", lambda: db)
+            return await PipelineExecutionEngine()._estimate_cardinalities(state, ["src", "dedup"])
+
+    @pytest.mark.asyncio
+    async def test_engine_uses_cached_profiles(self, monkeypatch):
+        estimates = await self.estimate_with_owner(monkeypatch, file_owner=5)
+
+        assert estimates["dedup"]["distinct_keys"] == 20
+
+    @pytest.mark.asyncio
+    async def test_engine_ignores_profiles_of_other_users_files(self, monkeypatch):
+        assert await self.estimate_with_owner(monkeypatch, file_owner=6) == {}
@@ -0,0 +1,288 @@
+"""
+Unit Tests for Columnar Upload Sidecars
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Typed Parquet conversion of CSV, JSON and Excel uploads (with pyarrow)
+- Column projection and row-group windows read from the sidecar
+- Stale sidecars and the text fallback
+- Background conversion scheduling after validation
+- FILE_SOURCE pipeline nodes reading uploads, restricted to their owner and admins
+"""
+
+import csv
+import importlib
+import json
+import pkgutil
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+import backend.models
+from backend.models.file_upload import FileStatus, FileType, FileUpload
+from backend.models.user import User
+from backend.schemas.pipeline_visual import NodeType
+from backend.services import columnar_sidecar_service as columnar
+from backend.services.column_profile_service import profile_file
+from backend.services.columnar_sidecar_service import (
+    ColumnarConversionError,
+    ColumnarSidecarService,
+    convert_to_columnar,
+    iter_upload_batches,
+    open_sidecar,
+    preview_sidecar,
+)
+from backend.services.file_preview_service import preview_file
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine, PipelineExecutionState
+
+for module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{module.name}")
+
+HEADER = ["id", "price", "active", "day", "seen_at", "name"]
+ROWS = [
+    [str(i), f"{i * 1.5}", "yes" if i % 2 else "no", f"2024-01-{i % 28 + 1:02d}", f"2024-02-03T04:05:{i % 60:02d}", f"name {i}"]
+    for i in range(500)
+]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "data.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(ROWS)
+    return str(path)
+
+
+@pytest.fixture
+def pyarrow_installed():
+    pytest.importorskip("pyarrow")
+
+
+def upload_for(path, file_type, **fields):
+    return FileUpload(
+        id=1,
+        filename="data",
+        original_filename="data",
+        file_path=path,
+        file_type=file_type,
+        file_size=1,
+        file_hash="a" * 64,
+        status=FileStatus.UPLOADED,
+        is_validated=True,
+        **fields
+    )
+
+
+class TestTextFallback:
+    """Test reading uploads without a sidecar"""
+
+    def test_projection_without_sidecar(self, csv_file):
+        batches = list(iter_upload_batches(csv_file, "csv", columns=["name", "id", "missing"], batch_size=200))
+
+        assert [len(batch["id"]) for batch in batches] == [200, 200, 100]
+        assert list(batches[0]) == ["name", "id"]
+        assert batches[0]["id"][:2] == [0, 1]
+
+    def test_parsed_types_match_sidecar_types(self, csv_file):
+        batch = next(iter_upload_batches(csv_file, "csv", file_hash="a" * 64))
+
+        assert batch["id"][:3] == [0, 1, 2]
+        assert batch["price"][:2] == [0.0, 1.5]
+        assert batch["active"][:2] == [False, True]
+        assert batch["day"][0] == date(2024, 1, 1)
+        assert batch["seen_at"][1] == datetime(2024, 2, 3, 4, 5, 1)
+        assert batch["name"][0] == "name 0"
+
+    def test_parsed_json_fills_missing_columns(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps([{"id": 1, "tags": ["a"]}, {"id": 2, "note": ""}]))
+
+        batches = list(iter_upload_batches(str(path), "json"))
+
+        assert batches == [{"id": [1, 2], "tags": [["a"], None], "note": [None, None]}]
+
+    def test_excel_batches(self, tmp_path):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["id", "when", None])
+        sheet.append([1, datetime(2024, 5, 6, 7, 8, 9), "x"])
+        sheet.append([2, None])
+        path = tmp_path / "data.xlsx"
+        workbook.save(path)
+
+        batches = list(iter_upload_batches(str(path), "excel"))
+
+        assert batches == [{"id": [1, 2], "when": [datetime(2024, 5, 6, 7, 8, 9), None], "column_2": ["x", None]}]
+
+    def test_conversion_requires_pyarrow(self, csv_file, monkeypatch):
+        monkeypatch.setattr(columnar, "pq", None)
+
+        with pytest.raises(ColumnarConversionError, match="pyarrow"):
+            convert_to_columnar(csv_file, "csv")
+        assert open_sidecar(csv_file) is None
+
+
+class TestConversion:
+    """Test typed Parquet sidecars"""
+
+    def test_csv_types(self, csv_file, pyarrow_installed):
+        summary = convert_to_columnar(csv_file, "csv", file_hash="a" * 64)
+
+        assert summary["row_count"] == len(ROWS)
+        assert [column["type"] for column in summary["columns"]] == [
+            "int64", "double", "bool", "date32[day]", "timestamp[us]", "string"
+        ]
+        batch = next(iter_upload_batches(csv_file, "csv", file_hash="a" * 64))
+        assert batch["id"][:3] == [0, 1, 2]
+        assert batch["active"][:2] == [False, True]
+        assert batch["day"][0] == date(2024, 1, 1)
+        assert batch["seen_at"][1] == datetime(2024, 2, 3, 4, 5, 1)
+
+    def test_sidecar_reads_only_requested_columns(self, csv_file, pyarrow_installed):
+        convert_to_columnar(csv_file, "csv", file_hash="a" * 64)
+
+        with patch.object(columnar, "iter_file_batches", side_effect=AssertionError("text parsed")):
+            batches = list(iter_upload_batches(csv_file, "csv", file_hash="a" * 64, columns=["price"]))
+
+        assert list(batches[0]) == ["price"]
+        assert sum(len(batch["price"]) for batch in batches) == len(ROWS)
+
+    def test_stale_or_mismatched_sidecar_ignored(self, csv_file, pyarrow_installed):
+        convert_to_columnar(csv_file, "csv", file_hash="a" * 64)
+
+        assert open_sidecar(csv_file, "a" * 64, "csv") is not None
+        assert open_sidecar(csv_file, "b" * 64, "csv") is None
+        assert open_sidecar(csv_file, "a" * 64, "csv", delimiter=";") is None
+
+    def test_json_nested_values_round_trip(self, tmp_path, pyarrow_installed):
+        path = tmp_path / "data.json"
+        records = [{"id": i, "tags": ["a", str(i)], "meta": {"n": i}} for i in range(10)]
+        records[3]["extra"] = "late column"
+        path.write_text("\n".join(json.dumps(record) for record in records))
+
+        convert_to_columnar(str(path), "json")
+        batch = next(iter_upload_batches(str(path), "json"))
+
+        assert batch["tags"][2] == ["a", "2"]
+        assert batch["meta"][9] == {"n": 9}
+        assert batch["extra"][3] == "late column" and batch["extra"][0] is None
+
+    def test_preview_window_across_row_groups(self, csv_file, pyarrow_installed, monkeypatch):
+        monkeypatch.setattr(columnar, "CONVERSION_BATCH_SIZE", 64)
+        convert_to_columnar(csv_file, "csv", file_hash="a" * 64)
+        sidecar = open_sidecar(csv_file, "a" * 64, "csv")
+
+        result = preview_sidecar(sidecar, 120, 20)
+
+        assert sidecar.metadata.num_row_groups == 8
+        assert result["columns"] == HEADER
+        assert [row[0] for row in result["rows"]] == list(range(120, 140))
+        assert result["rows"][0][3] == "2024-01-09"
+        assert preview_file(csv_file, "csv", start=120, limit=20, file_hash="a" * 64) == result
+
+    def test_profile_reads_sidecar(self, csv_file, pyarrow_installed):
+        convert_to_columnar(csv_file, "csv", file_hash="a" * 64)
+
+        with patch("backend.services.column_profile_service.iter_file_batches", side_effect=AssertionError("text parsed")):
+            profile = profile_file(csv_file, "csv", file_hash="a" * 64).to_dict()
+
+        types = {column["name"]: column["data_type"] for column in profile["columns"]}
+        assert profile["row_count"] == len(ROWS)
+        assert types["id"] == "integer" and types["day"] == "date" and types["active"] == "boolean"
+
+
+class TestScheduling:
+    """Test background conversion after validation"""
+
+    @pytest.mark.asyncio
+    async def test_not_requested(self, csv_file):
+        db = AsyncMock()
+
+        assert await ColumnarSidecarService().schedule(db, upload_for(csv_file, FileType.CSV)) is None
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_without_pyarrow(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, processing_metadata={"columnar": {"requested": True}})
+
+        with patch.object(columnar, "columnar_available", return_value=False):
+            state = await ColumnarSidecarService().schedule(AsyncMock(), upload)
+
+        assert state["status"] == "unavailable"
+        assert upload.processing_metadata["columnar"]["requested"] is True
+
+    @pytest.mark.asyncio
+    async def test_queues_conversion_job(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, processing_metadata={"columnar": {"requested": True}})
+        service = ColumnarSidecarService()
+
+        with patch.object(columnar, "columnar_available", return_value=True), \
+                patch.object(columnar, "open_sidecar", return_value=None), \
+                patch.object(columnar.schema_inference_service, "submit", return_value={"job_id": "job-1"}) as submit:
+            state = await service.schedule(AsyncMock(), upload)
+
+        assert state["status"] == "converting" and state["job_id"] == "job-1"
+        assert submit.call_args.args[0] == "columnar_conversion"
+        assert submit.call_args.kwargs["file_id"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_conversion_recorded(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, processing_metadata={"columnar": {"requested": True}})
+        result = Mock()
+        result.scalar_one_or_none.return_value = upload
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=result)
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__.return_value = session
+
+        with patch.object(columnar, "AsyncSessionLocal", session_factory):
+            with pytest.raises(ColumnarConversionError):
+                await ColumnarSidecarService()._record(1, {"error": "Column 'id' does not fit type int64"})
+
+        assert upload.processing_metadata["columnar"]["status"] == "failed"
+        session.commit.assert_awaited()
+
+
+class TestFileSourceNode:
+    """Test FILE_SOURCE pipeline nodes reading uploads"""
+
+    async def run_source(self, upload, user, config=None):
+        node = Mock(id="source", type=NodeType.FILE_SOURCE, data={}, config={"file_id": 1, **(config or {})})
+        state = PipelineExecutionState(1, Mock(), user)
+
+        with patch("backend.services.pipeline_execution_engine.AsyncSessionLocal", MagicMock()), \
+                patch("backend.services.pipeline_execution_engine.file_upload_service.get_file_upload",
+                      new_callable=AsyncMock, return_value=upload):
+            records = await PipelineExecutionEngine()._execute_node(state, node)
+        return records, state
+
+    @pytest.mark.asyncio
+    async def test_reads_configured_columns(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, user_id=7)
+
+        records, state = await self.run_source(upload, User(id=7, role="viewer"), {"columns": ["id", "name"]})
+
+        assert records == len(ROWS)
+        assert all(list(batch) == ["id", "name"] for batch in state.node_outputs["source"])
+        assert state.node_outputs["source"][0]["name"][0] == "name 0"
+
+    @pytest.mark.asyncio
+    async def test_rejects_other_users_upload(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, user_id=7)
+
+        for user in (User(id=8, role="designer"), None):
+            with pytest.raises(Exception, match="Uploaded file 1 not found"):
+                await self.run_source(upload, user)
+
+    @pytest.mark.asyncio
+    async def test_admin_reads_any_upload(self, csv_file):
+        upload = upload_for(csv_file, FileType.CSV, user_id=7)
+
+        for user in (User(id=8, role="admin"), User(id=9, role="viewer", is_superuser=True)):
+            records, _ = await self.run_source(upload, user)
+            assert records == len(ROWS)
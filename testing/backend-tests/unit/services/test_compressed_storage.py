@@ -0,0 +1,182 @@
+"""
+Unit Tests for Compressed Frame Storage
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Blocked gzip frames that stay readable as one gzip stream
+- Range reads that decompress only the frames they cover
+- Stale frame indexes and plain files
+- Previews, validation and batch readers over compressed uploads
+- Framed log archives
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from backend.models.file_upload import FileType
+from backend.services.compressed_storage import (
+    CompressedStorageError,
+    FrameIndex,
+    FramedReader,
+    compress_file,
+    frame_index_path,
+    is_compressed,
+    open_stored,
+    read_range,
+    stored_size,
+)
+from backend.services import file_preview_service as preview
+from backend.services.file_preview_service import preview_file
+from backend.services.file_validation_service import scan_file_contents
+from backend.services.logging_service import EnhancedLoggingService
+from backend.services.schema_inference_service import infer_csv_file, iter_file_batches
+
+FRAME = 4096
+ROWS = [["id", "note"]] + [[str(i), f"note {i}, \"quoted\"\nsecond line"] for i in range(3000)]
+
+
+def csv_bytes(rows):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+CONTENT = csv_bytes(ROWS)
+
+
+@pytest.fixture
+def compressed(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_bytes(CONTENT)
+    target = str(tmp_path / "stored.csv")
+    compress_file(str(source), target, frame_size=FRAME)
+    return target
+
+
+class TestFrames:
+    """Test writing and reading framed files"""
+
+    def test_round_trip_is_plain_gzip(self, compressed):
+        index = FrameIndex.load(compressed)
+
+        assert index.frame_count == -(-len(CONTENT) // FRAME)
+        assert index.uncompressed_size == stored_size(compressed) == len(CONTENT)
+        assert index.compressed_size < len(CONTENT) / 3
+        with open(compressed, "rb") as f:
+            assert gzip.decompress(f.read()) == CONTENT
+        with open_stored(compressed) as f:
+            assert f.read() == CONTENT
+
+    def test_range_reads_only_covered_frames(self, compressed):
+        with FramedReader(compressed) as reader:
+            reader.seek(10 * FRAME - 100)
+            # Raw reads stop at a frame boundary
+            data = reader.read(200)
+            data += reader.read(100)
+
+            assert data == CONTENT[10 * FRAME - 100:10 * FRAME + 100]
+            assert reader.frames_read == 2
+
+        assert read_range(compressed, 3 * FRAME + 7, 3 * FRAME) == CONTENT[3 * FRAME + 7:6 * FRAME + 7]
+        assert read_range(compressed, len(CONTENT) - 5, 100) == CONTENT[-5:]
+
+    def test_empty_file(self, tmp_path):
+        source = tmp_path / "empty"
+        source.write_bytes(b"")
+        compress_file(str(source), str(tmp_path / "stored"))
+
+        assert is_compressed(str(tmp_path / "stored"))
+        assert read_range(str(tmp_path / "stored"), 0, 10) == b""
+
+    def test_stale_index_reads_plain_file(self, compressed):
+        with open(compressed, "wb") as f:
+            f.write(b"plain content")
+
+        assert not is_compressed(compressed)
+        assert read_range(compressed, 6, 7) == b"content"
+        with pytest.raises(CompressedStorageError):
+            FramedReader(compressed)
+
+    def test_corrupt_frame(self, compressed):
+        with open(compressed, "r+b") as f:
+            f.seek(FrameIndex.load(compressed).compressed_offsets[2] + 20)
+            f.write(b"\x00" * 16)
+
+        with pytest.raises(CompressedStorageError, match="frame 2"):
+            read_range(compressed, 2 * FRAME, 10)
+
+
+class TestCompressedReaders:
+    """Test readers over compressed uploads"""
+
+    def test_preview_touches_few_frames(self, compressed, monkeypatch):
+        reads = []
+        original = FramedReader._load_frame
+
+        def counting_load(self, number):
+            if number != self._frame_number:
+                reads.append(number)
+            return original(self, number)
+
+        scan_file_contents(compressed, FileType.CSV)
+        monkeypatch.setattr(preview, "SCAN_BLOCK_SIZE", 1024)
+        with patch.object(FramedReader, "_load_frame", counting_load):
+            result = preview_file(compressed, "csv", start=2500, limit=5)
+
+        assert result["rows"] == ROWS[2501:2506]
+        assert result["total_rows"] == len(ROWS) - 1
+        # The header frame plus the frames from the offset indexed for record 2000 to the window
+        assert sorted(reads)[:2] == [0, 19]
+        assert len(reads) < FrameIndex.load(compressed).frame_count // 3
+
+    def test_validation_sees_original_content(self, compressed):
+        content = scan_file_contents(compressed, FileType.CSV)
+
+        assert content["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+        assert content["bytes_read"] == len(CONTENT)
+        assert content["record_count"] == len(ROWS)
+
+    def test_batches_and_inference(self, compressed):
+        batches = list(iter_file_batches(compressed, "csv", batch_size=1000))
+
+        assert sum(len(batch["id"]) for batch in batches) == len(ROWS) - 1
+        assert batches[2]["note"][0] == ROWS[2001][1]
+        assert infer_csv_file(compressed)["file_size"] == len(CONTENT)
+
+
+class TestLogArchives:
+    """Test framed log archives"""
+
+    @pytest.mark.asyncio
+    async def test_archive_is_framed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(EnhancedLoggingService, "ARCHIVE_DIR", str(tmp_path))
+        fields = (
+            "correlation_id", "request_id", "user_id", "pipeline_id", "component", "logger_name",
+            "exception_type", "exception_message", "extra_data"
+        )
+        logs = [
+            SimpleNamespace(id=i, timestamp=datetime(2024, 1, 1), level=None, message=f"message {i}", **dict.fromkeys(fields))
+            for i in range(3)
+        ]
+        result = Mock()
+        result.scalars.return_value.all.return_value = logs
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=result)
+        db.add = Mock()
+
+        archived = await EnhancedLoggingService.__new__(EnhancedLoggingService).archive_old_logs(db, datetime(2024, 2, 1))
+
+        archive_path = archived["archive_path"]
+        assert is_compressed(archive_path) and frame_index_path(archive_path).endswith(".frames")
+        assert db.add.call_args.args[0].compression_type == "gzip-frames"
+        with open(archive_path, "rb") as f:
+            lines = gzip.decompress(f.read()).decode().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["message 0", "message 1", "message 2"]
@@ -0,0 +1,333 @@
+"""
+Unit Tests for the Deduplication Service
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Exact deduplication with spilling to disk
+- Approximate deduplication with a scalable Bloom filter
+- Windowed deduplication by record count, time and memory
+- Configuration validation
+- DEDUPLICATE nodes in the execution engine and validator
+- Operator memory sized from the node's memory budget reservation
+- Concurrent runs of one pipeline holding separate memory budgets
+"""
+
+from unittest.mock import AsyncMock, patch
+import asyncio
+import random
+
+import pytest
+
+from backend.schemas.pipeline_visual import (
+    NodePosition,
+    NodeType,
+    PipelineEdge,
+    PipelineNode,
+    VisualPipelineDefinition,
+)
+from backend.services.deduplication_service import (
+    ApproximateDeduplicator,
+    BloomFilter,
+    DeduplicationConfigError,
+    DeduplicationService,
+    ExactDeduplicator,
+    ScalableBloomFilter,
+    WindowedDeduplicator,
+    key_digests,
+)
+from backend.services.memory_budget_service import MemoryBudgetService
+from backend.services.node_output_cache import records_to_columns
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine
+from backend.services.pipeline_validation_service import PipelineValidationService
+
+
+def batches_of(values, size):
+    for start in range(0, len(values), size):
+        yield {"key": values[start:start + size], "n": list(range(start, min(start + size, len(values))))}
+
+
+def first_occurrences(values):
+    return list(dict.fromkeys(values))
+
+
+@pytest.fixture
+def keys():
+    rng = random.Random(11)
+    return [rng.randrange(5000) for _ in range(20000)]
+
+
+class TestExactDeduplicator:
+    """Test exact mode"""
+
+    def test_removes_duplicates_across_batches(self, tmp_path, keys):
+        operator = ExactDeduplicator(["key"], 64 * 1024 * 1024, tmp_path)
+
+        output = [k for batch in batches_of(keys, 1000) for k in operator.process(batch)["key"]]
+
+        assert output == first_occurrences(keys)
+        assert operator.get_metrics()["duplicates_removed"] == len(keys) - len(output)
+
+    def test_spills_to_disk_and_stays_exact(self, tmp_path, keys):
+        operator = ExactDeduplicator(["key"], 1, tmp_path)
+
+        output = [k for batch in batches_of(keys, 700) for k in operator.process(batch)["key"]]
+        metrics = operator.get_metrics()
+
+        assert output == first_occurrences(keys)
+        assert metrics["spills"] >= 1
+        assert metrics["spilled_keys"] > 0
+        assert metrics["keys_in_memory"] <= operator.max_memory_keys
+
+        operator.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_whole_record_key(self, tmp_path):
+        operator = ExactDeduplicator([], 1024 * 1024, tmp_path)
+        batch = records_to_columns([{"a": 1, "b": 2}, {"a": 1, "b": 2}, {"a": 1, "b": 3}])
+
+        assert operator.process(batch) == {"a": [1, 1], "b": [2, 3]}
+
+
+class TestBloomFilters:
+    """Test Bloom filter behaviour"""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter.for_capacity(10000, 0.01)
+        digests = key_digests({"k": list(range(10000))}, ["k"])
+        bloom.add(digests)
+
+        assert bloom.contains(digests).all()
+
+    def test_false_positive_rate_within_bound(self):
+        bloom = ScalableBloomFilter(1000, 0.01, 64 * 1024 * 1024)
+        bloom.add(key_digests({"k": list(range(20000))}, ["k"]))
+
+        probes = bloom.contains(key_digests({"k": list(range(20000, 70000))}, ["k"]))
+
+        assert len(bloom.filters) > 1
+        assert probes.mean() < 0.02
+
+    def test_saturates_at_memory_budget(self):
+        bloom = ScalableBloomFilter(1000, 0.01, 4096)
+        bloom.add(key_digests({"k": list(range(20000))}, ["k"]))
+
+        assert bloom.saturated
+        assert bloom.nbytes <= 4096
+
+
+class TestApproximateDeduplicator:
+    """Test approximate mode"""
+
+    def test_never_lets_duplicates_through(self, keys):
+        operator = ApproximateDeduplicator(["key"], 1024 * 1024, false_positive_rate=0.01, expected_items=1000)
+
+        output = [k for batch in batches_of(keys, 1000) for k in operator.process(batch)["key"]]
+        expected = first_occurrences(keys)
+
+        assert len(output) == len(set(output))
+        assert set(output) <= set(expected)
+        # Only false positives may drop new keys
+        assert len(output) >= len(expected) * 0.98
+
+    def test_metrics(self, keys):
+        operator = ApproximateDeduplicator(["key"], 1024 * 1024, expected_items=1000)
+        for batch in batches_of(keys, 1000):
+            operator.process(batch)
+
+        metrics = operator.get_metrics()
+
+        assert metrics["mode"] == "approximate"
+        assert metrics["memory_bytes"] <= metrics["memory_limit_bytes"]
+        assert metrics["estimated_false_positive_rate"] < 0.01
+
+
+class TestWindowedDeduplicator:
+    """Test windowed mode"""
+
+    def test_record_window(self):
+        operator = WindowedDeduplicator(["key"], 1024 * 1024, window_records=3)
+
+        output = operator.process({"key": ["a", "b", "a", "c", "d", "e", "a"]})
+
+        # The second 'a' is within 3 records; the last one is not
+        assert output["key"] == ["a", "b", "c", "d", "e", "a"]
+
+    def test_time_window_uses_timestamp_field(self):
+        operator = WindowedDeduplicator(["key"], 1024 * 1024, window_seconds=10, timestamp_field="ts")
+
+        output = operator.process({"key": ["a", "a", "a"], "ts": [0, 5, 30]})
+
+        assert output["ts"] == [0, 30]
+
+    def test_memory_budget_evicts_oldest(self):
+        operator = WindowedDeduplicator(["key"], 1, window_records=1000)
+
+        operator.process({"key": list(range(10))})
+        metrics = operator.get_metrics()
+
+        assert metrics["keys_in_window"] == 1
+        assert metrics["evicted_early"] == 9
+
+    def test_requires_window(self):
+        with pytest.raises(DeduplicationConfigError):
+            WindowedDeduplicator(["key"], 1024)
+
+
+class TestDeduplicationService:
+    """Test configuration handling"""
+
+    def test_validate_config(self):
+        assert DeduplicationService.validate_config({"mode": "exact"}) == []
+        assert DeduplicationService.validate_config({"mode": "fuzzy"})
+        assert DeduplicationService.validate_config({"mode": "windowed"})
+        assert DeduplicationService.validate_config({"mode": "approximate", "false_positive_rate": 2})
+
+    def test_validate_config_non_numeric_settings(self):
+        assert DeduplicationService.validate_config({"mode": "approximate", "false_positive_rate": "often"}) == [
+            "false_positive_rate must be a number"
+        ]
+        assert DeduplicationService.validate_config({"mode": "approximate", "false_positive_rate": [0.1]}) == [
+            "false_positive_rate must be a number"
+        ]
+        assert DeduplicationService.validate_config(
+            {"mode": "windowed", "window_records": "many", "window_seconds": {"s": 1}}
+        ) == ["window_records must be an integer", "window_seconds must be a number"]
+        assert DeduplicationService.validate_config({"mode": "windowed", "window_seconds": "30"}) == []
+
+    def test_validate_config_out_of_range_settings(self):
+        for rate in (0, 1, -0.5, float("nan")):
+            assert DeduplicationService.validate_config({"mode": "approximate", "false_positive_rate": rate}) == [
+                "false_positive_rate must be between 0 and 1"
+            ]
+        for expected_items in (0, -10):
+            assert DeduplicationService.validate_config({"mode": "approximate", "expected_items": expected_items}) == [
+                "expected_items must be greater than 0"
+            ]
+        assert DeduplicationService.validate_config({"mode": "windowed", "window_records": -1}) == [
+            "window_records must be greater than 0"
+        ]
+        assert DeduplicationService.validate_config({"mode": "windowed", "window_records": 0}) == [
+            "window_records must be greater than 0"
+        ]
+        assert DeduplicationService.validate_config({"mode": "windowed", "window_seconds": 0}) == [
+            "window_seconds must be greater than 0"
+        ]
+        assert DeduplicationService.validate_config({"mode": "windowed", "window_seconds": float("nan")}) == [
+            "window_seconds must be greater than 0"
+        ]
+        with pytest.raises(DeduplicationConfigError):
+            DeduplicationService().create_operator({"mode": "approximate", "expected_items": 0})
+
+    def test_create_operator(self, tmp_path):
+        service = DeduplicationService(spill_dir=tmp_path)
+
+        assert isinstance(service.create_operator({"key_fields": ["a"]}), ExactDeduplicator)
+        assert isinstance(service.create_operator({"mode": "approximate"}), ApproximateDeduplicator)
+        assert isinstance(service.create_operator({"mode": "windowed", "window_records": 5}), WindowedDeduplicator)
+        with pytest.raises(DeduplicationConfigError):
+            service.create_operator({"mode": "nope"})
+
+
+def dedup_definition(config):
+    return VisualPipelineDefinition(
+        nodes=[
+            PipelineNode(id="src", type=NodeType.FILE_SOURCE, position=NodePosition(x=0, y=0)),
+            PipelineNode(id="dedup", type=NodeType.DEDUPLICATE, position=NodePosition(x=1, y=0), config=config),
+            PipelineNode(id="dst", type=NodeType.FILE_DESTINATION, position=NodePosition(x=2, y=0)),
+        ],
+        edges=[
+            PipelineEdge(id="e1", source="src", target="dedup"),
+            PipelineEdge(id="e2", source="dedup", target="dst"),
+        ],
+    )
+
+
+class TestDeduplicateNode:
+    """Test DEDUPLICATE nodes in the engine and validator"""
+
+    def test_validation(self):
+        validator = PipelineValidationService()
+
+        assert validator.validate_pipeline(dedup_definition({"mode": "exact"})).is_valid
+        result = validator.validate_pipeline(dedup_definition({"mode": "windowed"}))
+        assert not result.is_valid
+        assert any("window" in error for error in result.errors)
+
+    @pytest.mark.asyncio
+    async def test_engine_reports_metrics(self):
+        engine = PipelineExecutionEngine()
+        original_execute = engine._execute_node
+
+        async def execute(state, node):
+            if node.id == "src":
+                state.node_outputs["src"] = [{"key": [1, 2, 1]}, {"key": [2, 3]}]
+                return 5
+            if node.id == "dst":
+                return 0
+            return await original_execute(state, node)
+
+        with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                patch.object(engine, "_execute_node", side_effect=execute):
+            mock_realtime.broadcast_pipeline_status = AsyncMock()
+            mock_realtime.broadcast_pipeline_progress = AsyncMock()
+            mock_realtime.broadcast_pipeline_completed = AsyncMock()
+
+            state = await engine.execute_pipeline(1, dedup_definition({"mode": "exact", "key_fields": ["key"]}))
+
+        step = next(s for s in state.steps if s.node_id == "dedup")
+        assert state.node_outputs["dedup"] == [{"key": [1, 2]}, {"key": [3]}]
+        assert step.records_processed == 3
+        assert step.metrics["duplicates_removed"] == 2
+        assert step.metrics["memory_bytes"] > 0
+
+    @staticmethod
+    async def run_dedup(broker, config, runs=1, source_delay=0):
+        engine = PipelineExecutionEngine()
+        original_execute = engine._execute_node
+
+        async def execute(state, node):
+            if node.id == "src":
+                await asyncio.sleep(source_delay)
+                state.node_outputs["src"] = [{"key": [1, 2, 1]}]
+                return 3
+            if node.id == "dst":
+                return 0
+            return await original_execute(state, node)
+
+        with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                patch('backend.services.pipeline_execution_engine.memory_budget_service', broker), \
+                patch.object(engine, "_execute_node", side_effect=execute):
+            mock_realtime.broadcast_pipeline_status = AsyncMock()
+            mock_realtime.broadcast_pipeline_progress = AsyncMock()
+            mock_realtime.broadcast_pipeline_completed = AsyncMock()
+
+            return await asyncio.gather(*(
+                engine.execute_pipeline(1, dedup_definition(config)) for _ in range(runs)
+            ))
+
+    @pytest.mark.asyncio
+    async def test_operator_memory_comes_from_reservation(self):
+        mb = 1024 * 1024
+        config = {"mode": "exact", "key_fields": ["key"], "memory_bytes": 128 * mb}
+
+        [roomy] = await self.run_dedup(MemoryBudgetService(pool_bytes=512 * mb), config)
+        [busy] = await self.run_dedup(MemoryBudgetService(pool_bytes=96 * mb), config)
+
+        roomy_step = next(s for s in roomy.steps if s.node_id == "dedup")
+        busy_step = next(s for s in busy.steps if s.node_id == "dedup")
+        assert roomy_step.metrics["memory_limit_bytes"] == 128 * mb
+        # The broker grants what the pool can spare, and the operator is capped at that
+        assert 90 * mb <= busy_step.metrics["memory_limit_bytes"] <= 96 * mb
+        assert busy.reservations["dedup"].peak_bytes == busy_step.metrics["memory_limit_bytes"]
+        assert busy.node_outputs["dedup"] == [{"key": [1, 2]}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_runs_of_one_pipeline_hold_separate_budgets(self):
+        broker = MemoryBudgetService(pool_bytes=1024 * 1024 * 1024)
+
+        first, second = await self.run_dedup(broker, {"mode": "exact", "key_fields": ["key"]}, runs=2, source_delay=0.05)
+
+        assert first.cancellation_token.key != second.cancellation_token.key
+        assert first.status == second.status == "completed"
+        assert first.node_outputs["dedup"] == second.node_outputs["dedup"] == [{"key": [1, 2]}]
+        assert broker.runs == {}
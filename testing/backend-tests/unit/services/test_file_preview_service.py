@@ -0,0 +1,191 @@
+"""
+Unit Tests for Indexed File Previews
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Sparse record-offset index that follows quoted newlines across blocks
+- Row windows read from the nearest indexed offset
+- Stale and unusable indexes
+- JSON Lines previews
+- Index built during the validation read
+"""
+
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from backend.models.file_upload import FileType
+from backend.services import file_preview_service as preview
+from backend.services.file_preview_service import (
+    FilePreviewError,
+    LineIndex,
+    LineIndexBuilder,
+    build_line_index,
+    line_index_path,
+    preview_file,
+    read_records,
+)
+from backend.services.file_validation_service import scan_file_contents
+
+ROWS = [["id", "note"]] + [[str(i), f"line {i}\nwith \"quotes\", and commas" if i % 3 else f"plain {i}"] for i in range(5000)]
+
+
+def write_csv(path, rows, line_terminator="\n"):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer, lineterminator=line_terminator).writerows(rows)
+    path.write_bytes(buffer.getvalue().encode())
+    return str(path)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    return write_csv(tmp_path / "data.csv", ROWS)
+
+
+class TestLineIndex:
+    """Test building and reading the sparse index"""
+
+    def test_offsets_follow_quoted_records(self, csv_file):
+        builder = LineIndexBuilder(quote_aware=True, every=100)
+        with open(csv_file, "rb") as f:
+            # Small blocks so quoted fields straddle block boundaries
+            while block := f.read(777):
+                builder.update(block)
+        builder.save(csv_file)
+
+        index = LineIndex.load(csv_file)
+        assert index.record_count == len(ROWS)
+        with open(csv_file, "rb") as f:
+            content = f.read()
+        for record in (0, 100, 2500, 4999, len(ROWS) - 1):
+            first, offset = index.nearest(record)
+            assert first == record - record % 100
+            row = next(csv.reader(io.StringIO(content[offset:].decode(), newline="")))
+            assert row == ROWS[first]
+
+    def test_nearest_past_the_end(self, tmp_path):
+        path = write_csv(tmp_path / "short.csv", ROWS[:150])
+        build_line_index(path, every=100)
+
+        assert LineIndex.load(path).nearest(10_000)[0] == 100
+
+    def test_stale_index_ignored(self, csv_file):
+        build_line_index(csv_file, every=100)
+        with open(csv_file, "ab") as f:
+            f.write(b"9999,appended\n")
+
+        assert LineIndex.load(csv_file) is None
+
+    def test_read_records_scans_from_nearest_offset(self, csv_file, monkeypatch):
+        build_line_index(csv_file, every=100)
+        index = LineIndex.load(csv_file)
+        scanned = []
+        original = preview._record_ends
+
+        def counting_record_ends(data, quote_aware, in_quotes):
+            scanned.append(data.size)
+            return original(data, quote_aware, in_quotes)
+
+        monkeypatch.setattr(preview, "SCAN_BLOCK_SIZE", 1024)
+        monkeypatch.setattr(preview, "_record_ends", counting_record_ends)
+        records = read_records(csv_file, 4321, 5, True, index)
+
+        parsed = list(csv.reader(io.StringIO(b"".join(records).decode(), newline="")))
+        assert parsed == ROWS[4321:4326]
+        # Only the records after the offset for 4300 are scanned, not the file
+        assert sum(scanned) < 10_000
+
+
+class TestPreviewFile:
+    """Test row-window previews"""
+
+    def test_far_window_matches_csv_reader(self, csv_file):
+        result = preview_file(csv_file, "csv", start=3997, limit=7)
+
+        assert result["columns"] == ROWS[0]
+        assert result["rows"] == ROWS[3998:4005]
+        assert result["total_rows"] == len(ROWS) - 1
+        assert result["row_count"] == 7
+
+    def test_crlf_and_no_trailing_newline(self, tmp_path):
+        path = write_csv(tmp_path / "crlf.csv", ROWS[:300], line_terminator="\r\n")
+        with open(path, "rb+") as f:
+            f.truncate(len(f.read()) - 2)
+
+        result = preview_file(path, "csv", start=295, limit=10)
+
+        assert result["rows"] == ROWS[296:300]
+
+    def test_window_past_the_end(self, csv_file):
+        assert preview_file(csv_file, "csv", start=len(ROWS), limit=10)["rows"] == []
+
+    def test_unusable_index_falls_back_to_parsing(self, tmp_path):
+        # A lone CR ends a CSV record but not an indexed line
+        path = tmp_path / "cr.csv"
+        path.write_bytes(b"a,b\r1,2\r3,4\r")
+        builder = LineIndexBuilder(quote_aware=True)
+        builder.update(path.read_bytes())
+        builder.save(str(path), usable=False)
+
+        result = preview_file(str(path), "csv", start=1, limit=5)
+
+        assert result["columns"] == ["a", "b"]
+        assert result["rows"] == [["3", "4"]]
+
+    def test_json_lines_window(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text("".join(json.dumps({"id": i, "text": "a \n b"}) + "\n" for i in range(3000)))
+
+        result = preview_file(str(path), "jsonl", start=2500, limit=3)
+
+        assert result["rows"] == [{"id": i, "text": "a \n b"} for i in (2500, 2501, 2502)]
+        assert result["columns"] is None
+        assert result["total_rows"] == 3000
+
+    def test_unsupported_format(self, csv_file):
+        with pytest.raises(FilePreviewError):
+            preview_file(csv_file, "parquet")
+
+
+class TestIndexDuringValidation:
+    """Test the index written by the validation read"""
+
+    def test_csv_index_from_validation_read(self, csv_file):
+        with patch.object(preview, "build_line_index", side_effect=AssertionError("second read")):
+            content = scan_file_contents(csv_file, FileType.CSV)
+            result = preview_file(csv_file, "csv", start=1234, limit=3)
+
+        assert content["record_count"] == len(ROWS)
+        assert LineIndex.load(csv_file).usable
+        assert result["rows"] == ROWS[1235:1238]
+
+    def test_csv_record_mismatch_marks_index_unusable(self, tmp_path):
+        path = tmp_path / "cr.csv"
+        path.write_bytes(b"a,b\r1,2\r3,4\r")
+
+        scan_file_contents(str(path), FileType.CSV)
+
+        assert not LineIndex.load(str(path)).usable
+
+    def test_json_array_not_indexed(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps([{"id": i} for i in range(10)]))
+
+        content = scan_file_contents(str(path), FileType.JSON)
+
+        assert content["record_count"] is None
+        assert not (tmp_path / "data.json.idx").exists()
+        assert line_index_path(str(path)) == str(path) + ".idx"
+
+    def test_json_lines_indexed(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text("\n".join(json.dumps({"id": i}) for i in range(10)))
+
+        content = scan_file_contents(str(path), FileType.JSON)
+
+        assert content["record_count"] == 10
+        index = LineIndex.load(str(path))
+        assert index.usable and not index.quote_aware
@@ -16,7 +16,7 @@ import os
 import hashlib
 import tempfile
 from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, Mock, MagicMock, patch
+from unittest.mock import AsyncMock, Mock, MagicMock, call, patch
 from pathlib import Path
 
 import pytest
@@ -144,17 +144,14 @@ class TestFileUploadService:
         mock_db_session.commit = AsyncMock()
         mock_db_session.refresh = AsyncMock()
 
-        # Create temporary file for testing
-        os.makedirs(os.path.dirname(sample_file_upload.file_path), exist_ok=True)
-
-        with patch('aiofiles.open', create=True) as mock_aiofiles_open:
-            mock_file = AsyncMock()
-            mock_aiofiles_open.return_value.__aenter__.return_value = mock_file
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as temp_file:
+            sample_file_upload.file_path = temp_file.name
 
+        try:
             result = await file_upload_service.upload_chunk(
                 db=mock_db_session,
                 file_id=1,
-                chunk_data=b"test chunk data",
+                chunk_data=b"x" * 256,
                 chunk_number=0,
                 total_chunks=4
             )
@@ -163,6 +160,9 @@ class TestFileUploadService:
             assert result["progress"] == 25  # 1/4 chunks = 25%
             assert result["chunk_number"] == 0
             assert result["total_chunks"] == 4
+            assert sample_file_upload.status == FileStatus.UPLOADING
+        finally:
+            os.remove(sample_file_upload.file_path)
 
     @pytest.mark.asyncio
     async def test_upload_chunk_completes_on_final_chunk(self, file_upload_service, mock_db_session, sample_file_upload):
@@ -172,24 +172,34 @@ class TestFileUploadService:
         mock_db_session.execute = AsyncMock(return_value=mock_result)
         mock_db_session.commit = AsyncMock()
         mock_db_session.refresh = AsyncMock()
+        mock_db_session.add = Mock()
 
         # Create temporary file
         with tempfile.NamedTemporaryFile(mode='wb', delete=False) as temp_file:
             sample_file_upload.file_path = temp_file.name
 
+        chunks = [bytes([i]) * 256 for i in range(4)]
+        # The blob row inserted for the content, before its file is stored
+        blob = Mock(content_hash=hashlib.sha256(b"".join(chunks)).hexdigest(), file_size=None, ref_count=0)
+
         try:
-            result = await file_upload_service.upload_chunk(
-                db=mock_db_session,
-                file_id=1,
-                chunk_data=b"final chunk",
-                chunk_number=3,
-                total_chunks=4
-            )
+            # Chunks may arrive out of order; the last one received completes the upload
+            with patch.object(file_upload_service, "_lock_blob", AsyncMock(return_value=blob)):
+                for chunk_number in (3, 1, 2, 0):
+                    result = await file_upload_service.upload_chunk(
+                        db=mock_db_session,
+                        file_id=1,
+                        chunk_data=chunks[chunk_number],
+                        chunk_number=chunk_number,
+                        total_chunks=4
+                    )
 
             # Verify upload is marked as completed
+            assert result["progress"] == 100
             assert sample_file_upload.status == FileStatus.UPLOADED
             assert sample_file_upload.upload_completed_at is not None
-            assert sample_file_upload.file_hash is not None
+            assert sample_file_upload.file_hash == hashlib.sha256(b"".join(chunks)).hexdigest()
+            assert sample_file_upload.file_path == file_upload_service._blob_path(sample_file_upload.file_hash)
         finally:
             if os.path.exists(sample_file_upload.file_path):
                 os.remove(sample_file_upload.file_path)
@@ -264,7 +274,9 @@ class TestFileUploadService:
 
         mock_result = Mock()
         mock_result.scalars.return_value.all.return_value = [expired_file]
-        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        no_blobs = Mock()
+        no_blobs.scalars.return_value.all.return_value = []
+        mock_db_session.execute = AsyncMock(side_effect=[mock_result, no_blobs])
         mock_db_session.commit = AsyncMock()
         mock_db_session.delete = AsyncMock()
 
@@ -273,7 +285,11 @@ class TestFileUploadService:
                 count = await file_upload_service.cleanup_expired_files(db=mock_db_session)
 
                 assert count == 1
-                mock_remove.assert_called_once_with("/tmp/expired.csv")
+                # The frame index, record index and columnar sidecars go with the file
+                assert mock_remove.call_args_list == [
+                    call("/tmp/expired.csv"), call("/tmp/expired.csv.frames"),
+                    call("/tmp/expired.csv.idx"), call("/tmp/expired.csv.parquet")
+                ]
                 assert expired_file.status == FileStatus.DELETED
 
     # File Deletion Tests
@@ -296,7 +312,12 @@ class TestFileUploadService:
                 )
 
                 assert result is True
-                mock_remove.assert_called_once_with(sample_file_upload.file_path)
+                assert mock_remove.call_args_list == [
+                    call(sample_file_upload.file_path),
+                    call(sample_file_upload.file_path + ".frames"),
+                    call(sample_file_upload.file_path + ".idx"),
+                    call(sample_file_upload.file_path + ".parquet")
+                ]
 
     @pytest.mark.asyncio
     async def test_delete_file_keeps_physical_file_when_requested(self, file_upload_service, mock_db_session, sample_file_upload):
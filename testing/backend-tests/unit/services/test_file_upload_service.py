@@ -0,0 +1,426 @@
+"""
+Unit Tests for Chunked File Uploads
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Positional chunk writes in any order and in parallel
+- Received-chunk bitmap and missing-chunk queries for resume
+- Incremental SHA-256 without re-reading the file at finalize
+- Chunk layout validation and upload size limits
+- Content-addressed blob storage, reference counts and garbage collection
+- Compressed storage of text uploads
+"""
+
+import asyncio
+import hashlib
+import importlib
+import os
+import pkgutil
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import Insert
+from sqlalchemy.dialects import postgresql
+
+import backend.models
+from backend.models.file_upload import FileBlob, FileStatus, FileType, FileUpload
+from backend.services.compressed_storage import frame_index_path, is_compressed
+from backend.services.file_upload_service import (
+    ChunkBitmap,
+    ChunkUploadError,
+    FileUploadService,
+    UploadTooLargeError,
+)
+
+for module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{module.name}")
+
+CHUNK_SIZE = 1000
+FILE_SIZE = 4500
+CONTENT = os.urandom(FILE_SIZE)
+
+
+def chunk(n):
+    return CONTENT[n * CHUNK_SIZE:(n + 1) * CHUNK_SIZE]
+
+
+class FakeSession:
+    """Async session stand-in keeping uploads and blobs in memory"""
+
+    def __init__(self):
+        self.uploads = {}
+        self.blobs = {}
+        self.statements = []
+        self.commit = AsyncMock()
+        self.refresh = AsyncMock()
+        self.flush = AsyncMock()
+
+    def add(self, obj):
+        if isinstance(obj, FileBlob):
+            self.blobs[obj.content_hash] = obj
+        else:
+            obj.id = obj.id or len(self.uploads) + 1
+            self.uploads[obj.id] = obj
+
+    async def delete(self, obj):
+        if isinstance(obj, FileBlob):
+            del self.blobs[obj.content_hash]
+        else:
+            del self.uploads[obj.id]
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        params = statement.compile().params
+        if isinstance(statement, Insert):
+            # INSERT ... ON CONFLICT DO NOTHING of a blob row
+            if params["content_hash"] not in self.blobs:
+                self.add(FileBlob(**params))
+            return Mock()
+        if "blob_hash_1" in params:
+            rows = [
+                u.id for u in self.uploads.values()
+                if u.blob_hash == params["blob_hash_1"]
+                and (u.user_id == params.get("user_id_1") or u.pipeline_id == params.get("pipeline_id_1"))
+            ]
+        elif statement.column_descriptions[0]["entity"] is FileBlob:
+            if "content_hash_1" in params:
+                rows = [self.blobs[params["content_hash_1"]]] if params["content_hash_1"] in self.blobs else []
+            else:
+                rows = [blob for blob in self.blobs.values() if blob.ref_count <= 0]
+        elif "id_1" in params:
+            rows = [self.uploads[params["id_1"]]] if params["id_1"] in self.uploads else []
+        else:
+            rows = [u for u in self.uploads.values() if u.expires_at and u.expires_at < datetime.utcnow()]
+        result = Mock()
+        result.scalar_one_or_none.return_value = rows[0] if rows else None
+        result.scalars.return_value.all.return_value = rows
+        return result
+
+
+@pytest.fixture(autouse=True)
+def upload_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileUploadService, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(FileUploadService, "BLOB_DIR", str(tmp_path / "uploads" / "blobs"))
+    # The test files are a few KB, split into 1000-byte chunks
+    monkeypatch.setattr(FileUploadService, "MIN_CHUNK_SIZE", CHUNK_SIZE)
+
+
+@pytest.fixture
+def upload(tmp_path):
+    return FileUpload(
+        id=1,
+        filename="data.bin",
+        original_filename="data.bin",
+        file_path=str(tmp_path / "data.bin"),
+        file_type=FileType.OTHER,
+        file_size=FILE_SIZE,
+        chunk_size=CHUNK_SIZE,
+        chunk_count=5,
+        status=FileStatus.UPLOADING,
+        user_id=1,
+        created_at=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def db(upload):
+    session = FakeSession()
+    session.add(upload)
+    return session
+
+
+class TestChunkBitmap:
+    """Test the received-chunk bitmap"""
+
+    def test_add_count_missing(self):
+        bitmap = ChunkBitmap(11)
+        for n in (0, 7, 8, 10):
+            bitmap.add(n)
+
+        restored = ChunkBitmap(11, bitmap.to_bytes())
+        assert len(restored.to_bytes()) == 2
+        assert restored.count() == 4
+        assert 8 in restored and 9 not in restored
+        assert restored.missing() == [1, 2, 3, 4, 5, 6, 9]
+        assert restored.missing(limit=3) == [1, 2, 3]
+
+
+class TestChunkedUpload:
+    """Test out-of-order and parallel chunked uploads"""
+
+    @pytest.mark.asyncio
+    async def test_out_of_order_chunks_assemble_file(self, db, upload):
+        service = FileUploadService()
+        staged_path = upload.file_path
+
+        for n in (4, 2, 0, 3, 1):
+            result = await service.upload_chunk(db, 1, chunk(n), n, 5)
+
+        assert result["received_chunks"] == 5
+        assert upload.status == FileStatus.UPLOADED
+        assert not os.path.exists(staged_path)
+        with open(upload.file_path, "rb") as f:
+            assert f.read() == CONTENT
+        assert upload.file_hash == hashlib.sha256(CONTENT).hexdigest()
+        assert service._hash_states == {}
+
+    @pytest.mark.asyncio
+    async def test_parallel_chunks(self, db, upload):
+        service = FileUploadService()
+
+        await asyncio.gather(*(service.upload_chunk(db, 1, chunk(n), n, 5) for n in range(5)))
+
+        assert upload.upload_progress == 100
+        assert upload.file_hash == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_in_order_upload_never_reads_file(self, db, upload):
+        service = FileUploadService()
+
+        with patch("backend.services.file_upload_service.os.pread") as pread, \
+                patch.object(service, "_calculate_file_hash") as full_hash:
+            for n in range(5):
+                await service.upload_chunk(db, 1, chunk(n), n, 5)
+
+        pread.assert_not_called()
+        full_hash.assert_not_called()
+        assert upload.file_hash == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_resume_after_restart(self, db, upload):
+        first = FileUploadService()
+        for n in (0, 1, 3):
+            await first.upload_chunk(db, 1, chunk(n), n, 5)
+
+        status = await first.get_chunk_status(db, 1)
+        assert status["missing_chunks"] == [2, 4]
+        assert status["received_chunks"] == 3
+
+        # A fresh process rebuilds the hash from the chunks already on disk
+        resumed = FileUploadService()
+        await resumed.upload_chunk(db, 1, chunk(2), 2, 5)
+        await resumed.upload_chunk(db, 1, chunk(4), 4, 5)
+
+        assert upload.status == FileStatus.UPLOADED
+        assert upload.file_hash == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_rejects_chunks_outside_layout(self, db, upload):
+        service = FileUploadService()
+
+        with pytest.raises(ChunkUploadError, match="must be 500 bytes"):
+            await service.upload_chunk(db, 1, chunk(0), 4, 5)
+        with pytest.raises(ChunkUploadError, match="out of range"):
+            await service.upload_chunk(db, 1, b"", 5, 5)
+        with pytest.raises(ChunkUploadError, match="has 5 chunks"):
+            await service.upload_chunk(db, 1, chunk(0), 0, 3)
+        assert upload.received_chunks is None
+
+    @pytest.mark.asyncio
+    async def test_rejects_chunks_after_completion(self, db, upload):
+        service = FileUploadService()
+        for n in range(5):
+            await service.upload_chunk(db, 1, chunk(n), n, 5)
+
+        with pytest.raises(ValueError, match="already completed"):
+            await service.upload_chunk(db, 1, chunk(0), 0, 5)
+
+
+class TestUploadLimits:
+    """Test size and chunk layout limits"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_files_above_max_size(self, db, monkeypatch):
+        monkeypatch.setattr(FileUploadService, "MAX_FILE_SIZE", FILE_SIZE - 1)
+
+        with pytest.raises(UploadTooLargeError):
+            await FileUploadService().create_upload(db, "big.bin", FILE_SIZE, chunk_size=CHUNK_SIZE)
+        assert list(db.uploads) == [1]
+
+    @pytest.mark.asyncio
+    async def test_rejects_small_chunks_and_too_many_chunks(self, db, monkeypatch):
+        service = FileUploadService()
+
+        with pytest.raises(ChunkUploadError, match="at least 1000 bytes"):
+            await service.create_upload(db, "tiny.bin", FILE_SIZE, chunk_size=1)
+        monkeypatch.setattr(FileUploadService, "MAX_CHUNK_COUNT", 4)
+        with pytest.raises(ChunkUploadError, match="at least 1125 bytes"):
+            await service.create_upload(db, "many.bin", FILE_SIZE, chunk_size=CHUNK_SIZE)
+        with pytest.raises(ChunkUploadError, match="at most 4 chunks"):
+            await service.upload_chunk(db, 1, chunk(0), 0, 10**9)
+        assert list(db.uploads) == [1]
+
+    @pytest.mark.asyncio
+    async def test_missing_chunks_listing_is_capped(self, db, monkeypatch):
+        monkeypatch.setattr(FileUploadService, "MAX_LISTED_MISSING_CHUNKS", 2)
+        service = FileUploadService()
+        await service.upload_chunk(db, 1, chunk(1), 1, 5)
+
+        status = await service.get_chunk_status(db, 1)
+
+        assert status["missing_chunks"] == [0, 2]
+        assert status["missing_chunks_truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_rejects_chunks_above_max_chunk_size(self, db, upload, monkeypatch):
+        monkeypatch.setattr(FileUploadService, "MAX_CHUNK_SIZE", CHUNK_SIZE)
+        service = FileUploadService()
+
+        with pytest.raises(ChunkUploadError, match=f"at most {CHUNK_SIZE} bytes"):
+            await service.create_upload(db, "wide.bin", FILE_SIZE, chunk_size=CHUNK_SIZE + 1)
+        assert list(db.uploads) == [1]
+
+        # Older records without a chunk size split the file into total_chunks chunks
+        upload.chunk_size = None
+        with pytest.raises(ChunkUploadError, match="upload in more chunks"):
+            service.expected_chunk_length(upload, 0, 1)
+        with pytest.raises(ChunkUploadError, match="upload in more chunks"):
+            await service.upload_chunk(db, 1, b"x" * FILE_SIZE, 0, 1)
+
+    def test_expected_chunk_length(self, upload):
+        service = FileUploadService()
+
+        assert service.expected_chunk_length(upload, 0, 5) == CHUNK_SIZE
+        assert service.expected_chunk_length(upload, 4, 5) == FILE_SIZE - 4 * CHUNK_SIZE
+        with pytest.raises(ChunkUploadError, match="out of range"):
+            service.expected_chunk_length(upload, 5, 5)
+        with pytest.raises(ChunkUploadError, match="has 5 chunks"):
+            service.expected_chunk_length(upload, 0, 4)
+
+
+class TestBlobStorage:
+    """Test content-addressed storage of completed uploads"""
+
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_blob(self, db, upload):
+        service = FileUploadService()
+        for n in range(5):
+            await service.upload_chunk(db, 1, chunk(n), n, 5)
+
+        second = await service.create_upload(db, "again.bin", FILE_SIZE, chunk_size=CHUNK_SIZE)
+        staged_path = second.file_path
+        for n in range(5):
+            await service.upload_chunk(db, second.id, chunk(n), n, 5)
+        third = await service.upload_complete_file(db, "third.bin", CONTENT)
+
+        content_hash = hashlib.sha256(CONTENT).hexdigest()
+        assert list(db.blobs) == [content_hash]
+        assert db.blobs[content_hash].ref_count == 3
+        assert upload.file_path == second.file_path == third.file_path == service._blob_path(content_hash)
+        assert second.blob_hash == third.blob_hash == content_hash
+        assert not os.path.exists(staged_path)
+        assert os.listdir(service.UPLOAD_DIR) == ["blobs"]
+
+    @pytest.mark.asyncio
+    async def test_blob_row_is_created_before_it_is_locked(self, db):
+        service = FileUploadService()
+
+        stored = await service.upload_complete_file(db, "first.bin", CONTENT)
+
+        inserts = [i for i, statement in enumerate(db.statements) if isinstance(statement, Insert)]
+        assert len(inserts) == 1
+        sql = str(db.statements[inserts[0]].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (content_hash) DO NOTHING" in sql
+        # The row now exists, so the following SELECT ... FOR UPDATE serializes identical uploads
+        assert db.statements[inserts[0] + 1]._for_update_arg is not None
+        assert db.blobs[stored.blob_hash].ref_count == 1
+
+    @pytest.mark.asyncio
+    async def test_completes_when_a_concurrent_upload_inserted_the_blob_row(self, db):
+        service = FileUploadService()
+        content_hash = hashlib.sha256(CONTENT).hexdigest()
+        # Inserted by an identical upload that has not stored its file yet
+        db.add(FileBlob(content_hash=content_hash, file_size=FILE_SIZE, storage_path=service._blob_path(content_hash), ref_count=0))
+
+        stored = await service.upload_complete_file(db, "first.bin", CONTENT)
+
+        assert stored.status != FileStatus.UPLOADING
+        assert list(db.blobs) == [content_hash]
+        assert db.blobs[content_hash].ref_count == 1
+        assert os.path.exists(service._blob_path(content_hash))
+
+    @pytest.mark.asyncio
+    async def test_known_hash_skips_upload(self, db):
+        service = FileUploadService()
+        await service.upload_complete_file(db, "first.bin", CONTENT, user_id=1)
+        content_hash = hashlib.sha256(CONTENT).hexdigest()
+
+        known = await service.create_upload(
+            db, "copy.bin", FILE_SIZE, user_id=1, chunk_size=CHUNK_SIZE, file_hash=content_hash
+        )
+        wrong_size = await service.create_upload(db, "other.bin", FILE_SIZE + 1, user_id=1, file_hash=content_hash)
+        unknown = await service.create_upload(db, "new.bin", FILE_SIZE, user_id=1, file_hash="0" * 64)
+
+        assert known.status == FileStatus.UPLOADED
+        assert known.file_path == service._blob_path(content_hash)
+        assert (await service.get_chunk_status(db, known.id))["missing_chunks"] == []
+        assert db.blobs[content_hash].ref_count == 2
+        assert wrong_size.status == unknown.status == FileStatus.UPLOADING
+        assert unknown.blob_hash is None
+
+    @pytest.mark.asyncio
+    async def test_hash_does_not_claim_another_users_blob(self, db):
+        service = FileUploadService()
+        first = await service.upload_complete_file(db, "private.bin", CONTENT, user_id=1, pipeline_id=7)
+        content_hash = first.blob_hash
+
+        claimed = await service.create_upload(
+            db, "stolen.bin", FILE_SIZE, user_id=2, chunk_size=CHUNK_SIZE, file_hash=content_hash
+        )
+        shared = await service.create_upload(
+            db, "pipeline.bin", FILE_SIZE, user_id=3, pipeline_id=7, chunk_size=CHUNK_SIZE, file_hash=content_hash
+        )
+
+        assert claimed.status == FileStatus.UPLOADING
+        assert claimed.blob_hash is None and claimed.file_path != first.file_path
+        assert len((await service.get_chunk_status(db, claimed.id))["missing_chunks"]) == 5
+        assert await service.get_file_content(db, claimed.id) is None
+        assert shared.status == FileStatus.UPLOADED and shared.blob_hash == content_hash
+        assert db.blobs[content_hash].ref_count == 2
+
+    @pytest.mark.asyncio
+    async def test_blobs_collected_once_unreferenced(self, db):
+        service = FileUploadService()
+        first = await service.upload_complete_file(db, "first.bin", CONTENT)
+        second = await service.upload_complete_file(db, "second.bin", CONTENT)
+        content_hash = first.blob_hash
+
+        await service.delete_file(db, first.id)
+        first.expires_at = None
+        second.expires_at = datetime.utcnow() - timedelta(hours=1)
+        assert await service.cleanup_expired_files(db) == 1
+        assert content_hash not in db.blobs
+        assert not os.path.exists(service._blob_path(content_hash))
+
+    @pytest.mark.asyncio
+    async def test_referenced_blobs_survive_cleanup(self, db):
+        service = FileUploadService()
+        first = await service.upload_complete_file(db, "first.bin", CONTENT)
+        second = await service.upload_complete_file(db, "second.bin", CONTENT, is_temporary=False)
+        first.expires_at = datetime.utcnow() - timedelta(hours=1)
+        second.expires_at = None
+
+        assert await service.cleanup_expired_files(db) == 0
+        assert db.blobs[first.blob_hash].ref_count == 1
+        with open(second.file_path, "rb") as f:
+            assert f.read() == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_text_blobs_stored_compressed(self, db, monkeypatch):
+        monkeypatch.setattr(FileUploadService, "COMPRESS_UPLOADS", True)
+        service = FileUploadService()
+        text = b"id,value\n" + b"".join(b"%d,value %d\n" % (i, i) for i in range(20000))
+        upload = await service.upload_complete_file(db, "data.csv", text)
+        binary = await service.upload_complete_file(db, "data.bin", CONTENT)
+
+        assert is_compressed(upload.file_path) and not is_compressed(binary.file_path)
+        assert os.path.getsize(upload.file_path) < len(text) / 3
+        assert db.blobs[upload.blob_hash].file_size == len(text)
+        assert await service.get_file_content(db, upload.id, offset=100000, length=50) == text[100000:100050]
+        assert await service.get_file_content(db, upload.id) == text
+
+        await service.delete_file(db, upload.id)
+        upload.expires_at = datetime.utcnow() - timedelta(hours=1)
+        await service.cleanup_expired_files(db)
+        assert not os.path.exists(frame_index_path(service._blob_path(upload.blob_hash)))
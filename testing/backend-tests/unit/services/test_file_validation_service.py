@@ -0,0 +1,207 @@
+"""
+Unit Tests for Single-Pass File Validation
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- One read feeding hashing, MIME sniffing, encoding detection and structural checks
+- Streaming CSV and JSON checks across read blocks
+- Streaming the same read to the virus scanner
+- Validation off the event loop
+"""
+
+import hashlib
+import importlib
+import json
+import pkgutil
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+import backend.models
+from backend.models.file_upload import FileStatus, FileType, FileUpload
+from backend.services import file_validation_service as validation
+from backend.services.file_validation_service import FileValidationService, scan_file_contents
+
+for module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{module.name}")
+
+
+class FakeScanner:
+    """Reads the INSTREAM stream the way pyclamd does"""
+
+    def __init__(self, response=None, fail_after=None):
+        self.response = response
+        self.fail_after = fail_after
+        self.received = bytearray()
+
+    def scan_stream(self, stream, chunk_size):
+        while chunk := stream.read(chunk_size):
+            self.received.extend(chunk)
+            if self.fail_after is not None and len(self.received) >= self.fail_after:
+                raise ConnectionError("clamd went away")
+        return self.response
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(validation, "READ_BLOCK_SIZE", 256)
+    monkeypatch.setattr(validation, "SCAN_QUEUE_BLOCKS", 2)
+
+
+def upload_for(path, file_type, **fields):
+    return FileUpload(
+        id=1,
+        filename=path.name,
+        original_filename=path.name,
+        file_path=str(path),
+        file_type=file_type,
+        file_size=path.stat().st_size,
+        status=FileStatus.UPLOADED,
+        **fields
+    )
+
+
+def session_for(upload):
+    result = Mock()
+    result.scalar_one_or_none.return_value = upload
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+class TestScanFileContents:
+    """Test the single read pass"""
+
+    def test_csv_read_once(self, tmp_path, small_blocks):
+        path = tmp_path / "data.csv"
+        rows = ["id,note"] + [f'{i},"multi\nline, {i}"' for i in range(2000)]
+        path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+        reads = []
+        original = validation._TeeStream.readinto
+
+        def counting_readinto(self, buffer):
+            count = original(self, buffer)
+            reads.append(count)
+            return count
+
+        with patch.object(validation._TeeStream, "readinto", counting_readinto):
+            content = scan_file_contents(str(path), FileType.CSV)
+
+        assert content["errors"] == []
+        assert sum(reads) == content["bytes_read"] == path.stat().st_size
+        assert content["file_hash"] == hashlib.sha256(path.read_bytes()).hexdigest()
+        assert content["mime_type"].startswith("text/")
+        assert content["encoding"] == "utf-8"
+
+    def test_csv_late_inconsistency(self, tmp_path, small_blocks):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n" + "1,2\n" * 5000 + "3\n")
+
+        content = scan_file_contents(str(path), FileType.CSV)
+
+        assert content["errors"] == ["Inconsistent column count at row 5002: expected 2, got 1"]
+        assert content["bytes_read"] == path.stat().st_size
+
+    @pytest.mark.parametrize("text, error", [
+        (json.dumps([{"id": i} for i in range(500)]), None),
+        ("\n".join(json.dumps({"id": i}) for i in range(500)), None),
+        ("[]", "JSON file is empty"),
+        ("{}", "JSON file is empty"),
+        ("42", "JSON must be an object or array"),
+        ('[{"a": 1}, {"a": ', "Invalid JSON"),
+    ])
+    def test_json_structure(self, tmp_path, small_blocks, text, error):
+        path = tmp_path / "data.json"
+        path.write_text(text)
+
+        content = scan_file_contents(str(path), FileType.JSON)
+
+        if error is None:
+            assert content["errors"] == []
+        else:
+            assert len(content["errors"]) == 1 and error in content["errors"][0]
+        assert content["file_hash"] == hashlib.sha256(text.encode()).hexdigest()
+
+    def test_streams_to_virus_scanner(self, tmp_path, small_blocks):
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(range(256)) * 40)
+        scanner = FakeScanner(response={"stream": ("FOUND", "Eicar-Test-Signature")})
+
+        with patch.object(validation, "_connect_scanner", return_value=(scanner, "clean", None)):
+            content = scan_file_contents(str(path), FileType.OTHER, scan_viruses=True)
+
+        assert bytes(scanner.received) == path.read_bytes()
+        assert content["scan"][0] == "infected"
+
+    def test_failing_scanner_does_not_stall_read(self, tmp_path, small_blocks):
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10000)
+        scanner = FakeScanner(fail_after=256)
+
+        with patch.object(validation, "_connect_scanner", return_value=(scanner, "clean", None)):
+            content = scan_file_contents(str(path), FileType.OTHER, scan_viruses=True)
+
+        assert content["bytes_read"] == 10000
+        assert content["scan"][0] == "error"
+
+    def test_unavailable_scanner(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_text("hello")
+
+        with patch.object(validation, "_connect_scanner", return_value=(None, "not_scanned", "ClamAV daemon not available")):
+            content = scan_file_contents(str(path), FileType.TEXT, scan_viruses=True)
+
+        assert content["scan"] == ("not_scanned", "ClamAV daemon not available")
+
+
+class TestValidateFile:
+    """Test validation through the service"""
+
+    @pytest.mark.asyncio
+    async def test_validates_in_worker_thread(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,2\n")
+        upload = upload_for(path, FileType.CSV)
+        threads = []
+
+        def record_thread(*args):
+            threads.append(threading.current_thread())
+            return scan_file_contents(*args)
+
+        with patch.object(validation, "scan_file_contents", record_thread), \
+                patch.object(validation.magic.Magic, "from_file", side_effect=AssertionError("second read")):
+            result = await FileValidationService().validate_file(session_for(upload), 1)
+
+        assert result["valid"] is True
+        assert threads and threads[0] is not threading.main_thread()
+        assert upload.file_hash == hashlib.sha256(path.read_bytes()).hexdigest()
+        assert upload.file_metadata == {"encoding": "utf-8", "record_count": 2}
+
+    @pytest.mark.asyncio
+    async def test_rejects_hash_mismatch(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,2\n")
+        upload = upload_for(path, FileType.CSV, file_hash="0" * 64)
+
+        result = await FileValidationService().validate_file(session_for(upload), 1)
+
+        assert result["valid"] is False
+        assert "File content does not match the uploaded hash" in result["errors"]
+
+    @pytest.mark.asyncio
+    async def test_validate_and_scan_reads_once(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,2\n")
+        upload = upload_for(path, FileType.CSV)
+        scanner = FakeScanner()
+        service = FileValidationService()
+
+        with patch.object(validation, "_connect_scanner", return_value=(scanner, "clean", None)), \
+                patch.object(service, "scan_virus", new_callable=AsyncMock) as scan_virus:
+            result = await service.validate_and_scan(session_for(upload), 1)
+
+        assert result["valid"] is True and result["clean"] is True
+        assert bytes(scanner.received) == path.read_bytes()
+        assert upload.virus_scan_result == "clean"
+        scan_virus.assert_not_called()
@@ -0,0 +1,198 @@
+"""
+Unit Tests for the Compiled Function Registry
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Compiling once per (function_id, updated_at)
+- Recompiling after an update and invalidation
+- LRU bounds
+- Resolving functions from the database
+- Running function nodes in the execution engine
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import importlib
+import pkgutil
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.models
+from backend.models.pipeline_template import TransformationFunction
+from backend.schemas.pipeline_visual import (
+    NodePosition,
+    NodeType,
+    PipelineEdge,
+    PipelineNode,
+    VisualPipelineDefinition,
+)
+from backend.services.function_registry import FunctionCompilationError, FunctionRegistry
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine
+from backend.services.sandbox_worker_pool import SandboxWorkerPool
+
+# Relationship targets must all be imported before mappers can configure
+for _module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{_module.name}")
+
+DOUBLE_CODE = "def double(data):\n    return [{'v': r['v'] * 2} for r in data]"
+
+
+def make_function(function_id=1, name="double", code=DOUBLE_CODE, updated_at=None):
+    return SimpleNamespace(
+        id=function_id,
+        name=name,
+        function_code=code,
+        updated_at=updated_at,
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+@pytest.fixture
+def registry():
+    return FunctionRegistry(max_size=2)
+
+
+@asynccontextmanager
+async def db_session():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(TransformationFunction.__table__.create)
+
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+
+    await engine.dispose()
+
+
+class TestFunctionRegistry:
+    """Test compilation caching"""
+
+    def test_compiles_once_per_version(self, registry):
+        function = make_function()
+
+        first = registry.get(function)
+        second = registry.get(function)
+
+        assert first is second
+        assert registry.get_stats()["compilations"] == 1
+        assert first([{"v": 2}]) == [{"v": 4}]
+
+    def test_new_version_recompiles_and_drops_old(self, registry):
+        registry.get(make_function())
+        updated = make_function(
+            code="def double(data):\n    return [{'v': r['v'] * 3} for r in data]",
+            updated_at=datetime(2026, 1, 1) + timedelta(hours=1),
+        )
+
+        compiled = registry.get(updated)
+
+        assert compiled([{"v": 2}]) == [{"v": 6}]
+        assert registry.get_stats()["size"] == 1
+        assert registry.get_stats()["compilations"] == 2
+
+    def test_invalidate(self, registry):
+        registry.get(make_function())
+        registry.invalidate(1)
+
+        assert registry.get_stats()["size"] == 0
+
+    def test_lru_bound(self, registry):
+        for function_id in range(3):
+            registry.get(make_function(function_id=function_id))
+
+        assert registry.get_stats()["size"] == 2
+
+    def test_missing_function_name(self, registry):
+        with pytest.raises(FunctionCompilationError):
+            registry.get(make_function(name="other"))
+
+    def test_restricted_builtins(self, registry):
+        compiled = registry.get(make_function(code="def double(data):\n    return open('/etc/passwd')"))
+
+        with pytest.raises(NameError):
+            compiled([])
+
+    def test_call_batch_passes_parameters(self, registry):
+        compiled = registry.get(make_function(
+            name="scale",
+            code="def scale(data, factor=1):\n    return [{'v': r['v'] * factor} for r in data]",
+        ))
+
+        assert compiled.call_batch([{"v": 2}], {"factor": 5}) == [{"v": 10}]
+        assert compiled.call_count == 1
+
+
+class TestRegistryResolve:
+    """Test resolving functions from the database"""
+
+    @pytest.mark.asyncio
+    async def test_resolve_by_id_and_name(self, registry):
+        async with db_session() as db:
+            db.add(TransformationFunction(
+                name="double", display_name="Double", function_code=DOUBLE_CODE
+            ))
+            await db.commit()
+
+            by_name = await registry.resolve(db, name="double")
+            by_id = await registry.resolve(db, function_id=by_name.function_id)
+
+        assert by_name is by_id
+        assert registry.get_stats()["compilations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resolve_missing(self, registry):
+        async with db_session() as db:
+            assert await registry.resolve(db, function_id=999) is None
+
+
+class TestEngineFunctionNodes:
+    """Test that function nodes run user functions in the sandbox per batch"""
+
+    @pytest.mark.asyncio
+    async def test_function_node_applies_to_each_batch(self, registry):
+        engine = PipelineExecutionEngine()
+        compiled = registry.get(make_function())
+        definition = VisualPipelineDefinition(
+            nodes=[
+                PipelineNode(id="src", type=NodeType.FILE_SOURCE, position=NodePosition(x=0, y=0)),
+                PipelineNode(id="fn", type=NodeType.MAP, position=NodePosition(x=1, y=0),
+                             config={"function_id": 1}),
+            ],
+            edges=[PipelineEdge(id="e", source="src", target="fn")],
+        )
+
+        original_execute = engine._execute_node
+
+        async def execute(state, node):
+            if node.id == "src":
+                state.node_outputs["src"] = [{"v": [1, 2]}, {"v": [3]}]
+                return 3
+            return await original_execute(state, node)
+
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10)
+        try:
+            with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                    patch('backend.services.pipeline_execution_engine.sandbox_worker_pool', pool), \
+                    patch.object(engine, "_resolve_function", AsyncMock(return_value=compiled)), \
+                    patch.object(engine, "_execute_node", side_effect=execute):
+                mock_realtime.broadcast_pipeline_status = AsyncMock()
+                mock_realtime.broadcast_pipeline_progress = AsyncMock()
+                mock_realtime.broadcast_pipeline_completed = AsyncMock()
+
+                state = await engine.execute_pipeline(1, definition)
+        finally:
+            await pool.shutdown()
+
+        assert state.node_outputs["fn"] == [{"v": [2, 4]}, {"v": [6]}]
+        assert state.steps[-1].records_processed == 3
+        # User functions run in the sandbox, one call per batch
+        assert pool.get_stats()["calls"] == 2
+        assert compiled.call_count == 0
@@ -0,0 +1,126 @@
+"""
+Unit Tests for Memory Budget Service
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Run admission against the pool
+- Operator reservations and spill signalling
+- Releasing runs and reservations
+- Usage reporting per run and per operator
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.memory_budget_service import (
+    MemoryBudgetExceededError,
+    MemoryBudgetService,
+    detect_memory_limit,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def broker():
+    return MemoryBudgetService(pool_bytes=100 * MB, spill_threshold=0.8)
+
+
+class TestRunAdmission:
+    """Test admitting runs into the pool"""
+
+    @pytest.mark.asyncio
+    async def test_admit_run_within_budget(self, broker):
+        await broker.admit_run("run:1", grant_bytes=40 * MB)
+        await broker.admit_run("run:2", grant_bytes=40 * MB)
+
+        usage = broker.get_usage()
+        assert usage["used_bytes"] == 80 * MB
+        assert set(usage["runs"]) == {"run:1", "run:2"}
+
+    @pytest.mark.asyncio
+    async def test_admit_run_times_out_when_pool_is_full(self, broker):
+        await broker.admit_run("run:1", grant_bytes=80 * MB)
+
+        with pytest.raises(MemoryBudgetExceededError):
+            await broker.admit_run("run:2", grant_bytes=40 * MB, timeout=0.1)
+
+    @pytest.mark.asyncio
+    async def test_admit_run_waits_for_release(self, broker):
+        await broker.admit_run("run:1", grant_bytes=80 * MB)
+        asyncio.get_running_loop().call_later(0.05, broker.release_run, "run:1")
+
+        await broker.admit_run("run:2", grant_bytes=40 * MB, timeout=2)
+
+        assert "run:2" in broker.get_usage()["runs"]
+
+    @pytest.mark.asyncio
+    async def test_admit_run_larger_than_pool(self, broker):
+        with pytest.raises(MemoryBudgetExceededError):
+            await broker.admit_run("run:1", grant_bytes=200 * MB)
+
+
+class TestOperatorReservations:
+    """Test operator reservations within a run"""
+
+    @pytest.mark.asyncio
+    async def test_reservations_draw_from_run_grant(self, broker):
+        await broker.admit_run("run:1", grant_bytes=30 * MB)
+        broker.reserve("run:1", "sort", 20 * MB)
+
+        usage = broker.get_usage()
+        assert usage["used_bytes"] == 30 * MB
+        assert usage["runs"]["run:1"]["operators"]["sort"]["reserved_bytes"] == 20 * MB
+
+    @pytest.mark.asyncio
+    async def test_grow_refused_requests_spill(self, broker):
+        await broker.admit_run("run:1", grant_bytes=10 * MB)
+        reservation = broker.reserve("run:1", "join", 50 * MB)
+
+        assert reservation.grow(30 * MB) is True
+        assert reservation.grow(30 * MB) is False
+        assert reservation.spill_requested is True
+
+        reservation.shrink(60 * MB)
+        assert reservation.spill_requested is False
+        assert reservation.peak_bytes == 80 * MB
+
+    @pytest.mark.asyncio
+    async def test_pressure_asks_largest_consumer_to_spill(self, broker):
+        spilled = []
+        await broker.admit_run("run:1", grant_bytes=0)
+        await broker.admit_run("run:2", grant_bytes=0)
+        broker.reserve("run:1", "aggregate", 60 * MB, spill_callback=lambda: spilled.append("aggregate"))
+        broker.reserve("run:2", "sort", 25 * MB)
+
+        assert spilled == ["aggregate"]
+
+    @pytest.mark.asyncio
+    async def test_reserve_requires_admission(self, broker):
+        with pytest.raises(MemoryBudgetExceededError):
+            broker.reserve("run:unknown", "filter", MB)
+
+    @pytest.mark.asyncio
+    async def test_context_manager_releases_reservation(self, broker):
+        await broker.admit_run("run:1", grant_bytes=0)
+
+        with broker.reserve("run:1", "filter", 10 * MB):
+            assert broker.get_usage()["used_bytes"] == 10 * MB
+
+        assert broker.get_usage()["used_bytes"] == 0
+        assert broker.get_usage()["runs"]["run:1"]["operators"] == {}
+
+    @pytest.mark.asyncio
+    async def test_release_run_frees_operators(self, broker):
+        await broker.admit_run("run:1", grant_bytes=0)
+        reservation = broker.reserve("run:1", "join", 40 * MB)
+
+        broker.release_run("run:1")
+
+        assert broker.get_usage()["used_bytes"] == 0
+        assert reservation.grow(MB) is False
+
+
+def test_detect_memory_limit_is_positive():
+    assert detect_memory_limit() > 0
@@ -0,0 +1,240 @@
+"""
+Unit Tests for Node Output Cache
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Fingerprinting of node config, upstream outputs and watermarks
+- Storing and loading columnar batches
+- LRU eviction by size
+- Reusing cached outputs in pipeline execution
+- Missing the cache after a node's transformation function or schema mapping is edited
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.schemas.pipeline_visual import (
+    NodePosition,
+    NodeType,
+    PipelineEdge,
+    PipelineNode,
+    VisualPipelineDefinition,
+)
+from backend.services.node_output_cache import (
+    NodeOutputCache,
+    columns_to_records,
+    records_to_columns,
+)
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine
+
+
+def make_node(node_id, node_type, config=None):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        position=NodePosition(x=0, y=0),
+        config=config or {},
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return NodeOutputCache(cache_dir=tmp_path / "node_cache", max_bytes=10 * 1024 * 1024)
+
+
+class TestColumnarConversion:
+    """Test record/column conversion helpers"""
+
+    def test_round_trip(self):
+        records = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        batch = records_to_columns(records)
+
+        assert batch == {"id": [1, 2], "name": ["a", "b"]}
+        assert columns_to_records(batch) == records
+
+    def test_sparse_records(self):
+        batch = records_to_columns([{"id": 1}, {"id": 2, "extra": "x"}])
+
+        assert batch == {"id": [1, 2], "extra": [None, "x"]}
+
+
+class TestFingerprint:
+    """Test node fingerprint computation"""
+
+    def test_same_inputs_same_fingerprint(self):
+        node = make_node("f", NodeType.FILTER, {"condition": "x > 1"})
+
+        assert NodeOutputCache.compute_fingerprint(node, ["a"]) == \
+            NodeOutputCache.compute_fingerprint(node, ["a"])
+
+    def test_config_change_changes_fingerprint(self):
+        a = make_node("f", NodeType.FILTER, {"condition": "x > 1"})
+        b = make_node("f", NodeType.FILTER, {"condition": "x > 2"})
+
+        assert NodeOutputCache.compute_fingerprint(a, ["up"]) != \
+            NodeOutputCache.compute_fingerprint(b, ["up"])
+
+    def test_upstream_change_changes_fingerprint(self):
+        node = make_node("f", NodeType.FILTER)
+
+        assert NodeOutputCache.compute_fingerprint(node, ["up1"]) != \
+            NodeOutputCache.compute_fingerprint(node, ["up2"])
+
+    def test_revision_changes_fingerprint(self):
+        node = make_node("f", NodeType.MAP, {"function_id": 5})
+
+        assert NodeOutputCache.compute_fingerprint(node, ["up"], revision="v1") != \
+            NodeOutputCache.compute_fingerprint(node, ["up"], revision="v2")
+        assert NodeOutputCache.compute_fingerprint(node, ["up"]) == \
+            NodeOutputCache.compute_fingerprint(node, ["up"], revision=None)
+
+    def test_source_watermark(self):
+        node = make_node("s", NodeType.DATABASE_SOURCE, {"watermark": "2026-10-01"})
+
+        assert NodeOutputCache.source_watermark(node) == "2026-10-01"
+        assert NodeOutputCache.source_watermark(make_node("s", NodeType.API_SOURCE)) is None
+
+
+class TestCacheStorage:
+    """Test storing, loading and evicting entries"""
+
+    def test_put_and_get(self, cache):
+        batches = [{"id": [1, 2]}, {"id": [3]}]
+        cache.put("ab" * 32, batches)
+
+        entry = cache.get("ab" * 32)
+        assert entry["batches"] == batches
+        assert entry["record_count"] == 3
+        assert cache.get_stats()["hits"] == 1
+
+    def test_miss(self, cache):
+        assert cache.get("cd" * 32) is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_index_is_rebuilt_from_disk(self, cache, tmp_path):
+        cache.put("ef" * 32, [{"id": [1]}])
+
+        reopened = NodeOutputCache(cache_dir=tmp_path / "node_cache", max_bytes=10 * 1024 * 1024)
+        assert reopened.contains("ef" * 32)
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        small_cache = NodeOutputCache(cache_dir=tmp_path / "lru", max_bytes=3000)
+        payload = [{"value": ["x" * 1000]}]
+
+        small_cache.put("01" * 32, payload)
+        small_cache.put("02" * 32, payload)
+        small_cache.get("01" * 32)
+        small_cache.put("03" * 32, payload)
+
+        assert small_cache.contains("01" * 32)
+        assert not small_cache.contains("02" * 32)
+        assert small_cache.contains("03" * 32)
+        assert small_cache.get_stats()["size_bytes"] <= 3000
+
+
+class TestEngineCacheReuse:
+    """Test that unchanged upstream nodes are served from cache"""
+
+    @pytest.mark.asyncio
+    async def test_rerun_reuses_unchanged_upstream(self, cache):
+        def definition(filter_condition):
+            return VisualPipelineDefinition(
+                nodes=[
+                    make_node("src", NodeType.DATABASE_SOURCE, {"snapshot_id": "snap-1"}),
+                    make_node("flt", NodeType.FILTER, {"condition": filter_condition}),
+                ],
+                edges=[PipelineEdge(id="e1", source="src", target="flt")],
+            )
+
+        engine = PipelineExecutionEngine()
+        executed = []
+
+        async def fake_node(state, node):
+            executed.append(node.id)
+            state.node_outputs[node.id] = [{"id": [1, 2, 3]}]
+            return 3
+
+        with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                patch('backend.services.pipeline_execution_engine.node_output_cache', cache), \
+                patch.object(engine, "_execute_node", side_effect=fake_node):
+            mock_realtime.broadcast_pipeline_status = AsyncMock()
+            mock_realtime.broadcast_pipeline_progress = AsyncMock()
+            mock_realtime.broadcast_pipeline_completed = AsyncMock()
+
+            await engine.execute_pipeline(1, definition("x > 1"), use_cache=True)
+            state = await engine.execute_pipeline(1, definition("x > 2"), use_cache=True)
+
+        assert executed == ["src", "flt", "flt"]
+        assert state.cached_nodes == ["src"]
+        assert state.node_outputs["src"] == [{"id": [1, 2, 3]}]
+
+    async def run_with_edit(self, cache, definition, edit, **patches):
+        """Run a pipeline twice, apply `edit`, run it again; returns executed node ids and the last state"""
+        engine = PipelineExecutionEngine()
+        executed = []
+
+        async def fake_node(state, node):
+            executed.append(node.id)
+            state.node_outputs[node.id] = [{"id": [1, 2, 3]}]
+            return 3
+
+        with patch('backend.services.pipeline_execution_engine.realtime_pipeline_service') as mock_realtime, \
+                patch('backend.services.pipeline_execution_engine.node_output_cache', cache), \
+                patch.object(engine, "_execute_node", side_effect=fake_node):
+            for name, value in patches.items():
+                setattr(engine, name, value)
+            mock_realtime.broadcast_pipeline_status = AsyncMock()
+            mock_realtime.broadcast_pipeline_progress = AsyncMock()
+            mock_realtime.broadcast_pipeline_completed = AsyncMock()
+
+            await engine.execute_pipeline(1, definition, use_cache=True)
+            state = await engine.execute_pipeline(1, definition, use_cache=True)
+            assert state.cached_nodes == [node.id for node in definition.nodes]
+            edit()
+            state = await engine.execute_pipeline(1, definition, use_cache=True)
+        return executed, state
+
+    @pytest.mark.asyncio
+    async def test_function_edit_misses_cache(self, cache):
+        definition = VisualPipelineDefinition(
+            nodes=[
+                make_node("src", NodeType.DATABASE_SOURCE, {"snapshot_id": "snap-1"}),
+                make_node("fn", NodeType.MAP, {"function_id": 5}),
+            ],
+            edges=[PipelineEdge(id="e1", source="src", target="fn")],
+        )
+        function = SimpleNamespace(version="2026-10-01T00:00:00")
+
+        def edit_function():
+            function.version = "2026-10-02T00:00:00"
+
+        executed, state = await self.run_with_edit(
+            cache, definition, edit_function, _resolve_function=AsyncMock(return_value=function)
+        )
+
+        assert executed == ["src", "fn", "fn"]
+        assert state.cached_nodes == ["src"]
+
+    @pytest.mark.asyncio
+    async def test_schema_mapping_edit_misses_cache(self, cache):
+        definition = VisualPipelineDefinition(
+            nodes=[
+                make_node("src", NodeType.DATABASE_SOURCE, {"snapshot_id": "snap-1"}),
+                make_node("map", NodeType.MAP, {"schema_mapping_id": 7}),
+            ],
+            edges=[PipelineEdge(id="e1", source="src", target="map")],
+        )
+        mapping = SimpleNamespace(version="2026-10-01T00:00:00")
+
+        def edit_mapping():
+            mapping.version = "2026-10-02T00:00:00"
+
+        executed, state = await self.run_with_edit(
+            cache, definition, edit_mapping, _resolve_schema_mapping=AsyncMock(return_value=mapping)
+        )
+
+        assert executed == ["src", "map", "map"]
+        assert state.cached_nodes == ["src"]
+
@@ -0,0 +1,176 @@
+"""
+Unit Tests for the Sandbox Worker Pool
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Running functions and columnar batches in worker processes
+- Error propagation from user code
+- Per-batch timeouts, CPU and memory limits
+- Worker recycling after N calls
+- Shared memory transport and restricted result unpickling
+"""
+
+from types import SimpleNamespace
+import os
+import pickle
+
+import pytest
+
+from backend.services.sandbox_worker_pool import (
+    SandboxFunctionError,
+    SandboxResourceError,
+    SandboxTimeoutError,
+    SandboxWorkerPool,
+    _restricted_loads,
+)
+
+
+def make_function(code, name="transform", function_id=1, version="v1"):
+    return SimpleNamespace(function_id=function_id, version=version, name=name, source=code)
+
+
+DOUBLE = make_function("def transform(data, factor=2):\n    return [{'v': r['v'] * factor} for r in data]")
+SPIN = make_function("def transform(data):\n    while True:\n        pass", function_id=2)
+
+
+def shm_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+
+class TestSandboxCalls:
+    """Test running functions in workers"""
+
+    @pytest.mark.asyncio
+    async def test_call_returns_result(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10)
+        try:
+            result = await pool.call(DOUBLE, [{"v": 1}, {"v": 2}], {"factor": 3})
+        finally:
+            await pool.shutdown()
+
+        assert result == [{"v": 3}, {"v": 6}]
+
+    @pytest.mark.asyncio
+    async def test_call_columnar(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10)
+        try:
+            result = await pool.call_columnar(DOUBLE, {"v": [1, 2, 3]})
+        finally:
+            await pool.shutdown()
+
+        assert result == {"v": [2, 4, 6]}
+
+    @pytest.mark.asyncio
+    async def test_user_error_is_reported(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10)
+        failing = make_function("def transform(data):\n    return data['missing']", function_id=3)
+        try:
+            with pytest.raises(SandboxFunctionError) as exc_info:
+                await pool.call(failing, {})
+            # The worker survives ordinary exceptions
+            assert await pool.call(DOUBLE, [{"v": 1}]) == [{"v": 2}]
+        finally:
+            await pool.shutdown()
+
+        assert exc_info.value.error_type == "KeyError"
+        assert pool.get_stats()["recycled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_restricted_builtins(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10)
+        escape = make_function("def transform(data):\n    return open('/etc/passwd').read()", function_id=4)
+        try:
+            with pytest.raises(SandboxFunctionError) as exc_info:
+                await pool.call(escape, [])
+        finally:
+            await pool.shutdown()
+
+        assert exc_info.value.error_type == "NameError"
+
+    @pytest.mark.asyncio
+    async def test_large_batch_uses_shared_memory(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, timeout_seconds=10, shm_threshold=1024)
+        before = shm_blocks()
+        try:
+            result = await pool.call_columnar(DOUBLE, {"v": list(range(10000))})
+        finally:
+            await pool.shutdown()
+
+        assert result["v"][-1] == 19998
+        assert shm_blocks() == before
+
+
+class TestSandboxLimits:
+    """Test timeouts, resource limits and recycling"""
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_and_replaces_worker(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=0, timeout_seconds=10)
+        try:
+            await pool.start()
+            pid = pool.get_stats()["workers"][0]["pid"]
+
+            with pytest.raises(SandboxTimeoutError):
+                await pool.call(SPIN, [], timeout=0.5)
+
+            stats = pool.get_stats()
+            assert stats["timeouts"] == 1
+            assert stats["workers"][0]["pid"] != pid
+            assert await pool.call(DOUBLE, [{"v": 1}]) == [{"v": 2}]
+        finally:
+            await pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cpu_limit(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=1, timeout_seconds=30)
+        try:
+            with pytest.raises(SandboxResourceError):
+                await pool.call(SPIN, [])
+            assert await pool.call(DOUBLE, [{"v": 1}]) == [{"v": 2}]
+        finally:
+            await pool.shutdown()
+
+        assert pool.get_stats()["recycled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_limit(self):
+        pool = SandboxWorkerPool(size=1, cpu_seconds=5, memory_bytes=256 * 1024 * 1024, timeout_seconds=30)
+        hog = make_function("def transform(data):\n    return [0] * (10 ** 9)", function_id=5)
+        try:
+            with pytest.raises(SandboxResourceError):
+                await pool.call(hog, [])
+            assert await pool.call(DOUBLE, [{"v": 1}]) == [{"v": 2}]
+        finally:
+            await pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_calls(self):
+        pool = SandboxWorkerPool(size=1, max_calls_per_worker=2, cpu_seconds=5, timeout_seconds=10)
+        try:
+            await pool.start()
+            pid = pool.get_stats()["workers"][0]["pid"]
+            for _ in range(3):
+                await pool.call(DOUBLE, [{"v": 1}])
+            stats = pool.get_stats()
+        finally:
+            await pool.shutdown()
+
+        assert stats["recycled"] == 1
+        assert stats["workers"][0]["pid"] != pid
+        assert stats["workers"][0]["calls"] == 1
+
+
+class TestRestrictedUnpickling:
+    """Test that worker results cannot smuggle arbitrary objects"""
+
+    def test_allows_plain_data(self):
+        from datetime import datetime
+        from decimal import Decimal
+
+        data = [{"a": 1, "b": Decimal("1.5"), "c": datetime(2026, 1, 1), "d": {1, 2}}]
+
+        assert _restricted_loads(pickle.dumps(data)) == data
+
+    def test_refuses_other_classes(self):
+        with pytest.raises(pickle.UnpicklingError):
+            _restricted_loads(pickle.dumps(SimpleNamespace(a=1)))
@@ -0,0 +1,207 @@
+"""
+Unit Tests for Streaming Schema Inference
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Monotone type widening and nullability over every value
+- Date format detection and disambiguation
+- Streaming CSV and JSON (array, NDJSON) inference with reservoir sampling
+- Background inference jobs with progress
+"""
+
+import json
+import threading
+
+import pytest
+
+from backend.services import schema_inference_service as inference
+from backend.services.schema_inference_service import (
+    SchemaInferenceError,
+    SchemaInferenceService,
+    infer_csv_file,
+    infer_json_file,
+    iter_json_records,
+    reservoir_sample,
+)
+from backend.services.schema_introspector import (
+    APISchemaIntrospector,
+    ColumnTypeTracker,
+    DataType,
+    FileSchemaIntrospector,
+)
+
+
+def resolve(values, parse_text=True):
+    tracker = ColumnTypeTracker(parse_text)
+    for value in values:
+        tracker.observe(value)
+    return tracker
+
+
+def fields_by_name(result):
+    return {field["name"]: field for field in result["fields"]}
+
+
+class TestColumnTypeTracker:
+    """Test single-pass type inference"""
+
+    def test_widening(self):
+        assert resolve(["1", "2"]).resolve() == DataType.INTEGER
+        assert resolve(["1", "2", "2.5"]).resolve() == DataType.FLOAT
+        assert resolve(["1", "2.5", "n/a"]).resolve() == DataType.STRING
+        assert resolve(["0", "1"]).resolve() == DataType.INTEGER
+        assert resolve(["yes", "0", "No"]).resolve() == DataType.BOOLEAN
+        assert resolve(["nan", "inf"]).resolve() == DataType.STRING
+
+    def test_late_values_are_not_ignored(self):
+        values = [str(i) for i in range(50)] + ["oops"]
+
+        assert resolve(values).resolve() == DataType.STRING
+        assert FileSchemaIntrospector._infer_csv_column_type(values) == DataType.STRING
+
+    def test_date_formats_narrow(self):
+        tracker = resolve(["05/01/2026", "06/01/2026", "25/01/2026"])
+
+        assert tracker.resolve() == DataType.DATE
+        assert tracker.date_format == "%d/%m/%Y"
+        assert resolve(["2026-02-30"]).resolve() == DataType.STRING
+        assert resolve(["2026-01-05", "2026-01-05T10:00:00Z"]).resolve() == DataType.DATETIME
+
+    def test_nullability_counts_missing_values(self):
+        field = resolve(["a", "", None, "abcd"]).to_schema_field("name", total=6)
+
+        assert field.nullable is True
+        assert field.max_length == 4
+        assert field.constraints["null_count"] == 4
+
+    def test_native_values(self):
+        assert resolve([1, 2.5], parse_text=False).resolve() == DataType.FLOAT
+        assert resolve([True, False], parse_text=False).resolve() == DataType.BOOLEAN
+        assert resolve([1, "1"], parse_text=False).resolve() == DataType.STRING
+        assert resolve(["12"], parse_text=False).resolve() == DataType.STRING
+        assert resolve([None], parse_text=False).resolve() == DataType.UNKNOWN
+
+    def test_json_sample_uses_every_object(self):
+        schema = APISchemaIntrospector.introspect_json_sample(
+            [{"id": 1, "tags": ["a"]}, {"id": 2.5, "note": "x"}]
+        )
+
+        fields = fields_by_name(schema)
+        assert fields["id"]["data_type"] == "float"
+        assert fields["tags"]["data_type"] == "array"
+        assert fields["note"]["nullable"] is True
+        assert schema["sample_record_count"] == 2
+
+
+class TestStreamingFiles:
+    """Test streaming file inference"""
+
+    def test_csv_full_scan(self, tmp_path):
+        path = tmp_path / "data.csv"
+        lines = ["id,amount,joined,comment"]
+        lines += [f"{i},{i}.5,2026-01-{i % 28 + 1:02d},\"line, {i}\"" for i in range(5000)]
+        lines.append("5000,,2026-02-01,")
+        path.write_text("\n".join(lines) + "\n")
+        reported = []
+
+        result = infer_csv_file(str(path), progress=lambda *args: reported.append(args))
+
+        fields = fields_by_name(result)
+        assert result["row_count"] == 5001
+        assert fields["id"]["data_type"] == "integer"
+        assert fields["amount"]["data_type"] == "float" and fields["amount"]["nullable"] is True
+        assert fields["joined"]["data_type"] == "date"
+        assert fields["comment"]["data_type"] == "string"
+        assert reported[-1] == (path.stat().st_size, path.stat().st_size, 5001)
+
+    def test_csv_sampling(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a\n" + "\n".join(str(i) for i in range(3000)) + "\n")
+
+        result = infer_csv_file(str(path), sample_size=200)
+
+        assert result["row_count"] == 3000
+        assert result["sampled_row_count"] == 200
+        assert fields_by_name(result)["a"]["data_type"] == "integer"
+
+    def test_empty_csv(self, tmp_path):
+        path = tmp_path / "empty.csv"
+        path.write_text("")
+
+        with pytest.raises(SchemaInferenceError):
+            infer_csv_file(str(path))
+
+    @pytest.mark.parametrize("layout", ["array", "ndjson"])
+    def test_json_layouts_across_read_blocks(self, tmp_path, monkeypatch, layout):
+        monkeypatch.setattr(inference, "READ_BLOCK_SIZE", 64)
+        records = [{"id": i, "value": i * 1.5, "label": "é" * (i % 7)} for i in range(300)]
+        records[150]["extra"] = {"nested": "x" * 500}
+        path = tmp_path / "data.json"
+        if layout == "array":
+            path.write_text(json.dumps(records, indent=2), encoding="utf-8")
+        else:
+            path.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+
+        with open(path, "rb") as stream:
+            assert list(iter_json_records(stream)) == records
+
+        result = infer_json_file(str(path))
+        fields = fields_by_name(result)
+        assert result["record_count"] == 300
+        assert fields["value"]["data_type"] == "float"
+        assert fields["extra"]["data_type"] == "object" and fields["extra"]["nullable"] is True
+
+    def test_invalid_json(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text('[{"a": 1}, {"a": ')
+
+        with pytest.raises(SchemaInferenceError):
+            infer_json_file(str(path))
+
+    def test_reservoir_sample_is_bounded_and_uniform(self):
+        counts = [0] * 10
+        for seed in range(2000):
+            for item in reservoir_sample(iter(range(10)), 3, seed=seed):
+                counts[item] += 1
+
+        assert len(reservoir_sample(iter(range(1000)), 5)) == 5
+        assert all(500 < count < 700 for count in counts)
+
+
+class TestSchemaInferenceJobs:
+    """Test background inference jobs"""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_in_worker_thread(self, tmp_path, monkeypatch):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,x\n2,y\n")
+        threads = []
+        original = SchemaInferenceService.infer_file
+
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(SchemaInferenceService, "infer_file", staticmethod(record_thread))
+        service = SchemaInferenceService()
+
+        job = service.start_job(str(path), "csv")
+        assert job["status"] == "running"
+        finished = await service.wait(job["job_id"])
+
+        assert finished["status"] == "completed"
+        assert finished["progress"] == 1.0
+        assert finished["records_scanned"] == 2
+        assert fields_by_name(finished["result"])["a"]["data_type"] == "integer"
+        assert threads and threads[0] is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self, tmp_path):
+        service = SchemaInferenceService()
+
+        job = service.start_job(str(tmp_path / "missing.csv"), "csv")
+        finished = await service.wait(job["job_id"])
+
+        assert finished["status"] == "failed"
+        assert finished["error"]
+        assert service.get_job("unknown") is None
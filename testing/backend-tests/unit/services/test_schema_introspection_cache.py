@@ -0,0 +1,161 @@
+"""
+Unit Tests for the Schema Introspection Cache
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Serving unchanged schemas from cache after a fingerprint check
+- Re-introspection and drift events when the catalog changes
+- Drift listeners and event history, per user
+- Table-level schema comparison
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.services.schema_introspection_cache import SchemaIntrospectionCache, connection_fingerprint
+from backend.services.schema_introspector import DatabaseSchemaIntrospector, SchemaComparator
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'source.db'}"
+    execute(url,
+            "CREATE TABLE customers (id INTEGER PRIMARY KEY, email VARCHAR(120), score INTEGER)",
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, total NUMERIC)")
+    return url
+
+
+def execute(url, *statements):
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    engine.dispose()
+
+
+def count_introspections():
+    return patch.object(
+        DatabaseSchemaIntrospector, "introspect_connection",
+        side_effect=DatabaseSchemaIntrospector.introspect_connection
+    )
+
+
+class TestIntrospectionCache:
+    """Test fingerprint-checked caching"""
+
+    def test_unchanged_schema_is_served_from_cache(self, database_url):
+        cache = SchemaIntrospectionCache()
+
+        with count_introspections() as introspect:
+            first = cache.introspect(database_url)
+            second = cache.introspect(database_url)
+
+        assert introspect.call_count == 1
+        assert first["cached"] is False and second["cached"] is True
+        assert first["fingerprint"] == second["fingerprint"]
+        assert second["tables"] == first["tables"]
+        assert cache.get_stats()["hits"] == 1
+
+    def test_paging_from_cache(self, database_url):
+        cache = SchemaIntrospectionCache()
+        cache.introspect(database_url)
+
+        page = cache.introspect(database_url, offset=1, limit=1)
+
+        assert page["cached"] is True
+        assert [t["name"] for t in page["tables"]] == ["orders"]
+        assert page["total_tables"] == 2
+        assert page["next_offset"] is None
+
+    def test_refresh_forces_introspection(self, database_url):
+        cache = SchemaIntrospectionCache()
+        cache.introspect(database_url)
+
+        assert cache.introspect(database_url, refresh=True)["cached"] is False
+
+    def test_errors_are_reported(self, tmp_path):
+        result = SchemaIntrospectionCache().introspect(f"sqlite:///{tmp_path / 'missing' / 'x.db'}")
+
+        assert "error" in result
+
+    def test_password_is_not_part_of_the_key(self):
+        assert connection_fingerprint("postgresql://u:old@db:5432/app") == \
+            connection_fingerprint("postgresql://u:new@db:5432/app")
+        assert connection_fingerprint("postgresql://u:p@db:5432/app") != \
+            connection_fingerprint("postgresql://u:p@db:5432/other")
+
+
+class TestDriftDetection:
+    """Test drift events on catalog changes"""
+
+    def test_added_column_is_non_breaking_drift(self, database_url):
+        cache = SchemaIntrospectionCache()
+        cache.introspect(database_url)
+        execute(database_url, "ALTER TABLE customers ADD COLUMN phone TEXT")
+
+        result = cache.introspect(database_url)
+        drift = result["drift"]
+
+        assert result["cached"] is False
+        assert drift["event_type"] == "schema_drift"
+        assert drift["breaking"] is False
+        assert drift["changed_tables"][0]["table"] == "customers"
+        assert drift["changed_tables"][0]["added_fields"] == ["phone"]
+        assert drift["previous_fingerprint"] != drift["current_fingerprint"]
+        assert cache.introspect(database_url)["cached"] is True
+
+    def test_dropped_table_is_breaking_and_notifies_listeners(self, database_url):
+        cache = SchemaIntrospectionCache()
+        received = []
+        cache.add_drift_listener(lambda event: 1 / 0)
+        cache.add_drift_listener(received.append)
+        cache.introspect(database_url)
+        execute(database_url, "DROP TABLE orders", "CREATE TABLE refunds (id INTEGER PRIMARY KEY)")
+
+        cache.introspect(database_url)
+
+        assert len(received) == 1
+        assert received[0]["breaking"] is True
+        assert received[0]["removed_tables"] == ["orders"]
+        assert received[0]["added_tables"] == ["refunds"]
+        assert cache.get_drift_events() == received
+
+    def test_drift_events_filtered_by_user(self, database_url):
+        cache = SchemaIntrospectionCache()
+        cache.introspect(database_url, user_id=1)
+        execute(database_url, "ALTER TABLE customers ADD COLUMN phone TEXT")
+
+        drift = cache.introspect(database_url, user_id=1)["drift"]
+
+        assert drift["user_id"] == 1
+        assert cache.get_drift_events(user_id=1) == [drift]
+        assert cache.get_drift_events(user_id=2) == []
+        assert cache.get_drift_events() == [drift]
+
+    def test_index_only_change(self, database_url):
+        cache = SchemaIntrospectionCache()
+        cache.introspect(database_url)
+        execute(database_url, "CREATE INDEX ix_customers_email ON customers (email)")
+
+        drift = cache.introspect(database_url)["drift"]
+
+        assert drift["breaking"] is False
+        assert drift["changed_tables"][0]["index_changes"] == {"added": ["ix_customers_email"], "removed": []}
+
+
+class TestCompareDatabaseSchemas:
+    """Test table-level comparison"""
+
+    def test_type_change_is_breaking(self):
+        previous = {"tables": [{"name": "t", "fields": [{"name": "a", "data_type": "integer"}], "indexes": []}]}
+        current = {"tables": [{"name": "t", "fields": [{"name": "a", "data_type": "string"}], "indexes": []}]}
+
+        event = SchemaComparator.build_drift_event("db", "public", previous, current)
+
+        assert event["breaking"] is True
+        assert event["changed_tables"][0]["type_changes"] == [
+            {"field": "a", "old_type": "integer", "new_type": "string"}
+        ]
+        assert SchemaComparator.compare_database_schemas(previous, previous)["schemas_match"] is True
@@ -0,0 +1,111 @@
+"""
+Unit Tests for Database Schema Introspection
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Bulk reflection of columns, keys, defaults and indexes
+- Paging through large schemas
+- Streaming tables page by page
+- Running introspection off the event loop
+"""
+
+from unittest.mock import patch
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.services.schema_introspector import DatabaseSchemaIntrospector
+
+TABLE_COUNT = 120
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'catalog.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, email VARCHAR(120) NOT NULL)"))
+        for i in range(TABLE_COUNT):
+            conn.execute(text(
+                f"CREATE TABLE orders_{i:03d} ("
+                "id INTEGER PRIMARY KEY, "
+                "customer_id INTEGER REFERENCES customers(id), "
+                "amount NUMERIC(10, 2), "
+                "placed_at TIMESTAMP, "
+                "note TEXT DEFAULT 'none')"
+            ))
+            conn.execute(text(f"CREATE INDEX ix_orders_{i:03d}_customer ON orders_{i:03d} (customer_id)"))
+    engine.dispose()
+    return url
+
+
+def tables_by_name(schema):
+    return {table["name"]: table for table in schema["tables"]}
+
+
+class TestBulkIntrospection:
+    """Test bulk catalog reflection"""
+
+    def test_reflects_columns_keys_and_indexes(self, database_url):
+        schema = DatabaseSchemaIntrospector.introspect_database(database_url)
+
+        assert schema["schema_name"] == "main"
+        assert schema["table_count"] == schema["total_tables"] == TABLE_COUNT + 1
+        assert schema["next_offset"] is None
+
+        orders = tables_by_name(schema)["orders_007"]
+        fields = {field["name"]: field for field in orders["fields"]}
+        assert fields["id"]["primary_key"] is True
+        assert fields["customer_id"]["foreign_key"] == "customers.id"
+        assert fields["amount"]["data_type"] == "float"
+        assert fields["placed_at"]["data_type"] == "datetime"
+        assert fields["note"]["default_value"] == "'none'"
+        assert [index["name"] for index in orders["indexes"]] == ["ix_orders_007_customer"]
+
+        email = tables_by_name(schema)["customers"]["fields"][1]
+        assert email["nullable"] is False
+        assert email["max_length"] == 120
+
+    def test_paging(self, database_url):
+        first = DatabaseSchemaIntrospector.introspect_database(database_url, limit=50)
+        second = DatabaseSchemaIntrospector.introspect_database(database_url, offset=first["next_offset"], limit=100)
+
+        assert first["table_count"] == 50
+        assert first["next_offset"] == 50
+        assert second["table_count"] == TABLE_COUNT + 1 - 50
+        assert second["next_offset"] is None
+        names = [t["name"] for t in first["tables"] + second["tables"]]
+        assert names == sorted(names)
+        assert len(set(names)) == TABLE_COUNT + 1
+
+    def test_connection_error_is_reported(self, tmp_path):
+        schema = DatabaseSchemaIntrospector.introspect_database(
+            f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}"
+        )
+
+        assert "error" in schema
+
+    def test_stream_matches_bulk_result(self, database_url):
+        items = list(DatabaseSchemaIntrospector.iter_tables(database_url, page_size=16))
+        header, tables = items[0], items[1:]
+
+        assert header["total_tables"] == TABLE_COUNT + 1
+        assert header["connection_type"] == "sqlite"
+        bulk = DatabaseSchemaIntrospector.introspect_database(database_url)
+        assert tables == bulk["tables"]
+
+    @pytest.mark.asyncio
+    async def test_async_runs_in_worker_thread(self, database_url):
+        calling_threads = []
+        original = DatabaseSchemaIntrospector._introspect_tables
+
+        def record_thread(*args):
+            calling_threads.append(threading.current_thread())
+            return original(*args)
+
+        with patch.object(DatabaseSchemaIntrospector, "_introspect_tables", side_effect=record_thread):
+            schema = await DatabaseSchemaIntrospector.introspect_database_async(database_url, limit=5)
+
+        assert schema["table_count"] == 5
+        assert calling_threads and calling_threads[0] is not threading.main_thread()
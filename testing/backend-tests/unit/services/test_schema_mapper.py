@@ -0,0 +1,122 @@
+"""
+Unit Tests for Schema Mapping Generation
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Field name normalization, abbreviations and synonyms
+- Exact, case-insensitive and indexed fuzzy matching
+- Type-compatibility pruning of fuzzy candidates
+- Auto-mapping very wide schemas
+"""
+
+import random
+import time
+
+from backend.services.schema_mapper import (
+    FieldMatchIndex,
+    MappingGenerator,
+    MappingType,
+    normalize_field_name,
+    types_compatible,
+)
+
+
+def schema(*fields):
+    return {"fields": [{"name": name, "data_type": data_type} for name, data_type in fields]}
+
+
+def mapped(mappings):
+    return {m.destination_field: m.source_field for m in mappings}
+
+
+class TestNormalization:
+    """Test field name tokenization"""
+
+    def test_splits_case_styles(self):
+        assert normalize_field_name("customerFirstName") == ("customer", "first", "name")
+        assert normalize_field_name("CUSTOMER_ID") == ("customer", "id")
+        assert normalize_field_name("HTTPStatusCode2") == ("http", "status", "code", "2")
+
+    def test_expands_abbreviations_and_plurals(self):
+        assert normalize_field_name("cust_nm") == ("customer", "name")
+        assert normalize_field_name("zip") == ("postal", "code")
+        assert normalize_field_name("orders") == ("order",)
+        assert normalize_field_name("status") == ("status",)
+
+    def test_type_compatibility(self):
+        assert types_compatible("integer", "float")
+        assert types_compatible("string", "datetime")
+        assert types_compatible("date", "timestamp")
+        assert not types_compatible("boolean", "datetime")
+        assert not types_compatible("array", "integer")
+
+
+class TestAutoGenerateMappings:
+    """Test automatic mapping generation"""
+
+    def test_exact_and_case_insensitive_matches(self):
+        mappings = MappingGenerator.auto_generate_mappings(
+            schema(("id", "integer"), ("Email", "string"), ("email", "string")),
+            schema(("id", "integer"), ("EMAIL", "string")),
+        )
+
+        assert mapped(mappings) == {"id": "id", "EMAIL": "Email"}
+        assert mappings[0].mapping_type == MappingType.DIRECT
+
+    def test_fuzzy_match_with_abbreviations(self):
+        mappings = MappingGenerator.auto_generate_mappings(
+            schema(("cust_nm", "string"), ("order_qty", "integer"), ("zip", "string"), ("created", "datetime")),
+            schema(("customerName", "string"), ("OrderQuantity", "float"), ("postal_code", "string")),
+        )
+
+        assert mapped(mappings) == {
+            "customerName": "cust_nm",
+            "OrderQuantity": "order_qty",
+            "postal_code": "zip",
+        }
+        quantity = next(m for m in mappings if m.destination_field == "OrderQuantity")
+        assert quantity.mapping_type == MappingType.TRANSFORM
+
+    def test_incompatible_types_are_pruned(self):
+        mappings = MappingGenerator.auto_generate_mappings(
+            schema(("is_active_flag", "boolean"), ("active_flags", "array")),
+            schema(("active_flag", "datetime")),
+        )
+
+        assert mappings == []
+
+    def test_unrelated_names_are_not_matched(self):
+        mappings = MappingGenerator.auto_generate_mappings(
+            schema(("revenue", "float"), ("region", "string")),
+            schema(("phone_number", "string")),
+        )
+
+        assert mappings == []
+
+    def test_index_only_scores_top_candidates(self):
+        source = {f"field_{i}": {"name": f"field_{i}", "data_type": "string"} for i in range(500)}
+        index = FieldMatchIndex(source)
+
+        tokens, grams = index._features("field_42")
+        assert len(index._candidates(tokens, grams)) <= FieldMatchIndex.MAX_CANDIDATES
+        assert index.best_match("Field42")[0] == "field_42"
+
+    def test_wide_schemas(self):
+        rng = random.Random(5)
+        entities = ["customer", "order", "product", "account", "invoice", "payment", "vendor", "store"]
+        attributes = ["id", "name", "amount", "quantity", "date", "status", "code", "description", "total"]
+        source, destination = [], []
+        for i in range(5000):
+            entity, attribute = rng.choice(entities), rng.choice(attributes)
+            data_type = rng.choice(["string", "integer", "float", "datetime"])
+            source.append((f"{entity}_{attribute}_{i}", data_type))
+            destination.append((f"{entity.capitalize()}{attribute.capitalize()}{i}", data_type))
+        rng.shuffle(destination)
+
+        started = time.perf_counter()
+        mappings = MappingGenerator.auto_generate_mappings(schema(*source), schema(*destination))
+        elapsed = time.perf_counter() - started
+
+        assert len(mappings) == 5000
+        assert all(m.source_field.rsplit("_", 1)[1] in m.destination_field for m in mappings)
+        assert elapsed < 5
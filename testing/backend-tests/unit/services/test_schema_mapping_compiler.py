@@ -0,0 +1,238 @@
+"""
+Unit Tests for the Schema Mapping Compiler
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Parity with the code emitted by TransformationRuleGenerator
+- Compiled casts, regexes, date formats and math operations
+- Column-wise CONCAT, SPLIT and CALCULATED mappings
+- Per-row CONDITIONAL mappings
+- Caching by mapping id and revision, and database resolution
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+import importlib
+import pkgutil
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import backend.models
+from backend.models.schema_mapping import SchemaMappingDefinition
+from backend.services.schema_mapper import (
+    FieldMapping,
+    MappingType,
+    SchemaMapping,
+    TransformationRuleGenerator,
+)
+from backend.services.schema_mapping_compiler import (
+    DateParser,
+    MappingApplicationError,
+    MappingCompilationError,
+    SchemaMappingCompiler,
+    compile_schema_mapping,
+)
+
+for module in pkgutil.iter_modules(backend.models.__path__):
+    importlib.import_module(f"backend.models.{module.name}")
+
+
+def make_mapping(*field_mappings, updated_at=datetime(2026, 1, 1), mapping_id="m1"):
+    return SchemaMapping(mapping_id=mapping_id, name="test", field_mappings=list(field_mappings), updated_at=updated_at)
+
+
+def transform(source, destination, **transformation):
+    return FieldMapping(source, destination, MappingType.TRANSFORM, transformation)
+
+
+def run_generated_code(schema_mapping, records):
+    namespace = {}
+    exec(TransformationRuleGenerator.generate_python_code(schema_mapping), namespace)
+    return [namespace["transform_data"](record) for record in records]
+
+
+class TestParityWithGeneratedCode:
+    """Test that compiled mappings match the generated Python code"""
+
+    def test_direct_constant_and_string_transforms(self):
+        mapping = make_mapping(
+            FieldMapping("id", "record_id"),
+            FieldMapping(None, "source", MappingType.CONSTANT, {"value": "crm"}),
+            transform("name", "upper_name", type="uppercase"),
+            transform("name", "lower_name", type="lowercase"),
+            transform("code", "code", type="trim"),
+            transform("age", "age", type="cast", to_type="integer", function="int"),
+        )
+        records = [
+            {"id": 1, "name": "Ada", "code": " x ", "age": "36"},
+            {"id": 2, "name": "", "code": None, "age": None},
+            {"id": 3, "code": "y"},
+        ]
+
+        assert compile_schema_mapping(mapping).apply_records(records) == run_generated_code(mapping, records)
+
+    def test_direct_mapping_shares_the_source_column(self):
+        batch = {"id": [1, 2, 3]}
+
+        result = compile_schema_mapping(make_mapping(FieldMapping("id", "record_id"))).apply_batch(batch)
+
+        assert result["record_id"] is batch["id"]
+
+
+class TestCompiledTransformations:
+    """Test transformations the generated code left unimplemented"""
+
+    def apply(self, field_mapping, values, source="v"):
+        compiled = compile_schema_mapping(make_mapping(field_mapping))
+        return compiled.apply_batch({source: values})[field_mapping.destination_field]
+
+    def test_casts(self):
+        assert self.apply(transform("v", "o", type="cast", to_type="float"), ["1.5", None]) == [1.5, None]
+        assert self.apply(transform("v", "o", type="cast", to_type="boolean"), ["yes", "0", True]) == [True, False, True]
+
+    def test_cast_error_policy(self):
+        with pytest.raises(MappingApplicationError):
+            self.apply(transform("v", "o", type="cast", to_type="int"), ["abc"])
+
+        assert self.apply(transform("v", "o", type="cast", to_type="int", on_error="null"), ["abc", "7"]) == [None, 7]
+
+    def test_unknown_cast_fails_at_compile_time(self):
+        with pytest.raises(MappingCompilationError):
+            compile_schema_mapping(make_mapping(transform("v", "o", type="cast", to_type="geometry")))
+
+    def test_substring_replace_and_regex(self):
+        assert self.apply(transform("v", "o", type="substring", start=1, length=3), ["abcdef"]) == ["bcd"]
+        assert self.apply(transform("v", "o", type="replace", old="-", new=""), ["1-2-3"]) == ["123"]
+        assert self.apply(transform("v", "o", type="replace", old=r"\s+", new=" ", regex=True), ["a   b"]) == ["a b"]
+        assert self.apply(
+            transform("v", "o", type="regex_extract", pattern=r"(\d{3})-\d+"), ["tel 555-1234", "none"]
+        ) == ["555", None]
+
+    def test_format_date_with_fixed_format(self):
+        result = self.apply(
+            transform("v", "o", type="format_date", format="%d/%m/%Y", output_format="%Y-%m-%d"),
+            ["31/12/2025", "bad", None]
+        )
+
+        assert result == ["2025-12-31", None, None]
+
+    def test_format_date_auto_detect_caches_format(self):
+        parser = DateParser("auto-detect", None)
+
+        assert [parser(v) for v in ["05/01/2026", "06/01/2026", "2026-01-07"]] == \
+            [datetime(2026, 1, 5), datetime(2026, 1, 6), datetime(2026, 1, 7)]
+        assert parser.last_format == "%d/%m/%Y"
+
+    def test_math_operation(self):
+        assert self.apply(transform("v", "o", type="math_operation", operation="multiply", operand=100), [0.5, None]) == [50.0, None]
+
+    def test_custom_transformation_is_rejected(self):
+        with pytest.raises(MappingCompilationError):
+            compile_schema_mapping(make_mapping(transform("v", "o", type="custom")))
+
+
+class TestMultiFieldMappings:
+    """Test column-wise multi-field and conditional mappings"""
+
+    def test_concat_split_and_calculated(self):
+        compiled = compile_schema_mapping(make_mapping(
+            FieldMapping(None, "full_name", MappingType.CONCAT, {"fields": ["first", "last"], "separator": " "}),
+            FieldMapping("email", "domain", MappingType.SPLIT, {"separator": "@", "index": 1}),
+            FieldMapping(None, "total", MappingType.CALCULATED, {"fields": ["qty", "price"], "operation": "multiply"}),
+        ))
+
+        result = compiled.apply_records([
+            {"first": "Ada", "last": "Lovelace", "email": "ada@example.com", "qty": 2, "price": 1.5},
+            {"first": "Bob", "last": None, "email": "nobody", "qty": None, "price": 3},
+        ])
+
+        assert result == [
+            {"full_name": "Ada Lovelace", "domain": "example.com", "total": 3.0},
+            {"full_name": "Bob", "domain": None, "total": None},
+        ]
+
+    def test_conditional_with_transformation_and_else_field(self):
+        compiled = compile_schema_mapping(make_mapping(FieldMapping(
+            "name", "display", MappingType.CONDITIONAL,
+            {"type": "uppercase", "else_field": "fallback"},
+            condition={"all": [{"field": "active", "operator": "equals", "value": True},
+                               {"field": "name", "operator": "not_null"}]}
+        )))
+
+        result = compiled.apply_batch({
+            "name": ["ada", "bob", None],
+            "active": [True, False, True],
+            "fallback": ["-", "inactive", "unnamed"],
+        })
+
+        assert result["display"] == ["ADA", "inactive", "unnamed"]
+
+    def test_conditional_constants_and_type_mismatch(self):
+        compiled = compile_schema_mapping(make_mapping(FieldMapping(
+            None, "tier", MappingType.CONDITIONAL, {"then": "gold", "else": "standard"},
+            condition={"field": "spend", "operator": "greater_than", "value": 1000}
+        )))
+
+        assert compiled.apply_batch({"spend": [5000, 10, None, "n/a"]})["tier"] == \
+            ["gold", "standard", "standard", "standard"]
+
+    def test_conditional_requires_condition(self):
+        with pytest.raises(MappingCompilationError):
+            compile_schema_mapping(make_mapping(FieldMapping("a", "b", MappingType.CONDITIONAL)))
+
+
+@asynccontextmanager
+async def mapping_session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SchemaMappingDefinition.__table__.create)
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)()
+    finally:
+        await engine.dispose()
+
+
+class TestSchemaMappingCompiler:
+    """Test caching of compiled mappings"""
+
+    def test_cached_per_revision(self):
+        compiler = SchemaMappingCompiler()
+        first = compiler.get(make_mapping(FieldMapping("a", "b")))
+
+        assert compiler.get(make_mapping(FieldMapping("a", "b"))) is first
+        revised = compiler.get(make_mapping(FieldMapping("a", "c"), updated_at=datetime(2026, 2, 1)))
+
+        assert revised is not first
+        assert revised.destination_fields == ["c"]
+        assert compiler.get_stats()["size"] == 1
+        assert compiler.get_stats()["compilations"] == 2
+
+    def test_lru_eviction_and_invalidate(self):
+        compiler = SchemaMappingCompiler(max_size=2)
+        for mapping_id in ("m1", "m2", "m3"):
+            compiler.get(make_mapping(FieldMapping("a", "b"), mapping_id=mapping_id))
+
+        assert compiler.get_stats()["size"] == 2
+        compiler.invalidate("m3")
+        assert compiler.get_stats()["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resolve_from_database(self):
+        compiler = SchemaMappingCompiler()
+        async with mapping_session() as db:
+            db.add(SchemaMappingDefinition(
+                id=1, name="m", source_schema_id=1, destination_schema_id=2,
+                field_mappings=[FieldMapping("name", "name", MappingType.TRANSFORM, {"type": "uppercase"}).to_dict()],
+            ))
+            await db.commit()
+
+            compiled = await compiler.resolve(db, 1)
+            again = await compiler.resolve(db, 1)
+            missing = await compiler.resolve(db, 2)
+
+        assert compiled is again
+        assert compiled.apply_records([{"name": "ada"}]) == [{"name": "ADA"}]
+        assert missing is None
+        assert compiler.get_stats()["hits"] == 1
@@ -0,0 +1,272 @@
+"""
+Unit Tests for the Vectorized Builtin Functions
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- Parity with the Python source of every builtin
+- Null masks, zero-copy renames, hash grouping and stable argsort
+- Fallbacks for mixed-type and nullable columns
+- Registry dispatch of builtins to the columnar implementations
+- Blocking builtins seeing every upstream batch of a pipeline node, off the event loop
+"""
+
+from types import SimpleNamespace
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock, patch
+import random
+import threading
+
+import pytest
+
+from backend.services.function_registry import FunctionRegistry
+from backend.services.node_output_cache import columns_to_records, records_to_columns
+from backend.services.pipeline_execution_engine import PipelineExecutionEngine, PipelineExecutionState
+from backend.services.transformation_function_service import TransformationFunctionService
+from backend.services import vectorized_builtins as vb
+
+
+def make_function(name, is_builtin):
+    return SimpleNamespace(
+        id=1, name=name, function_code=builtin_source(name)["function_code"],
+        updated_at=None, created_at=datetime(2026, 1, 1), is_builtin=is_builtin
+    )
+
+
+def builtin_source(name):
+    return next(f for f in TransformationFunctionService.get_builtin_functions() if f["name"] == name)
+
+
+def python_builtin(name):
+    """Reference implementation: the builtin's displayed Python source"""
+    namespace = {}
+    exec(builtin_source(name)["function_code"], namespace)
+    return namespace[name]
+
+
+def sample_records(rows=500, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "category": rng.choice(["a", "b", "c", None]),
+            "region": rng.choice(["north", "south"]),
+            "amount": rng.randint(-50, 500),
+            "price": round(rng.uniform(0, 100), 2),
+            "email": rng.choice([f"user{i % 40}@test.com", None]),
+        }
+        for i in range(rows)
+    ]
+
+
+@pytest.fixture
+def records():
+    return sample_records()
+
+
+@pytest.fixture
+def batch(records):
+    return records_to_columns(records)
+
+
+class TestParityWithPythonSource:
+    """Test that columnar results match the record-based source"""
+
+    @pytest.mark.parametrize("fields", [["email"], ["category", "email"]])
+    def test_filter_null_values(self, records, batch, fields):
+        expected = python_builtin("filter_null_values")(records, fields)
+
+        assert columns_to_records(vb.filter_null_values(batch, fields)) == expected
+
+    def test_filter_null_values_all_fields(self, records, batch):
+        expected = python_builtin("filter_null_values")(records)
+
+        assert columns_to_records(vb.filter_null_values(batch)) == expected
+
+    def test_map_fields(self, records, batch):
+        mapping = {"id": "record_id", "email": "contact"}
+        expected = python_builtin("map_fields")(records, mapping)
+
+        assert columns_to_records(vb.map_fields(batch, mapping)) == expected
+
+    @pytest.mark.parametrize("group_by,sum_field", [
+        (["region"], "amount"),
+        (["region", "category"], "amount"),
+        (["category"], "price"),
+    ])
+    def test_aggregate_sum(self, records, batch, group_by, sum_field):
+        expected = python_builtin("aggregate_sum")(records, group_by, sum_field)
+        result = columns_to_records(vb.aggregate_sum(batch, group_by, sum_field))
+
+        assert [{k: v for k, v in r.items() if k != "total"} for r in result] == \
+            [{k: v for k, v in r.items() if k != "total"} for r in expected]
+        assert [r["total"] for r in result] == pytest.approx([r["total"] for r in expected])
+
+    @pytest.mark.parametrize("sort_by", ["amount", "price", "region"])
+    @pytest.mark.parametrize("reverse", [False, True])
+    def test_sort_records_is_stable(self, records, batch, sort_by, reverse):
+        expected = python_builtin("sort_records")(records, sort_by, reverse)
+
+        assert columns_to_records(vb.sort_records(batch, sort_by, reverse)) == expected
+
+    @pytest.mark.parametrize("limit,offset", [(10, 0), (25, 490), (5, 600)])
+    def test_limit_records(self, records, batch, limit, offset):
+        expected = python_builtin("limit_records")(records, limit, offset)
+
+        assert columns_to_records(vb.limit_records(batch, limit, offset)) == expected
+
+    @pytest.mark.parametrize("unique_fields", [["email"], ["region", "category"], []])
+    def test_deduplicate(self, records, batch, unique_fields):
+        expected = python_builtin("deduplicate")(records, unique_fields)
+
+        assert columns_to_records(vb.deduplicate(batch, unique_fields)) == expected
+
+
+class TestColumnarBehaviour:
+    """Test columnar-specific behaviour and fallbacks"""
+
+    def test_map_fields_does_not_copy_columns(self, batch):
+        result = vb.map_fields(batch, {"email": "contact"})
+
+        assert result["contact"] is batch["email"]
+
+    def test_filter_missing_column_drops_everything(self, batch):
+        result = vb.filter_null_values(batch, ["missing"])
+
+        assert all(values == [] for values in result.values())
+
+    def test_sort_mixed_types_falls_back_to_python(self):
+        batch = {"v": [3, "a", 1]}
+
+        with pytest.raises(TypeError):
+            vb.sort_records(batch, "v")
+
+    def test_sort_datetimes(self):
+        dates = [datetime(2026, 1, d) for d in (3, 1, 2)]
+
+        assert vb.sort_records({"d": dates}, "d")["d"] == sorted(dates)
+
+    def test_aggregate_decimals_and_nulls(self):
+        batch = {"k": ["x", "x", "y"], "v": [Decimal("1.5"), None, Decimal("2")]}
+
+        assert vb.aggregate_sum(batch, ["k"], "v") == {"k": ["x", "y"], "total": [Decimal("1.5"), Decimal("2")]}
+
+    def test_aggregate_keeps_integer_totals(self):
+        result = vb.aggregate_sum({"k": [1, 1, 2], "v": [2**40, 2**40, 1]}, ["k"], "v")
+
+        assert result["total"] == [2**41, 1]
+        assert all(isinstance(t, int) for t in result["total"])
+
+    def test_aggregate_past_int64_does_not_wrap(self):
+        result = vb.aggregate_sum({"k": [1, 1, 1, 2], "v": [2**62, 2**62, 2**62, -(2**62)]}, ["k"], "v")
+
+        assert result["total"] == [3 * 2**62, -(2**62)]
+
+    def test_concat_batches_fills_missing_columns(self):
+        merged = vb.concat_batches([{"a": [1, 2]}, {"a": [3], "b": ["x"]}])
+
+        assert merged == {"a": [1, 2, 3], "b": [None, None, "x"]}
+
+    def test_empty_batch(self):
+        assert vb.deduplicate({}, ["a"]) == {}
+        assert vb.aggregate_sum({}, ["a"], "b") == {"a": [], "total": []}
+
+
+class TestRegistryDispatch:
+    """Test that builtins are dispatched to their columnar versions"""
+
+    def test_builtin_uses_columnar_function(self, batch):
+        compiled = FunctionRegistry().get(make_function("deduplicate", is_builtin=True))
+
+        assert compiled.columnar_func is vb.deduplicate
+        assert compiled.call_columnar(batch, {"unique_fields": ["region"]})["region"] == \
+            list(dict.fromkeys(batch["region"]))
+
+    def test_user_function_with_builtin_name_is_not_swapped(self, records, batch):
+        compiled = FunctionRegistry().get(make_function("limit_records", is_builtin=False))
+
+        assert compiled.columnar_func is None
+        assert not compiled.blocking
+        assert columns_to_records(compiled.call_columnar(batch, {"limit": 3})) == records[:3]
+
+    def test_blocking_builtins_marked(self):
+        assert FunctionRegistry().get(make_function("aggregate_sum", is_builtin=True)).blocking
+        assert not FunctionRegistry().get(make_function("map_fields", is_builtin=True)).blocking
+
+
+class TestBlockingBuiltins:
+    """Test that blocking builtins see every upstream batch of a node"""
+
+    BATCHES = [{"k": ["a", "b"], "v": [1, 5]}, {"k": ["a", "b"], "v": [10, 2]}]
+
+    async def run_node(self, name, parameters, batches=None):
+        compiled = FunctionRegistry().get(make_function(name, is_builtin=True))
+        state = PipelineExecutionState(1, Mock())
+        state.upstream = {"fn": ["source"]}
+        state.node_outputs = {"source": batches or self.BATCHES}
+        engine = PipelineExecutionEngine()
+
+        with patch.object(engine, "_resolve_function", new_callable=AsyncMock, return_value=compiled):
+            await engine._execute_function_node(state, Mock(id="fn"), {"parameters": parameters})
+        return columns_to_records(vb.concat_batches(state.node_outputs["fn"]))
+
+    @pytest.mark.asyncio
+    async def test_aggregate_sum(self):
+        result = await self.run_node("aggregate_sum", {"group_by": ["k"], "sum_field": "v"})
+
+        assert result == [{"k": "a", "total": 11}, {"k": "b", "total": 7}]
+
+    @pytest.mark.asyncio
+    async def test_limit_records(self):
+        result = await self.run_node("limit_records", {"limit": 2, "offset": 1})
+
+        assert result == [{"k": "b", "v": 5}, {"k": "a", "v": 10}]
+
+    @pytest.mark.asyncio
+    async def test_sort_records(self):
+        result = await self.run_node("sort_records", {"sort_by": "v"})
+
+        assert [row["v"] for row in result] == [1, 2, 5, 10]
+
+    @pytest.mark.asyncio
+    async def test_deduplicate(self):
+        result = await self.run_node("deduplicate", {"unique_fields": ["k"]})
+
+        assert result == [{"k": "a", "v": 1}, {"k": "b", "v": 5}]
+
+    @pytest.mark.asyncio
+    async def test_row_wise_builtin_keeps_batches(self):
+        compiled = FunctionRegistry().get(make_function("map_fields", is_builtin=True))
+        state = PipelineExecutionState(1, Mock())
+        state.upstream = {"fn": ["source"]}
+        state.node_outputs = {"source": self.BATCHES}
+        engine = PipelineExecutionEngine()
+
+        with patch.object(engine, "_resolve_function", new_callable=AsyncMock, return_value=compiled):
+            records_out = await engine._execute_function_node(
+                state, Mock(id="fn"), {"parameters": {"field_mapping": {"v": "value"}}}
+            )
+
+        assert records_out == 4
+        assert len(state.node_outputs["fn"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_blocking_builtin_runs_in_executor(self):
+        compiled = FunctionRegistry().get(make_function("sort_records", is_builtin=True))
+        state = PipelineExecutionState(1, Mock())
+        state.upstream = {"fn": ["source"]}
+        state.node_outputs = {"source": self.BATCHES}
+        engine = PipelineExecutionEngine()
+        call_columnar = compiled.call_columnar
+        threads = []
+
+        def record_thread(batch, parameters):
+            threads.append(threading.current_thread())
+            return call_columnar(batch, parameters)
+
+        with patch.object(engine, "_resolve_function", new_callable=AsyncMock, return_value=compiled), \
+                patch.object(compiled, "call_columnar", side_effect=record_thread):
+            await engine._execute_function_node(state, Mock(id="fn"), {"parameters": {"sort_by": "v"}})
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.main_thread()
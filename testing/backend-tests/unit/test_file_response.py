@@ -0,0 +1,155 @@
+"""
+Unit Tests for Stored File Downloads
+Data Aggregator Platform - Testing Framework
+
+Tests cover:
+- ETag from the content hash and If-None-Match revalidation
+- Single and multi-range requests
+- Zero-copy pathsend for whole files when the server offers it
+- Compressed files served by their content, decompressing only covered frames
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from backend.core.file_response import StoredFileResponse, parse_etags
+from backend.services.compressed_storage import compress_file
+
+CONTENT = bytes(range(256)) * 4096
+
+
+@pytest.fixture
+def stored_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+@pytest.fixture
+def client(stored_file):
+    file_hash = hashlib.sha256(CONTENT).hexdigest()
+
+    async def download(request):
+        return StoredFileResponse(stored_file, file_hash=file_hash, filename="data.bin")
+
+    return TestClient(Starlette(routes=[Route("/download", download)]))
+
+
+class TestStoredFileResponse:
+    """Test streaming downloads"""
+
+    def test_full_download_with_etag(self, client):
+        response = client.get("/download")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["etag"] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+        assert response.headers["accept-ranges"] == "bytes"
+
+    def test_if_none_match(self, client):
+        etag = client.get("/download").headers["etag"]
+
+        assert client.get("/download", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+        assert client.get("/download", headers={"If-None-Match": "*"}).content == b""
+        assert client.get("/download", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    def test_single_range(self, client):
+        response = client.get("/download", headers={"Range": "bytes=1000-300000"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[1000:300001]
+        assert response.headers["content-range"] == f"bytes 1000-300000/{len(CONTENT)}"
+
+    def test_multiple_ranges(self, client):
+        response = client.get("/download", headers={"Range": "bytes=0-9, -10"})
+
+        assert response.status_code == 206
+        assert response.headers["content-type"].startswith("multipart/byteranges")
+        assert CONTENT[:10] in response.content and CONTENT[-10:] in response.content
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/download", headers={"Range": f"bytes={len(CONTENT)}-"})
+
+        assert response.status_code == 416
+
+    def test_pathsend_when_offered(self, stored_file):
+        messages = []
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "headers": [],
+            "extensions": {"http.response.pathsend": {}},
+        }
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(StoredFileResponse(stored_file, file_hash="abc")(scope, receive, send))
+
+        assert messages[-1] == {"type": "http.response.pathsend", "path": stored_file}
+        assert not any(message["type"] == "http.response.body" for message in messages)
+
+    def test_parse_etags(self):
+        assert parse_etags('"a", W/"b" ,,"c"') == {'"a"', '"b"', '"c"'}
+
+
+class TestCompressedDownloads:
+    """Test downloads of files in compressed frame storage"""
+
+    @pytest.fixture
+    def compressed_file(self, tmp_path):
+        source = tmp_path / "source.bin"
+        source.write_bytes(CONTENT)
+        compress_file(str(source), str(tmp_path / "stored.bin"), frame_size=64 * 1024)
+        return str(tmp_path / "stored.bin")
+
+    @pytest.fixture
+    def compressed_client(self, compressed_file):
+        async def download(request):
+            return StoredFileResponse(compressed_file, file_hash="abc", filename="data.bin")
+
+        return TestClient(Starlette(routes=[Route("/download", download)]))
+
+    def test_full_download_is_uncompressed(self, compressed_client):
+        response = compressed_client.get("/download")
+
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == str(len(CONTENT))
+
+    def test_ranges_over_frames(self, compressed_client):
+        single = compressed_client.get("/download", headers={"Range": "bytes=200000-400000"})
+        multiple = compressed_client.get("/download", headers={"Range": "bytes=0-9, -10"})
+
+        assert single.status_code == 206
+        assert single.content == CONTENT[200000:400001]
+        assert single.headers["content-range"] == f"bytes 200000-400000/{len(CONTENT)}"
+        assert CONTENT[:10] in multiple.content and CONTENT[-10:] in multiple.content
+
+    def test_no_pathsend(self, compressed_file):
+        messages = []
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "headers": [],
+            "extensions": {"http.response.pathsend": {}},
+            "asgi": {"spec_version": "2.4"},
+        }
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(StoredFileResponse(compressed_file, file_hash="abc")(scope, receive, send))
+
+        assert not any(message["type"] == "http.response.pathsend" for message in messages)
+        assert b"".join(message.get("body", b"") for message in messages) == CONTENT
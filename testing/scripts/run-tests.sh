@@ -198,6 +198,28 @@ run_e2e_tests() {
     fi
 }
 
+# Run performance benchmarks
+run_performance_tests() {
+    print_stage_header "Performance Benchmarks"
+    local start_time=$(date +%s)
+    
+    cd "${PROJECT_ROOT}"
+    
+    if ${PYTHON_BIN} testing/backend-tests/performance/run_benchmarks.py --check-baseline 2>&1 | tee testing/reports/logs/performance.log; then
+        local end_time=$(date +%s)
+        local duration=$((end_time - start_time))s
+        STAGE_RESULTS[performance]="PASSED"
+        STAGE_DURATIONS[performance]=$duration
+        return 0
+    else
+        local end_time=$(date +%s)
+        local duration=$((end_time - start_time))s
+        STAGE_RESULTS[performance]="FAILED"
+        STAGE_DURATIONS[performance]=$duration
+        return 1
+    fi
+}
+
 # Main execution
 main() {
     print_header
@@ -261,6 +283,15 @@ main() {
         fi
     fi
     
+    if [ "$STAGE_TO_RUN" == "all" ] || [ "$STAGE_TO_RUN" == "performance" ]; then
+        if run_performance_tests; then
+            print_stage_result "Performance Benchmarks" "PASSED" "${STAGE_DURATIONS[performance]}"
+        else
+            print_stage_result "Performance Benchmarks" "FAILED" "${STAGE_DURATIONS[performance]}"
+            EXIT_CODE=1
+        fi
+    fi
+    
     # Print final summary
     echo ""
     echo -e "${CYAN}╔══════════════════════════════════════════════════════════════╗${NC}"